@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analyse d'intention de l'assistant : base des logiciels, cascade de classification
+(mots-clés, recherche approximative, cache, exemples, spéculation, Ollama) et sa configuration.
+
+Séparée du point d'entrée (assistant_spotify.py) pour servir sans micro, carte son
+ni synthèse vocale : transcription en lot, benchmarks, tests.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from detection_mots_cles import obtenir_detecteur
+from recherche_logiciels import obtenir_index
+from base_raccourcis import BaseRaccourcis
+from client_ollama import ClientOllama
+from residence_ollama import ResidenceOllama
+from classification_llm import (
+    CatalogueIntentions, NUM_PREDICT_LABELS, PrefixeClassification, classifier_en_flux, confiance_reponse,
+    extraire_intention, obtenir_catalogue,
+)
+from classification_exemples import IndexExemples, creer_embeddeur, exemples_intentions
+from cache_intentions import CacheIntentions, empreinte_classification, empreinte_logiciels
+from speculation_llm import ClassificationSpeculative
+from metriques import METRIQUES
+from journal_evenements import JOURNAL
+from cascade_intentions import CascadeIntentions, EtageCascade
+
+
+# ==================== CONFIGURATION ====================
+
+# Dossier des raccourcis des logiciels (à adapter selon votre installation)
+SHORTCUTS_PATH = r"C:\Users\jaige\Desktop\ia_perso\IA_Test\shortcuts"
+
+
+# Index du dossier shortcuts conservé entre deux lancements, puis surveillé pendant l'écoute :
+# un raccourci ajouté ou supprimé (sous-dossiers compris) est pris en compte sans redémarrer
+SHORTCUTS_CACHE_PATH = "cache_raccourcis.json"
+SHORTCUTS_SURVEILLANCE_S = 2.0   # Intervalle entre deux vérifications du dossier (None = pas de surveillance)
+BASE_RACCOURCIS = BaseRaccourcis(SHORTCUTS_PATH, SHORTCUTS_CACHE_PATH, SHORTCUTS_SURVEILLANCE_S or 2.0)
+
+# Base de données des logiciels disponibles
+SOFTWARE_DB = {}
+
+# Incrémenté à chaque rechargement de SOFTWARE_DB (invalide les structures qui en dépendent)
+SOFTWARE_DB_VERSION = 0
+
+# Empreinte du contenu de SOFTWARE_DB, stable d'un redémarrage à l'autre (clé du cache d'intentions)
+SOFTWARE_DB_EMPREINTE = empreinte_logiciels([])
+
+# Configuration Ollama
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_URL = f"{OLLAMA_BASE_URL}/api/generate"
+OLLAMA_MODEL = "mistral"  # Le nom du modèle (peut être mistral, mistral:latest, etc.)
+OLLAMA_KEEP_ALIVE = "10m"  # Durée pendant laquelle Ollama garde le modèle en mémoire après une requête
+OLLAMA_TENTATIVES = 2      # Nouvelles tentatives en cas d'échec de connexion (attente exponentielle)
+OLLAMA_STREAMING = True    # Couper la génération dès qu'un label est décodé (False : lire la réponse complète)
+
+# Client HTTP partagé (connexions persistantes) pour toutes les requêtes Ollama
+CLIENT_OLLAMA = ClientOllama(OLLAMA_BASE_URL, keep_alive=OLLAMA_KEEP_ALIVE, tentatives=OLLAMA_TENTATIVES)
+
+# Variable globale pour stocker le nom exact du modèle trouvé
+OLLAMA_MODEL_ACTUAL = None
+
+# Modèle chargé dans Ollama dès le démarrage (requête au prompt vide), puis sa résidence renouvelée
+# avant l'expiration du keep_alive tant que l'assistant sert ; après OLLAMA_INACTIVITE_MAX secondes
+# sans commande, le modèle est laissé expirer pour libérer la mémoire
+OLLAMA_PRECHARGEMENT = True
+OLLAMA_INACTIVITE_MAX = 20 * 60
+# Ce qu'Ollama doit reconnaître : 'codes' = toutes les intentions d'executer_action() et les logiciels de
+# SOFTWARE_DB, désignés par des numéros (réponse d'un ou deux tokens) ; 'spotify' = lancer Spotify ou non
+OLLAMA_CLASSIFICATION = 'codes'
+# En dessous de cette probabilité (selon le modèle) de sa réponse, la commande est ignorée
+# (Ollama ne renvoie les probabilités qu'à partir de la version 0.12 : sans elles, aucun filtrage)
+OLLAMA_CONFIANCE_MIN = 0.5
+# Prompt de classification : instructions fixes en tête, puis le texte transcrit. Les instructions ne sont
+# évaluées qu'une fois par Ollama : 'contexte' renvoie les tokens du préfixe déjà évalué à chaque requête,
+# 'systeme' les passe comme prompt système constant, None renvoie le prompt complet
+OLLAMA_PREFIXE = 'contexte'
+# Identique pour le préchargement et les classifications (sinon Ollama recharge le modèle).
+# Les instructions listent les logiciels (environ 8 tokens chacun) : à augmenter pour un gros dossier shortcuts
+OLLAMA_NUM_CTX = 1024
+OLLAMA_OPTIONS = {
+    "temperature": 0.0,   # Température à 0 pour des réponses déterministes
+    "num_predict": NUM_PREDICT_LABELS,  # Un label complet (remplacé par la longueur des codes en mode 'codes')
+    "num_ctx": OLLAMA_NUM_CTX,
+    "top_k": 1,           # Réduit les options de génération
+    "top_p": 0.1          # Réduit la diversité
+}
+INSTRUCTIONS_CLASSIFICATION = (
+    "Analyse: l'utilisateur veut-il lancer Spotify? "
+    "Réponds UNIQUEMENT 'ACTION_SPOTIFY' ou 'IGNORE'.\n\n"
+)
+PREFIXE_CLASSIFICATION = PrefixeClassification(CLIENT_OLLAMA, INSTRUCTIONS_CLASSIFICATION, OLLAMA_OPTIONS, OLLAMA_PREFIXE)
+
+RESIDENCE_OLLAMA = ResidenceOllama(
+    CLIENT_OLLAMA,
+    modele=lambda: _modele_ollama(),
+    keep_alive=OLLAMA_KEEP_ALIVE,
+    inactivite_max_s=OLLAMA_INACTIVITE_MAX,
+    options={"num_ctx": OLLAMA_NUM_CTX},
+    # Le cache des tokens évalués disparaît avec le modèle : réévaluer les instructions à chaque chargement
+    apres_chargement=lambda: preparer_classification(),
+)
+
+# Cache des intentions renvoyées par Ollama (persistant entre deux lancements)
+INTENT_CACHE_PATH = "cache_intentions.json"
+INTENT_CACHE_SIZE = 512                # Nombre maximal d'entrées (éviction LRU)
+INTENT_CACHE_TTL = 7 * 24 * 3600       # Durée de vie d'une entrée en secondes
+CACHE_INTENTIONS = CacheIntentions(INTENT_CACHE_SIZE, INTENT_CACHE_TTL, INTENT_CACHE_PATH)
+
+# Classification par similarité avec des phrases d'exemple, avant Ollama (classification_exemples.py) :
+# nom d'un modèle d'embeddings d'Ollama (ollama pull nomic-embed-text), 'ngrammes' (sans modèle, mais
+# sans notion de sens) ou None pour la désactiver
+EXEMPLES_EMBEDDEUR = 'nomic-embed-text'
+EXEMPLES_DOSSIER = "index_exemples"
+EXEMPLES_SIMILARITE_MIN = 0.8   # Similarité cosinus minimale avec le meilleur exemple
+EXEMPLES_MARGE_MIN = 0.05       # Écart minimal avec la meilleure autre intention
+INDEX_EXEMPLES: Optional[IndexExemples] = None  # Construit au démarrage
+
+# Seuil de longueur minimale du texte pour l'analyse
+MIN_TEXT_LENGTH = 3
+
+# Recherche approximative des noms de logiciels ("lance discorde" -> discord) avant de faire appel à Ollama
+RECHERCHE_APPROXIMATIVE = True
+SEUIL_RECHERCHE_APPROXIMATIVE = 0.75   # Score minimal (0 à 1) du logiciel retenu
+
+# Spéculation : la requête Ollama part dès qu'un texte partiel d'au moins SPECULATION_MOTS_MIN mots
+# ne change plus, et sa réponse est réutilisée si le texte final est identique
+SPECULATION_ACTIVE = True
+SPECULATION_MOTS_MIN = 3
+SPECULATION_BLOCS_STABLES = 1
+SPECULATION = ClassificationSpeculative(
+    classifier=lambda texte, annulation: classifier_ollama(texte, annulation),
+    necessite_llm=lambda texte: necessite_ollama(texte),
+    longueur_min=SPECULATION_MOTS_MIN,
+    blocs_stables=SPECULATION_BLOCS_STABLES,
+)
+
+# Cascade de classification (cascade_intentions.py), du moins coûteux au plus coûteux : la première intention
+# dont la confiance atteint le seuil de son étage est retenue ; si aucun étage ne conclut, la commande est ignorée.
+# Budget = latence maximale en secondes : passé ce délai, l'étage est annulé et la cascade passe au suivant
+# (None = exécuté dans le thread d'analyse, sans limite). Retirer un étage le désactive
+CASCADE_ETAGES = {
+    'mots_cles': {'seuil': None, 'budget_s': None},
+    'approximatif': {'seuil': SEUIL_RECHERCHE_APPROXIMATIVE, 'budget_s': None},
+    'cache': {'seuil': None, 'budget_s': None},
+    'exemples': {'seuil': EXEMPLES_SIMILARITE_MIN, 'budget_s': 0.5},
+    'speculation': {'seuil': None, 'budget_s': 10.0},   # Réponse déjà filtrée par le seuil de 'ollama'
+    'ollama': {'seuil': OLLAMA_CONFIANCE_MIN, 'budget_s': 10.0},
+}
+_FONCTIONS_ETAGES = {
+    'mots_cles': lambda texte, annulation: etage_mots_cles(texte),
+    'approximatif': lambda texte, annulation: etage_approximatif(texte),
+    'cache': lambda texte, annulation: etage_cache(texte),
+    'exemples': lambda texte, annulation: etage_exemples(texte),
+    'speculation': lambda texte, annulation: etage_speculation(texte),
+    'ollama': lambda texte, annulation: etage_ollama(texte, annulation),
+}
+CASCADE = CascadeIntentions([
+    EtageCascade(nom, _FONCTIONS_ETAGES[nom], **reglages) for nom, reglages in CASCADE_ETAGES.items()
+])
+
+# Origine des intentions : part des commandes conclues par chaque étage de la cascade ('aucune' = commande ignorée)
+INTENTIONS_PAR_SOURCE = {
+    source: METRIQUES.compteur('assistant_intentions_total', "Intentions déterminées, par source", {'source': source})
+    for source in (*CASCADE_ETAGES, 'aucune')
+}
+DUREE_EXEMPLES = METRIQUES.histogramme('assistant_exemples_secondes', "Durée d'une classification par similarité avec les exemples")
+DUREE_OLLAMA = METRIQUES.histogramme('assistant_ollama_secondes', "Durée d'une classification par Ollama")
+TIMEOUTS_OLLAMA = METRIQUES.compteur('assistant_ollama_timeouts_total', "Requêtes Ollama expirées")
+CONFIANCE_OLLAMA = METRIQUES.histogramme('assistant_ollama_confiance', "Probabilité de la réponse d'Ollama selon le modèle",
+                                         bornes=(0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99))
+
+
+# ==================== FONCTIONS ====================
+
+def load_software_db() -> None:
+    """
+    Charge la base de données des logiciels : depuis l'index enregistré s'il existe
+    (la surveillance le mettra à jour), sinon en parcourant le dossier shortcuts.
+    """
+    if not os.path.exists(SHORTCUTS_PATH):
+        print(f"⚠️  Dossier shortcuts introuvable : {SHORTCUTS_PATH}")
+        return
+    
+    origine = "index enregistré"
+    if not BASE_RACCOURCIS.charger():
+        BASE_RACCOURCIS.rescanner()
+        origine = "dossier shortcuts"
+    publier_software_db()
+    
+    print(f"✅ Base de données logiciels chargée ({origine}) : {len(SOFTWARE_DB)} logiciels")
+
+
+def publier_software_db() -> None:
+    """
+    Remplace SOFTWARE_DB par le contenu de BASE_RACCOURCIS et invalide ce qui en dépend.
+    
+    Le détecteur de mots-clés, la grammaire et l'index approximatif sont reconstruits
+    à leur prochaine utilisation (SOFTWARE_DB_VERSION change).
+    """
+    global SOFTWARE_DB, SOFTWARE_DB_VERSION, SOFTWARE_DB_EMPREINTE
+    SOFTWARE_DB = BASE_RACCOURCIS.logiciels()
+    SOFTWARE_DB_EMPREINTE = empreinte_logiciels(SOFTWARE_DB.keys())
+    SOFTWARE_DB_VERSION += 1
+
+
+def actualiser_classification() -> None:
+    """
+    Met à jour ce qui dépend de la liste des logiciels (index des exemples, prompt d'Ollama), après publier_software_db().
+    """
+    # Phrases d'exemple des logiciels ajoutés : seules celles-ci sont vectorisées
+    if INDEX_EXEMPLES is not None:
+        try:
+            INDEX_EXEMPLES.construire(exemples_intentions(SOFTWARE_DB.keys()))
+        except (requests.exceptions.RequestException, OSError) as e:
+            JOURNAL.evenement('erreur', f"⚠️  Mise à jour de l'index des exemples : {e}", etage='exemples', erreur=str(e))
+    
+    # Le prompt liste les logiciels : faire évaluer le nouveau préfixe avant la prochaine commande
+    if OLLAMA_CLASSIFICATION == 'codes' and OLLAMA_PREFIXE and RESIDENCE_OLLAMA.charge:
+        try:
+            preparer_classification()
+        except requests.exceptions.RequestException as e:
+            JOURNAL.evenement('erreur', f"⚠️  Préparation du prompt de classification : {e}", etage='ollama', erreur=str(e))
+
+
+def verifier_ollama() -> bool:
+    """
+    Vérifie si Ollama est accessible et si le modèle est disponible.
+    
+    Returns:
+        bool: True si Ollama est accessible, False sinon
+    """
+    try:
+        model_names = CLIENT_OLLAMA.lister_modeles(timeout=2)
+        
+        # Vérifier si le modèle existe (exact ou avec variante comme mistral:latest)
+        model_found = False
+        matching_model = None
+        
+        for model_name in model_names:
+            # Vérifier correspondance exacte ou si le nom commence par le modèle (ex: mistral:latest)
+            if model_name == OLLAMA_MODEL or model_name.startswith(OLLAMA_MODEL + ':'):
+                model_found = True
+                matching_model = model_name
+                break
+        
+        if model_found:
+            global OLLAMA_MODEL_ACTUAL
+            OLLAMA_MODEL_ACTUAL = matching_model
+            print(f"✅ Ollama accessible avec le modèle '{matching_model}'")
+            return True
+        else:
+            print(f"⚠️  Modèle '{OLLAMA_MODEL}' non trouvé. Modèles disponibles : {model_names}")
+            print(f"💡 Installez le modèle avec : ollama pull {OLLAMA_MODEL}")
+            return False
+    except requests.exceptions.RequestException:
+        print("❌ Ollama n'est pas accessible. Assurez-vous qu'Ollama est démarré.")
+        return False
+
+
+def charger_modele_ollama() -> None:
+    """
+    Charge le modèle dans Ollama (sans attendre une première commande), puis maintient sa résidence
+    tant que l'assistant est utilisé. Sans effet si verifier_ollama() n'a pas trouvé le modèle.
+    """
+    if not OLLAMA_PRECHARGEMENT or OLLAMA_MODEL_ACTUAL is None:
+        return
+    RESIDENCE_OLLAMA.prechauffer()
+    RESIDENCE_OLLAMA.demarrer()
+
+
+def preparer_index_exemples() -> None:
+    """
+    Construit ou met à jour l'index des phrases d'exemple (seules les phrases nouvelles sont vectorisées).
+    
+    Sans effet si la classification par exemples est désactivée ou si le modèle d'embeddings manque.
+    """
+    global INDEX_EXEMPLES
+    if not EXEMPLES_EMBEDDEUR:
+        return
+    try:
+        if EXEMPLES_EMBEDDEUR != 'ngrammes':
+            modeles = CLIENT_OLLAMA.lister_modeles(timeout=2)
+            if not any(nom == EXEMPLES_EMBEDDEUR or nom.startswith(EXEMPLES_EMBEDDEUR + ':') for nom in modeles):
+                print(f"⚠️  Modèle d'embeddings '{EXEMPLES_EMBEDDEUR}' absent : classification par exemples désactivée")
+                print(f"💡 Installez le modèle avec : ollama pull {EXEMPLES_EMBEDDEUR}")
+                return
+        index = IndexExemples(EXEMPLES_DOSSIER, creer_embeddeur(EXEMPLES_EMBEDDEUR, CLIENT_OLLAMA))
+        vectorisees = index.construire(exemples_intentions(SOFTWARE_DB.keys()))
+    except (requests.exceptions.RequestException, OSError) as e:
+        print(f"⚠️  Index des exemples indisponible : {e}")
+        return
+    INDEX_EXEMPLES = index
+    print(f"✅ Index des exemples : {len(index)} phrases ({vectorisees} vectorisées)")
+
+
+def analyser_intention_mots_cles(texte: str) -> Optional[str]:
+    """
+    Analyse rapide basée sur des mots-clés (premier étage de la cascade).
+    
+    Les mots-clés sont définis dans detection_mots_cles.MOTS_CLES_INTENTIONS.
+    
+    Args:
+        texte: Texte transcrit à analyser
+        
+    Returns:
+        str: Code d'intention si détecté (ex: 'ACTION_SPOTIFY', 'LAUNCH_SOFTWARE:nom'), None sinon
+    """
+    if not texte:
+        return None
+    
+    # Automate compilé une seule fois par version de SOFTWARE_DB : une seule passe sur le texte
+    return obtenir_detecteur(SOFTWARE_DB, SOFTWARE_DB_VERSION).detecter(texte)
+
+
+def rechercher_logiciel_approximatif(texte: str) -> Optional[Tuple[str, float]]:
+    """
+    Cherche un logiciel mal transcrit après un verbe de lancement ("lance discorde").
+    
+    Args:
+        texte: Texte transcrit à analyser
+        
+    Returns:
+        tuple: (nom du logiciel, score) si un nom est assez proche, None sinon
+    """
+    if not RECHERCHE_APPROXIMATIVE or not texte or not SOFTWARE_DB:
+        return None
+    index = obtenir_index(SOFTWARE_DB, SOFTWARE_DB_VERSION)
+    return index.rechercher_lancement(texte, SEUIL_RECHERCHE_APPROXIMATIVE)
+
+
+def classer_par_exemples(texte: str) -> Optional[Tuple[str, float, float]]:
+    """
+    Cherche l'intention dont une phrase d'exemple est assez proche du texte.
+    
+    Args:
+        texte: Texte transcrit à analyser
+        
+    Returns:
+        tuple: (code d'intention, similarité, marge) si la marge est suffisante, None sinon
+            (le seuil de similarité est celui de l'étage 'exemples' de la cascade)
+    """
+    index = INDEX_EXEMPLES
+    if index is None or not texte:
+        return None
+    debut = time.perf_counter()
+    try:
+        resultat = index.classer(texte)
+    except requests.exceptions.RequestException as e:
+        JOURNAL.evenement('erreur', f"❌ Erreur lors de la vectorisation du texte : {e}", etage='exemples', erreur=str(e))
+        return None
+    DUREE_EXEMPLES.observer(time.perf_counter() - debut)
+    if resultat is None:
+        return None
+    intention, similarite, marge = resultat
+    if marge < EXEMPLES_MARGE_MIN:
+        return None
+    # Index pas encore mis à jour après la suppression d'un raccourci
+    if intention.startswith('LAUNCH_SOFTWARE:') and intention.split(':', 1)[1] not in SOFTWARE_DB:
+        return None
+    return resultat
+
+
+
+def analyser_intention_partielle(texte: str) -> Optional[str]:
+    """
+    Analyse d'un résultat partiel de Vosk pour l'engagement anticipé.
+    
+    Args:
+        texte: Texte partiel stable
+        
+    Returns:
+        str: Code d'intention si le texte désigne une commande complète et sans ambiguïté, None sinon
+    """
+    # L'utilisateur parle : garder (ou recharger) le modèle Ollama avant que la commande n'en ait besoin
+    RESIDENCE_OLLAMA.signaler_activite()
+    if not texte or len(texte.strip()) < MIN_TEXT_LENGTH:
+        return None
+    return obtenir_detecteur(SOFTWARE_DB, SOFTWARE_DB_VERSION).detecter_definitif(texte)
+
+
+def _modele_ollama() -> str:
+    """Nom exact du modèle trouvé par verifier_ollama(), ou le nom par défaut."""
+    return OLLAMA_MODEL_ACTUAL if OLLAMA_MODEL_ACTUAL else OLLAMA_MODEL
+
+
+def catalogue_classification() -> Optional[CatalogueIntentions]:
+    """
+    Met les instructions de classification à jour de SOFTWARE_DB et retourne le catalogue des codes.
+    
+    Returns:
+        CatalogueIntentions: Catalogue de la version courante de SOFTWARE_DB, None en mode 'spotify'
+    """
+    if OLLAMA_CLASSIFICATION != 'codes':
+        return None
+    catalogue = obtenir_catalogue(SOFTWARE_DB, SOFTWARE_DB_VERSION)
+    if PREFIXE_CLASSIFICATION.instructions is not catalogue.instructions:
+        PREFIXE_CLASSIFICATION.changer_instructions(catalogue.instructions,
+                                                    dict(OLLAMA_OPTIONS, num_predict=catalogue.num_predict))
+    return catalogue
+
+
+def changer_client_ollama(client: ClientOllama) -> None:
+    """
+    Remplace le client Ollama partagé (autre serveur, benchmarks, tests).
+
+    La classification et la résidence du modèle utilisent le nouveau client dès leur requête suivante.
+
+    Args:
+        client: Nouveau client Ollama
+    """
+    global CLIENT_OLLAMA
+    CLIENT_OLLAMA = client
+    PREFIXE_CLASSIFICATION.changer_client(client)
+    RESIDENCE_OLLAMA.client = client
+
+
+# (instructions, réglages, empreinte) de la dernière empreinte calculée pour le cache des intentions
+_EMPREINTE_CACHE: Tuple[Optional[str], Tuple, str] = (None, (), '')
+
+
+def empreinte_cache() -> str:
+    """
+    Empreinte sous laquelle les réponses d'Ollama sont mises en cache : base logiciels,
+    mode de classification et instructions courantes (recalculée seulement quand elles changent).
+    """
+    global _EMPREINTE_CACHE
+    catalogue_classification()
+    instructions = PREFIXE_CLASSIFICATION.instructions
+    reglages = (SOFTWARE_DB_EMPREINTE, OLLAMA_CLASSIFICATION, OLLAMA_PREFIXE)
+    dernier = _EMPREINTE_CACHE
+    if dernier[0] is instructions and dernier[1] == reglages:
+        return dernier[2]
+    empreinte = empreinte_classification(SOFTWARE_DB_EMPREINTE, f"{OLLAMA_CLASSIFICATION}/{OLLAMA_PREFIXE}", instructions)
+    _EMPREINTE_CACHE = (instructions, reglages, empreinte)
+    return empreinte
+
+
+def preparer_classification() -> None:
+    """Fait évaluer par Ollama les instructions de classification à jour (après un chargement du modèle)."""
+    catalogue_classification()
+    PREFIXE_CLASSIFICATION.preparer(_modele_ollama())
+
+
+def classifier_ollama_confiance(
+    texte: str,
+    annulation: Optional[threading.Event] = None,
+    timeout: float = 15,
+) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Demande à Ollama (Mistral) le code d'intention d'un texte et sa probabilité selon le modèle.
+    
+    Args:
+        texte: Texte transcrit à analyser
+        annulation: Événement qui interrompt la génération (spéculation devenue inutile, budget de la cascade dépassé)
+        timeout: Délai maximal de la requête HTTP, en secondes
+        
+    Returns:
+        tuple: (code d'intention, confiance) ; code None si la requête a été annulée,
+            confiance None si Ollama ne renvoie pas les probabilités
+        
+    Raises:
+        requests.exceptions.RequestException: En cas d'erreur ou de timeout de la requête
+    """
+    catalogue = catalogue_classification()
+    debut = time.perf_counter()
+    # Instructions fixes (déjà évaluées par Ollama) suivies du seul texte transcrit ; leur évaluation,
+    # si elle n'est pas faite, compte dans le délai de la requête
+    payload = PREFIXE_CLASSIFICATION.payload(_modele_ollama(), texte, timeout=timeout)
+    payload["keep_alive"] = OLLAMA_KEEP_ALIVE  # Garder le modèle chargé entre deux commandes
+    payload["logprobs"] = True  # Probabilité des tokens générés : confiance de la réponse
+    timeout = max(0.1, timeout - (time.perf_counter() - debut))
+    
+    try:
+        if OLLAMA_STREAMING or annulation is not None:
+            # Chaque token coûte cher sur CPU : on s'arrête dès que le code est connu. Une requête annulable
+            # est toujours streamée : l'annulation ferme la connexion et Ollama arrête la génération
+            intention, flux = classifier_en_flux(CLIENT_OLLAMA, payload, timeout=timeout, annulation=annulation,
+                                                 catalogue=catalogue, arret_anticipe=OLLAMA_STREAMING)
+            confiance = flux['confiance']
+            if flux['fin'] is not None:
+                PREFIXE_CLASSIFICATION.enregistrer(flux['fin'])
+        else:
+            result = CLIENT_OLLAMA.generer(payload, timeout=timeout)
+            PREFIXE_CLASSIFICATION.enregistrer(result)
+            reponse = result.get('response', '')
+            intention = catalogue.decoder(reponse, termine=True) if catalogue is not None else extraire_intention(reponse)
+            confiance = confiance_reponse(result.get('logprobs') or [])
+    except requests.exceptions.Timeout:
+        TIMEOUTS_OLLAMA.incrementer()
+        raise
+    # Chaque génération repart pour un keep_alive complet
+    RESIDENCE_OLLAMA.signaler_requete()
+    if intention is None:
+        return None, None
+    DUREE_OLLAMA.observer(time.perf_counter() - debut)
+    if confiance is not None:
+        CONFIANCE_OLLAMA.observer(confiance)
+    return intention, confiance
+
+
+def classifier_ollama(texte: str, annulation: Optional[threading.Event] = None) -> Optional[str]:
+    """
+    Demande à Ollama le code d'intention d'un texte (requête spéculative).
+    
+    Args:
+        texte: Texte transcrit à analyser
+        annulation: Événement qui interrompt la génération (requête spéculative devenue inutile)
+        
+    Returns:
+        str: Code d'intention, None si la requête a été annulée ou si la réponse est trop incertaine
+            (la cascade passe alors à l'étage 'ollama', et rien n'est mis en cache)
+        
+    Raises:
+        requests.exceptions.RequestException: En cas d'erreur ou de timeout de la requête
+    """
+    intention, confiance = classifier_ollama_confiance(texte, annulation, timeout=_budget_etage('speculation'))
+    etage = CASCADE.etage('ollama')
+    if intention is not None and etage is not None and not etage.accepte(confiance):
+        # Même seuil que l'étage 'ollama' : une réponse incertaine n'est ni retenue ni mise en cache
+        JOURNAL.evenement('ollama.confiance', f"🤔 Réponse spéculative trop incertaine ({intention}, {confiance:.2f}) : écartée",
+                          intention=intention, confiance=round(confiance, 3))
+        return None
+    return intention
+
+
+def necessite_ollama(texte: str) -> bool:
+    """
+    Indique si l'analyse de ce texte passera par Ollama (ni mots-clés, ni cache, ni exemple proche).
+    
+    Args:
+        texte: Texte transcrit (éventuellement partiel)
+        
+    Returns:
+        bool: True si une requête Ollama serait nécessaire
+    """
+    if not texte or len(texte.strip()) < MIN_TEXT_LENGTH:
+        return False
+    if analyser_intention_mots_cles(texte) or rechercher_logiciel_approximatif(texte):
+        return False
+    if CACHE_INTENTIONS.contient(texte, _modele_ollama(), empreinte_cache()):
+        return False
+    exemple = classer_par_exemples(texte)
+    etage = CASCADE.etage('exemples')
+    return exemple is None or etage is None or not etage.accepte(exemple[1])
+
+
+# ---------- Étages de la cascade (CASCADE_ETAGES) : (code d'intention, confiance) ou None ----------
+
+def _budget_etage(nom: str, defaut: float = 15) -> float:
+    """Budget de l'étage `nom` de la cascade, `defaut` s'il n'en a pas."""
+    etage = CASCADE.etage(nom)
+    return etage.budget_s if etage is not None and etage.budget_s else defaut
+
+
+def etage_mots_cles(texte: str) -> Optional[Tuple[str, Optional[float]]]:
+    """Mots-clés et noms exacts des logiciels : une passe de l'automate."""
+    intention = analyser_intention_mots_cles(texte)
+    return (intention, None) if intention else None
+
+
+def etage_approximatif(texte: str) -> Optional[Tuple[str, Optional[float]]]:
+    """Nom de logiciel mal transcrit par Vosk : inutile de demander à Ollama, qui ne connaît pas la liste."""
+    logiciel = rechercher_logiciel_approximatif(texte)
+    if logiciel is None:
+        return None
+    nom, score = logiciel
+    return f'LAUNCH_SOFTWARE:{nom}', score
+
+
+def etage_cache(texte: str) -> Optional[Tuple[str, Optional[float]]]:
+    """Les mêmes phrases reviennent souvent : réponse d'Ollama déjà connue."""
+    intention = CACHE_INTENTIONS.obtenir(texte, _modele_ollama(), empreinte_cache())
+    return (intention, None) if intention else None
+
+
+def etage_exemples(texte: str) -> Optional[Tuple[str, Optional[float]]]:
+    """Phrase proche d'un exemple connu : une vectorisation suffit, sans génération par mistral."""
+    exemple = classer_par_exemples(texte)
+    return (exemple[0], exemple[1]) if exemple else None
+
+
+def etage_speculation(texte: str) -> Optional[Tuple[str, Optional[float]]]:
+    """Requête Ollama lancée pendant que l'utilisateur finissait sa phrase."""
+    if not SPECULATION_ACTIVE:
+        return None
+    intention = SPECULATION.reprendre(texte, timeout=_budget_etage('speculation'))
+    return (intention, None) if intention else None
+
+
+def etage_ollama(texte: str, annulation: threading.Event) -> Optional[Tuple[str, Optional[float]]]:
+    """
+    Classification par Ollama, interrompue si la cascade l'annule (budget dépassé).
+    
+    Toujours streamée, même si OLLAMA_STREAMING est désactivé : l'annulation ferme la connexion au morceau
+    suivant (Ollama arrête la génération) et le timeout HTTP, égal au budget, borne l'attente du premier morceau.
+    Une requête abandonnée ne garde donc ni connexion du pool ni temps de calcul au-delà du budget.
+    """
+    intention, confiance = classifier_ollama_confiance(texte, annulation, timeout=_budget_etage('ollama'))
+    return (intention, confiance) if intention else None
+
+
+_MESSAGES_SOURCES = {
+    'mots_cles': "🔍 Intention détectée par mots-clés (rapide)",
+    'approximatif': "🔎 Logiciel reconnu approximativement",
+    'cache': "💾 Intention trouvée dans le cache",
+    'exemples': "📐 Intention reconnue par similarité",
+    'speculation': "🔮 Intention calculée pendant l'énoncé (spéculation)",
+    'ollama': "🤖 Intention déterminée par Ollama",
+}
+
+
+def analyser_intention(texte: str, incidents: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """
+    Analyse l'intention de l'utilisateur en descendant la cascade CASCADE_ETAGES
+    (mots-clés, recherche approximative, cache, exemples, puis Ollama).
+    
+    Args:
+        texte: Texte transcrit à analyser
+        incidents: Si donné, reçoit les étages en erreur ou hors budget (nom -> cause) quand la commande
+            est ignorée faute d'étage qui ait conclu
+        
+    Returns:
+        str: Code d'intention ('ACTION_SPOTIFY', 'NEXT_SONG', 'LAUNCH_SOFTWARE:nom'...), 'IGNORE' si aucun étage
+            n'a reconnu de commande, None si le texte est trop court
+    """
+    if not texte or len(texte.strip()) < MIN_TEXT_LENGTH:
+        return None
+    RESIDENCE_OLLAMA.signaler_activite()
+    
+    resultat = CASCADE.analyser(texte, incidents)
+    if resultat is None:
+        # Étages sans réponse, trop incertains, hors budget ou en erreur : mieux vaut ne rien faire
+        JOURNAL.evenement('intention.source', "🤷 Aucun étage de la cascade n'a reconnu de commande", source='aucune')
+        INTENTIONS_PAR_SOURCE['aucune'].incrementer()
+        return 'IGNORE'
+    
+    champs = {'duree_ms': round(1000 * resultat.duree_s, 3)}
+    message = _MESSAGES_SOURCES.get(resultat.etage, f"Intention déterminée par l'étage {resultat.etage}")
+    if resultat.confiance is not None:
+        champs['confiance'] = round(resultat.confiance, 3)
+        message += f" : {resultat.intention} ({resultat.confiance:.2f})"
+    if resultat.etage in ('speculation', 'ollama'):
+        champs['modele'] = _modele_ollama()
+        CACHE_INTENTIONS.enregistrer(texte, _modele_ollama(), empreinte_cache(), resultat.intention)
+    JOURNAL.evenement('intention.source', message, source=resultat.etage, **champs)
+    INTENTIONS_PAR_SOURCE[resultat.etage].incrementer()
+    return resultat.intention
@@ -5,368 +5,242 @@ Assistant Vocal Local "Spotify-Link"
 Script Python pour contrôler Spotify via commandes vocales en local.
 """
 
+import time
+
+# Référence du rapport de démarrage : les imports font partie du temps avant la première commande
+INSTANT_LANCEMENT = time.perf_counter()
+
+import importlib.util
 import json
 import subprocess
 import os
 import sys
-import time
 import keyboard
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
 
-try:
-    import vosk
-    import pyaudio
+if TYPE_CHECKING:
     import pyttsx3
-    import requests
-except ImportError as e:
-    print(f"❌ Module manquant : {e}")
+
+# vosk, pyaudio et pyttsx3 ne sont importés que par les étapes du démarrage qui s'en servent
+# (en parallèle) : on vérifie seulement ici qu'ils sont installés
+_MODULES_MANQUANTS = [module for module in ('vosk', 'pyaudio', 'pyttsx3', 'requests') if importlib.util.find_spec(module) is None]
+if _MODULES_MANQUANTS:
+    print(f"❌ Module manquant : {', '.join(_MODULES_MANQUANTS)}")
     print("📦 Installez les dépendances avec : pip install -r requirements.txt")
     sys.exit(1)
 
+import analyse_intentions as intentions
+from modeles_vosk import REGISTRE_MODELES
+from detection_mots_cles import obtenir_grammaire
+from pipeline_audio import PipelineVocal, SuiviPartiels
+from synthese_vocale import TravailleurVocal, PRIORITE_HAUTE, PRIORITE_NORMALE, PRIORITE_BASSE
+from cache_phrases import CachePhrases, LecteurAudio, PHRASES_FIXES, phrases_logiciels
+from detection_voix import DetecteurVoix
+from sources_audio import SourceAudio, creer_source
+from metriques import METRIQUES
+from journal_evenements import JOURNAL
+from demarrage import OrchestrateurDemarrage
+
 
 # ==================== CONFIGURATION ====================
 
+# Dossier des raccourcis, Ollama, cache des intentions et cascade de classification : voir analyse_intentions.py
+
 # Chemin vers l'exécutable Spotify (à adapter selon votre installation)
-SHORTCUTS_PATH = r"C:\Users\jaige\Desktop\ia_perso\IA_Test\shortcuts"
 SPOTIFY_PATH = r"C:\Users\jaige\Desktop\ia_perso\IA_Test\shortcuts\Spotify_shortcut.lnk"
 
-# Base de données des logiciels disponibles
-SOFTWARE_DB = {}
-
 # Chemin vers le modèle Vosk (sera téléchargé automatiquement si nécessaire)
 VOSK_MODEL_PATH = r"vosk-model-small-fr-0.22"
 
-# Configuration Ollama
-OLLAMA_URL = "http://localhost:11434/api/generate"
-OLLAMA_MODEL = "mistral"  # Le nom du modèle (peut être mistral, mistral:latest, etc.)
+# Reconnaissance des commandes limitée à une grammaire (phrases de commande + "lance [logiciel]").
+# La dictée (nom de playlist) garde un recognizer à vocabulaire libre.
+GRAMMAIRE_COMMANDES = True
+
+# Synthèse vocale : âge au-delà duquel une réponse en attente n'est plus prononcée (secondes)
+TTS_AGE_MAX = 10.0
+# L'assistant se tait dès que l'utilisateur reprend la parole (premier résultat partiel d'un énoncé).
+# À désactiver si le micro capte les haut-parleurs : l'assistant s'interromprait lui-même
+INTERRUPTION_VOCALE = True
 
-# Variable globale pour stocker le nom exact du modèle trouvé
-OLLAMA_MODEL_ACTUAL = None
+# Dossier du cache audio des réponses fixes (invalidé si la voix, le débit ou le volume changent)
+PHRASES_CACHE_DIR = "cache_voix"
 
 # Configuration audio
 SAMPLE_RATE = 16000
 CHUNK_SIZE = 4000
 
-# Seuil de longueur minimale du texte pour l'analyse
-MIN_TEXT_LENGTH = 3
+# Source audio : "micro", un fichier .wav, "pcm:fichier" (PCM brut 16 bits) ou "-" (PCM brut sur stdin)
+SOURCE_AUDIO = "micro"
+SOURCE_TEMPS_REEL = True    # False : les sources fichier sont lues aussi vite que possible
+SOURCE_PCM_FREQUENCE = 16000  # Fréquence des flux PCM bruts (rééchantillonnés à SAMPLE_RATE)
+SOURCE_PCM_CANAUX = 1
+
+# Détection d'activité vocale : le silence n'est pas envoyé à Vosk
+VAD_ACTIVE = True
+
+# Engagement anticipé : une commande sans ambiguïté est exécutée dès que le résultat partiel
+# de Vosk ne change plus pendant PARTIEL_BLOCS_STABLES blocs, sans attendre la fin de l'énoncé
+ENGAGEMENT_PARTIEL = True
+PARTIEL_BLOCS_STABLES = 2   # 2 x 0,25 s : un seul bloc stable déclenchait des commandes sur des mots inachevés
+
+# Pipeline d'écoute : blocs audio en attente avant abandon des plus anciens (64 x 0,25 s = 16 s)
+PIPELINE_FILE_AUDIO = 64
+
+# Pipeline d'écoute en cours (utilisé par la dictée du nom de playlist)
+PIPELINE_ACTIF: Optional[PipelineVocal] = None
+
+# Affiche la durée de chaque phase du démarrage (chargement du modèle, voix, Ollama...)
+RAPPORT_DEMARRAGE = True
+
+# Journal d'événements JSONL (énoncés, intentions, actions, synthèse vocale, erreurs) ;
+# la console n'affiche qu'une vue de ces événements, à débit limité
+JOURNAL_FICHIER = "evenements.jsonl"   # None = console seule
+JOURNAL_TAILLE_MAX = 5 * 1024 * 1024   # Taille avant archivage (evenements.jsonl.1, .2...)
+JOURNAL_FICHIERS_CONSERVES = 3
+JOURNAL_CONSOLE = True
+JOURNAL_CONSOLE_MAX_PAR_S = 20         # Au-delà, les messages sont masqués sur la console (mais journalisés)
+
+# Métriques (latences par étage, compteurs) : désactivées par défaut, sans coût notable dans la boucle d'écoute
+METRIQUES_ACTIVES = False
+METRIQUES_PORT = 9464        # Exposées sur http://127.0.0.1:9464/metrics (None = pas de serveur HTTP)
+METRIQUES_FICHIER = None     # Fichier réécrit toutes les METRIQUES_PERIODE secondes (None = pas de fichier)
+METRIQUES_PERIODE = 10.0
 
 
 # ==================== FONCTIONS ====================
 
-def load_software_db() -> None:
-    """
-    Charge la base de données des logiciels depuis le dossier shortcuts.
+def creer_source_audio() -> SourceAudio:
     """
-    global SOFTWARE_DB
-    if not os.path.exists(SHORTCUTS_PATH):
-        print(f"⚠️  Dossier shortcuts introuvable : {SHORTCUTS_PATH}")
-        return
+    Ouvre la source audio configurée par SOURCE_AUDIO.
     
-    SOFTWARE_DB = {}
-    for file in os.listdir(SHORTCUTS_PATH):
-        if file.endswith('.lnk'):
-            # Supposer que le nom est avant '_shortcut.lnk'
-            name = file.replace('_shortcut.lnk', '').lower()
-            path = os.path.join(SHORTCUTS_PATH, file)
-            SOFTWARE_DB[name] = path
-        elif file.endswith('.url'):
-            name = file.replace('.url', '').lower()
-            path = os.path.join(SHORTCUTS_PATH, file)
-            SOFTWARE_DB[name] = path
-    
-    print(f"✅ Base de données logiciels chargée : {list(SOFTWARE_DB.keys())}")
+    Returns:
+        SourceAudio: Source ouverte livrant des blocs de CHUNK_SIZE échantillons à SAMPLE_RATE
+    """
+    source = creer_source(
+        SOURCE_AUDIO,
+        sample_rate=SAMPLE_RATE,
+        taille_bloc=CHUNK_SIZE,
+        temps_reel=SOURCE_TEMPS_REEL,
+        frequence_pcm=SOURCE_PCM_FREQUENCE,
+        canaux_pcm=SOURCE_PCM_CANAUX,
+    )
+    return source.ouvrir()
 
 
-def initialiser_voix() -> pyttsx3.Engine:
+def sur_raccourcis_modifies(version: int, ajoutes: list, retires: list) -> None:
     """
-    Configure et initialise le moteur de synthèse vocale pyttsx3.
+    Appelée par la surveillance du dossier shortcuts quand des logiciels apparaissent ou disparaissent.
     
-    Returns:
-        pyttsx3.Engine: Moteur TTS configuré
+    Args:
+        version: Version de l'index des raccourcis
+        ajoutes: Noms des logiciels ajoutés
+        retires: Noms des logiciels retirés
     """
-    try:
-        engine = pyttsx3.init()
-        
-        # Configuration de la voix française
-        voices = engine.getProperty('voices')
-        # Chercher une voix française si disponible
-        for voice in voices:
-            if 'french' in voice.name.lower() or 'fr' in voice.id.lower():
-                engine.setProperty('voice', voice.id)
-                break
-        
-        # Configuration de la vitesse (mots par minute)
-        engine.setProperty('rate', 150)
-        
-        # Configuration du volume (0.0 à 1.0)
-        engine.setProperty('volume', 5.0)
-        
-        print("✅ Voix initialisée")
-        return engine
+    intentions.publier_software_db()
+    JOURNAL.evenement('raccourcis', f"🔄 Raccourcis mis à jour : {len(ajoutes)} ajoutés, {len(retires)} retirés",
+                      version=version, ajoutes=ajoutes, retires=retires)
     
-    except Exception as e:
-        print(f"❌ Erreur lors de l'initialisation de la voix : {e}")
-        sys.exit(1)
+    # La grammaire des commandes contient les noms des logiciels : le recognizer en cours doit être reconstruit
+    if PIPELINE_ACTIF is not None and GRAMMAIRE_COMMANDES:
+        PIPELINE_ACTIF.remplacer_recognizer(creer_recognizer_commandes(VOSK_MODEL_PATH))
+    intentions.actualiser_classification()
 
 
-def parler(engine: pyttsx3.Engine, texte: str) -> None:
+def creer_recognizer_commandes(model_path: str):
     """
-    Fait parler l'assistant avec le texte fourni.
+    Crée le recognizer des commandes vocales.
     
     Args:
-        engine: Moteur TTS
-        texte: Texte à prononcer
+        model_path: Dossier du modèle Vosk
+    
+    Returns:
+        vosk.KaldiRecognizer: Recognizer limité à la grammaire des commandes si GRAMMAIRE_COMMANDES est activé
     """
-    try:
-        engine.say(texte)
-        engine.runAndWait()
-    except Exception as e:
-        print(f"❌ Erreur lors de la synthèse vocale : {e}")
+    if not GRAMMAIRE_COMMANDES:
+        return REGISTRE_MODELES.creer_recognizer(model_path, SAMPLE_RATE)
+    grammaire = obtenir_grammaire(intentions.SOFTWARE_DB, intentions.SOFTWARE_DB_VERSION)
+    return REGISTRE_MODELES.creer_recognizer(model_path, SAMPLE_RATE, grammaire=grammaire)
 
 
-def verifier_ollama() -> bool:
+def _creer_moteur_voix() -> "pyttsx3.Engine":
     """
-    Vérifie si Ollama est accessible et si le modèle est disponible.
+    Crée et configure le moteur pyttsx3 (appelé dans le thread vocal).
     
     Returns:
-        bool: True si Ollama est accessible, False sinon
+        pyttsx3.Engine: Moteur TTS configuré
     """
-    try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=2)
-        if response.status_code == 200:
-            models = response.json().get('models', [])
-            model_names = [model.get('name', '') for model in models]
-            
-            # Vérifier si le modèle existe (exact ou avec variante comme mistral:latest)
-            model_found = False
-            matching_model = None
-            
-            for model_name in model_names:
-                # Vérifier correspondance exacte ou si le nom commence par le modèle (ex: mistral:latest)
-                if model_name == OLLAMA_MODEL or model_name.startswith(OLLAMA_MODEL + ':'):
-                    model_found = True
-                    matching_model = model_name
-                    break
-            
-            if model_found:
-                global OLLAMA_MODEL_ACTUAL
-                OLLAMA_MODEL_ACTUAL = matching_model
-                print(f"✅ Ollama accessible avec le modèle '{matching_model}'")
-                return True
-            else:
-                print(f"⚠️  Modèle '{OLLAMA_MODEL}' non trouvé. Modèles disponibles : {model_names}")
-                print(f"💡 Installez le modèle avec : ollama pull {OLLAMA_MODEL}")
-                return False
-        return False
-    except requests.exceptions.RequestException:
-        print("❌ Ollama n'est pas accessible. Assurez-vous qu'Ollama est démarré.")
-        return False
+    import pyttsx3
+    
+    engine = pyttsx3.init()
+    
+    # Configuration de la voix française
+    voices = engine.getProperty('voices')
+    # Chercher une voix française si disponible
+    for voice in voices:
+        if 'french' in voice.name.lower() or 'fr' in voice.id.lower():
+            engine.setProperty('voice', voice.id)
+            break
+    
+    # Configuration de la vitesse (mots par minute)
+    engine.setProperty('rate', 150)
+    
+    # Configuration du volume (0.0 à 1.0)
+    engine.setProperty('volume', 5.0)
+    
+    return engine
 
 
-def analyser_intention_mots_cles(texte: str) -> Optional[str]:
+def initialiser_voix() -> TravailleurVocal:
     """
-    Analyse rapide basée sur des mots-clés (fallback si Ollama est trop lent).
+    Démarre le thread de synthèse vocale avec le moteur pyttsx3.
     
-    Args:
-        texte: Texte transcrit à analyser
-        
     Returns:
-        str: 'ACTION_SPOTIFY' si détecté, None sinon
-    """
-    if not texte:
-        return None
-    
-    texte_lower = texte.lower()
-    
-    # Vérifier si le texte demande de lancer un logiciel disponible
-    for name, path in SOFTWARE_DB.items():
-        if f"lance {name}" in texte_lower or f"ouvre {name}" in texte_lower or f"démarre {name}" in texte_lower or f"start {name}" in texte_lower:
-            return f'LAUNCH_SOFTWARE:{name}'
-    
-    # Mots-clés qui indiquent une intention de lancer Spotify (fallback)
-    mots_cles_spotify = [
-        'lance spotify', 'ouvre spotify', 'démarre spotify', 'start spotify',
-        'lance spotify', 'ouvrir spotify', 'démarrer spotify',
-        'spotify', 'ouvre spotify', 'lance spotify'
-    ]
-
-    mots_cles_play_pause = [
-        'pause', 'arrête', 'reprends', 'stop',
-        'stoppe', 'arrête la musique', 'pause la musique',
-        'reprends la musique', 'stoppe la musique',
-        'reprend', 'relance', 'relance la musique', 'relance la chanson',
-    ]
-
-    mots_cles_volume_up = [
-        'plus fort', 'monte le son', 'augmente le son', 
-        'augmente le volume', 'monte le volume'
-    ]
-
-    mots_cles_volume_down = [
-        'moins fort', 'baisse le son', 'diminue le son', 
-        'diminue le volume', 'baisse le volume'
-    ]
-
-    mots_cles_next = [
-        'suivant', 'prochain', 'next', 'prochaine', 
-        'suivante', 'passe'
-    ]
-
-    mots_cles_previous = [
-        'précédent', 'précédente', 'previous', 'revient', 
-        'reviens', 'return', 'retour', 'retourne'
-    ]
-
-    mots_cles_shuffle = [
-        'shuffle', 'mélange', 'mélange la musique', 
-        'mélange la chanson', 'aléatoire'
-    ]
-
-    mots_cles_repeat = [
-        'repeat', 'répète', 'répète la chanson', 
-        'répète la musique', 'répète'
-    ]
-
-    mots_cles_playlist = [
-        'met la playlist', 'joue la playlist', 'playlist'
-    ]
-
-
-    # Vérifier si le texte contient des mots-clés Spotify
-    for mot_cle in mots_cles_spotify:
-        if mot_cle in texte_lower:
-            return 'ACTION_SPOTIFY'
-    for mot_cle in mots_cles_play_pause:
-        if mot_cle in texte_lower:
-            return 'PLAY_PAUSE'
-    for mot_cle in mots_cles_volume_up:
-        if mot_cle in texte_lower:
-            return 'VOLUME_UP'
-    for mot_cle in mots_cles_volume_down:
-        if mot_cle in texte_lower:
-            return 'VOLUME_DOWN'
-    for mot_cle in mots_cles_next:
-        if mot_cle in texte_lower:
-            return 'NEXT_SONG'
-    for mot_cle in mots_cles_previous:
-        if mot_cle in texte_lower:
-            return 'PREVIOUS_SONG'
-    for mot_cle in mots_cles_shuffle:
-        if mot_cle in texte_lower:
-            return 'SHUFFLE'
-    for mot_cle in mots_cles_repeat:
-        if mot_cle in texte_lower:
-            return 'REPEAT'
-    for mot_cle in mots_cles_playlist:
-        if mot_cle in texte_lower:
-            return 'PLAYLIST'
+        TravailleurVocal: Thread vocal prêt à recevoir des messages
+    """
+    try:
+        engine = TravailleurVocal(
+            _creer_moteur_voix,
+            age_max_s=TTS_AGE_MAX,
+            cache_phrases=CachePhrases(PHRASES_CACHE_DIR),
+            lecteur=LecteurAudio(),
+        ).demarrer()
+        print("✅ Voix initialisée")
+        return engine
     
-    return None
+    except Exception as e:
+        print(f"❌ Erreur lors de l'initialisation de la voix : {e}")
+        sys.exit(1)
 
 
-def analyser_intention(texte: str) -> Optional[str]:
+def parler(engine: TravailleurVocal, texte: str, priorite: int = PRIORITE_NORMALE, attendre: bool = False) -> None:
     """
-    Analyse l'intention de l'utilisateur via Ollama (Mistral) avec fallback sur mots-clés.
+    Fait parler l'assistant avec le texte fourni, sans bloquer l'appelant.
     
     Args:
-        texte: Texte transcrit à analyser
-        
-    Returns:
-        str: 'ACTION_SPOTIFY' si l'utilisateur veut lancer Spotify, 'IGNORE' sinon, None en cas d'erreur
-    """
-    if not texte or len(texte.strip()) < MIN_TEXT_LENGTH:
-        return None
-    
-    # D'abord, essayer la détection rapide par mots-clés
-    intention_mots_cles = analyser_intention_mots_cles(texte)
-    if intention_mots_cles:
-        print("🔍 Intention détectée par mots-clés (rapide)")
-        return intention_mots_cles
-    
-    # Si pas de mots-clés évidents, utiliser Ollama pour une analyse plus fine
-    # Prompt optimisé pour une réponse rapide et concise
-    prompt_system = (
-        "Analyse: l'utilisateur veut-il lancer Spotify? "
-        "Réponds UNIQUEMENT 'ACTION_SPOTIFY' ou 'IGNORE'."
-    )
-    
-    prompt_complet = f"{prompt_system}\n\nTexte: {texte}\n\nRéponse:"
-    
+        engine: Thread vocal
+        texte: Texte à prononcer
+        priorite: Un message plus prioritaire interrompt la phrase en cours
+        attendre: Attendre la fin de la phrase (ex: avant d'écouter la réponse de l'utilisateur)
+    """
     try:
-        # Utiliser le nom exact du modèle trouvé, ou le nom par défaut
-        model_to_use = OLLAMA_MODEL_ACTUAL if OLLAMA_MODEL_ACTUAL else OLLAMA_MODEL
-        
-        payload = {
-            "model": model_to_use,
-            "prompt": prompt_complet,
-            "stream": False,
-            "options": {
-                "temperature": 0.0,   # Température à 0 pour des réponses déterministes
-                "num_predict": 3,     # Limite la réponse à très peu de tokens (ACTION_SPOTIFY ou IGNORE)
-                "num_ctx": 64,        # Réduit le contexte pour accélérer
-                "top_k": 1,           # Réduit les options de génération
-                "top_p": 0.1          # Réduit la diversité
-            }
-        }
-        
-        response = requests.post(OLLAMA_URL, json=payload, timeout=15)
-        response.raise_for_status()
-        
-        result = response.json()
-        reponse_llm = result.get('response', '').strip().upper()
-        
-        # Nettoyer la réponse pour extraire ACTION_SPOTIFY ou IGNORE
-        if 'ACTION_SPOTIFY' in reponse_llm:
-            return 'ACTION_SPOTIFY'
-        elif 'PLAY_PAUSE' in reponse_llm:
-            return 'PLAY_PAUSE'
-        elif 'NEXT_SONG' in reponse_llm:
-            return 'NEXT_SONG'
-        elif 'PREVIOUS_SONG' in reponse_llm:
-            return 'PREVIOUS_SONG'
-        elif 'VOLUME_UP' in reponse_llm:
-            return 'VOLUME_UP'
-        elif 'VOLUME_DOWN' in reponse_llm:
-            return 'VOLUME_DOWN'
-        elif 'SHUFFLE' in reponse_llm:
-            return 'SHUFFLE'
-        elif 'REPEAT' in reponse_llm:
-            return 'REPEAT'
-        elif 'PLAYLIST' in reponse_llm:
-            return 'PLAYLIST'
-        elif 'IGNORE' in reponse_llm:
-            return 'IGNORE'
-        else:
-            # Si la réponse n'est pas claire, on ignore par défaut
-            return 'IGNORE'
-    
-    except requests.exceptions.Timeout:
-        print(f"⏱️  Timeout Ollama - Utilisation de la détection par mots-clés")
-        # En cas de timeout, utiliser la détection par mots-clés
-        intention_mots_cles = analyser_intention_mots_cles(texte)
-        if intention_mots_cles:
-            return intention_mots_cles
-        return 'IGNORE'  # Par défaut, ignorer si pas de mots-clés
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Erreur lors de la requête à Ollama : {e}")
-        return None
+        engine.dire(texte, priorite=priorite, attendre=attendre)
     except Exception as e:
-        print(f"❌ Erreur lors de l'analyse de l'intention : {e}")
-        return None
+        print(f"❌ Erreur lors de la synthèse vocale : {e}")
+
 
 
-def executer_action(code_intention: str, engine: pyttsx3.Engine, texte: str = "") -> None:
+def executer_action(code_intention: str, engine: TravailleurVocal, texte: str = "") -> None:
     """
     Exécute l'action correspondant au code d'intention.
     
     Args:
-        code_intention: Code d'intention ('ACTION_SPOTIFY' ou 'IGNORE')
+        code_intention: Code d'intention ('ACTION_SPOTIFY', 'PLAY_PAUSE', 'LAUNCH_SOFTWARE:nom', 'IGNORE'...)
         engine: Moteur TTS pour les réponses vocales
     """
     if code_intention.startswith('LAUNCH_SOFTWARE:'):
         name = code_intention.split(':', 1)[1]
-        if name in SOFTWARE_DB:
-            lancer_logiciel(SOFTWARE_DB[name], name, engine)
+        if name in intentions.SOFTWARE_DB:
+            lancer_logiciel(intentions.SOFTWARE_DB[name], name, engine)
         else:
             parler(engine, f"Logiciel {name} non trouvé")
     elif code_intention == 'ACTION_SPOTIFY':
@@ -392,7 +266,7 @@ def executer_action(code_intention: str, engine: pyttsx3.Engine, texte: str = ""
         pass
 
 
-def ecouter_nom_playlist(engine: pyttsx3.Engine) -> str:
+def ecouter_nom_playlist(engine: TravailleurVocal) -> str:
     """
     Écoute le microphone et retourne le nom de la playlist dicté par l'utilisateur.
     
@@ -402,6 +276,21 @@ def ecouter_nom_playlist(engine: pyttsx3.Engine) -> str:
     Returns:
         str: Nom de la playlist transcrit depuis le microphone
     """
+    # Environ 37 s avant d'accepter un résultat partiel, 75 s au maximum
+    max_timeout = 150  # Nombre de blocs audio avant timeout
+    delai_partiel = max_timeout * CHUNK_SIZE / SAMPLE_RATE
+    
+    # Pendant l'écoute continue, le pipeline détourne le prochain énoncé vers la dictée
+    if PIPELINE_ACTIF is not None:
+        print("🎤 Parlez maintenant le nom de la playlist...")
+        nom_playlist = PIPELINE_ACTIF.attendre_dictee(delai_partiel, delai_partiel * 2)
+        if nom_playlist:
+            print(f"🎤 Nom de la playlist capté : {nom_playlist}")
+        else:
+            print("⏱️  Timeout : aucune réponse détectée")
+            parler(engine, "Je n'ai rien entendu. Veuillez réessayer.")
+        return nom_playlist.strip()
+    
     # Vérifier et télécharger le modèle Vosk
     model_path = telecharger_modele_vosk()
     if not model_path:
@@ -410,30 +299,23 @@ def ecouter_nom_playlist(engine: pyttsx3.Engine) -> str:
         return ""
     
     try:
-        # Charger le modèle Vosk
-        model = vosk.Model(model_path)
-        recognizer = vosk.KaldiRecognizer(model, SAMPLE_RATE)
-        recognizer.SetWords(True)
+        # Recognizer construit sur le modèle Vosk partagé (déjà chargé par ecouter_micro)
+        recognizer = REGISTRE_MODELES.creer_recognizer(model_path, SAMPLE_RATE)
         
-        # Initialiser PyAudio
-        audio = pyaudio.PyAudio()
-        stream = audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=CHUNK_SIZE
-        )
+        # Ouvrir la source audio (micro par défaut)
+        source = creer_source_audio()
         
         print("🎤 Parlez maintenant le nom de la playlist...")
         
         nom_playlist = ""
         timeout_counter = 0
-        max_timeout = 150  # Nombre d'itérations avant timeout (environ 15 secondes)
         
         while True:
             try:
-                data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
+                data = source.lire()
+                if not data:
+                    print("⏹️  Fin de la source audio")
+                    break
                 timeout_counter += 1
                 
                 if recognizer.AcceptWaveform(data):
@@ -468,9 +350,7 @@ def ecouter_nom_playlist(engine: pyttsx3.Engine) -> str:
                 continue
         
         # Nettoyage
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
+        source.fermer()
         
         return nom_playlist.strip()
     
@@ -479,7 +359,7 @@ def ecouter_nom_playlist(engine: pyttsx3.Engine) -> str:
         parler(engine, "Erreur lors de l'initialisation du microphone")
         return ""
 
-def lancer_logiciel(path: str, name: str, engine: pyttsx3.Engine) -> None:
+def lancer_logiciel(path: str, name: str, engine: TravailleurVocal) -> None:
     """
     Lance un logiciel via son raccourci.
     
@@ -504,7 +384,7 @@ def lancer_logiciel(path: str, name: str, engine: pyttsx3.Engine) -> None:
         parler(engine, f"Impossible de lancer {name}")
 
 
-def lancer_spotify(engine: pyttsx3.Engine) -> None:
+def lancer_spotify(engine: TravailleurVocal) -> None:
     """
     Lance l'application Spotify.
     
@@ -618,7 +498,8 @@ def playlist(engine, nom_playlist=None):
     """
     # Si le nom de la playlist n'est pas fourni, l'écouter via le microphone
     if not nom_playlist:
-        parler(engine, "Quelle playlist souhaitez-vous jouer ?")
+        # Attendre la fin de la question pour que le micro ne l'entende pas
+        parler(engine, "Quelle playlist souhaitez-vous jouer ?", priorite=PRIORITE_HAUTE, attendre=True)
         nom_playlist = ecouter_nom_playlist(engine)
     
     # Vérifier qu'on a bien un nom de playlist
@@ -654,126 +535,300 @@ def telecharger_modele_vosk() -> Optional[str]:
     return None
 
 
-def ecouter_micro(engine: pyttsx3.Engine) -> None:
+def configurer_journal() -> None:
+    """
+    Applique la configuration du journal d'événements (avant le premier événement).
     """
-    Écoute le microphone en continu et traite les commandes vocales.
+    JOURNAL.configurer(
+        chemin=JOURNAL_FICHIER,
+        taille_max_octets=JOURNAL_TAILLE_MAX,
+        fichiers_conserves=JOURNAL_FICHIERS_CONSERVES,
+        console=JOURNAL_CONSOLE,
+        console_max_par_s=JOURNAL_CONSOLE_MAX_PAR_S,
+    )
+    if JOURNAL_FICHIER:
+        print(f"📝 Journal d'événements : {JOURNAL_FICHIER}")
+
+
+def demarrer_metriques() -> None:
+    """
+    Active la collecte des métriques et leur export (HTTP et/ou fichier) selon la configuration.
+    """
+    if not METRIQUES_ACTIVES:
+        return
+    METRIQUES.activer()
+    if METRIQUES_PORT is not None:
+        try:
+            METRIQUES.servir(METRIQUES_PORT)
+            print(f"📈 Métriques exposées sur http://127.0.0.1:{METRIQUES.port_serveur()}/metrics")
+        except OSError as e:
+            print(f"⚠️  Serveur de métriques impossible sur le port {METRIQUES_PORT} : {e}")
+    if METRIQUES_FICHIER:
+        METRIQUES.exporter_periodiquement(METRIQUES_FICHIER, METRIQUES_PERIODE)
+        print(f"📈 Métriques écrites toutes les {METRIQUES_PERIODE:g} s dans {METRIQUES_FICHIER}")
+
+
+def creer_recognizers(model_path: str) -> Tuple[object, Optional[object]]:
+    """
+    Construit les recognizers sur le modèle Vosk partagé (chargé une seule fois).
     
     Args:
-        engine: Moteur TTS
+        model_path: Dossier du modèle Vosk
+    
+    Returns:
+        tuple: (grammaire des commandes pour l'écoute, vocabulaire libre pour la dictée ou None)
     """
-    # Vérifier et télécharger le modèle Vosk
-    model_path = telecharger_modele_vosk()
-    if not model_path:
-        print("❌ Modèle Vosk introuvable. Veuillez le télécharger.")
-        parler(engine, "Modèle de reconnaissance vocale introuvable")
-        return
+    recognizer = creer_recognizer_commandes(model_path)
+    recognizer_dictee = REGISTRE_MODELES.creer_recognizer(model_path, SAMPLE_RATE) if GRAMMAIRE_COMMANDES else None
+    return recognizer, recognizer_dictee
+
+
+def creer_pipeline(
+    engine,
+    source: SourceAudio,
+    model_path: Optional[str],
+    voix_prete: Optional[Callable[[], bool]] = None,
+) -> PipelineVocal:
+    """
+    Construit le pipeline d'écoute (capture, reconnaissance, analyse, action) selon la configuration.
+    
+    Args:
+        engine: Moteur TTS, ou fonction qui le retourne (moteur encore en cours d'initialisation)
+        source: Source audio ouverte
+        model_path: Dossier du modèle Vosk (None = recognizers fournis plus tard par installer_recognizers ;
+            le micro capture déjà et l'audio attend dans la file)
+        voix_prete: Indique sans attendre si le moteur TTS est initialisé (None = toujours)
+    
+    Returns:
+        PipelineVocal: Pipeline prêt à être démarré
+    """
+    recognizer, recognizer_dictee = creer_recognizers(model_path) if model_path else (None, None)
+    obtenir_engine = engine if callable(engine) else (lambda: engine)
+    
+    def interrompre_voix() -> None:
+        # Rien n'a pu être dit avant l'initialisation de la voix : inutile de l'attendre
+        if voix_prete is None or voix_prete():
+            obtenir_engine().interrompre()
+    
+    # Capture, reconnaissance, analyse et action tournent chacune dans leur thread :
+    # le micro est vidé en continu même pendant un appel à Ollama ou une réponse vocale.
+    return PipelineVocal(
+        lire_bloc=source.lire,
+        recognizer=recognizer,
+        analyser=intentions.analyser_intention,
+        executer=lambda intention, texte: executer_action(intention, obtenir_engine(), texte),
+        taille_file_audio=PIPELINE_FILE_AUDIO,
+        detecteur_voix=DetecteurVoix(SAMPLE_RATE) if VAD_ACTIVE else None,
+        recognizer_dictee=recognizer_dictee,
+        suivi_partiels=(SuiviPartiels(intentions.analyser_intention_partielle, PARTIEL_BLOCS_STABLES)
+                        if ENGAGEMENT_PARTIEL else None),
+        speculateur=intentions.SPECULATION if intentions.SPECULATION_ACTIVE else None,
+        # Source lue plus vite que le temps réel : ne perdre aucun bloc
+        sans_perte=not source.temps_reel,
+        debut_enonce=interrompre_voix if INTERRUPTION_VOCALE else None,
+    )
+
+
+def installer_recognizers(pipeline: PipelineVocal, model_path: str) -> None:
+    """
+    Fournit ses recognizers au pipeline déjà démarré, une fois le modèle Vosk et la base des logiciels chargés.
+    
+    Args:
+        pipeline: Pipeline démarré sans recognizer
+        model_path: Dossier du modèle Vosk
+    """
+    global PIPELINE_ACTIF
+    pipeline.remplacer_recognizer(*creer_recognizers(model_path))
+    # Les rechargements de SOFTWARE_DB reconstruisent désormais la grammaire de ce pipeline
+    PIPELINE_ACTIF = pipeline
+
+
+def ecouter_micro(pipeline: PipelineVocal, source: SourceAudio) -> None:
+    """
+    Laisse le pipeline traiter les commandes vocales jusqu'à Ctrl+C ou la fin du flux audio, puis l'arrête.
+    
+    Args:
+        pipeline: Pipeline d'écoute démarré
+        source: Source audio du pipeline (fermée à la fin)
+    """
+    global PIPELINE_ACTIF
     
     try:
-        # Charger le modèle Vosk
-        model = vosk.Model(model_path)
-        recognizer = vosk.KaldiRecognizer(model, SAMPLE_RATE)
-        recognizer.SetWords(True)
-        
-        # Initialiser PyAudio
-        audio = pyaudio.PyAudio()
-        stream = audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=CHUNK_SIZE
-        )
-        
-        logiciels_disponibles = ', '.join(SOFTWARE_DB.keys()) if SOFTWARE_DB else 'aucun'
-        print(f"🎤 Microphone activé. Logiciels disponibles : {logiciels_disponibles}. Dites 'lance [nom]' pour démarrer.")
-        print("💬 Appuyez sur Ctrl+C pour arrêter.\n")
-        
-        buffer_texte = ""
-        dernier_texte = ""
-        
-        while True:
-            try:
-                data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-                
-                if recognizer.AcceptWaveform(data):
-                    result = json.loads(recognizer.Result())
-                    texte = result.get('text', '').strip()
-                    
-                    if texte and texte != dernier_texte:
-                        print(f"🎤 Vous avez dit : {texte}")
-                        buffer_texte = texte
-                        dernier_texte = texte
-                        
-                        # Analyser l'intention
-                        intention = analyser_intention(buffer_texte)
-                        
-                        if intention:
-                            print(f"🧠 Intention détectée : {intention}")
-                            executer_action(intention, engine)
-                            buffer_texte = ""  # Réinitialiser le buffer
-                
-                else:
-                    # Résultat partiel (en cours de reconnaissance)
-                    partial = json.loads(recognizer.PartialResult())
-                    partial_text = partial.get('partial', '').strip()
-                    if partial_text:
-                        # Afficher le texte partiel (optionnel, peut être commenté)
-                        pass
-            
-            except KeyboardInterrupt:
-                print("\n\n🛑 Arrêt demandé par l'utilisateur")
-                break
-            except Exception as e:
-                print(f"❌ Erreur lors de l'écoute : {e}")
-                continue
-        
-        # Nettoyage
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
-        print("✅ Microphone fermé")
+        # Attente par petites tranches pour que Ctrl+C reste pris en compte
+        while not pipeline.attendre(timeout=0.5):
+            pass
+    except KeyboardInterrupt:
+        print("\n\n🛑 Arrêt demandé par l'utilisateur")
+    finally:
+        pipeline.arreter()
+        PIPELINE_ACTIF = None
     
-    except Exception as e:
-        print(f"❌ Erreur lors de l'initialisation du microphone : {e}")
-        parler(engine, "Erreur lors de l'initialisation du microphone")
+    # Les messages encore en file passent avant les statistiques
+    JOURNAL.arreter()
+    print("📊 Statistiques du pipeline :")
+    pipeline.afficher_statistiques()
+    
+    # Nettoyage
+    source.fermer()
+    print("✅ Source audio fermée")
 
 
 def main_loop() -> None:
     """
     Boucle principale qui orchestre toutes les fonctionnalités.
+    
+    Les étapes indépendantes du démarrage tournent en parallèle et le micro capture dès
+    l'ouverture de la source : une commande prononcée pendant le chargement du modèle
+    Vosk attend dans la file audio au lieu d'être perdue.
     """
     print("=" * 60)
     print("🎵 Assistant Vocal Local 'Spotify-Link'")
     print("=" * 60)
     print()
     
-    # Initialiser la voix
-    engine = initialiser_voix()
+    # Avant le premier événement (marquer() en est un) : sinon le journal démarre sans fichier
+    configurer_journal()
+    demarrage = OrchestrateurDemarrage(INSTANT_LANCEMENT)
+    demarrage.marquer('imports')
+    demarrer_metriques()
     
-    # Charger la base de données des logiciels
-    load_software_db()
+    # Étapes indépendantes lancées en parallèle ; le thread principal n'attend que ce dont il a besoin
+    model_path = telecharger_modele_vosk()
+    if model_path:
+        demarrage.lancer('modele_vosk', REGISTRE_MODELES.obtenir, model_path)
+    demarrage.lancer('voix', initialiser_voix)
+    demarrage.lancer('raccourcis', intentions.load_software_db)
+    demarrage.lancer('cache_intentions', intentions.CACHE_INTENTIONS.charger)
+    demarrage.lancer('ollama', intentions.verifier_ollama)
+    # Le préchargement évalue aussi les instructions de classification, qui listent les raccourcis
+    demarrage.lancer('ollama_chargement', intentions.charger_modele_ollama, apres=('ollama', 'raccourcis'))
+    demarrage.lancer('index_exemples', intentions.preparer_index_exemples, apres=('raccourcis',))
+    
+    # Ouvrir la source audio (micro par défaut, ou fichier / stdin pour rejouer un enregistrement)
+    # et capturer tout de suite, avant même que le modèle soit chargé
+    pipeline = source = None
+    if model_path:
+        try:
+            source = demarrage.executer('micro', creer_source_audio)
+            pipeline = creer_pipeline(lambda: demarrage.resultat('voix'), source, None,
+                                      voix_prete=lambda: demarrage.terminee('voix'))
+            pipeline.demarrer()
+        except Exception as e:
+            print(f"❌ Erreur lors de l'initialisation du microphone : {e}")
+    
+    engine = demarrage.resultat('voix')
+    
+    # Rendre en arrière-plan les réponses fixes qui ne sont pas encore en cache audio
+    demarrage.resultat('raccourcis')
+    engine.precalculer(PHRASES_FIXES + phrases_logiciels(intentions.SOFTWARE_DB.keys()))
+    
+    # Intentions mémorisées lors des lancements précédents
+    nb_intentions = demarrage.resultat('cache_intentions')
+    if nb_intentions:
+        print(f"✅ Cache des intentions chargé : {nb_intentions} entrées")
     
     # Vérifier Ollama
-    if not verifier_ollama():
+    if not demarrage.resultat('ollama'):
         print("\n⚠️  Ollama n'est pas correctement configuré. Le script continuera mais l'analyse d'intention ne fonctionnera pas.")
         print("   Assurez-vous qu'Ollama est démarré et que le modèle 'mistral' est installé.")
         reponse = input("Voulez-vous continuer quand même ? (o/n) : ")
         if reponse.lower() != 'o':
+            if pipeline is not None:
+                pipeline.arreter()
+                source.fermer()
             sys.exit(1)
     
-    # Message de bienvenue vocal
-    logiciels_disponibles = ', '.join(SOFTWARE_DB.keys()) if SOFTWARE_DB else 'aucun'
-    parler(engine, f"Assistant vocal initialisé. Logiciels disponibles : {logiciels_disponibles}. Dites 'lance [nom]' pour démarrer un logiciel.")
+    if not model_path:
+        print("❌ Modèle Vosk introuvable. Veuillez le télécharger.")
+        parler(engine, "Modèle de reconnaissance vocale introuvable")
+    elif pipeline is None:
+        parler(engine, "Erreur lors de l'initialisation du microphone")
+    else:
+        try:
+            demarrage.resultat('modele_vosk')
+            demarrage.executer('recognizers', installer_recognizers, pipeline, model_path)
+        except Exception as e:
+            print(f"❌ Erreur lors du chargement du modèle Vosk : {e}")
+            parler(engine, "Modèle de reconnaissance vocale introuvable")
+            pipeline.arreter()
+            source.fermer()
+            pipeline = None
+    
+    if pipeline is not None:
+        demarrage.marquer('pret')
+        en_attente = pipeline.file_audio.profondeur()
+        logiciels_disponibles = ', '.join(intentions.SOFTWARE_DB.keys()) if intentions.SOFTWARE_DB else 'aucun'
+        print(f"🎤 Microphone activé. Logiciels disponibles : {logiciels_disponibles}. Dites 'lance [nom]' pour démarrer.")
+        if en_attente:
+            print(f"   {en_attente} blocs audio capturés pendant le chargement ({en_attente * CHUNK_SIZE / SAMPLE_RATE:.1f} s), traités maintenant")
+        print("💬 Appuyez sur Ctrl+C pour arrêter.\n")
+        if RAPPORT_DEMARRAGE:
+            demarrage.afficher_rapport()
+        
+        # Prendre en compte les raccourcis ajoutés ou supprimés pendant l'écoute
+        if intentions.SHORTCUTS_SURVEILLANCE_S and os.path.exists(intentions.SHORTCUTS_PATH):
+            intentions.BASE_RACCOURCIS.abonner(sur_raccourcis_modifies)
+            intentions.BASE_RACCOURCIS.abonner(
+                lambda version, ajoutes, retires: engine.precalculer(phrases_logiciels(ajoutes)))
+            intentions.BASE_RACCOURCIS.demarrer_surveillance()
+        
+        # Message de bienvenue court ; priorité basse : la première commande de l'utilisateur le coupe
+        parler(engine, "Assistant vocal prêt.", priorite=PRIORITE_BASSE)
+        
+        # Démarrer l'écoute
+        ecouter_micro(pipeline, source)
+    
+    intentions.BASE_RACCOURCIS.arreter_surveillance()
+    intentions.RESIDENCE_OLLAMA.arreter()
     
-    # Démarrer l'écoute
-    ecouter_micro(engine)
+    # Sauvegarder le cache des intentions pour le prochain lancement
+    intentions.CACHE_INTENTIONS.sauvegarder()
+    stats_cache = intentions.CACHE_INTENTIONS.statistiques()
+    print(f"💾 Cache des intentions : {stats_cache['hits']} hits, {stats_cache['misses']} misses, {stats_cache['taille']} entrées")
+    intentions.CASCADE.afficher_statistiques()
     
     # Message de fin
-    parler(engine, "Au revoir")
+    parler(engine, "Au revoir", priorite=PRIORITE_HAUTE)
+    engine.arreter()
+    METRIQUES.arreter()
+    JOURNAL.arreter()
     print("\n👋 Au revoir !")
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Assistant vocal local 'Spotify-Link'")
+    parser.add_argument('--source', default=SOURCE_AUDIO,
+                        help="micro, fichier .wav, pcm:fichier (PCM brut 16 bits) ou - (PCM brut sur stdin)")
+    parser.add_argument('--sans-pacing', action='store_true',
+                        help="Lit les sources fichier aussi vite que possible au lieu du temps réel")
+    parser.add_argument('--frequence-pcm', type=int, default=SOURCE_PCM_FREQUENCE,
+                        help="Fréquence d'échantillonnage des flux PCM bruts")
+    parser.add_argument('--canaux-pcm', type=int, default=SOURCE_PCM_CANAUX,
+                        help="Nombre de canaux des flux PCM bruts")
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE, help="Échantillons par bloc audio")
+    parser.add_argument('--journal', default=JOURNAL_FICHIER,
+                        help="Fichier JSONL du journal d'événements ('' = pas de fichier)")
+    parser.add_argument('--silencieux', action='store_true',
+                        help="N'affiche pas les événements sur la console (ils restent dans le journal)")
+    parser.add_argument('--metriques-port', type=int, default=None,
+                        help="Active les métriques et les expose sur http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--metriques-fichier', default=None,
+                        help="Active les métriques et les écrit périodiquement dans ce fichier")
+    arguments = parser.parse_args()
+    SOURCE_AUDIO = arguments.source
+    SOURCE_TEMPS_REEL = not arguments.sans_pacing
+    SOURCE_PCM_FREQUENCE = arguments.frequence_pcm
+    SOURCE_PCM_CANAUX = arguments.canaux_pcm
+    CHUNK_SIZE = arguments.chunk
+    JOURNAL_FICHIER = arguments.journal or None
+    JOURNAL_CONSOLE = not arguments.silencieux
+    if arguments.metriques_port is not None or arguments.metriques_fichier:
+        METRIQUES_ACTIVES = True
+        METRIQUES_PORT = arguments.metriques_port
+        METRIQUES_FICHIER = arguments.metriques_fichier
+    
     try:
         main_loop()
     except KeyboardInterrupt:
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Base des raccourcis du dossier shortcuts, persistante et mise à jour à chaud.
+
+L'index (nom, chemin, date de modification, type de chaque raccourci, et
+date de modification de chaque dossier) est enregistré sur disque : au
+démarrage, la base est disponible sans relire le dossier. La surveillance
+compare périodiquement la date de modification de chaque dossier connu et
+ne relit que les dossiers modifiés (ajout, suppression ou renommage d'un
+raccourci), sous-dossiers compris. Quand la liste change, le numéro de
+version est incrémenté et les abonnés sont prévenus depuis le thread de
+surveillance : la boucle d'écoute n'attend jamais un parcours du disque.
+"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Extensions reconnues -> type du raccourci
+EXTENSIONS_RACCOURCIS = {'.lnk': 'lnk', '.url': 'url'}
+
+# Suffixe retiré des raccourcis Windows ("Spotify_shortcut.lnk" -> "spotify")
+SUFFIXE_RACCOURCI = '_shortcut'
+
+
+def nom_logiciel(fichier: str) -> Optional[Tuple[str, str]]:
+    """
+    Déduit le nom du logiciel et le type d'un fichier de raccourci.
+
+    Args:
+        fichier: Nom du fichier (sans dossier)
+
+    Returns:
+        tuple: (nom en minuscules, type), None si ce n'est pas un raccourci
+    """
+    base, extension = os.path.splitext(fichier)
+    type_raccourci = EXTENSIONS_RACCOURCIS.get(extension.lower())
+    if type_raccourci is None:
+        return None
+    if type_raccourci == 'lnk' and base.endswith(SUFFIXE_RACCOURCI):
+        base = base[:-len(SUFFIXE_RACCOURCI)]
+    return base.lower(), type_raccourci
+
+
+class BaseRaccourcis:
+    """
+    Index incrémental d'un dossier de raccourcis.
+
+    Args:
+        dossier: Dossier des raccourcis (parcouru récursivement)
+        chemin_cache: Fichier JSON de l'index (None = pas de persistance)
+        intervalle_s: Période de la surveillance
+    """
+
+    def __init__(self, dossier: str, chemin_cache: Optional[str] = None, intervalle_s: float = 2.0) -> None:
+        self.dossier = dossier
+        self.chemin_cache = chemin_cache
+        self.intervalle_s = intervalle_s
+
+        # dossier relatif -> {'mtime': ..., 'fichiers': {fichier: {'nom', 'mtime', 'type'}}, 'sous_dossiers': [...]}
+        self._dossiers: Dict[str, Dict] = {}
+        self._logiciels: Dict[str, str] = {}
+        self._verrou = threading.Lock()
+        self._abonnes: List[Callable[[int, List[str], List[str]], None]] = []
+        self._arret = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.version = 0
+        self.parcours = 0
+        self.dossiers_relus = 0
+
+    # ---------- Persistance ----------
+
+    def charger(self) -> int:
+        """
+        Recharge l'index enregistré lors du lancement précédent.
+
+        Returns:
+            int: Nombre de logiciels chargés (0 si pas de cache ou cache d'un autre dossier)
+        """
+        if not self.chemin_cache or not os.path.exists(self.chemin_cache):
+            return 0
+        try:
+            with open(self.chemin_cache, 'r', encoding='utf-8') as f:
+                donnees = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Cache des raccourcis illisible, le dossier sera relu : {e}")
+            return 0
+        if donnees.get('dossier') != os.path.abspath(self.dossier):
+            return 0
+
+        with self._verrou:
+            self._dossiers = donnees.get('dossiers', {})
+            self._logiciels = self._construire_logiciels()
+            self.version += 1
+            return len(self._logiciels)
+
+    def sauvegarder(self) -> None:
+        """Écrit l'index sur disque (écriture atomique via un fichier temporaire)."""
+        if not self.chemin_cache:
+            return
+        with self._verrou:
+            donnees = {'version': 1, 'dossier': os.path.abspath(self.dossier), 'dossiers': self._dossiers}
+            texte = json.dumps(donnees, ensure_ascii=False)
+
+        # Plusieurs processus (transcription en lot) peuvent écrire en même temps
+        temporaire = f"{self.chemin_cache}.{os.getpid()}.tmp"
+        try:
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                f.write(texte)
+            os.replace(temporaire, self.chemin_cache)
+        except OSError as e:
+            print(f"⚠️  Impossible de sauvegarder le cache des raccourcis : {e}")
+
+    # ---------- Parcours ----------
+
+    def _lire_dossier(self, relatif: str, mtime: float) -> Dict:
+        """Liste un dossier (un seul appel à scandir) et retourne son entrée d'index."""
+        fichiers = {}
+        sous_dossiers = []
+        with os.scandir(os.path.join(self.dossier, relatif)) as entrees:
+            for entree in entrees:
+                try:
+                    if entree.is_dir(follow_symlinks=False):
+                        sous_dossiers.append(os.path.join(relatif, entree.name) if relatif else entree.name)
+                        continue
+                    decode = nom_logiciel(entree.name)
+                    if decode is not None:
+                        fichiers[entree.name] = {'nom': decode[0], 'type': decode[1], 'mtime': entree.stat().st_mtime}
+                except OSError:
+                    # Fichier supprimé pendant le parcours : il sera absent au prochain passage
+                    continue
+        self.dossiers_relus += 1
+        return {'mtime': mtime, 'fichiers': fichiers, 'sous_dossiers': sorted(sous_dossiers)}
+
+    def rescanner(self) -> bool:
+        """
+        Met l'index à jour en ne relisant que les dossiers dont la date de modification a changé.
+
+        Returns:
+            bool: True si la liste des logiciels a changé (version incrémentée, abonnés prévenus)
+        """
+        with self._verrou:
+            anciens = self._dossiers
+        nouveaux: Dict[str, Dict] = {}
+        a_visiter = ['']
+        while a_visiter:
+            relatif = a_visiter.pop()
+            try:
+                mtime = os.stat(os.path.join(self.dossier, relatif)).st_mtime
+            except OSError:
+                continue
+            connu = anciens.get(relatif)
+            if connu is not None and connu['mtime'] == mtime:
+                entree = connu
+            else:
+                try:
+                    entree = self._lire_dossier(relatif, mtime)
+                except OSError:
+                    continue
+            nouveaux[relatif] = entree
+            a_visiter.extend(entree['sous_dossiers'])
+        self.parcours += 1
+
+        with self._verrou:
+            self._dossiers = nouveaux
+            logiciels = self._construire_logiciels()
+            ajoutes = sorted(set(logiciels) - set(self._logiciels))
+            retires = sorted(set(self._logiciels) - set(logiciels))
+            modifies = ajoutes or retires or any(logiciels[nom] != self._logiciels[nom] for nom in logiciels)
+            self._logiciels = logiciels
+            if modifies:
+                self.version += 1
+            version = self.version
+
+        if nouveaux != anciens:
+            self.sauvegarder()
+        if modifies:
+            for rappel in list(self._abonnes):
+                try:
+                    rappel(version, ajoutes, retires)
+                except Exception as e:
+                    print(f"⚠️  Erreur lors de la mise à jour après modification des raccourcis : {e}")
+        return bool(modifies)
+
+    def _construire_logiciels(self) -> Dict[str, str]:
+        """Nom -> chemin complet ; en cas de doublon, le premier dans l'ordre des chemins l'emporte."""
+        logiciels = {}
+        for relatif in sorted(self._dossiers):
+            for fichier, infos in sorted(self._dossiers[relatif]['fichiers'].items()):
+                logiciels.setdefault(infos['nom'], os.path.join(self.dossier, relatif, fichier))
+        return logiciels
+
+    # ---------- Consultation ----------
+
+    def logiciels(self) -> Dict[str, str]:
+        """Retourne une copie de la table nom -> chemin du raccourci."""
+        with self._verrou:
+            return dict(self._logiciels)
+
+    def entrees(self) -> List[Dict]:
+        """Retourne toutes les entrées de l'index (nom, chemin, date de modification, type)."""
+        with self._verrou:
+            return [
+                {'nom': infos['nom'], 'chemin': os.path.join(self.dossier, relatif, fichier),
+                 'mtime': infos['mtime'], 'type': infos['type']}
+                for relatif, dossier in self._dossiers.items()
+                for fichier, infos in dossier['fichiers'].items()
+            ]
+
+    # ---------- Surveillance ----------
+
+    def abonner(self, rappel: Callable[[int, List[str], List[str]], None]) -> None:
+        """
+        Enregistre une fonction appelée quand la liste des logiciels change.
+
+        Args:
+            rappel: Fonction (version, noms ajoutés, noms retirés), appelée depuis le thread de surveillance
+        """
+        self._abonnes.append(rappel)
+
+    def demarrer_surveillance(self) -> None:
+        """Lance le thread qui relit le dossier dès le démarrage puis toutes les `intervalle_s` secondes."""
+        if self._thread is not None:
+            return
+        self._arret.clear()
+
+        def boucle() -> None:
+            while True:
+                try:
+                    self.rescanner()
+                except Exception as e:
+                    print(f"⚠️  Surveillance des raccourcis : {e}")
+                if self._arret.wait(self.intervalle_s):
+                    return
+
+        self._thread = threading.Thread(target=boucle, name="surveillance-raccourcis", daemon=True)
+        self._thread.start()
+
+    def arreter_surveillance(self) -> None:
+        """Arrête le thread de surveillance."""
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
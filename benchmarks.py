@@ -0,0 +1,1305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks de l'assistant vocal.
+
+Utilisation :
+    python benchmarks.py intentions --raccourcis 5000
+    python benchmarks.py logiciels --raccourcis 5000
+    python benchmarks.py exemples --raccourcis 500 --requetes 200
+    python benchmarks.py ollama --requetes 200
+    python benchmarks.py flux --latence-token 0.03
+    python benchmarks.py codes --raccourcis 30 --latence-token 0.03
+    python benchmarks.py cascade --requetes 40 --latence-lente 3.0 --budget 1.0
+    python benchmarks.py residence --chargement 2.0 --premiere-commande 2.5
+    python benchmarks.py prefixe --requetes 20 --latence-prompt-token 0.004
+    python benchmarks.py speculation --latence 0.4 --fin-enonce 0.5
+    python benchmarks.py voix --messages 50
+    python benchmarks.py vad --wav enregistrement.wav --modele vosk-model-small-fr-0.22
+    python benchmarks.py grammaire --corpus clips/corpus.jsonl --modele vosk-model-small-fr-0.22
+    python benchmarks.py partiels --corpus clips/corpus.jsonl --modele vosk-model-small-fr-0.22
+    python benchmarks.py bout-en-bout --corpus clips/corpus.jsonl --modele vosk-model-small-fr-0.22 --sortie run.json
+    python benchmarks.py lot --entree archives/ --modele vosk-model-small-fr-0.22 --processus 1,2,4,8
+    python benchmarks.py metriques --repetitions 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Configurer l'encodage UTF-8 pour la console Windows
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+
+# ==================== OUTILS ====================
+
+def centiles(valeurs: List[float]) -> Dict[str, float]:
+    """
+    Résume une série de durées (secondes) en millisecondes.
+
+    Args:
+        valeurs: Durées mesurées
+
+    Returns:
+        dict: n, moyenne, p50, p95, p99 et max en ms (rang le plus proche)
+    """
+    if not valeurs:
+        return {'n': 0}
+    triees = sorted(valeurs)
+
+    def rang(p: float) -> float:
+        return 1000 * triees[min(len(triees) - 1, max(0, int(round(p / 100 * len(triees) + 0.5)) - 1))]
+
+    return {
+        'n': len(triees),
+        'moyenne': 1000 * sum(triees) / len(triees),
+        'p50': rang(50),
+        'p95': rang(95),
+        'p99': rang(99),
+        'max': 1000 * triees[-1],
+    }
+
+
+def chronometrer(fonction, repetitions: int) -> float:
+    """
+    Exécute `fonction` plusieurs fois et retourne le temps moyen par appel.
+
+    Args:
+        fonction: Fonction sans argument à mesurer
+        repetitions: Nombre d'appels
+
+    Returns:
+        float: Temps moyen par appel en microsecondes
+    """
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        fonction()
+    return (time.perf_counter() - debut) * 1e6 / repetitions
+
+
+# ==================== INTENTIONS ====================
+
+def _analyse_lineaire(texte: str, software_db: Dict[str, str]) -> Optional[str]:
+    """Implémentation historique (parcours linéaire) servant de référence."""
+    from detection_mots_cles import MOTS_CLES_INTENTIONS
+
+    texte_lower = texte.lower()
+    for name in software_db:
+        if f"lance {name}" in texte_lower or f"ouvre {name}" in texte_lower or f"démarre {name}" in texte_lower or f"start {name}" in texte_lower:
+            return f'LAUNCH_SOFTWARE:{name}'
+    for code, mots_cles in MOTS_CLES_INTENTIONS:
+        for mot_cle in mots_cles:
+            if mot_cle in texte_lower:
+                return code
+    return None
+
+
+def benchmark_intentions(args: argparse.Namespace) -> None:
+    """Compare l'automate Aho-Corasick au parcours linéaire historique."""
+    from detection_mots_cles import DetecteurMotsCles
+
+    generateur = random.Random(args.graine)
+    software_db = {}
+    while len(software_db) < args.raccourcis:
+        longueur = generateur.randint(4, 12)
+        nom = ''.join(generateur.choice(string.ascii_lowercase) for _ in range(longueur))
+        software_db[nom] = f"C:\\shortcuts\\{nom}_shortcut.lnk"
+    noms = list(software_db)
+
+    textes = [
+        "monte le son s'il te plaît",
+        "mets la chanson suivante",
+        "est-ce que tu peux me dire quelle heure il est",
+        f"lance {noms[-1]}",
+        f"ouvre {noms[len(noms) // 2]}",
+        "joue la playlist du matin",
+        "je voudrais écouter quelque chose de calme ce soir",
+    ]
+
+    debut = time.perf_counter()
+    detecteur = DetecteurMotsCles(noms)
+    duree_construction = time.perf_counter() - debut
+
+    print(f"📊 {args.raccourcis} raccourcis, construction de l'automate : {duree_construction * 1000:.1f} ms")
+    print(f"{'texte':<55} {'linéaire (µs)':>14} {'automate (µs)':>14} {'gain':>7}")
+
+    for texte in textes:
+        attendu = _analyse_lineaire(texte, software_db)
+        obtenu = detecteur.detecter(texte)
+        if attendu != obtenu:
+            print(f"❌ Résultats différents pour '{texte}' : {attendu} != {obtenu}")
+            sys.exit(1)
+
+        duree_lineaire = chronometrer(lambda: _analyse_lineaire(texte, software_db), args.repetitions)
+        duree_automate = chronometrer(lambda: detecteur.detecter(texte), args.repetitions)
+        print(f"{texte[:55]:<55} {duree_lineaire:>14.1f} {duree_automate:>14.1f} {duree_lineaire / duree_automate:>6.0f}x")
+
+
+def _alterer(nom: str, generateur: random.Random) -> str:
+    """Simule une erreur de transcription : une lettre remplacée, ajoutée ou retirée, ou un "e" final."""
+    position = generateur.randrange(len(nom))
+    operation = generateur.choice(('remplacer', 'ajouter', 'retirer', 'e_final'))
+    if operation == 'remplacer':
+        return nom[:position] + generateur.choice(string.ascii_lowercase) + nom[position + 1:]
+    if operation == 'ajouter':
+        return nom[:position] + generateur.choice(string.ascii_lowercase) + nom[position:]
+    if operation == 'retirer' and len(nom) > 4:
+        return nom[:position] + nom[position + 1:]
+    return nom + 'e'
+
+
+def benchmark_logiciels(args: argparse.Namespace) -> None:
+    """Mesure la recherche approximative des noms de logiciels (noms altérés comme par une erreur de Vosk)."""
+    from recherche_logiciels import IndexLogiciels
+
+    generateur = random.Random(args.graine)
+    noms = set()
+    while len(noms) < args.raccourcis:
+        noms.add(''.join(generateur.choice(string.ascii_lowercase) for _ in range(generateur.randint(4, 12))))
+    noms = sorted(noms)
+
+    debut = time.perf_counter()
+    index = IndexLogiciels(noms)
+    duree_construction = time.perf_counter() - debut
+
+    cibles = [generateur.choice(noms) for _ in range(args.requetes)]
+    textes = [f"lance {_alterer(nom, generateur)}" for nom in cibles]
+    durees = []
+    trouves = justes = 0
+    for texte, cible in zip(textes, cibles):
+        debut = time.perf_counter()
+        resultat = index.rechercher_lancement(texte, args.seuil)
+        durees.append(time.perf_counter() - debut)
+        if resultat:
+            trouves += 1
+            justes += resultat[0] == cible
+
+    # Textes sans logiciel : ne doivent rien trouver
+    faux_positifs = sum(
+        1 for texte in ("lance la météo", "ouvre la fenêtre", "lance un minuteur de cinq minutes")
+        if index.rechercher_lancement(texte, args.seuil)
+    )
+
+    stats = centiles(durees)
+    print(f"📊 {args.raccourcis} raccourcis, construction de l'index : {duree_construction * 1000:.1f} ms")
+    print(f"   {args.requetes} noms altérés : {trouves} trouvés, {justes} corrects ({justes / args.requetes:.0%})")
+    print(f"   durée par recherche : p50 {stats['p50']:.3f} ms, p95 {stats['p95']:.3f} ms, max {stats['max']:.3f} ms")
+    print(f"   faux positifs sur 3 phrases sans logiciel : {faux_positifs}")
+
+
+def benchmark_exemples(args: argparse.Namespace) -> None:
+    """Index des phrases d'exemple : construction complète, incrémentale, et similarité vectorisée vs boucle Python."""
+    import tempfile
+
+    import numpy as np
+
+    from classification_exemples import EmbeddeurNgrammes, IndexExemples, exemples_intentions
+
+    generateur = random.Random(args.graine)
+    noms = set()
+    while len(noms) < args.raccourcis:
+        noms.add(''.join(generateur.choice(string.ascii_lowercase) for _ in range(generateur.randint(4, 12))))
+    noms = sorted(noms)
+    embeddeur = EmbeddeurNgrammes()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        mesures = []
+        for etape, logiciels in (('construction complète', noms[:-1]), ('index à jour', noms[:-1]),
+                                 ('un logiciel ajouté', noms)):
+            index = IndexExemples(dossier, embeddeur)
+            debut = time.perf_counter()
+            vectorisees = index.construire(exemples_intentions(logiciels))
+            mesures.append((etape, time.perf_counter() - debut, vectorisees))
+
+        matrice, intentions, debuts, couples = index._index
+        textes = [generateur.choice(TEXTES_LLM) for _ in range(args.requetes)]
+        vecteurs = [embeddeur([texte])[0] for texte in textes]
+
+        def boucle(vecteur) -> str:
+            # Référence : similarité exemple par exemple, en Python
+            vecteur = vecteur / np.linalg.norm(vecteur)
+            meilleurs: Dict[str, float] = {}
+            for ligne, (intention, _) in enumerate(couples):
+                similarite = float(sum(float(a) * float(b) for a, b in zip(matrice[ligne], vecteur)))
+                meilleurs[intention] = max(meilleurs.get(intention, -1.0), similarite)
+            return max(meilleurs, key=meilleurs.get)
+
+        def vectorisee(vecteur) -> str:
+            similarites = matrice @ (vecteur / np.linalg.norm(vecteur))
+            return intentions[int(np.argmax(np.maximum.reduceat(similarites, debuts)))]
+
+        resultats = {}
+        for nom, fonction, vecteurs_mesures in (('boucle Python', boucle, vecteurs[:5]), ('NumPy', vectorisee, vecteurs)):
+            durees = []
+            for vecteur in vecteurs_mesures:
+                debut = time.perf_counter()
+                fonction(vecteur)
+                durees.append(time.perf_counter() - debut)
+            resultats[nom] = centiles(durees)
+        accord = all(boucle(vecteur) == vectorisee(vecteur) for vecteur in vecteurs[:5])
+
+        durees_classer = []
+        for texte in textes:
+            debut = time.perf_counter()
+            index.classer(texte)
+            durees_classer.append(time.perf_counter() - debut)
+
+    print(f"📊 {len(couples)} phrases d'exemple ({args.raccourcis} logiciels), embeddeur {embeddeur.identifiant}")
+    for etape, duree, vectorisees in mesures:
+        print(f"   {etape:<22} : {duree * 1000:>7.1f} ms, {vectorisees} phrases vectorisées")
+    for nom, stats in resultats.items():
+        print(f"   similarités, {nom:<13} : p50 {stats['p50']:.3f} ms, max {stats['max']:.3f} ms")
+    print(f"   mêmes intentions : {'oui' if accord else 'NON'}")
+    stats = centiles(durees_classer)
+    print(f"   classer() (vectorisation comprise) : p50 {stats['p50']:.3f} ms, p95 {stats['p95']:.3f} ms")
+
+
+# ==================== OLLAMA ====================
+
+def benchmark_ollama(args: argparse.Namespace) -> None:
+    """Compare des requêtes isolées à la session persistante du client Ollama, sur un faux serveur."""
+    import requests
+    from client_ollama import ClientOllama
+    from ollama_factice import ServeurOllamaFactice
+
+    payload = {"model": "mistral:latest", "prompt": "Texte: bonjour", "stream": False}
+
+    with ServeurOllamaFactice(reponse='IGNORE') as serveur:
+        debut = time.perf_counter()
+        for _ in range(args.requetes):
+            requests.post(f"{serveur.url_base}/api/generate", json=payload, timeout=5).json()
+        duree_isolee = time.perf_counter() - debut
+        connexions_isolees = serveur.connexions
+
+        client = ClientOllama(serveur.url_base)
+        debut = time.perf_counter()
+        for _ in range(args.requetes):
+            client.generer(payload, timeout=5)
+        duree_client = time.perf_counter() - debut
+        connexions_client = serveur.connexions - connexions_isolees
+        statistiques = client.statistiques()
+        client.fermer()
+
+    print(f"📊 {args.requetes} requêtes /api/generate sur {serveur.url_base}")
+    print(f"   requests.post isolé : {duree_isolee * 1000 / args.requetes:.2f} ms/requête, {connexions_isolees} connexions TCP")
+    print(f"   ClientOllama        : {duree_client * 1000 / args.requetes:.2f} ms/requête, {connexions_client} connexions TCP")
+    print(f"   connexion moyenne {statistiques['connexion_moyenne_ms']:.2f} ms, "
+          f"premier octet moyen {statistiques['premier_octet_moyen_ms']:.2f} ms")
+
+
+def benchmark_flux(args: argparse.Namespace) -> None:
+    """Compare la classification complète à la classification streamée avec arrêt anticipé."""
+    from classification_llm import classifier_en_flux, extraire_intention
+    from client_ollama import ClientOllama
+    from ollama_factice import ServeurOllamaFactice
+
+    payload = {"model": "mistral:latest", "prompt": "Texte: mets la suite", "options": {"num_predict": 16}}
+    reponse = "NEXT_SONG (l'utilisateur veut passer au morceau suivant)"
+
+    with ServeurOllamaFactice(reponse=reponse, latence_token_s=args.latence_token) as serveur:
+        client = ClientOllama(serveur.url_base)
+
+        debut = time.perf_counter()
+        for _ in range(args.requetes):
+            intention_complete = extraire_intention(client.generer(payload)['response'])
+        duree_complete = (time.perf_counter() - debut) / args.requetes
+
+        debut = time.perf_counter()
+        for _ in range(args.requetes):
+            intention_flux, statistiques = classifier_en_flux(client, payload)
+        duree_flux = (time.perf_counter() - debut) / args.requetes
+        client.fermer()
+
+    print(f"📊 Réponse simulée de {len(serveur.generer_tokens({}))} tokens, {args.latence_token * 1000:.0f} ms/token")
+    print(f"   réponse complète : {duree_complete * 1000:.1f} ms -> {intention_complete}")
+    print(f"   flux + arrêt     : {duree_flux * 1000:.1f} ms -> {intention_flux} ({statistiques['morceaux']} morceaux lus)")
+
+
+def benchmark_codes(args: argparse.Namespace) -> None:
+    """Réponse du LLM en labels (num_predict 3 ou 8) vs en codes numériques, pour toutes les intentions."""
+    from classification_llm import NUM_PREDICT_LABELS, CatalogueIntentions, classifier_en_flux
+    from client_ollama import ClientOllama
+    from ollama_factice import ServeurOllamaFactice
+
+    generateur = random.Random(0)
+    noms = {''.join(generateur.choice(string.ascii_lowercase) for _ in range(generateur.randint(4, 12)))
+            for _ in range(args.raccourcis)}
+    catalogue = CatalogueIntentions(noms)
+    attendue = {'intention': 'IGNORE'}
+
+    def reponse(payload: Dict) -> str:
+        # LLM "parfait" : il répond l'intention attendue, avec le code ou le label selon le prompt
+        if payload.get('prompt', '').startswith(catalogue.instructions):
+            return ' ' + catalogue.codes[attendue['intention']]
+        return ' ' + attendue['intention']
+
+    modes = (
+        ('labels, num_predict 3', None, 3),
+        (f'labels, num_predict {NUM_PREDICT_LABELS}', None, NUM_PREDICT_LABELS),
+        ('codes', catalogue, catalogue.num_predict),
+    )
+    print(f"📊 {len(catalogue.intentions)} intentions ({args.raccourcis} logiciels), {args.latence_token * 1000:.0f} ms/token")
+    with ServeurOllamaFactice(reponse=reponse, latence_token_s=args.latence_token) as serveur:
+        client = ClientOllama(serveur.url_base)
+        for nom, catalogue_mode, num_predict in modes:
+            justes, morceaux, durees = 0, 0, []
+            for intention in catalogue.intentions.values():
+                attendue['intention'] = intention
+                prompt = (catalogue.instructions if catalogue_mode else "") + "Texte: ...\n\nRéponse:"
+                payload = {"model": "mistral:latest", "prompt": prompt, "options": {"num_predict": num_predict}}
+                debut = time.perf_counter()
+                obtenue, statistiques = classifier_en_flux(client, payload, catalogue=catalogue_mode)
+                durees.append(time.perf_counter() - debut)
+                justes += obtenue == intention
+                morceaux += statistiques['morceaux']
+            print(f"   {nom:<21} : {justes}/{len(catalogue.intentions)} intentions reconnues, "
+                  f"{morceaux / len(catalogue.intentions):.1f} morceaux lus, {1000 * sum(durees) / len(durees):.0f} ms en moyenne")
+        client.fermer()
+
+
+def benchmark_cascade(args: argparse.Namespace) -> None:
+    """Cascade d'intention avec un LLM parfois lent : attente de sa réponse vs annulation au budget de l'étage."""
+    from cascade_intentions import CascadeIntentions, EtageCascade
+    from classification_llm import classifier_en_flux
+    from client_ollama import ClientOllama
+    from detection_mots_cles import obtenir_detecteur
+    from ollama_factice import ServeurOllamaFactice
+
+    detecteur = obtenir_detecteur({'discord': 'discord.lnk', 'steam': 'steam.lnk'}, 1)
+    textes = ["lance discord", "mets pause", "chanson suivante", "est-ce qu'il va pleuvoir demain",
+              "monte le son", "ouvre steam", "raconte moi une blague", "je voudrais écouter autre chose"]
+    requetes_llm = {'nombre': 0}
+
+    def reponse(payload: Dict) -> str:
+        # Une requête sur `lents` tombe sur un modèle occupé ou en cours de chargement
+        requetes_llm['nombre'] += 1
+        if requetes_llm['nombre'] % args.lents == 0:
+            time.sleep(args.latence_lente)
+        return ' IGNORE'
+
+    def etage_mots_cles(texte, annulation):
+        intention = detecteur.detecter(texte)
+        return (intention, None) if intention else None
+
+    print(f"📊 {args.requetes} commandes, une requête au LLM sur {args.lents} répond en {args.latence_lente:g} s")
+    with ServeurOllamaFactice(reponse=reponse, latence_token_s=0.02) as serveur:
+        client = ClientOllama(serveur.url_base)
+
+        def etage_llm(texte, annulation):
+            payload = {"model": "mistral:latest", "prompt": f"Texte: {texte}\n\nRéponse:", "options": {"num_predict": 8}}
+            intention, _ = classifier_en_flux(client, payload, timeout=15, annulation=annulation)
+            return (intention, None) if intention else None
+
+        for nom, budget in (('attente du LLM', None), (f'budget {args.budget:g} s', args.budget)):
+            requetes_llm['nombre'] = 0
+            cascade = CascadeIntentions([EtageCascade('mots_cles', etage_mots_cles),
+                                         EtageCascade('llm', etage_llm, budget_s=budget)])
+            durees = []
+            for i in range(args.requetes):
+                debut = time.perf_counter()
+                cascade.analyser(textes[i % len(textes)])
+                durees.append(time.perf_counter() - debut)
+            durees.sort()
+            print(f"   {nom:<15} : {1000 * sum(durees) / len(durees):.0f} ms en moyenne, "
+                  f"p95 {1000 * durees[int(0.95 * (len(durees) - 1))]:.0f} ms, max {1000 * durees[-1]:.0f} ms")
+            for etage, stats in cascade.statistiques()['etages'].items():
+                print(f"      {etage:<9} : {stats['retenue']}/{stats['passages']} retenues, {stats['depassement']} hors budget, "
+                      f"p95 {stats['duree_p95_ms']:.0f} ms")
+        client.fermer()
+
+
+def benchmark_residence(args: argparse.Namespace) -> None:
+    """Latence de la première classification, modèle chargé à la demande vs préchargé au démarrage."""
+    import threading
+    from classification_llm import classifier_en_flux
+    from client_ollama import ClientOllama
+    from journal_evenements import JOURNAL
+    from ollama_factice import ServeurOllamaFactice
+    from residence_ollama import ResidenceOllama
+
+    JOURNAL.configurer(console=False)
+    payload = {"model": "mistral:latest", "prompt": "Texte: mets la suite", "options": {"num_predict": 3}}
+    resultats = {}
+    for mode in ('à la demande', 'préchargement'):
+        with ServeurOllamaFactice(reponse='NEXT_SONG', duree_chargement_s=args.chargement) as serveur:
+            client = ClientOllama(serveur.url_base)
+            if mode == 'préchargement':
+                residence = ResidenceOllama(client, lambda: "mistral:latest")
+                threading.Thread(target=residence.prechauffer, daemon=True).start()
+            # L'utilisateur prononce sa première commande peu après le démarrage
+            time.sleep(args.premiere_commande)
+            debut = time.perf_counter()
+            classifier_en_flux(client, payload, timeout=60)
+            resultats[mode] = time.perf_counter() - debut
+            client.fermer()
+
+    print(f"📊 Chargement simulé du modèle : {args.chargement:.1f} s, première commande {args.premiere_commande:.1f} s après le démarrage")
+    for mode, duree in resultats.items():
+        print(f"   {mode:<13} : première classification en {duree * 1000:.0f} ms")
+
+
+# Textes qui passent par le LLM (aucun mot-clé)
+TEXTES_LLM = [
+    "mets un peu d'ambiance", "j'aimerais écouter un truc calme", "il fait beau aujourd'hui",
+    "tu peux mettre du son s'il te plaît", "on écoute de la musique", "c'est quoi ce morceau",
+]
+
+
+def benchmark_prefixe(args: argparse.Namespace) -> None:
+    """Évaluation du prompt par Ollama : prompt complet à chaque requête vs préfixe d'instructions réutilisé."""
+    import analyse_intentions as intentions
+    from classification_llm import PrefixeClassification
+    from client_ollama import ClientOllama
+    from journal_evenements import JOURNAL
+    from ollama_factice import ServeurOllamaFactice
+    from residence_ollama import ResidenceOllama
+
+    JOURNAL.configurer(console=False)
+    modele = "mistral:latest"
+    print(f"📊 {args.requetes} classifications, {args.latence_prompt_token * 1000:.1f} ms par token de prompt évalué")
+    for cache_prefixe in (True, False):
+        print(f"   serveur {'avec' if cache_prefixe else 'sans'} cache de préfixe :")
+        for mode in (None, 'systeme', 'contexte'):
+            with ServeurOllamaFactice(reponse='IGNORE', latence_prompt_token_s=args.latence_prompt_token,
+                                      cache_prefixe=cache_prefixe) as serveur:
+                client = ClientOllama(serveur.url_base)
+                prefixe = PrefixeClassification(client, intentions.INSTRUCTIONS_CLASSIFICATION, intentions.OLLAMA_OPTIONS, mode)
+                # Démarrage de l'assistant : modèle préchargé, préfixe évalué sauf avec le prompt complet (avant)
+                ResidenceOllama(
+                    client, lambda: modele, options={'num_ctx': intentions.OLLAMA_NUM_CTX},
+                    apres_chargement=(lambda: prefixe.preparer(modele)) if mode else None,
+                ).prechauffer()
+
+                evalues, durees_evaluation, totaux = [], [], []
+                for i in range(args.requetes):
+                    payload = prefixe.payload(modele, TEXTES_LLM[i % len(TEXTES_LLM)])
+                    debut = time.perf_counter()
+                    reponse = client.generer(payload, timeout=60)
+                    totaux.append(time.perf_counter() - debut)
+                    evalues.append(reponse['prompt_eval_count'])
+                    durees_evaluation.append(reponse['prompt_eval_duration'] / 1e9)
+                client.fermer()
+
+            nom = {None: 'prompt complet', 'systeme': 'prompt système', 'contexte': 'context'}[mode]
+            print(f"      {nom:<15} : 1re requête {evalues[0]:>3} tokens évalués, {durees_evaluation[0] * 1000:>5.0f} ms "
+                  f"(total {totaux[0] * 1000:.0f} ms) ; suivantes {sum(evalues[1:]) / max(1, len(evalues) - 1):>5.1f} tokens, "
+                  f"{1000 * sum(durees_evaluation[1:]) / max(1, len(durees_evaluation) - 1):>5.0f} ms "
+                  f"(total {1000 * sum(totaux[1:]) / max(1, len(totaux) - 1):.0f} ms)")
+
+
+# Énoncés simulés : résultats partiels successifs (un par bloc audio), puis texte final
+ENONCES_SPECULATION = [
+    (["mets", "mets un", "mets un peu", "mets un peu d'ambiance", "mets un peu d'ambiance"],
+     "mets un peu d'ambiance"),
+    (["j'aimerais", "j'aimerais écouter", "j'aimerais écouter un", "j'aimerais écouter un truc",
+      "j'aimerais écouter un truc", "j'aimerais écouter un truc calme"],
+     "j'aimerais écouter un truc calme"),
+    (["il fait", "il fait beau", "il fait beau aujourd'hui", "il fait beau aujourd'hui"],
+     "il fait beau aujourd'hui"),
+    (["tu peux", "tu peux mettre", "tu peux mettre du son", "tu peux mettre du son"],
+     "tu peux mettre du son s'il te plaît"),
+    (["on écoute", "on écoute de la", "on écoute de la musique", "on écoute de la musique"],
+     "on écoute de la musique"),
+]
+
+
+def benchmark_speculation(args: argparse.Namespace) -> None:
+    """Compare le délai texte final -> intention avec et sans requête spéculative sur les partiels."""
+    from classification_llm import classifier_en_flux
+    from client_ollama import ClientOllama
+    from ollama_factice import ServeurOllamaFactice
+    from speculation_llm import ClassificationSpeculative
+
+    with ServeurOllamaFactice(reponse='ACTION_SPOTIFY', latence_s=args.latence, latence_token_s=args.latence_token) as serveur:
+        client = ClientOllama(serveur.url_base)
+
+        def classifier(texte: str, annulation=None) -> Optional[str]:
+            payload = {"model": "mistral:latest", "prompt": f"Texte: {texte}", "options": {"num_predict": 3}}
+            return classifier_en_flux(client, payload, annulation=annulation)[0]
+
+        speculateur = ClassificationSpeculative(classifier, lambda texte: True, args.mots_min, args.blocs_stables)
+        delais_sans, delais_avec = [], []
+        for partiels, final in ENONCES_SPECULATION:
+            debut = time.perf_counter()
+            classifier(final)
+            delais_sans.append(time.perf_counter() - debut)
+
+            for partiel in partiels:
+                speculateur.observer_partiel(partiel)
+                time.sleep(args.bloc)
+            time.sleep(args.fin_enonce)
+            debut = time.perf_counter()
+            if speculateur.reprendre(final) is None:
+                classifier(final)
+            delais_avec.append(time.perf_counter() - debut)
+        client.fermer()
+
+    stats = speculateur.statistiques()
+    print(f"📊 {len(ENONCES_SPECULATION)} énoncés, Ollama simulé à {args.latence * 1000:.0f} ms + "
+          f"{args.latence_token * 1000:.0f} ms/token, blocs de {args.bloc * 1000:.0f} ms, "
+          f"fin d'énoncé détectée {args.fin_enonce * 1000:.0f} ms après le dernier partiel")
+    print(f"   texte final -> intention sans spéculation : {sum(delais_sans) * 1000 / len(delais_sans):.0f} ms en moyenne")
+    print(f"   texte final -> intention avec spéculation : {sum(delais_avec) * 1000 / len(delais_avec):.0f} ms en moyenne")
+    print(f"   {stats['lancees']} requêtes spéculatives : {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['annulees']} annulées), {stats['temps_gaspille_ms']:.0f} ms de LLM gaspillés")
+
+
+# ==================== SYNTHÈSE VOCALE ====================
+
+def benchmark_voix(args: argparse.Namespace) -> None:
+    """Mesure la latence du thread vocal avec un moteur factice (sans carte son)."""
+    from synthese_vocale import MoteurFactice, TravailleurVocal, PRIORITE_BASSE, PRIORITE_HAUTE
+
+    moteur = MoteurFactice(duree_par_caractere=args.duree_caractere)
+    travailleur = TravailleurVocal(lambda: moteur).demarrer()
+
+    # Temps de retour à l'appelant
+    retours = []
+    for i in range(args.messages):
+        debut = time.perf_counter()
+        travailleur.dire(f"réponse numéro {i % 5}")
+        retours.append(time.perf_counter() - debut)
+    travailleur.attendre_silence()
+
+    # Réactivité du barge-in : un message urgent coupe un long message d'accueil
+    travailleur.dire("bienvenue " * 50, priorite=PRIORITE_BASSE)
+    time.sleep(0.05)
+    debut = time.perf_counter()
+    travailleur.dire("Quelle playlist ?", priorite=PRIORITE_HAUTE, attendre=True)
+    duree_barge_in = time.perf_counter() - debut
+    travailleur.arreter()
+
+    stats = travailleur.statistiques()
+    print(f"📊 {args.messages} messages, moteur factice à {args.duree_caractere * 1000:.0f} ms/caractère")
+    print(f"   retour à l'appelant : {max(retours) * 1e6:.0f} µs au maximum")
+    print(f"   attente en file     : {stats['attente_moyenne_ms']:.1f} ms en moyenne, {stats['attente_max_ms']:.1f} ms max")
+    print(f"   messages fusionnés  : {stats['fusionnes']}, interrompus : {stats['interrompus']}")
+    print(f"   barge-in            : message urgent prononcé en entier {duree_barge_in * 1000:.0f} ms après sa demande")
+
+
+# ==================== DÉTECTION D'ACTIVITÉ VOCALE ====================
+
+def lire_wav_16k(chemin: str) -> bytes:
+    """
+    Lit un fichier WAV PCM 16 bits mono à 16 kHz.
+
+    Args:
+        chemin: Chemin du fichier WAV
+
+    Returns:
+        bytes: Audio PCM brut
+    """
+    import wave
+
+    with wave.open(chemin, 'rb') as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getframerate() != 16000:
+            print(f"❌ {chemin} : WAV 16 bits mono 16 kHz attendu "
+                  f"({wav.getnchannels()} canaux, {8 * wav.getsampwidth()} bits, {wav.getframerate()} Hz)")
+            sys.exit(1)
+        return wav.readframes(wav.getnframes())
+
+
+def _decoder(recognizer, blocs: List[bytes], detecteur=None) -> tuple:
+    """Décode des blocs avec un recognizer neuf, avec ou sans VAD ; retourne (textes, temps CPU)."""
+    textes = []
+    debut = time.process_time()
+    for bloc in blocs:
+        if detecteur is not None:
+            a_decoder, fin_segment = detecteur.filtrer(bloc)
+        else:
+            a_decoder, fin_segment = [bloc], False
+        for morceau in a_decoder:
+            if recognizer.AcceptWaveform(morceau):
+                textes.append(json.loads(recognizer.Result()).get('text', ''))
+            else:
+                json.loads(recognizer.PartialResult())
+        if fin_segment:
+            textes.append(json.loads(recognizer.FinalResult()).get('text', ''))
+    textes.append(json.loads(recognizer.FinalResult()).get('text', ''))
+    return [t for t in textes if t], time.process_time() - debut
+
+
+def benchmark_vad(args: argparse.Namespace) -> None:
+    """Mesure la part de blocs épargnée au recognizer et le temps CPU gagné sur un enregistrement."""
+    from detection_voix import DetecteurVoix
+
+    audio = lire_wav_16k(args.wav)
+    taille = args.taille_bloc * 2
+    blocs = [audio[i:i + taille] for i in range(0, len(audio), taille)]
+    duree_audio = len(audio) / 2 / 16000
+
+    detecteur = DetecteurVoix(16000)
+    debut = time.process_time()
+    for bloc in blocs:
+        detecteur.filtrer(bloc)
+    cout_vad = time.process_time() - debut
+    stats = detecteur.statistiques()
+
+    print(f"📊 {args.wav} : {duree_audio:.1f} s d'audio, {len(blocs)} blocs de {args.taille_bloc} échantillons")
+    print(f"   blocs non décodés : {stats['blocs_ignores']}/{stats['blocs']} ({stats['fraction_ignoree']:.0%}), "
+          f"{stats['segments']} segments de parole")
+    print(f"   coût de la VAD    : {cout_vad * 1000:.1f} ms CPU ({cout_vad * 1e6 / len(blocs):.0f} µs/bloc)")
+
+    if not args.modele:
+        print("💡 Ajoutez --modele <dossier Vosk> pour mesurer le temps CPU de décodage gagné")
+        return
+
+    import vosk
+    vosk.SetLogLevel(-1)
+    modele = vosk.Model(args.modele)
+    textes_complets, cpu_complet = _decoder(vosk.KaldiRecognizer(modele, 16000), blocs)
+    textes_vad, cpu_vad = _decoder(vosk.KaldiRecognizer(modele, 16000), blocs, DetecteurVoix(16000))
+
+    print(f"   décodage complet  : {cpu_complet:.2f} s CPU -> {textes_complets}")
+    print(f"   décodage avec VAD : {cpu_vad:.2f} s CPU -> {textes_vad}")
+    if cpu_complet:
+        print(f"   temps CPU gagné   : {1 - cpu_vad / cpu_complet:.0%}")
+
+
+# ==================== GRAMMAIRE DES COMMANDES ====================
+
+def charger_corpus(chemin: str) -> List[Dict]:
+    """
+    Charge un corpus d'enregistrements annotés (JSONL).
+
+    Chaque ligne décrit un clip : {"wav": "suivant.wav", "texte": "musique suivante", "intention": "NEXT_SONG"}.
+    Les chemins des WAV sont relatifs au fichier du corpus.
+
+    Args:
+        chemin: Fichier JSONL du corpus
+
+    Returns:
+        list: Entrées du corpus, avec le chemin absolu du WAV
+    """
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    corpus = []
+    with open(chemin, 'r', encoding='utf-8') as f:
+        for numero, ligne in enumerate(f, 1):
+            ligne = ligne.strip()
+            if not ligne:
+                continue
+            try:
+                entree = json.loads(ligne)
+            except ValueError as e:
+                print(f"❌ {chemin}:{numero} : ligne JSON invalide ({e})")
+                sys.exit(1)
+            entree['wav'] = os.path.join(dossier, entree['wav'])
+            corpus.append(entree)
+    return corpus
+
+
+def taux_erreur_mots(reference: str, hypothese: str) -> float:
+    """Taux d'erreur sur les mots (distance d'édition / nombre de mots de la référence)."""
+    ref = reference.lower().split()
+    hyp = hypothese.lower().split()
+    if not ref:
+        return float(bool(hyp))
+    precedente = list(range(len(hyp) + 1))
+    for i, mot_ref in enumerate(ref, 1):
+        courante = [i] + [0] * len(hyp)
+        for j, mot_hyp in enumerate(hyp, 1):
+            courante[j] = min(precedente[j] + 1, courante[j - 1] + 1, precedente[j - 1] + (mot_ref != mot_hyp))
+        precedente = courante
+    return precedente[-1] / len(ref)
+
+
+def benchmark_grammaire(args: argparse.Namespace) -> None:
+    """Compare vitesse et précision du recognizer à grammaire et du recognizer libre sur des clips annotés."""
+    import vosk
+    from detection_mots_cles import DetecteurMotsCles, grammaire_commandes
+
+    corpus = charger_corpus(args.corpus)
+    if args.logiciels is not None:
+        noms = [nom.strip().lower() for nom in args.logiciels.split(',') if nom.strip()]
+    else:
+        # Par défaut : les logiciels cités dans les annotations du corpus
+        noms = sorted({e['intention'].split(':', 1)[1] for e in corpus
+                       if e.get('intention', '').startswith('LAUNCH_SOFTWARE:')})
+    detecteur = DetecteurMotsCles(noms)
+    grammaire = grammaire_commandes(noms)
+
+    vosk.SetLogLevel(-1)
+    modele = vosk.Model(args.modele)
+    taille = args.taille_bloc * 2
+    modes = {
+        'libre': lambda: vosk.KaldiRecognizer(modele, 16000),
+        'grammaire': lambda: vosk.KaldiRecognizer(modele, 16000, grammaire),
+    }
+    resultats = {mode: {'cpu': 0.0, 'intentions': 0, 'annotees': 0, 'erreurs_mots': 0.0, 'textes': 0}
+                 for mode in modes}
+    duree_audio = 0.0
+
+    print(f"📊 {len(corpus)} clips, grammaire de {len(json.loads(grammaire))} phrases ({len(noms)} logiciels)")
+    for entree in corpus:
+        audio = lire_wav_16k(entree['wav'])
+        duree_audio += len(audio) / 2 / 16000
+        blocs = [audio[i:i + taille] for i in range(0, len(audio), taille)]
+        ligne = [os.path.basename(entree['wav'])]
+        for mode, creer in modes.items():
+            textes, cpu = _decoder(creer(), blocs)
+            texte = ' '.join(mot for mot in ' '.join(textes).split() if mot != '[unk]')
+            stats = resultats[mode]
+            stats['cpu'] += cpu
+            if 'intention' in entree:
+                stats['annotees'] += 1
+                stats['intentions'] += detecteur.detecter(texte) == (entree['intention'] or None)
+            if 'texte' in entree:
+                stats['textes'] += 1
+                stats['erreurs_mots'] += taux_erreur_mots(entree['texte'], texte)
+            ligne.append(f"{mode}='{texte}'")
+        if args.details:
+            print("   " + ", ".join(ligne))
+
+    print(f"   {'mode':<10} {'CPU (s)':>8} {'RTF':>7} {'intentions':>11} {'WER':>6}")
+    for mode, stats in resultats.items():
+        rtf = stats['cpu'] / duree_audio if duree_audio else 0.0
+        precision = f"{stats['intentions'] / stats['annotees']:.0%}" if stats['annotees'] else "-"
+        wer = f"{stats['erreurs_mots'] / stats['textes']:.0%}" if stats['textes'] else "-"
+        print(f"   {mode:<10} {stats['cpu']:>8.2f} {rtf:>7.3f} {precision:>11} {wer:>6}")
+
+
+# ==================== ENGAGEMENT ANTICIPÉ ====================
+
+def benchmark_partiels(args: argparse.Namespace) -> None:
+    """
+    Compare, en temps audio, l'instant où une commande part sur un partiel stable
+    et l'instant où Vosk rend le résultat final.
+    """
+    import vosk
+    from detection_mots_cles import DetecteurMotsCles, grammaire_commandes
+    from pipeline_audio import SuiviPartiels
+
+    corpus = charger_corpus(args.corpus)
+    noms = sorted({e['intention'].split(':', 1)[1] for e in corpus
+                   if e.get('intention', '').startswith('LAUNCH_SOFTWARE:')})
+    detecteur = DetecteurMotsCles(noms)
+    grammaire = grammaire_commandes(noms) if args.grammaire else None
+
+    vosk.SetLogLevel(-1)
+    modele = vosk.Model(args.modele)
+    taille = args.taille_bloc * 2
+    duree_bloc = args.taille_bloc / 16000
+    # Silence ajouté après chaque clip : au micro, l'écoute continue jusqu'à la détection de fin d'énoncé
+    silence = bytes(2 * int(args.silence * 16000))
+    suivi = SuiviPartiels(detecteur.detecter_definitif, args.blocs_stables)
+    justes = 0
+
+    for entree in corpus:
+        audio = lire_wav_16k(entree['wav']) + silence
+        recognizer = vosk.KaldiRecognizer(modele, 16000, grammaire) if grammaire else vosk.KaldiRecognizer(modele, 16000)
+        engagement = None
+        final = None
+        for numero, debut in enumerate(range(0, len(audio), taille), 1):
+            instant = numero * duree_bloc
+            if recognizer.AcceptWaveform(audio[debut:debut + taille]):
+                texte = json.loads(recognizer.Result()).get('text', '')
+                if texte.strip():
+                    final = (texte, instant)
+                    suivi.final(texte, instant)
+                    break
+            else:
+                partiel = json.loads(recognizer.PartialResult()).get('partial', '')
+                partiel = ' '.join(mot for mot in partiel.split() if mot != '[unk]')
+                intention = suivi.partiel(partiel, instant)
+                if intention:
+                    engagement = (intention, instant)
+        if final is None:
+            instant = len(audio) / 2 / 16000
+            final = (json.loads(recognizer.FinalResult()).get('text', ''), instant)
+            suivi.final(final[0], instant)
+        if engagement is not None and 'intention' in entree:
+            justes += engagement[0] == entree['intention']
+        if args.details:
+            anticipe = f"{engagement[0]} à {engagement[1] * 1000:.0f} ms" if engagement else "aucune"
+            print(f"   {os.path.basename(entree['wav'])} : anticipée {anticipe}, "
+                  f"final '{final[0]}' à {final[1] * 1000:.0f} ms")
+
+    stats = suivi.statistiques()
+    print(f"📊 {len(corpus)} clips, blocs de {duree_bloc * 1000:.0f} ms, {args.blocs_stables} bloc(s) de stabilité"
+          f"{', grammaire des commandes' if grammaire else ''}")
+    print(f"   commandes anticipées : {stats['engages']}/{len(corpus)} ({justes} conformes à l'annotation), "
+          f"{stats['doublons_evites']} résultats finals confirmant la commande, {stats['desaccords']} la contredisant")
+    print(f"   latence depuis le début de l'énoncé : partiel {stats['latence_partiel_ms']:.0f} ms, "
+          f"final {stats['latence_final_ms']:.0f} ms")
+    print(f"   gain moyen sur les commandes anticipées : {stats['gain_moyen_ms']:.0f} ms")
+
+
+# ==================== BOUT EN BOUT ====================
+
+class _ClavierFactice:
+    """
+    Remplace le module `keyboard` : signale chaque touche au lieu de l'envoyer.
+
+    Args:
+        sur_touche: Fonction appelée avec la description de la touche
+    """
+
+    def __init__(self, sur_touche) -> None:
+        self.sur_touche = sur_touche
+
+    def send(self, touches: str) -> None:
+        self.sur_touche(touches)
+
+    def write(self, texte: str) -> None:
+        self.sur_touche(f"write:{texte}")
+
+
+class _SourceClip:
+    """
+    Rejoue un clip (déjà converti en 16 bits mono) suivi de silence, au rythme du temps réel ou non.
+
+    Mémorise l'instant où le bloc contenant la dernière trame de parole du clip a été livré (fin de l'énoncé).
+    """
+
+    def __init__(self, audio: bytes, silence_s: float, taille_bloc: int, temps_reel: bool) -> None:
+        from detection_voix import DetecteurVoix
+
+        self.temps_reel = temps_reel
+        self._audio = audio + bytes(2 * int(silence_s * 16000))
+        # Fin de la parole : dernière trame classée "parole" par la VAD (le clip peut finir par du silence)
+        detecteur = DetecteurVoix(16000)
+        parole = detecteur.analyser(audio)
+        if parole.any():
+            derniere = len(parole) - 1 - int(parole[::-1].argmax())
+            self._fin_parole_octets = 2 * (derniere + 1) * detecteur.taille_trame
+        else:
+            self._fin_parole_octets = len(audio)
+        self._taille = 2 * taille_bloc
+        self._position = 0
+        self._debut: Optional[float] = None
+        self.fin_parole: Optional[float] = None
+
+    def lire(self) -> bytes:
+        bloc = self._audio[self._position:self._position + self._taille]
+        if not bloc:
+            return b""
+        if self._debut is None:
+            self._debut = time.perf_counter()
+        self._position += len(bloc)
+        if self.temps_reel:
+            attente = self._debut + self._position / 2 / 16000 - time.perf_counter()
+            if attente > 0:
+                time.sleep(attente)
+        if self.fin_parole is None and self._position >= self._fin_parole_octets:
+            self.fin_parole = time.perf_counter()
+        return bloc
+
+    def fermer(self) -> None:
+        pass
+
+
+def benchmark_bout_en_bout(args: argparse.Namespace) -> None:
+    """
+    Rejoue un corpus de clips annotés dans le vrai pipeline de l'assistant (clavier, voix et Ollama factices)
+    et mesure chaque étage entre la fin de l'énoncé et la touche envoyée par executer_action().
+    """
+    import platform
+
+    from sources_audio import SourceWav
+
+    # Chronologie du clip en cours (instants perf_counter)
+    mesures: Dict = {}
+
+    def marquer_action(libelle: str) -> None:
+        mesures.setdefault('action', time.perf_counter())
+        mesures.setdefault('touche', libelle)
+
+    # Le clavier factice doit être en place avant l'import de l'assistant
+    sys.modules['keyboard'] = _ClavierFactice(marquer_action)
+    import analyse_intentions as intentions
+    import assistant_spotify as assistant
+    from cache_intentions import CacheIntentions
+    from client_ollama import ClientOllama
+    from ollama_factice import ServeurOllamaFactice
+    from synthese_vocale import MoteurFactice, TravailleurVocal
+
+    corpus = charger_corpus(args.corpus)
+    clip_courant: Dict = {}
+
+    def reponse_llm(payload: Dict) -> str:
+        if args.reponse_llm == 'oracle':
+            # Ollama "parfait" : répond l'intention annotée du clip en cours (son numéro en mode 'codes')
+            intention = clip_courant.get('intention') or 'IGNORE'
+            catalogue = intentions.catalogue_classification()
+            return catalogue.codes.get(intention, '0') if catalogue is not None else intention
+        return args.reponse_llm
+
+    # Configuration de l'assistant et de son analyse d'intention pour ce passage
+    assistant.CHUNK_SIZE = args.chunk
+    assistant.GRAMMAIRE_COMMANDES = not args.sans_grammaire
+    assistant.VAD_ACTIVE = not args.sans_vad
+    assistant.ENGAGEMENT_PARTIEL = not args.sans_anticipation
+    intentions.SPECULATION_ACTIVE = not args.sans_speculation
+    intentions.OLLAMA_STREAMING = not args.sans_streaming
+    intentions.CACHE_INTENTIONS = CacheIntentions(chemin=None)
+    noms = sorted({e['intention'].split(':', 1)[1] for e in corpus
+                   if (e.get('intention') or '').startswith('LAUNCH_SOFTWARE:')})
+    intentions.SOFTWARE_DB = {nom: f"{nom}_shortcut.lnk" for nom in noms}
+    intentions.SOFTWARE_DB_VERSION += 1
+    intentions.SOFTWARE_DB_EMPREINTE = intentions.empreinte_logiciels(noms)
+
+    originaux = {
+        'analyser_intention': intentions.analyser_intention,
+        'analyser_intention_mots_cles': intentions.analyser_intention_mots_cles,
+        'executer_action': assistant.executer_action,
+    }
+
+    def analyser_intention(texte: str):
+        mesures.setdefault('texte_final', time.perf_counter())
+        intention = originaux['analyser_intention'](texte)
+        mesures.setdefault('analyse_fin', time.perf_counter())
+        return intention
+
+    def analyser_intention_mots_cles(texte: str):
+        debut = time.perf_counter()
+        intention = originaux['analyser_intention_mots_cles'](texte)
+        # Seul le premier passage (celui d'analyser_intention) est mesuré ; la spéculation en fait d'autres
+        if 'texte_final' in mesures and 'mots_cles' not in mesures:
+            mesures['mots_cles'] = time.perf_counter() - debut
+            mesures['mots_cles_trouve'] = intention is not None
+        return intention
+
+    def executer_action(code_intention: str, engine, texte: str = "") -> None:
+        mesures.setdefault('intention', code_intention)
+        mesures.setdefault('dispatch_debut', time.perf_counter())
+        originaux['executer_action'](code_intention, engine, texte)
+        if code_intention == 'IGNORE':
+            marquer_action('IGNORE')
+
+    intentions.analyser_intention = analyser_intention
+    intentions.analyser_intention_mots_cles = analyser_intention_mots_cles
+    assistant.executer_action = executer_action
+    # Actions sans clavier : pas de processus lancé, pas de dictée au micro
+    assistant.lancer_logiciel = lambda path, name, engine: marquer_action(f"lancer:{name}")
+    assistant.lancer_spotify = lambda engine: marquer_action("lancer:spotify")
+    assistant.ecouter_nom_playlist = lambda engine: clip_courant.get('playlist', 'test')
+
+    etapes: Dict[str, List[float]] = {nom: [] for nom in ('asr', 'mots_cles', 'llm', 'dispatch', 'total')}
+    details = []
+    justes = annotees = 0
+    duree_audio = duree_reconnaissance = 0.0
+
+    with ServeurOllamaFactice(reponse=reponse_llm, latence_s=args.latence_llm, latence_token_s=args.latence_token) as serveur:
+        client_origine = intentions.CLIENT_OLLAMA
+        # Préfixe de classification et résidence du modèle compris : aucune requête vers le vrai Ollama
+        intentions.changer_client_ollama(ClientOllama(serveur.url_base, keep_alive=intentions.OLLAMA_KEEP_ALIVE))
+        intentions.OLLAMA_MODEL_ACTUAL = serveur.modeles[0]
+        engine = TravailleurVocal(lambda: MoteurFactice(duree_par_caractere=0.0)).demarrer()
+
+        for entree in corpus:
+            with SourceWav(entree['wav'], 16000, args.chunk, temps_reel=False) as wav:
+                morceaux = []
+                while True:
+                    bloc = wav.lire()
+                    if not bloc:
+                        break
+                    morceaux.append(bloc)
+            audio = b"".join(morceaux)
+            duree_audio += len(audio) / 2 / 16000
+
+            clip_courant.clear()
+            clip_courant.update(entree)
+            mesures.clear()
+            source = _SourceClip(audio, args.silence, args.chunk, temps_reel=not args.sans_pacing)
+            pipeline = assistant.creer_pipeline(engine, source, args.modele)
+            pipeline.demarrer()
+            pipeline.attendre(timeout=len(audio) / 2 / 16000 + args.silence + 30)
+            pipeline.arreter()
+            engine.attendre_silence(timeout=5)
+            if intentions.SPECULATION_ACTIVE:
+                intentions.SPECULATION.abandonner()
+            duree_reconnaissance += pipeline.statistiques()['etages']['reconnaissance']['duree_totale_s']
+
+            fin_parole = source.fin_parole or time.perf_counter()
+            # Texte disponible : résultat final transmis à l'analyse, ou commande anticipée sur un partiel
+            texte_pret = mesures.get('texte_final', mesures.get('dispatch_debut'))
+            if texte_pret is not None:
+                etapes['asr'].append(max(0.0, texte_pret - fin_parole))
+            if 'mots_cles' in mesures:
+                etapes['mots_cles'].append(mesures['mots_cles'])
+                if not mesures['mots_cles_trouve'] and 'analyse_fin' in mesures:
+                    # Cache, spéculation ou requête Ollama : tout ce qui suit l'échec des mots-clés
+                    etapes['llm'].append(mesures['analyse_fin'] - mesures['texte_final'] - mesures['mots_cles'])
+            if 'action' in mesures:
+                depart = mesures.get('analyse_fin', mesures.get('dispatch_debut'))
+                etapes['dispatch'].append(max(0.0, mesures['action'] - depart))
+                etapes['total'].append(max(0.0, mesures['action'] - fin_parole))
+
+            obtenue = mesures.get('intention')
+            if 'intention' in entree:
+                annotees += 1
+                justes += obtenue == (entree['intention'] or None)
+            details.append({
+                'wav': os.path.basename(entree['wav']),
+                'attendue': entree.get('intention'),
+                'obtenue': obtenue,
+                'touche': mesures.get('touche'),
+                'total_ms': 1000 * (mesures['action'] - fin_parole) if 'action' in mesures else None,
+            })
+            if args.details:
+                d = details[-1]
+                total = f"{d['total_ms']:.0f} ms" if d['total_ms'] is not None else "aucune action"
+                print(f"   {d['wav']} : {d['obtenue']} (attendue {d['attendue']}), {total}")
+
+        engine.arreter()
+        intentions.CLIENT_OLLAMA.fermer()
+        intentions.changer_client_ollama(client_origine)
+
+    resultats = {
+        'horodatage': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': platform.node(),
+        'configuration': {
+            'corpus': args.corpus,
+            'modele': args.modele,
+            'chunk': args.chunk,
+            'grammaire': assistant.GRAMMAIRE_COMMANDES,
+            'vad': assistant.VAD_ACTIVE,
+            'engagement_partiel': assistant.ENGAGEMENT_PARTIEL,
+            'speculation': intentions.SPECULATION_ACTIVE,
+            'streaming': intentions.OLLAMA_STREAMING,
+            'temps_reel': not args.sans_pacing,
+            'silence_s': args.silence,
+            'reponse_llm': args.reponse_llm,
+            'latence_llm_s': args.latence_llm,
+            'latence_token_s': args.latence_token,
+        },
+        'clips': len(corpus),
+        'precision_intentions': justes / annotees if annotees else None,
+        'duree_audio_s': duree_audio,
+        'rtf_reconnaissance': duree_reconnaissance / duree_audio if duree_audio else None,
+        'etapes': {nom: centiles(valeurs) for nom, valeurs in etapes.items()},
+        'details': details,
+    }
+
+    print(f"📊 {len(corpus)} clips ({duree_audio:.1f} s d'audio), blocs de {args.chunk} échantillons")
+    if annotees:
+        print(f"   précision des intentions : {justes}/{annotees} ({justes / annotees:.0%})")
+    if duree_audio:
+        print(f"   facteur temps réel de la reconnaissance : {resultats['rtf_reconnaissance']:.3f}")
+    print(f"   {'étage':<10} {'n':>4} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for nom, stats in resultats['etapes'].items():
+        if stats['n']:
+            print(f"   {nom:<10} {stats['n']:>4} {stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f}")
+        else:
+            print(f"   {nom:<10} {0:>4} {'-':>8} {'-':>8} {'-':>8}")
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(resultats, f, ensure_ascii=False, indent=2)
+        print(f"💾 Résultats enregistrés dans {args.sortie}")
+
+
+# ==================== TRANSCRIPTION EN LOT ====================
+
+def benchmark_lot(args: argparse.Namespace) -> None:
+    """
+    Débit de transcription_lot.py selon le nombre de processus, sur les mêmes fichiers,
+    avec l'étiquetage par mots-clés (Ollama, partagé, ne passe pas à l'échelle avec les coeurs).
+    """
+    import contextlib
+    import io
+    import tempfile
+
+    from transcription_lot import lister_fichiers, traiter_lot
+
+    fichiers = lister_fichiers(args.entree)
+    if args.fichiers:
+        fichiers = fichiers[:args.fichiers]
+    niveaux = [int(n) for n in args.processus.split(',')]
+
+    print(f"📊 {len(fichiers)} fichiers, {os.cpu_count()} coeurs logiques")
+    print(f"   {'processus':>9} {'durée (s)':>10} {'débit':>8} {'accélération':>13} {'efficacité':>11}")
+    reference = None
+    for processus in niveaux:
+        with tempfile.TemporaryDirectory() as dossier, contextlib.redirect_stdout(io.StringIO()):
+            bilan = traiter_lot(fichiers, os.path.join(dossier, 'etiquettes.jsonl'), args.modele, processus,
+                                mots_cles_seulement=True)
+        if reference is None:
+            reference = (processus, bilan['debit'])
+        acceleration = bilan['debit'] / reference[1] if reference[1] else 0.0
+        efficacite = acceleration * reference[0] / processus
+        erreurs = f"  ({bilan['erreurs']} erreurs)" if bilan['erreurs'] else ""
+        print(f"   {processus:>9} {bilan['duree_s']:>10.1f} {bilan['debit']:>7.1f}x {acceleration:>12.2f}x "
+              f"{efficacite:>10.0%}{erreurs}")
+    print("   (débit : secondes d'audio par seconde ; accélération et efficacité par rapport à la première ligne)")
+
+
+# ==================== MÉTRIQUES ====================
+
+def benchmark_metriques(args: argparse.Namespace) -> None:
+    """Mesure le coût d'une observation dans la boucle d'écoute, métriques désactivées puis activées."""
+    from urllib.request import urlopen
+    from metriques import RegistreMetriques
+
+    registre = RegistreMetriques()
+    histogramme = registre.histogramme('bench_secondes', "Durée mesurée")
+    compteur = registre.compteur('bench_total', "Événements")
+
+    def sans_instrument() -> None:
+        debut = time.perf_counter()
+        time.perf_counter() - debut
+
+    def instrumente() -> None:
+        debut = time.perf_counter()
+        histogramme.observer(time.perf_counter() - debut)
+        compteur.incrementer()
+
+    reference = chronometrer(sans_instrument, args.repetitions)
+    desactive = chronometrer(instrumente, args.repetitions)
+    registre.activer()
+    active = chronometrer(instrumente, args.repetitions)
+
+    registre.servir(0)
+    debut = time.perf_counter()
+    with urlopen(f"http://127.0.0.1:{registre.port_serveur()}/metrics", timeout=5) as reponse:
+        corps = reponse.read()
+    duree_lecture = time.perf_counter() - debut
+    registre.arreter()
+
+    print(f"📊 {args.repetitions} observations (histogramme + compteur)")
+    print(f"   sans instrument       : {reference:.3f} µs")
+    print(f"   métriques désactivées : {desactive:.3f} µs (+{desactive - reference:.3f} µs)")
+    print(f"   métriques activées    : {active:.3f} µs (+{active - reference:.3f} µs)")
+    print(f"   lecture de /metrics   : {duree_lecture * 1000:.1f} ms, {len(corps)} octets")
+
+
+# ==================== POINT D'ENTRÉE ====================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmarks de l'assistant vocal")
+    sous_commandes = parser.add_subparsers(dest='commande', required=True)
+
+    p_intentions = sous_commandes.add_parser('intentions', help="Détection d'intention par mots-clés")
+    p_intentions.add_argument('--raccourcis', type=int, default=5000, help="Nombre de raccourcis simulés")
+    p_intentions.add_argument('--repetitions', type=int, default=200, help="Appels par mesure")
+    p_intentions.add_argument('--graine', type=int, default=42, help="Graine du générateur aléatoire")
+    p_intentions.set_defaults(fonction=benchmark_intentions)
+
+    p_logiciels = sous_commandes.add_parser('logiciels', help="Recherche approximative des noms de logiciels")
+    p_logiciels.add_argument('--raccourcis', type=int, default=5000, help="Nombre de raccourcis simulés")
+    p_logiciels.add_argument('--requetes', type=int, default=500, help="Nombre de noms altérés recherchés")
+    p_logiciels.add_argument('--seuil', type=float, default=0.75, help="Score minimal retenu")
+    p_logiciels.add_argument('--graine', type=int, default=42, help="Graine du générateur aléatoire")
+    p_logiciels.set_defaults(fonction=benchmark_logiciels)
+
+    p_exemples = sous_commandes.add_parser('exemples', help="Index NumPy des phrases d'exemple (construction et similarité)")
+    p_exemples.add_argument('--raccourcis', type=int, default=500, help="Nombre de raccourcis simulés")
+    p_exemples.add_argument('--requetes', type=int, default=200, help="Nombre de phrases classées")
+    p_exemples.add_argument('--graine', type=int, default=42, help="Graine du générateur aléatoire")
+    p_exemples.set_defaults(fonction=benchmark_exemples)
+
+    p_ollama = sous_commandes.add_parser('ollama', help="Session HTTP persistante vers Ollama (faux serveur local)")
+    p_ollama.add_argument('--requetes', type=int, default=200, help="Nombre de requêtes")
+    p_ollama.set_defaults(fonction=benchmark_ollama)
+
+    p_flux = sous_commandes.add_parser('flux', help="Classification Ollama streamée avec arrêt anticipé (faux serveur local)")
+    p_flux.add_argument('--requetes', type=int, default=10, help="Nombre de requêtes")
+    p_flux.add_argument('--latence-token', type=float, default=0.03, help="Latence simulée par token (s)")
+    p_flux.set_defaults(fonction=benchmark_flux)
+
+    p_codes = sous_commandes.add_parser('codes', help="Réponse du LLM en labels vs en codes numériques (faux serveur local)")
+    p_codes.add_argument('--raccourcis', type=int, default=30, help="Nombre de logiciels dans le catalogue")
+    p_codes.add_argument('--latence-token', type=float, default=0.03, help="Latence simulée par token (s)")
+    p_codes.set_defaults(fonction=benchmark_codes)
+
+    p_cascade = sous_commandes.add_parser('cascade', help="Cascade d'intention : attente d'un LLM lent vs budget de latence (faux serveur local)")
+    p_cascade.add_argument('--requetes', type=int, default=40)
+    p_cascade.add_argument('--lents', type=int, default=4, help="Une requête au LLM sur N est lente")
+    p_cascade.add_argument('--latence-lente', type=float, default=3.0, help="Durée d'une requête lente (s)")
+    p_cascade.add_argument('--budget', type=float, default=1.0, help="Budget de l'étage LLM (s)")
+    p_cascade.set_defaults(fonction=benchmark_cascade)
+
+    p_residence = sous_commandes.add_parser('residence', help="Première classification avec et sans préchargement du modèle Ollama")
+    p_residence.add_argument('--chargement', type=float, default=2.0, help="Durée de chargement simulée du modèle (s)")
+    p_residence.add_argument('--premiere-commande', type=float, default=2.5,
+                             help="Délai entre le démarrage et la première commande (s)")
+    p_residence.set_defaults(fonction=benchmark_residence)
+
+    p_prefixe = sous_commandes.add_parser('prefixe', help="Évaluation du prompt avec et sans réutilisation du préfixe (faux serveur local)")
+    p_prefixe.add_argument('--requetes', type=int, default=20, help="Nombre de classifications")
+    p_prefixe.add_argument('--latence-prompt-token', type=float, default=0.004,
+                           help="Durée simulée d'évaluation d'un token de prompt (s)")
+    p_prefixe.set_defaults(fonction=benchmark_prefixe)
+
+    p_voix = sous_commandes.add_parser('voix', help="Latence du thread de synthèse vocale (moteur factice)")
+    p_voix.add_argument('--messages', type=int, default=50, help="Nombre de messages envoyés")
+    p_voix.add_argument('--duree-caractere', type=float, default=0.002, help="Durée simulée par caractère (s)")
+    p_voix.set_defaults(fonction=benchmark_voix)
+
+    p_vad = sous_commandes.add_parser('vad', help="Détection d'activité vocale sur un enregistrement WAV")
+    p_vad.add_argument('--wav', required=True, help="Enregistrement WAV 16 bits mono 16 kHz")
+    p_vad.add_argument('--modele', help="Dossier du modèle Vosk (pour mesurer le décodage)")
+    p_vad.add_argument('--taille-bloc', type=int, default=4000, help="Échantillons par bloc (CHUNK_SIZE)")
+    p_vad.set_defaults(fonction=benchmark_vad)
+
+    p_grammaire = sous_commandes.add_parser('grammaire', help="Recognizer à grammaire vs vocabulaire libre")
+    p_grammaire.add_argument('--corpus', required=True, help="Fichier JSONL des clips annotés (wav, texte, intention)")
+    p_grammaire.add_argument('--modele', required=True, help="Dossier du modèle Vosk")
+    p_grammaire.add_argument('--logiciels', help="Noms des logiciels séparés par des virgules (défaut : ceux du corpus)")
+    p_grammaire.add_argument('--taille-bloc', type=int, default=4000, help="Échantillons par bloc (CHUNK_SIZE)")
+    p_grammaire.add_argument('--details', action='store_true', help="Affiche la transcription de chaque clip")
+    p_grammaire.set_defaults(fonction=benchmark_grammaire)
+
+    p_partiels = sous_commandes.add_parser('partiels', help="Engagement sur partiel stable vs résultat final")
+    p_partiels.add_argument('--corpus', required=True, help="Fichier JSONL des clips annotés (wav, texte, intention)")
+    p_partiels.add_argument('--modele', required=True, help="Dossier du modèle Vosk")
+    p_partiels.add_argument('--blocs-stables', type=int, default=2, help="Blocs pendant lesquels le partiel ne doit pas changer")
+    p_partiels.add_argument('--taille-bloc', type=int, default=4000, help="Échantillons par bloc (CHUNK_SIZE)")
+    p_partiels.add_argument('--silence', type=float, default=1.5, help="Silence ajouté après chaque clip (secondes)")
+    p_partiels.add_argument('--grammaire', action='store_true', help="Utilise le recognizer à grammaire")
+    p_partiels.add_argument('--details', action='store_true', help="Affiche le détail de chaque clip")
+    p_partiels.set_defaults(fonction=benchmark_partiels)
+
+    p_speculation = sous_commandes.add_parser('speculation', help="Requête Ollama spéculative sur les résultats partiels")
+    p_speculation.add_argument('--latence', type=float, default=0.4, help="Latence simulée avant le premier token (s)")
+    p_speculation.add_argument('--latence-token', type=float, default=0.03, help="Latence simulée par token (s)")
+    p_speculation.add_argument('--bloc', type=float, default=0.25, help="Durée d'un bloc audio (s)")
+    p_speculation.add_argument('--fin-enonce', type=float, default=0.5, help="Délai de détection de fin d'énoncé (s)")
+    p_speculation.add_argument('--mots-min', type=int, default=3, help="Nombre minimal de mots du texte partiel")
+    p_speculation.add_argument('--blocs-stables', type=int, default=1, help="Blocs pendant lesquels le partiel ne doit pas changer")
+    p_speculation.set_defaults(fonction=benchmark_speculation)
+
+    p_bout = sous_commandes.add_parser('bout-en-bout', help="Latence de bout en bout sur un corpus de clips annotés")
+    p_bout.add_argument('--corpus', required=True, help="Fichier JSONL des clips annotés (wav, texte, intention, playlist)")
+    p_bout.add_argument('--modele', required=True, help="Dossier du modèle Vosk")
+    p_bout.add_argument('--chunk', type=int, default=4000, help="Échantillons par bloc audio (CHUNK_SIZE)")
+    p_bout.add_argument('--silence', type=float, default=1.0, help="Silence ajouté après chaque clip (secondes)")
+    p_bout.add_argument('--sans-pacing', action='store_true', help="Rejoue les clips aussi vite que possible")
+    p_bout.add_argument('--sans-grammaire', action='store_true', help="Recognizer à vocabulaire libre pour les commandes")
+    p_bout.add_argument('--sans-vad', action='store_true', help="Désactive la détection d'activité vocale")
+    p_bout.add_argument('--sans-anticipation', action='store_true', help="Désactive l'engagement sur partiel stable")
+    p_bout.add_argument('--sans-speculation', action='store_true', help="Désactive les requêtes Ollama spéculatives")
+    p_bout.add_argument('--sans-streaming', action='store_true', help="Classification Ollama sans streaming")
+    p_bout.add_argument('--reponse-llm', default='oracle', help="Réponse du faux Ollama ('oracle' = intention annotée)")
+    p_bout.add_argument('--latence-llm', type=float, default=0.3, help="Latence simulée d'Ollama avant le premier token (s)")
+    p_bout.add_argument('--latence-token', type=float, default=0.03, help="Latence simulée par token (s)")
+    p_bout.add_argument('--sortie', help="Fichier JSON où enregistrer les résultats")
+    p_bout.add_argument('--details', action='store_true', help="Affiche le résultat de chaque clip")
+    p_bout.set_defaults(fonction=benchmark_bout_en_bout)
+
+    p_lot = sous_commandes.add_parser('lot', help="Débit de la transcription en lot selon le nombre de processus")
+    p_lot.add_argument('--entree', required=True, help="Dossier de fichiers WAV, ou fichier texte listant un chemin par ligne")
+    p_lot.add_argument('--modele', required=True, help="Dossier du modèle Vosk")
+    p_lot.add_argument('--processus', default="1,2,4", help="Nombres de processus mesurés, séparés par des virgules")
+    p_lot.add_argument('--fichiers', type=int, help="Ne traite que les N premiers fichiers")
+    p_lot.set_defaults(fonction=benchmark_lot)
+
+    p_metriques = sous_commandes.add_parser('metriques', help="Coût des métriques dans la boucle d'écoute")
+    p_metriques.add_argument('--repetitions', type=int, default=1000000, help="Observations par mesure")
+    p_metriques.set_defaults(fonction=benchmark_metriques)
+
+    args = parser.parse_args(argv)
+    args.fonction(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache des intentions renvoyées par Ollama.
+
+Les transcriptions sont normalisées (minuscules, accents, ponctuation, mots
+de remplissage) pour que "Euh, mets la suite !" et "mets la suite" partagent
+la même entrée. Éviction LRU, durée de vie (TTL) et sauvegarde sur disque
+pour garder les entrées d'un redémarrage à l'autre.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+
+# Mots de remplissage retirés avant de construire la clé
+MOTS_REMPLISSAGE = {
+    'euh', 'heu', 'hum', 'hmm', 'bah', 'ben', 'bon', 'hein', 'voila',
+    'stp', 'svp', 'please',
+}
+
+# Expressions de politesse retirées (après suppression des accents et de la ponctuation)
+EXPRESSIONS_REMPLISSAGE = (
+    's il te plait',
+    's il vous plait',
+)
+
+_NON_ALPHANUMERIQUE = re.compile(r'[^a-z0-9]+')
+
+
+def normaliser_texte(texte: str) -> str:
+    """
+    Normalise une transcription pour la recherche dans le cache.
+
+    Args:
+        texte: Texte transcrit
+
+    Returns:
+        str: Texte en minuscules, sans accents, ponctuation ni mots de remplissage
+    """
+    texte = unicodedata.normalize('NFKD', texte.lower())
+    texte = ''.join(c for c in texte if not unicodedata.combining(c))
+    texte = ' ' + _NON_ALPHANUMERIQUE.sub(' ', texte) + ' '
+    for expression in EXPRESSIONS_REMPLISSAGE:
+        texte = texte.replace(f' {expression} ', ' ')
+    return ' '.join(mot for mot in texte.split() if mot not in MOTS_REMPLISSAGE)
+
+
+def empreinte_logiciels(noms: Iterable[str]) -> str:
+    """
+    Calcule une empreinte stable de la liste des logiciels.
+
+    Contrairement à SOFTWARE_DB_VERSION (compteur remis à zéro au démarrage),
+    l'empreinte ne change que si le contenu de la base change.
+
+    Args:
+        noms: Noms des logiciels de SOFTWARE_DB
+
+    Returns:
+        str: Empreinte hexadécimale courte
+    """
+    return hashlib.sha1('\n'.join(sorted(noms)).encode('utf-8')).hexdigest()[:12]
+
+
+def empreinte_classification(empreinte_db: str, mode: str, instructions: str) -> str:
+    """
+    Calcule l'empreinte de tout ce qui détermine la réponse d'Ollama, hors texte et modèle.
+
+    Une réponse obtenue avec d'autres instructions ou un autre mode de classification
+    (autres intentions, autres codes) ne doit pas être resservie.
+
+    Args:
+        empreinte_db: Empreinte de la base logiciels (empreinte_logiciels)
+        mode: Mode de classification et de préfixe (ex: 'codes/contexte')
+        instructions: Instructions de classification envoyées à Ollama
+
+    Returns:
+        str: Empreinte hexadécimale courte
+    """
+    return hashlib.sha1('\n'.join((empreinte_db, mode, instructions)).encode('utf-8')).hexdigest()[:12]
+
+
+class CacheIntentions:
+    """
+    Cache LRU avec durée de vie, persistant sur disque.
+
+    Args:
+        capacite: Nombre maximal d'entrées
+        ttl_s: Durée de vie d'une entrée en secondes
+        chemin: Fichier JSON de sauvegarde (None = cache en mémoire uniquement)
+        sauvegarde_toutes: Sauvegarder automatiquement après ce nombre de nouvelles entrées
+    """
+
+    def __init__(
+        self,
+        capacite: int = 512,
+        ttl_s: float = 7 * 24 * 3600,
+        chemin: Optional[str] = None,
+        sauvegarde_toutes: int = 10,
+    ) -> None:
+        self.capacite = capacite
+        self.ttl_s = ttl_s
+        self.chemin = chemin
+        self.sauvegarde_toutes = sauvegarde_toutes
+
+        # clé -> (intention, horodatage d'enregistrement)
+        self._entrees: "OrderedDict[str, tuple]" = OrderedDict()
+        self._verrou = threading.Lock()
+        self._modifications = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def cle(texte: str, modele: str, version_db: str) -> str:
+        """Construit la clé du cache : modèle, empreinte de la base logiciels et de la classification, texte normalisé."""
+        return f"{modele}|{version_db}|{normaliser_texte(texte)}"
+
+    def obtenir(self, texte: str, modele: str, version_db: str) -> Optional[str]:
+        """
+        Cherche l'intention associée au texte.
+
+        Args:
+            texte: Texte transcrit
+            modele: Nom du modèle Ollama
+            version_db: Empreinte de la base logiciels et de la classification (empreinte_classification)
+
+        Returns:
+            str: Intention en cache, None si absente ou expirée
+        """
+        cle = self.cle(texte, modele, version_db)
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                self.misses += 1
+                return None
+            intention, horodatage = entree
+            if time.time() - horodatage > self.ttl_s:
+                del self._entrees[cle]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return intention
+
+    def contient(self, texte: str, modele: str, version_db: str) -> bool:
+        """Indique si une entrée valide existe, sans modifier l'ordre LRU ni les compteurs."""
+        cle = self.cle(texte, modele, version_db)
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            return entree is not None and time.time() - entree[1] <= self.ttl_s
+
+    def enregistrer(self, texte: str, modele: str, version_db: str, intention: str) -> None:
+        """
+        Ajoute ou remplace l'intention associée au texte.
+
+        Args:
+            texte: Texte transcrit
+            modele: Nom du modèle Ollama
+            version_db: Empreinte de la base logiciels et de la classification (empreinte_classification)
+            intention: Code d'intention à mémoriser
+        """
+        cle = self.cle(texte, modele, version_db)
+        with self._verrou:
+            self._entrees[cle] = (intention, time.time())
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.capacite:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+            self._modifications += 1
+            sauvegarder = self.chemin and self._modifications >= self.sauvegarde_toutes
+
+        if sauvegarder:
+            self.sauvegarder()
+
+    def charger(self) -> int:
+        """
+        Recharge les entrées sauvegardées (les entrées expirées sont ignorées).
+
+        Returns:
+            int: Nombre d'entrées chargées
+        """
+        if not self.chemin or not os.path.exists(self.chemin):
+            return 0
+        try:
+            with open(self.chemin, 'r', encoding='utf-8') as f:
+                donnees = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Cache des intentions illisible, il sera reconstruit : {e}")
+            return 0
+
+        maintenant = time.time()
+        with self._verrou:
+            # Le fichier est enregistré du moins récemment au plus récemment utilisé
+            for cle, intention, horodatage in donnees.get('entrees', []):
+                if maintenant - horodatage <= self.ttl_s:
+                    self._entrees[cle] = (intention, horodatage)
+            while len(self._entrees) > self.capacite:
+                self._entrees.popitem(last=False)
+            return len(self._entrees)
+
+    def sauvegarder(self) -> None:
+        """Écrit le cache sur disque (écriture atomique via un fichier temporaire)."""
+        if not self.chemin:
+            return
+        with self._verrou:
+            entrees = [[cle, intention, horodatage] for cle, (intention, horodatage) in self._entrees.items()]
+            self._modifications = 0
+
+        temporaire = f"{self.chemin}.tmp"
+        try:
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entrees': entrees}, f, ensure_ascii=False)
+            os.replace(temporaire, self.chemin)
+        except OSError as e:
+            print(f"⚠️  Impossible de sauvegarder le cache des intentions : {e}")
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les compteurs du cache pour aider à le dimensionner.
+
+        Returns:
+            dict: hits, misses, taux de succès, évictions, expirations, taille
+        """
+        with self._verrou:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'taux_hits': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'taille': len(self._entrees),
+                'capacite': self.capacite,
+            }
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache audio des réponses fixes de l'assistant.
+
+Les phrases qui reviennent toujours ("musique suivante", "volume monté",
+"{nom} lancé"...) sont synthétisées une seule fois en WAV avec
+`engine.save_to_file`, puis rejouées directement depuis la mémoire par
+PyAudio. La clé inclut la voix, le débit et le volume : changer l'un de ces
+réglages invalide les fichiers existants.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import wave
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Réponses fixes prononcées par l'assistant
+PHRASES_FIXES = [
+    "Play ou pause",
+    "musique suivante",
+    "musique précédente",
+    "volume monté",
+    "volume baissé",
+    "aléatoire activé",
+    "répétition activé",
+    "Spotify lancé",
+    "Spotify est déjà lancé",
+    "Quelle playlist souhaitez-vous jouer ?",
+    "Désolé, je n'ai pas pu entendre le nom de la playlist.",
+    "Je n'ai rien entendu. Veuillez réessayer.",
+    "Au revoir",
+]
+
+# Réponses construites à partir du nom d'un logiciel de SOFTWARE_DB
+MODELES_PHRASES_LOGICIELS = [
+    "{name} lancé",
+]
+
+
+def phrases_logiciels(noms: Iterable[str]) -> List[str]:
+    """
+    Construit les réponses de MODELES_PHRASES_LOGICIELS pour chaque logiciel.
+
+    Args:
+        noms: Noms des logiciels de SOFTWARE_DB
+
+    Returns:
+        list: Phrases à mettre en cache
+    """
+    return [modele.format(name=name) for name in noms for modele in MODELES_PHRASES_LOGICIELS]
+
+
+class PhraseAudio:
+    """Audio PCM d'une phrase, prêt à être joué."""
+
+    def __init__(self, pcm: bytes, frequence: int, canaux: int, largeur: int) -> None:
+        self.pcm = pcm
+        self.frequence = frequence
+        self.canaux = canaux
+        self.largeur = largeur
+
+
+class CachePhrases:
+    """
+    Cache des phrases synthétisées, sur disque (WAV) et en mémoire (PCM).
+
+    Args:
+        dossier: Dossier où sont rangés les fichiers WAV et l'index
+    """
+
+    def __init__(self, dossier: str) -> None:
+        self.dossier = dossier
+        self._parametres: Optional[Dict] = None
+        self._fichiers: Dict[str, str] = {}
+        self._memoire: Dict[str, PhraseAudio] = {}
+        self._verrou = threading.Lock()
+        self.lectures = 0
+        self.syntheses = 0
+
+    @property
+    def _chemin_index(self) -> str:
+        return os.path.join(self.dossier, 'index.json')
+
+    def _cle(self, texte: str) -> str:
+        parametres = json.dumps(self._parametres, sort_keys=True)
+        return hashlib.sha1(f"{parametres}|{texte}".encode('utf-8')).hexdigest()
+
+    def configurer(self, voix: str, debit: float, volume: float) -> None:
+        """
+        Fixe les réglages de la voix et invalide les fichiers rendus avec d'autres réglages.
+
+        Args:
+            voix: Identifiant de la voix pyttsx3
+            debit: Débit en mots par minute
+            volume: Volume du moteur
+        """
+        parametres = {'voix': str(voix), 'debit': debit, 'volume': volume}
+        os.makedirs(self.dossier, exist_ok=True)
+
+        index = {}
+        if os.path.exists(self._chemin_index):
+            try:
+                with open(self._chemin_index, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+
+        with self._verrou:
+            self._parametres = parametres
+            self._memoire.clear()
+            if index.get('parametres') == parametres:
+                self._fichiers = {
+                    texte: fichier for texte, fichier in index.get('phrases', {}).items()
+                    if os.path.exists(os.path.join(self.dossier, fichier))
+                }
+                return
+
+            # Réglages différents : les anciens fichiers ne correspondent plus à la voix actuelle
+            self._fichiers = {}
+            for fichier in os.listdir(self.dossier):
+                if fichier.endswith('.wav'):
+                    try:
+                        os.remove(os.path.join(self.dossier, fichier))
+                    except OSError:
+                        pass
+        self._sauvegarder_index()
+        if index:
+            print("♻️  Réglages de la voix modifiés : cache audio des phrases invalidé")
+
+    def _sauvegarder_index(self) -> None:
+        with self._verrou:
+            donnees = {'parametres': self._parametres, 'phrases': dict(self._fichiers)}
+        temporaire = f"{self._chemin_index}.tmp"
+        try:
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump(donnees, f, ensure_ascii=False, indent=1)
+            os.replace(temporaire, self._chemin_index)
+        except OSError as e:
+            print(f"⚠️  Impossible d'écrire l'index du cache audio : {e}")
+
+    def contient(self, texte: str) -> bool:
+        return texte in self._fichiers
+
+    def rendre(self, moteur, texte: str) -> bool:
+        """
+        Synthétise une phrase dans un fichier WAV (à appeler depuis le thread du moteur).
+
+        Args:
+            moteur: Moteur pyttsx3 (ou compatible) offrant save_to_file
+            texte: Phrase à rendre
+
+        Returns:
+            bool: True si la phrase est maintenant en cache
+        """
+        if self._parametres is None:
+            return False
+        if texte in self._fichiers:
+            return True
+
+        fichier = f"{self._cle(texte)}.wav"
+        chemin = os.path.join(self.dossier, fichier)
+        try:
+            moteur.save_to_file(texte, chemin)
+            moteur.runAndWait()
+            # Vérifier que le fichier est bien un WAV lisible (certains pilotes écrivent de l'AIFF)
+            self._lire_wav(chemin)
+        except Exception as e:
+            print(f"⚠️  Phrase non mise en cache '{texte}' : {e}")
+            try:
+                os.remove(chemin)
+            except OSError:
+                pass
+            return False
+
+        with self._verrou:
+            self._fichiers[texte] = fichier
+            self.syntheses += 1
+        return True
+
+    def terminer_rendu(self) -> None:
+        """Enregistre l'index après une série de rendus."""
+        self._sauvegarder_index()
+
+    @staticmethod
+    def _lire_wav(chemin: str) -> PhraseAudio:
+        with wave.open(chemin, 'rb') as wav:
+            return PhraseAudio(
+                wav.readframes(wav.getnframes()),
+                wav.getframerate(),
+                wav.getnchannels(),
+                wav.getsampwidth(),
+            )
+
+    def audio(self, texte: str) -> Optional[PhraseAudio]:
+        """
+        Retourne l'audio PCM d'une phrase en cache (chargé en mémoire à la première demande).
+
+        Args:
+            texte: Phrase recherchée
+
+        Returns:
+            PhraseAudio: Audio de la phrase, None si elle n'est pas en cache
+        """
+        phrase = self._memoire.get(texte)
+        if phrase is not None:
+            self.lectures += 1
+            return phrase
+        fichier = self._fichiers.get(texte)
+        if fichier is None:
+            return None
+        try:
+            phrase = self._lire_wav(os.path.join(self.dossier, fichier))
+        except (OSError, wave.Error, EOFError):
+            with self._verrou:
+                self._fichiers.pop(texte, None)
+            return None
+        self._memoire[texte] = phrase
+        self.lectures += 1
+        return phrase
+
+
+class LecteurAudio:
+    """
+    Sortie audio PyAudio pour les phrases en cache.
+
+    Le flux de sortie est ouvert une fois par format audio et réutilisé.
+
+    Args:
+        taille_bloc: Nombre de trames écrites à la fois (granularité de l'interruption)
+    """
+
+    def __init__(self, taille_bloc: int = 1024) -> None:
+        self.taille_bloc = taille_bloc
+        self._audio = None
+        self._flux: Dict[Tuple[int, int, int], object] = {}
+
+    def _flux_pour(self, phrase: PhraseAudio):
+        import pyaudio
+
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        format_audio = (phrase.frequence, phrase.canaux, phrase.largeur)
+        flux = self._flux.get(format_audio)
+        if flux is None:
+            flux = self._audio.open(
+                format=self._audio.get_format_from_width(phrase.largeur),
+                channels=phrase.canaux,
+                rate=phrase.frequence,
+                output=True,
+                frames_per_buffer=self.taille_bloc,
+            )
+            self._flux[format_audio] = flux
+        return flux
+
+    def jouer(self, phrase: PhraseAudio, interrompre: Optional[threading.Event] = None) -> None:
+        """
+        Joue une phrase ; s'arrête entre deux blocs si `interrompre` est levé.
+
+        Args:
+            phrase: Audio à jouer
+            interrompre: Événement de barge-in
+        """
+        flux = self._flux_pour(phrase)
+        taille = self.taille_bloc * phrase.canaux * phrase.largeur
+        for debut in range(0, len(phrase.pcm), taille):
+            if interrompre is not None and interrompre.is_set():
+                return
+            flux.write(phrase.pcm[debut:debut + taille])
+
+    def fermer(self) -> None:
+        for flux in self._flux.values():
+            try:
+                flux.stop_stream()
+                flux.close()
+            except Exception:
+                pass
+        self._flux.clear()
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
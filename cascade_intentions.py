@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cascade de classification d'intention, du moins coûteux au plus coûteux.
+
+Chaque étage (mots-clés, recherche approximative, cache, exemples, LLM...)
+propose une intention avec une confiance ; la première proposition qui
+atteint le seuil de son étage est retenue. Un étage doté d'un budget de
+latence tourne dans son propre thread : passé ce délai, son événement
+d'annulation est levé et la cascade passe à l'étage suivant sans l'attendre.
+
+Appels, intentions retenues, propositions sous le seuil, dépassements,
+erreurs et latences sont comptés par étage, pour régler seuils et budgets
+de sorte que la plupart des commandes n'atteignent jamais le LLM.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from journal_evenements import JOURNAL
+from metriques import METRIQUES
+
+
+# Issue d'un passage dans un étage
+ISSUES = ('retenue', 'sous_seuil', 'vide', 'depassement', 'erreur')
+
+Proposition = Tuple[str, Optional[float]]
+
+
+@dataclass
+class ResultatCascade:
+    """Intention retenue par la cascade."""
+    intention: str
+    etage: str
+    confiance: Optional[float]
+    duree_s: float
+
+
+class EtageCascade:
+    """
+    Un étage de la cascade et ses mesures.
+
+    Args:
+        nom: Nom de l'étage (journal, métriques, statistiques)
+        fonction: Fonction (texte, événement d'annulation) -> (intention, confiance) ou None ;
+            une confiance None signifie que l'étage est certain de sa réponse
+        seuil: Confiance minimale pour retenir la proposition (None = toujours retenue)
+        budget_s: Latence maximale en secondes ; None = exécuté dans le thread appelant, sans limite
+    """
+
+    def __init__(
+        self,
+        nom: str,
+        fonction: Callable[[str, threading.Event], Optional[Proposition]],
+        seuil: Optional[float] = None,
+        budget_s: Optional[float] = None,
+    ) -> None:
+        self.nom = nom
+        self.fonction = fonction
+        self.seuil = seuil
+        self.budget_s = budget_s
+
+        self._verrou = threading.Lock()
+        self._durees: Deque[float] = deque(maxlen=1000)
+        self.issues = {issue: 0 for issue in ISSUES}
+        self._duree = METRIQUES.histogramme('assistant_cascade_secondes', "Durée d'un étage de la cascade d'intention",
+                                            {'etage': nom})
+        self._compteurs = {
+            issue: METRIQUES.compteur('assistant_cascade_total', "Passages dans un étage de la cascade, par issue",
+                                      {'etage': nom, 'issue': issue})
+            for issue in ISSUES
+        }
+
+    def accepte(self, confiance: Optional[float]) -> bool:
+        """Indique si une proposition de cette confiance atteint le seuil de l'étage."""
+        return self.seuil is None or confiance is None or confiance >= self.seuil
+
+    def compter(self, issue: str, duree: float) -> None:
+        with self._verrou:
+            self.issues[issue] += 1
+            self._durees.append(duree)
+        self._compteurs[issue].incrementer()
+        self._duree.observer(duree)
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les mesures de l'étage.
+
+        Returns:
+            dict: passages, compte par issue, taux de réussite, latences moyenne, p95 et max (ms, 1000 derniers passages)
+        """
+        with self._verrou:
+            issues = dict(self.issues)
+            durees = sorted(self._durees)
+        passages = sum(issues.values())
+        return {
+            'passages': passages,
+            **issues,
+            'taux_reussite': issues['retenue'] / passages if passages else 0.0,
+            'duree_moyenne_ms': 1000 * sum(durees) / len(durees) if durees else 0.0,
+            'duree_p95_ms': 1000 * durees[min(len(durees) - 1, int(0.95 * len(durees)))] if durees else 0.0,
+            'duree_max_ms': 1000 * durees[-1] if durees else 0.0,
+        }
+
+
+class CascadeIntentions:
+    """
+    Essaie les étages dans l'ordre jusqu'à ce que l'un d'eux retienne une intention.
+
+    Args:
+        etages: Étages, du moins coûteux au plus coûteux
+    """
+
+    def __init__(self, etages: List[EtageCascade]) -> None:
+        self.etages = etages
+        self._verrou = threading.Lock()
+        self.analyses = 0
+        self.non_resolues = 0
+
+    def etage(self, nom: str) -> Optional[EtageCascade]:
+        """Retourne l'étage `nom`, None s'il ne fait pas partie de la cascade."""
+        for etage in self.etages:
+            if etage.nom == nom:
+                return etage
+        return None
+
+    def _executer(self, etage: EtageCascade, texte: str) -> Tuple[str, Optional[Proposition]]:
+        """Exécute un étage dans son budget ; retourne (issue provisoire, proposition)."""
+        annulation = threading.Event()
+        if etage.budget_s is None:
+            proposition = etage.fonction(texte, annulation)
+            return ('retenue' if proposition else 'vide'), proposition
+
+        boite: Dict = {}
+        terminee = threading.Event()
+
+        def executer() -> None:
+            try:
+                boite['proposition'] = etage.fonction(texte, annulation)
+            except Exception as e:
+                boite['erreur'] = e
+            finally:
+                terminee.set()
+
+        threading.Thread(target=executer, name=f"cascade-{etage.nom}", daemon=True).start()
+        if not terminee.wait(etage.budget_s):
+            # L'étage s'arrêtera au prochain point de contrôle (ex: prochain token d'Ollama) ; on ne l'attend pas
+            annulation.set()
+            return 'depassement', None
+        if 'erreur' in boite:
+            raise boite['erreur']
+        proposition = boite.get('proposition')
+        return ('retenue' if proposition else 'vide'), proposition
+
+    def analyser(self, texte: str, incidents: Optional[Dict[str, str]] = None) -> Optional[ResultatCascade]:
+        """
+        Classifie un texte en descendant la cascade.
+
+        Args:
+            texte: Texte transcrit
+            incidents: Si donné et qu'aucun étage n'a conclu, reçoit les étages en erreur ou hors budget
+                (nom -> cause) : une absence d'intention due à une panne n'est pas une vraie réponse
+
+        Returns:
+            ResultatCascade: Intention retenue et étage qui l'a fournie, None si aucun étage n'a conclu
+        """
+        debut = time.perf_counter()
+        pannes: Dict[str, str] = {}
+        for etage in self.etages:
+            debut_etage = time.perf_counter()
+            try:
+                issue, proposition = self._executer(etage, texte)
+            except Exception as e:
+                issue, proposition = 'erreur', None
+                pannes[etage.nom] = f"{type(e).__name__}: {e}"
+                JOURNAL.evenement('erreur', f"❌ Étage '{etage.nom}' de la cascade en erreur : {e}",
+                                  etage=f'cascade.{etage.nom}', erreur=str(e))
+            duree = time.perf_counter() - debut_etage
+
+            if issue == 'retenue' and not etage.accepte(proposition[1]):
+                issue = 'sous_seuil'
+                JOURNAL.evenement('cascade', f"🤔 {etage.nom} : {proposition[0]} trop incertain ({proposition[1]:.2f} < {etage.seuil:g})",
+                                  etage=etage.nom, issue=issue, intention=proposition[0], confiance=round(proposition[1], 3))
+            elif issue == 'depassement':
+                pannes[etage.nom] = f"hors budget ({etage.budget_s:g} s)"
+                JOURNAL.evenement('cascade', f"⏱️  {etage.nom} annulé après {etage.budget_s:g} s, étage suivant",
+                                  etage=etage.nom, issue=issue, budget_s=etage.budget_s)
+            etage.compter(issue, duree)
+
+            if issue == 'retenue':
+                with self._verrou:
+                    self.analyses += 1
+                return ResultatCascade(proposition[0], etage.nom, proposition[1], time.perf_counter() - debut)
+
+        with self._verrou:
+            self.analyses += 1
+            self.non_resolues += 1
+        if incidents is not None:
+            incidents.update(pannes)
+        return None
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les mesures de la cascade.
+
+        Returns:
+            dict: analyses, non résolues, et pour chaque étage ses mesures et la part des analyses qu'il a conclues
+        """
+        with self._verrou:
+            analyses, non_resolues = self.analyses, self.non_resolues
+        etages = {}
+        for etage in self.etages:
+            stats = etage.statistiques()
+            stats['part_analyses'] = stats['retenue'] / analyses if analyses else 0.0
+            etages[etage.nom] = stats
+        return {'analyses': analyses, 'non_resolues': non_resolues, 'etages': etages}
+
+    def afficher_statistiques(self) -> None:
+        """Affiche la part des commandes conclues par chaque étage et ses latences."""
+        stats = self.statistiques()
+        print(f"🪜 Cascade d'intention : {stats['analyses']} analyses, {stats['non_resolues']} sans intention")
+        for nom, etage in stats['etages'].items():
+            print(f"   {nom:<13} {etage['passages']:>5} passages, {etage['retenue']:>5} retenues "
+                  f"({etage['part_analyses']:.0%} des analyses), {etage['sous_seuil']} sous le seuil, "
+                  f"{etage['depassement']} hors budget, {etage['erreur']} erreurs ; "
+                  f"{etage['duree_moyenne_ms']:.1f} ms en moyenne, p95 {etage['duree_p95_ms']:.1f} ms")
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Classification d'intention par similarité avec des phrases d'exemple.
+
+Chaque intention est décrite par quelques phrases d'exemple, dont les
+embeddings (vecteurs normalisés) forment une matrice enregistrée sur disque
+au format .npy et ouverte en mémoire partagée (mmap). Le texte transcrit est
+vectorisé une seule fois ; un produit matriciel donne sa similarité cosinus
+avec tous les exemples, et l'intention retenue est celle du meilleur exemple,
+avec l'écart (marge) qui la sépare de la meilleure autre intention.
+
+L'index est reconstruit de façon incrémentale : seuls les exemples nouveaux
+(ajoutés au code ou créés pour un nouveau logiciel) sont vectorisés.
+
+Construction hors ligne :
+    python classification_exemples.py --raccourcis shortcuts --embeddeur nomic-embed-text
+    python classification_exemples.py --embeddeur ngrammes --tester "mets un peu d'ambiance"
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import threading
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from cache_intentions import normaliser_texte
+
+
+# Phrases d'exemple par intention (formulations que les mots-clés ne couvrent pas)
+EXEMPLES_INTENTIONS: Dict[str, List[str]] = {
+    'ACTION_SPOTIFY': [
+        "mets de la musique", "j'ai envie d'écouter de la musique", "mets un peu d'ambiance",
+        "on écoute de la musique", "tu peux mettre du son", "j'aimerais écouter un truc calme",
+    ],
+    'PLAY_PAUSE': [
+        "coupe la musique", "mets en pause", "silence", "remets la musique",
+        "continue la chanson", "tais toi un instant",
+    ],
+    'NEXT_SONG': [
+        "change de chanson", "je n'aime pas ce morceau", "mets autre chose",
+        "chanson d'après", "saute ce titre",
+    ],
+    'PREVIOUS_SONG': [
+        "remets la chanson d'avant", "le morceau d'avant", "rejoue le titre précédent",
+        "reviens en arrière",
+    ],
+    'VOLUME_UP': [
+        "je n'entends rien", "c'est trop bas", "mets plus de son", "un peu plus haut",
+    ],
+    'VOLUME_DOWN': [
+        "c'est trop fort", "moins de bruit", "mets moins de son", "un peu plus bas",
+    ],
+    'SHUFFLE': [
+        "joue dans le désordre", "mode aléatoire", "mélange les titres",
+    ],
+    'REPEAT': [
+        "encore cette chanson", "joue la en boucle", "remets la même",
+    ],
+    'PLAYLIST': [
+        "mets ma liste de lecture", "joue ma sélection", "lance ma liste",
+    ],
+    'IGNORE': [
+        "il fait beau aujourd'hui", "quelle heure est il", "c'est quoi ce morceau",
+        "je vais manger", "bonjour comment ça va", "on se voit demain", "merci beaucoup",
+    ],
+}
+
+# Formulations générées pour chaque logiciel de SOFTWARE_DB
+GABARITS_LOGICIELS = ("ouvre {nom}", "j'ai besoin de {nom}", "je veux utiliser {nom}", "mets {nom}")
+
+FICHIER_METADONNEES = 'exemples.json'
+
+
+def exemples_intentions(
+    logiciels: Iterable[str] = (),
+    exemples: Optional[Dict[str, List[str]]] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Liste les couples (intention, phrase) de l'index.
+
+    Args:
+        logiciels: Noms des logiciels de SOFTWARE_DB (intention 'LAUNCH_SOFTWARE:nom')
+        exemples: Phrases par intention (EXEMPLES_INTENTIONS par défaut)
+
+    Returns:
+        list: Couples triés par intention puis par phrase, sans doublon
+    """
+    exemples = EXEMPLES_INTENTIONS if exemples is None else exemples
+    couples = {(intention, phrase) for intention, phrases in exemples.items() for phrase in phrases}
+    couples.update((f'LAUNCH_SOFTWARE:{nom}', gabarit.format(nom=nom)) for nom in logiciels for gabarit in GABARITS_LOGICIELS)
+    return sorted(couples)
+
+
+# ==================== EMBEDDEURS ====================
+
+class EmbeddeurNgrammes:
+    """
+    Vecteurs de trigrammes de caractères hachés : sans modèle ni réseau.
+
+    Robuste aux erreurs de transcription, mais sans notion de sens : deux
+    formulations différentes d'une même demande ne se ressemblent pas.
+
+    Args:
+        dimension: Taille des vecteurs
+    """
+
+    def __init__(self, dimension: int = 1024) -> None:
+        self.dimension = dimension
+        self.identifiant = f'ngrammes-{dimension}'
+
+    def __call__(self, textes: List[str]) -> np.ndarray:
+        vecteurs = np.zeros((len(textes), self.dimension), dtype=np.float32)
+        for ligne, texte in enumerate(textes):
+            texte = f"  {normaliser_texte(texte)} "
+            for i in range(len(texte) - 2):
+                # crc32 plutôt que hash() : stable d'un lancement à l'autre
+                vecteurs[ligne, zlib.crc32(texte[i:i + 3].encode('utf-8')) % self.dimension] += 1.0
+        return vecteurs
+
+
+class EmbeddeurOllama:
+    """
+    Embeddings calculés par un modèle d'Ollama (/api/embed), ex: nomic-embed-text.
+
+    Args:
+        client: ClientOllama partagé
+        modele: Nom du modèle d'embeddings
+        timeout: Délai maximal d'une requête en secondes
+    """
+
+    def __init__(self, client, modele: str, timeout: float = 30) -> None:
+        self.client = client
+        self.modele = modele
+        self.timeout = timeout
+        self.identifiant = f'ollama:{modele}'
+
+    def __call__(self, textes: List[str]) -> np.ndarray:
+        return np.asarray(self.client.vectoriser(self.modele, textes, timeout=self.timeout), dtype=np.float32)
+
+
+def _normaliser_lignes(matrice: np.ndarray) -> np.ndarray:
+    normes = np.linalg.norm(matrice, axis=1, keepdims=True)
+    normes[normes == 0] = 1.0
+    return matrice / normes
+
+
+# ==================== INDEX ====================
+
+class IndexExemples:
+    """
+    Matrice des embeddings des phrases d'exemple, persistante et ouverte en mmap.
+
+    Le dossier contient exemples.json (embeddeur, dimension, intention et phrase
+    de chaque ligne, fichier de la matrice) et la matrice exemples-<empreinte>.npy.
+    Chaque reconstruction écrit une nouvelle matrice plutôt que de remplacer
+    celle qui est ouverte (Windows refuse de remplacer un fichier mappé).
+
+    Args:
+        dossier: Dossier de l'index
+        embeddeur: Fonction (liste de textes) -> matrice (n, dimension), avec un attribut `identifiant`
+        taille_lot: Nombre maximal de phrases vectorisées par appel à l'embeddeur
+    """
+
+    def __init__(self, dossier: str, embeddeur: Callable[[List[str]], np.ndarray], taille_lot: int = 64) -> None:
+        self.dossier = dossier
+        self.embeddeur = embeddeur
+        self.taille_lot = taille_lot
+
+        # (matrice normalisée, intention de chaque groupe, début de chaque groupe, couples) remplacés d'un bloc
+        self._index: Optional[Tuple[np.ndarray, List[str], np.ndarray, List[Tuple[str, str]]]] = None
+        self._verrou = threading.Lock()
+
+        self.vectorisations = 0
+        self.reconstructions = 0
+
+    @property
+    def identifiant(self) -> str:
+        return getattr(self.embeddeur, 'identifiant', type(self.embeddeur).__name__)
+
+    def __len__(self) -> int:
+        index = self._index
+        return 0 if index is None else len(index[3])
+
+    # ---------- Persistance ----------
+
+    def _lire_disque(self) -> Optional[Tuple[np.ndarray, List[Tuple[str, str]]]]:
+        """Ouvre la matrice enregistrée en mmap ; None si absente, illisible ou d'un autre embeddeur."""
+        chemin = os.path.join(self.dossier, FICHIER_METADONNEES)
+        try:
+            with open(chemin, 'r', encoding='utf-8') as f:
+                metadonnees = json.load(f)
+            if metadonnees.get('embeddeur') != self.identifiant:
+                return None
+            matrice = np.load(os.path.join(self.dossier, metadonnees['matrice']), mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None
+        couples = [tuple(ligne) for ligne in metadonnees.get('lignes', [])]
+        if matrice.ndim != 2 or matrice.shape[0] != len(couples):
+            return None
+        return matrice, couples
+
+    def _ecrire_disque(self, matrice: np.ndarray, couples: List[Tuple[str, str]]) -> np.ndarray:
+        """Écrit la matrice et ses métadonnées, puis retourne la matrice rouverte en mmap."""
+        os.makedirs(self.dossier, exist_ok=True)
+        empreinte = hashlib.sha1(json.dumps([self.identifiant, couples], ensure_ascii=False).encode('utf-8')).hexdigest()[:12]
+        nom_matrice = f'exemples-{empreinte}.npy'
+        chemin_matrice = os.path.join(self.dossier, nom_matrice)
+
+        temporaire = f"{chemin_matrice}.{os.getpid()}.tmp"
+        with open(temporaire, 'wb') as f:
+            np.save(f, np.ascontiguousarray(matrice, dtype=np.float32))
+        os.replace(temporaire, chemin_matrice)
+
+        metadonnees = {
+            'version': 1,
+            'embeddeur': self.identifiant,
+            'dimension': int(matrice.shape[1]),
+            'matrice': nom_matrice,
+            'lignes': [list(couple) for couple in couples],
+        }
+        chemin = os.path.join(self.dossier, FICHIER_METADONNEES)
+        temporaire = f"{chemin}.{os.getpid()}.tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(metadonnees, f, ensure_ascii=False)
+        os.replace(temporaire, chemin)
+
+        # Anciennes matrices : celles encore ouvertes (Windows) seront supprimées à la prochaine reconstruction
+        for ancienne in glob.glob(os.path.join(self.dossier, 'exemples-*.npy')):
+            if os.path.basename(ancienne) != nom_matrice:
+                try:
+                    os.remove(ancienne)
+                except OSError:
+                    pass
+        return np.load(chemin_matrice, mmap_mode='r')
+
+    # ---------- Construction ----------
+
+    def _vectoriser(self, textes: List[str]) -> np.ndarray:
+        lots = [self.embeddeur(textes[i:i + self.taille_lot]) for i in range(0, len(textes), self.taille_lot)]
+        self.vectorisations += len(textes)
+        return _normaliser_lignes(np.vstack(lots).astype(np.float32))
+
+    def construire(self, couples: List[Tuple[str, str]]) -> int:
+        """
+        Met l'index à jour pour ces exemples, en ne vectorisant que les phrases absentes de l'index enregistré.
+
+        Args:
+            couples: Couples (intention, phrase) triés par intention (voir exemples_intentions())
+
+        Returns:
+            int: Nombre de phrases vectorisées (0 si l'index enregistré était à jour)
+        """
+        with self._verrou:
+            existant = self._lire_disque()
+            if existant is not None and existant[1] == couples:
+                self._publier(existant[0], couples)
+                return 0
+
+            lignes_connues = {}
+            if existant is not None:
+                lignes_connues = {couple: ligne for ligne, couple in enumerate(existant[1])}
+            nouveaux = [couple for couple in couples if couple not in lignes_connues]
+            vecteurs = self._vectoriser([phrase for _, phrase in nouveaux]) if nouveaux else None
+
+            dimension = vecteurs.shape[1] if vecteurs is not None else existant[0].shape[1]
+            matrice = np.empty((len(couples), dimension), dtype=np.float32)
+            position_nouveaux = {couple: i for i, couple in enumerate(nouveaux)}
+            for ligne, couple in enumerate(couples):
+                if couple in position_nouveaux:
+                    matrice[ligne] = vecteurs[position_nouveaux[couple]]
+                else:
+                    matrice[ligne] = existant[0][lignes_connues[couple]]
+
+            self._publier(self._ecrire_disque(matrice, couples), couples)
+            self.reconstructions += 1
+            return len(nouveaux)
+
+    def _publier(self, matrice: np.ndarray, couples: List[Tuple[str, str]]) -> None:
+        """Rend l'index consultable : lignes regroupées par intention (couples triés)."""
+        intentions: List[str] = []
+        debuts: List[int] = []
+        for ligne, (intention, _) in enumerate(couples):
+            if not intentions or intentions[-1] != intention:
+                intentions.append(intention)
+                debuts.append(ligne)
+        self._index = (matrice, intentions, np.asarray(debuts, dtype=np.intp), couples)
+
+    # ---------- Classification ----------
+
+    def classer(self, texte: str) -> Optional[Tuple[str, float, float]]:
+        """
+        Cherche l'intention dont un exemple ressemble le plus au texte.
+
+        Args:
+            texte: Texte transcrit
+
+        Returns:
+            tuple: (intention, similarité cosinus du meilleur exemple, marge sur la meilleure autre intention),
+                None si l'index est vide
+        """
+        index = self._index
+        if index is None or not index[1]:
+            return None
+        matrice, intentions, debuts, _ = index
+
+        vecteur = self.embeddeur([texte])[0].astype(np.float32)
+        norme = float(np.linalg.norm(vecteur))
+        if norme == 0.0:
+            return None
+        # Lignes normalisées : le produit matriciel donne directement les similarités cosinus
+        similarites = matrice @ (vecteur / norme)
+        par_intention = np.maximum.reduceat(similarites, debuts)
+
+        if len(par_intention) == 1:
+            return intentions[0], float(par_intention[0]), float(par_intention[0])
+        deux_meilleures = np.argpartition(par_intention, -2)[-2:]
+        seconde, premiere = sorted(deux_meilleures, key=lambda i: par_intention[i])
+        return intentions[premiere], float(par_intention[premiere]), float(par_intention[premiere] - par_intention[seconde])
+
+
+def creer_embeddeur(nom: str, client=None) -> Callable[[List[str]], np.ndarray]:
+    """
+    Crée l'embeddeur désigné par la configuration.
+
+    Args:
+        nom: 'ngrammes', ou nom d'un modèle d'embeddings d'Ollama
+        client: ClientOllama (requis pour un modèle d'Ollama)
+
+    Returns:
+        EmbeddeurNgrammes ou EmbeddeurOllama
+    """
+    if nom == 'ngrammes':
+        return EmbeddeurNgrammes()
+    return EmbeddeurOllama(client, nom)
+
+
+def main() -> None:
+    """Construit (ou met à jour) l'index des exemples hors ligne."""
+    from base_raccourcis import BaseRaccourcis
+    from client_ollama import ClientOllama
+
+    parser = argparse.ArgumentParser(description="Construit l'index des phrases d'exemple par intention")
+    parser.add_argument('--dossier', default='index_exemples', help="Dossier de l'index")
+    parser.add_argument('--embeddeur', default='nomic-embed-text',
+                        help="'ngrammes' ou modèle d'embeddings d'Ollama (ex: nomic-embed-text)")
+    parser.add_argument('--ollama', default='http://localhost:11434', help="URL d'Ollama")
+    parser.add_argument('--raccourcis', help="Dossier des raccourcis (une intention LAUNCH_SOFTWARE par logiciel)")
+    parser.add_argument('--tester', nargs='*', default=[], help="Phrases à classer une fois l'index construit")
+    args = parser.parse_args()
+
+    logiciels = {}
+    if args.raccourcis:
+        base = BaseRaccourcis(args.raccourcis)
+        base.rescanner()
+        logiciels = base.logiciels()
+
+    index = IndexExemples(args.dossier, creer_embeddeur(args.embeddeur, ClientOllama(args.ollama)))
+    couples = exemples_intentions(logiciels)
+    vectorisees = index.construire(couples)
+    print(f"✅ Index des exemples : {len(couples)} phrases ({vectorisees} vectorisées) dans {args.dossier}")
+    for texte in args.tester:
+        resultat = index.classer(texte)
+        if resultat:
+            intention, score, marge = resultat
+            print(f"   {texte!r} -> {intention} (similarité {score:.3f}, marge {marge:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Interprétation des réponses d'Ollama en codes d'intention.
+
+Contient l'extraction du label dans une réponse complète, le catalogue des
+intentions désignées par des codes numériques courts, la classification
+streamée qui coupe la génération dès que la réponse est décodée, et le prompt
+à préfixe fixe dont Ollama n'évalue qu'une fois les instructions.
+"""
+
+import math
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from client_ollama import ClientOllama
+
+
+# Labels reconnus dans la réponse du LLM, dans l'ordre de priorité
+LABELS_INTENTIONS = (
+    'ACTION_SPOTIFY',
+    'PLAY_PAUSE',
+    'NEXT_SONG',
+    'PREVIOUS_SONG',
+    'VOLUME_UP',
+    'VOLUME_DOWN',
+    'SHUFFLE',
+    'REPEAT',
+    'PLAYLIST',
+    'IGNORE',
+)
+
+# Tokens générés au plus pour un label complet ("ACTION_SPOTIFY" en compte 5 à 6 chez Mistral) ;
+# la classification streamée s'arrête de toute façon dès que le label est décodé
+NUM_PREDICT_LABELS = 8
+
+# Intentions d'executer_action() proposées au LLM, dans l'ordre de leurs codes (0 à 9 : un seul chiffre)
+INTENTIONS_CATALOGUE = (
+    ('IGNORE', "aucune commande (conversation, bruit, autre demande)"),
+    ('ACTION_SPOTIFY', "ouvrir Spotify"),
+    ('PLAY_PAUSE', "mettre en pause ou reprendre la musique"),
+    ('NEXT_SONG', "passer au morceau suivant"),
+    ('PREVIOUS_SONG', "revenir au morceau précédent"),
+    ('VOLUME_UP', "monter le son"),
+    ('VOLUME_DOWN', "baisser le son"),
+    ('SHUFFLE', "activer ou couper la lecture aléatoire"),
+    ('REPEAT', "activer ou couper la répétition"),
+    ('PLAYLIST', "lancer une playlist"),
+)
+
+_CODE = re.compile(r'\s*(\d+)')
+
+
+def extraire_intention(reponse_llm: str) -> str:
+    """
+    Extrait le code d'intention d'une réponse complète du LLM.
+
+    Args:
+        reponse_llm: Texte généré par Ollama
+
+    Returns:
+        str: Premier label trouvé (ordre de LABELS_INTENTIONS), 'IGNORE' si aucun
+    """
+    reponse_llm = reponse_llm.strip().upper()
+    for label in LABELS_INTENTIONS:
+        if label in reponse_llm:
+            return label
+    # Si la réponse n'est pas claire, on ignore par défaut
+    return 'IGNORE'
+
+
+def intention_decodee(texte_partiel: str) -> Optional[str]:
+    """
+    Indique si le texte généré jusqu'ici nomme un label sans ambiguïté.
+
+    Aucun label n'est contenu dans un autre : dès qu'un label complet
+    apparaît seul, les tokens suivants ne peuvent plus changer le résultat.
+
+    Args:
+        texte_partiel: Texte accumulé depuis le début du flux
+
+    Returns:
+        str: Label décodé, None s'il faut continuer à lire
+    """
+    texte_partiel = texte_partiel.upper()
+    trouves = [label for label in LABELS_INTENTIONS if label in texte_partiel]
+    if len(trouves) == 1:
+        return trouves[0]
+    return None
+
+
+class CatalogueIntentions:
+    """
+    Intentions et logiciels proposés au LLM, chacun désigné par un code numérique.
+
+    Les intentions d'executer_action() prennent les codes 0 à 9, les logiciels
+    de SOFTWARE_DB les suivants (10, 11...) : jusqu'à 90 logiciels, la réponse
+    tient en un ou deux tokens (Mistral découpe les nombres chiffre par chiffre), n'est jamais
+    tronquée par num_predict et se décode dès que le nombre est complet.
+
+    Args:
+        logiciels: Noms des logiciels de SOFTWARE_DB
+    """
+
+    def __init__(self, logiciels: Iterable[str] = ()) -> None:
+        self.intentions: Dict[str, str] = {}
+        lignes = []
+        for code, (intention, description) in enumerate(INTENTIONS_CATALOGUE):
+            self.intentions[str(code)] = intention
+            lignes.append(f"{code}: {description}")
+        for code, nom in enumerate(sorted(logiciels), start=len(INTENTIONS_CATALOGUE)):
+            self.intentions[str(code)] = f'LAUNCH_SOFTWARE:{nom}'
+            lignes.append(f"{code}: ouvrir le logiciel {nom}")
+
+        self.instructions = (
+            "Classe la commande vocale de l'utilisateur. "
+            "Réponds UNIQUEMENT par le numéro de la catégorie, sans rien ajouter.\n"
+            + "\n".join(lignes) + "\n\n"
+        )
+        # Code d'intention -> numéro (ex: pour simuler une réponse du LLM)
+        self.codes: Dict[str, str] = {intention: code for code, intention in self.intentions.items()}
+        # Chiffres du plus grand code, plus l'espace qui peut le précéder et un token de fin
+        self.num_predict = len(str(len(self.intentions) - 1)) + 2
+
+    def decoder(self, texte_partiel: str, termine: bool = False) -> Optional[str]:
+        """
+        Traduit la réponse (éventuellement partielle) du LLM en code d'intention.
+
+        Un nombre est complet dès qu'il est suivi d'un autre caractère, que la
+        génération est terminée, ou qu'aucun code plus long ne commence par lui.
+
+        Args:
+            texte_partiel: Texte accumulé depuis le début du flux
+            termine: True si la génération est terminée
+
+        Returns:
+            str: Code d'intention ('IGNORE' pour un numéro inconnu), None s'il faut continuer à lire
+        """
+        correspondance = _CODE.match(texte_partiel)
+        if correspondance is None:
+            # Le modèle n'a pas répondu par un numéro : chercher un label en toutes lettres une fois la réponse finie
+            return extraire_intention(texte_partiel) if termine else None
+        chiffres = correspondance.group(1)
+        complet = (termine or correspondance.end() < len(texte_partiel)
+                   or not any(code.startswith(chiffres) and code != chiffres for code in self.intentions))
+        if not complet:
+            return None
+        return self.intentions.get(chiffres, 'IGNORE')
+
+
+_cache_catalogue: Optional[Tuple[int, CatalogueIntentions]] = None
+_verrou_catalogue = threading.Lock()
+
+
+def obtenir_catalogue(software_db: Dict[str, str], version: int) -> CatalogueIntentions:
+    """
+    Retourne le catalogue des intentions pour la version de SOFTWARE_DB donnée.
+
+    Args:
+        software_db: Base de données des logiciels (nom -> chemin)
+        version: Numéro de version de la base de données
+
+    Returns:
+        CatalogueIntentions: Catalogue reconstruit uniquement quand la version change
+    """
+    global _cache_catalogue
+    cache = _cache_catalogue
+    if cache is not None and cache[0] == version:
+        return cache[1]
+
+    with _verrou_catalogue:
+        if _cache_catalogue is None or _cache_catalogue[0] != version:
+            _cache_catalogue = (version, CatalogueIntentions(list(software_db.keys())))
+        return _cache_catalogue[1]
+
+
+def confiance_reponse(logprobs: List[Dict]) -> Optional[float]:
+    """
+    Probabilité, selon le modèle, de la réponse qu'il a générée.
+
+    Args:
+        logprobs: Champ `logprobs` des objets de la réponse Ollama (un élément par token)
+
+    Returns:
+        float: Produit des probabilités des tokens (0 à 1), None si Ollama ne les a pas renvoyées
+    """
+    if not logprobs:
+        return None
+    return math.exp(sum(token.get('logprob', 0.0) for token in logprobs))
+
+
+def classifier_en_flux(
+    client: ClientOllama,
+    payload: Dict,
+    timeout: float = 15,
+    annulation: Optional[threading.Event] = None,
+    catalogue: Optional[CatalogueIntentions] = None,
+    arret_anticipe: bool = True,
+) -> Tuple[Optional[str], Dict]:
+    """
+    Classifie via une génération streamée et l'interrompt dès que la réponse est décodée.
+
+    Args:
+        client: Client Ollama partagé
+        payload: Corps de la requête /api/generate
+        timeout: Durée maximale totale de la classification en secondes
+        annulation: Événement qui interrompt la génération au prochain morceau reçu
+        catalogue: Catalogue des codes demandés au LLM (None = labels en toutes lettres)
+        arret_anticipe: False pour lire la réponse complète (la génération reste annulable)
+
+    Returns:
+        tuple: (code d'intention ou None si annulée, statistiques du flux : morceaux lus, arrêt anticipé,
+            annulation, durée, confiance du modèle si les logprobs sont renvoyées, dernier objet de la
+            réponse s'il a été lu)
+
+    Raises:
+        requests.exceptions.Timeout: Si la durée totale dépasse `timeout`
+    """
+    debut = time.perf_counter()
+    texte = ""
+    morceaux = 0
+    termine = False
+    fin = None
+    intention = None
+    annule = False
+    logprobs: List[Dict] = []
+
+    flux = client.generer_flux(payload, timeout=timeout)
+    try:
+        for morceau in flux:
+            if annulation is not None and annulation.is_set():
+                annule = True
+                break
+            morceaux += 1
+            termine = morceau.get('done', False)
+            if termine:
+                fin = morceau
+            texte += morceau.get('response', '')
+            logprobs.extend(morceau.get('logprobs') or [])
+            if arret_anticipe or termine:
+                intention = catalogue.decoder(texte, termine) if catalogue is not None else intention_decodee(texte)
+                if intention:
+                    break
+            # Le timeout de requests porte sur chaque lecture ; on borne aussi la durée totale
+            if time.perf_counter() - debut > timeout:
+                raise requests.exceptions.Timeout(f"Classification streamée plus longue que {timeout} s")
+    finally:
+        flux.close()
+
+    statistiques = {
+        'morceaux': morceaux,
+        'arret_anticipe': intention is not None and not termine,
+        'annule': annule,
+        'duree_s': time.perf_counter() - debut,
+        'confiance': confiance_reponse(logprobs),
+        'fin': fin,
+    }
+    if annule:
+        return None, statistiques
+    if intention is None:
+        intention = catalogue.decoder(texte, True) if catalogue is not None else extraire_intention(texte)
+    return intention, statistiques
+
+
+# Modes de réutilisation du préfixe d'instructions
+MODES_PREFIXE = ('contexte', 'systeme')
+
+
+class PrefixeClassification:
+    """
+    Prompt de classification en deux parties : les instructions, fixes, puis le texte transcrit.
+
+    Ollama garde en cache les tokens déjà évalués et ne réévalue que ce qui suit
+    le plus long préfixe commun avec la requête précédente. Les instructions sont
+    donc toujours envoyées à l'identique et en tête, avec les mêmes options (un
+    num_ctx différent recharge le modèle et vide ce cache) :
+
+    - 'contexte' : les instructions sont évaluées une fois et les tokens
+      renvoyés dans `context` accompagnent chaque requête, suivis du seul texte
+      transcrit ; les deux étapes passent par le gabarit de prompt du modèle
+      (Ollama ne renvoie pas de contexte en mode brut), le modèle voit donc un
+      échange au format habituel ;
+    - 'systeme' : les instructions sont passées comme prompt système constant.
+
+    Args:
+        client: Client Ollama partagé
+        instructions: Préfixe fixe du prompt (séparateur final compris)
+        options: Options Ollama communes à toutes les requêtes (num_ctx, temperature...)
+        mode: 'contexte', 'systeme', ou None pour envoyer le prompt complet à chaque requête
+    """
+
+    def __init__(self, client: ClientOllama, instructions: str, options: Dict, mode: Optional[str] = 'contexte') -> None:
+        if mode is not None and mode not in MODES_PREFIXE:
+            raise ValueError(f"Mode de préfixe inconnu : {mode}")
+        self.client = client
+        self.mode = mode
+        # (instructions, options) remplacés d'un bloc : une requête en cours garde un jeu cohérent
+        self._configuration: Tuple[str, Dict] = (instructions, dict(options))
+
+        # ((modèle, instructions), tokens du préfixe évalué) : seul le jeu d'instructions courant est conservé
+        self._contexte_courant: Optional[Tuple[Tuple[str, str], List[int]]] = None
+        self._verrou_preparation = threading.Lock()
+        self._verrou = threading.Lock()
+
+        self.preparations = 0
+        self.evaluations = 0
+        self.tokens_evalues = 0
+        self.duree_evaluation_s = 0.0
+
+    @property
+    def instructions(self) -> str:
+        return self._configuration[0]
+
+    @property
+    def options(self) -> Dict:
+        return self._configuration[1]
+
+    def changer_instructions(self, instructions: str, options: Optional[Dict] = None) -> None:
+        """
+        Remplace les instructions (ex: liste des logiciels modifiée) et, si données, les options.
+
+        Le préfixe des nouvelles instructions est évalué à la requête suivante,
+        ou dès l'appel à preparer().
+
+        Args:
+            instructions: Nouveau préfixe fixe du prompt
+            options: Nouvelles options Ollama (None = inchangées)
+        """
+        self._configuration = (instructions, dict(options) if options is not None else self._configuration[1])
+
+    def changer_client(self, client: ClientOllama) -> None:
+        """
+        Remplace le client Ollama (autre serveur) : le préfixe évalué par l'ancien est oublié.
+
+        Args:
+            client: Nouveau client Ollama partagé
+        """
+        with self._verrou_preparation:
+            self.client = client
+            self._contexte_courant = None
+
+    @staticmethod
+    def suffixe(texte: str) -> str:
+        """Partie variable du prompt : le texte transcrit."""
+        return f"Texte: {texte}\n\nRéponse:"
+
+    def _contexte(
+        self, modele: str, instructions: str, options: Dict, timeout: float, forcer: bool = False,
+    ) -> Optional[List[int]]:
+        """
+        Tokens des instructions évaluées (mode 'contexte'), obtenus une fois par modèle et par jeu d'instructions.
+
+        None si une autre préparation n'a pas abouti dans le délai : la requête n'attend pas plus que son budget.
+        """
+        cle = (modele, instructions)
+        courant = self._contexte_courant
+        if courant is not None and courant[0] == cle and not forcer:
+            return courant[1]
+        if not self._verrou_preparation.acquire(timeout=timeout):
+            return None
+        try:
+            courant = self._contexte_courant
+            if courant is not None and courant[0] == cle and not forcer:
+                return courant[1]
+            # Même mise en forme (gabarit du modèle) que les requêtes qui reprendront ce contexte ;
+            # un seul token généré : il est retiré du contexte renvoyé
+            options = dict(options, num_predict=1)
+            reponse = self.client.generer({'model': modele, 'prompt': instructions, 'options': options}, timeout=timeout)
+            contexte = reponse.get('context') or []
+            contexte = contexte[:len(contexte) - reponse.get('eval_count', 0)]
+            self._contexte_courant = (cle, contexte)
+            self.preparations += 1
+        finally:
+            self._verrou_preparation.release()
+        self.enregistrer(reponse)
+        return contexte
+
+    def preparer(self, modele: str, timeout: float = 60) -> None:
+        """
+        Fait évaluer les instructions par Ollama avant la première commande.
+
+        À rappeler après chaque chargement du modèle : le cache des tokens évalués
+        disparaît avec lui.
+
+        Args:
+            modele: Nom exact du modèle
+            timeout: Délai maximal en secondes
+        """
+        if self.mode == 'contexte':
+            instructions, options = self._configuration
+            self._contexte(modele, instructions, options, timeout, forcer=True)
+            return
+        # Texte vide : seul le préfixe commun à toutes les requêtes est évalué
+        payload = self.payload(modele, '')
+        payload['options']['num_predict'] = 1
+        reponse = self.client.generer(payload, timeout=timeout)
+        with self._verrou:
+            self.preparations += 1
+        self.enregistrer(reponse)
+
+    def payload(self, modele: str, texte: str, timeout: float = 60) -> Dict:
+        """
+        Construit la requête /api/generate de classification d'un texte.
+
+        En mode 'contexte', évalue d'abord les instructions si ce n'est pas fait ; si une autre
+        préparation est en cours au-delà du délai, la requête part avec le prompt complet.
+
+        Args:
+            modele: Nom exact du modèle
+            texte: Texte transcrit
+            timeout: Délai maximal de l'évaluation des instructions, en secondes
+
+        Returns:
+            dict: Corps de la requête (le keep_alive est ajouté par le client)
+        """
+        instructions, options = self._configuration
+        payload = {'model': modele, 'options': dict(options)}
+        contexte = self._contexte(modele, instructions, options, timeout) if self.mode == 'contexte' else None
+        if contexte is not None:
+            # Ollama place le texte des tokens de contexte devant le prompt (mis en forme par le modèle)
+            payload['context'] = contexte
+            payload['prompt'] = self.suffixe(texte)
+        elif self.mode == 'systeme':
+            payload['system'] = instructions
+            payload['prompt'] = self.suffixe(texte)
+        else:
+            payload['prompt'] = instructions + self.suffixe(texte)
+        return payload
+
+    def enregistrer(self, reponse: Dict) -> None:
+        """Comptabilise l'évaluation du prompt rapportée par le dernier objet d'une réponse Ollama."""
+        if 'prompt_eval_count' not in reponse:
+            return
+        with self._verrou:
+            self.evaluations += 1
+            self.tokens_evalues += reponse['prompt_eval_count']
+            self.duree_evaluation_s += reponse.get('prompt_eval_duration', 0) / 1e9
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les mesures d'évaluation du prompt.
+
+        Returns:
+            dict: Mode, préparations du préfixe, évaluations mesurées, tokens et durée moyens par évaluation
+        """
+        with self._verrou:
+            evaluations = self.evaluations
+            return {
+                'mode': self.mode,
+                'preparations': self.preparations,
+                'evaluations': evaluations,
+                'tokens_evalues_moyen': self.tokens_evalues / evaluations if evaluations else 0.0,
+                'evaluation_moyenne_ms': 1000 * self.duree_evaluation_s / evaluations if evaluations else 0.0,
+            }
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Client HTTP partagé pour toutes les requêtes vers Ollama.
+
+Une seule session `requests` avec un pool de connexions persistantes
+(keep-alive TCP), un `keep_alive` Ollama configurable pour garder le modèle
+en mémoire entre deux commandes, des tentatives avec attente exponentielle,
+et des mesures par requête (établissement de connexion, premier octet, total).
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, Iterator, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+
+# Durée d'établissement de la dernière connexion TCP ouverte par le thread courant
+_mesures_thread = threading.local()
+
+
+class _ConnexionChronometree(HTTPConnection):
+    """Connexion HTTP qui mesure la durée de son établissement."""
+
+    def connect(self) -> None:
+        debut = time.perf_counter()
+        super().connect()
+        _mesures_thread.duree_connexion = time.perf_counter() - debut
+
+
+class _PoolChronometre(HTTPConnectionPool):
+    ConnectionCls = _ConnexionChronometree
+
+
+class _AdaptateurChronometre(HTTPAdapter):
+    """Adaptateur requests dont les connexions HTTP sont chronométrées."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _PoolChronometre,
+            'https': HTTPSConnectionPool,
+        }
+
+
+@dataclass
+class MesureRequete:
+    """Chronométrage d'une requête vers Ollama."""
+    chemin: str
+    statut: Optional[int]
+    nouvelle_connexion: bool
+    duree_connexion_s: float
+    duree_premier_octet_s: float
+    duree_totale_s: float
+
+
+class ClientOllama:
+    """
+    Client Ollama avec session HTTP persistante.
+
+    Args:
+        url_base: Adresse du serveur Ollama (ex: http://localhost:11434)
+        keep_alive: Durée pendant laquelle Ollama garde le modèle chargé après une requête
+        tentatives: Nombre de nouvelles tentatives en cas d'échec de connexion
+        facteur_attente: Facteur de l'attente exponentielle entre deux tentatives (secondes)
+        taille_pool: Nombre maximal de connexions gardées ouvertes
+    """
+
+    def __init__(
+        self,
+        url_base: str = "http://localhost:11434",
+        keep_alive: Union[str, int] = "30m",
+        tentatives: int = 2,
+        facteur_attente: float = 0.2,
+        taille_pool: int = 4,
+    ) -> None:
+        self.url_base = url_base.rstrip('/')
+        self.keep_alive = keep_alive
+
+        # Seules les erreurs de connexion et les statuts "serveur occupé" sont
+        # retentés : une génération déjà partie ne doit pas être relancée.
+        strategie = Retry(
+            total=tentatives,
+            connect=tentatives,
+            read=0,
+            status=tentatives,
+            backoff_factor=facteur_attente,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET', 'POST'}),
+            raise_on_status=False,
+        )
+        adaptateur = _AdaptateurChronometre(pool_connections=1, pool_maxsize=taille_pool, max_retries=strategie)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adaptateur)
+        self.session.mount('https://', adaptateur)
+
+        self._mesures: Deque[MesureRequete] = deque(maxlen=200)
+        self._verrou = threading.Lock()
+
+    # ---------- Requêtes bas niveau ----------
+
+    def requete(self, methode: str, chemin: str, stream: bool = False, **kwargs) -> requests.Response:
+        """
+        Envoie une requête et enregistre son chronométrage.
+
+        Avec `stream=True`, le corps n'est pas lu : la durée totale est alors
+        celle de la réception des en-têtes, à l'appelant de fermer la réponse.
+
+        Args:
+            methode: Méthode HTTP ('GET', 'POST'...)
+            chemin: Chemin de l'API (ex: '/api/generate')
+            stream: Ne pas lire le corps de la réponse immédiatement
+
+        Returns:
+            requests.Response: Réponse HTTP
+        """
+        _mesures_thread.duree_connexion = None
+        debut = time.perf_counter()
+        response = self.session.request(methode, f"{self.url_base}{chemin}", stream=True, **kwargs)
+        premier_octet = time.perf_counter() - debut
+        if not stream:
+            # Lecture complète du corps : la connexion retourne ensuite au pool
+            response.content
+        total = time.perf_counter() - debut
+
+        duree_connexion = _mesures_thread.duree_connexion
+        self._enregistrer(MesureRequete(
+            chemin=chemin,
+            statut=response.status_code,
+            nouvelle_connexion=duree_connexion is not None,
+            duree_connexion_s=duree_connexion or 0.0,
+            duree_premier_octet_s=premier_octet,
+            duree_totale_s=total,
+        ))
+        return response
+
+    def _enregistrer(self, mesure: MesureRequete) -> None:
+        with self._verrou:
+            self._mesures.append(mesure)
+
+    # ---------- API Ollama ----------
+
+    def lister_modeles(self, timeout: float = 2) -> List[str]:
+        """
+        Retourne les noms des modèles installés dans Ollama (/api/tags).
+
+        Args:
+            timeout: Délai maximal en secondes
+
+        Returns:
+            list: Noms des modèles
+        """
+        response = self.requete('GET', '/api/tags', timeout=timeout)
+        response.raise_for_status()
+        return [model.get('name', '') for model in response.json().get('models', [])]
+
+    def generer(self, payload: Dict, timeout: float = 15) -> Dict:
+        """
+        Envoie une requête de génération non streamée (/api/generate).
+
+        Le `keep_alive` du client est ajouté si le payload n'en précise pas.
+
+        Args:
+            payload: Corps de la requête Ollama
+            timeout: Délai maximal de lecture en secondes
+
+        Returns:
+            dict: Réponse JSON d'Ollama
+        """
+        payload = dict(payload)
+        payload.setdefault('keep_alive', self.keep_alive)
+        payload['stream'] = False
+        response = self.requete('POST', '/api/generate', json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def vectoriser(self, modele: str, textes: List[str], timeout: float = 15) -> List[List[float]]:
+        """
+        Calcule les embeddings de plusieurs textes en une requête (/api/embed).
+
+        Args:
+            modele: Nom du modèle d'embeddings (ex: nomic-embed-text)
+            textes: Textes à vectoriser
+            timeout: Délai maximal de lecture en secondes
+
+        Returns:
+            list: Un vecteur par texte, dans l'ordre
+        """
+        payload = {'model': modele, 'input': textes, 'keep_alive': self.keep_alive}
+        response = self.requete('POST', '/api/embed', json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json().get('embeddings', [])
+
+    def generer_flux(self, payload: Dict, timeout: float = 15) -> Iterator[Dict]:
+        """
+        Envoie une requête de génération streamée et produit les morceaux NDJSON au fil de l'eau.
+
+        Interrompre l'itération (break, close()) ferme la connexion : Ollama
+        arrête alors la génération au lieu de produire les tokens restants.
+        La connexion interrompue n'est pas remise dans le pool ; la requête
+        suivante en ouvre une nouvelle (négligeable en local).
+
+        Args:
+            payload: Corps de la requête Ollama
+            timeout: Délai maximal entre deux morceaux en secondes
+
+        Yields:
+            dict: Morceau de réponse ('response', 'done'...)
+        """
+        payload = dict(payload)
+        payload.setdefault('keep_alive', self.keep_alive)
+        payload['stream'] = True
+        response = self.requete('POST', '/api/generate', stream=True, json=payload, timeout=timeout)
+        try:
+            response.raise_for_status()
+            for ligne in response.iter_lines():
+                if not ligne:
+                    continue
+                morceau = json.loads(ligne)
+                yield morceau
+                if morceau.get('done'):
+                    break
+        finally:
+            response.close()
+
+    # ---------- Mesures ----------
+
+    def derniere_mesure(self) -> Optional[MesureRequete]:
+        """Retourne le chronométrage de la dernière requête, None si aucune."""
+        with self._verrou:
+            return self._mesures[-1] if self._mesures else None
+
+    def statistiques(self) -> Dict:
+        """
+        Résume les mesures des dernières requêtes.
+
+        Returns:
+            dict: Nombre de requêtes, connexions ouvertes, durées moyennes (ms)
+        """
+        with self._verrou:
+            mesures = list(self._mesures)
+        if not mesures:
+            return {'requetes': 0}
+
+        nouvelles = [m for m in mesures if m.nouvelle_connexion]
+        return {
+            'requetes': len(mesures),
+            'nouvelles_connexions': len(nouvelles),
+            'connexion_moyenne_ms': 1000 * sum(m.duree_connexion_s for m in nouvelles) / len(nouvelles) if nouvelles else 0.0,
+            'premier_octet_moyen_ms': 1000 * sum(m.duree_premier_octet_s for m in mesures) / len(mesures),
+            'total_moyen_ms': 1000 * sum(m.duree_totale_s for m in mesures) / len(mesures),
+            'derniere': asdict(mesures[-1]),
+        }
+
+    def fermer(self) -> None:
+        """Ferme toutes les connexions du pool."""
+        self.session.close()
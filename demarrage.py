@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orchestration du démarrage de l'assistant.
+
+Les étapes indépendantes (chargement du modèle Vosk, moteur vocal, vérification
+d'Ollama, base des raccourcis...) sont lancées chacune dans leur thread ; une
+étape peut en attendre d'autres (`apres`). Le thread principal récupère le
+résultat d'une étape au moment où il en a besoin, et le rapport final détaille
+le début et la durée de chaque phase depuis le lancement du programme.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from journal_evenements import JOURNAL
+
+
+class EtapeDemarrage:
+    """
+    Une phase du démarrage.
+
+    Args:
+        nom: Nom de la phase (affiché dans le rapport)
+    """
+
+    def __init__(self, nom: str) -> None:
+        self.nom = nom
+        self.debut: Optional[float] = None
+        self.fin: Optional[float] = None
+        self.resultat: Any = None
+        self.erreur: Optional[BaseException] = None
+        self.thread_nom = threading.current_thread().name
+        self.terminee = threading.Event()
+
+    @property
+    def duree(self) -> Optional[float]:
+        if self.debut is None or self.fin is None:
+            return None
+        return self.fin - self.debut
+
+
+class OrchestrateurDemarrage:
+    """
+    Lance les étapes du démarrage en parallèle et mesure chacune d'elles.
+
+    Args:
+        origine: Instant (time.perf_counter) du lancement du programme
+    """
+
+    def __init__(self, origine: Optional[float] = None) -> None:
+        self.origine = origine if origine is not None else time.perf_counter()
+        self._etapes: Dict[str, EtapeDemarrage] = {}
+        self._verrou = threading.Lock()
+
+    def _nouvelle_etape(self, nom: str) -> EtapeDemarrage:
+        with self._verrou:
+            if nom in self._etapes:
+                raise ValueError(f"Étape de démarrage déjà déclarée : {nom}")
+            etape = EtapeDemarrage(nom)
+            self._etapes[nom] = etape
+            return etape
+
+    def _executer(self, etape: EtapeDemarrage, fonction: Callable, args: tuple, apres: Iterable[str]) -> None:
+        try:
+            for dependance in apres:
+                self.resultat(dependance)
+            etape.thread_nom = threading.current_thread().name
+            etape.debut = time.perf_counter()
+            etape.resultat = fonction(*args)
+        except BaseException as e:
+            etape.erreur = e
+        finally:
+            if etape.debut is None:
+                etape.debut = time.perf_counter()
+            etape.fin = time.perf_counter()
+            etape.terminee.set()
+            JOURNAL.evenement('demarrage', etape=etape.nom, debut_ms=round(1000 * (etape.debut - self.origine), 3),
+                              duree_ms=round(1000 * etape.duree, 3),
+                              erreur=str(etape.erreur) if etape.erreur is not None else None)
+
+    def lancer(self, nom: str, fonction: Callable, *args, apres: Iterable[str] = ()) -> None:
+        """
+        Lance une étape dans un thread dédié.
+
+        Args:
+            nom: Nom de l'étape
+            fonction: Fonction à exécuter
+            *args: Arguments de la fonction
+            apres: Étapes dont le résultat doit être disponible avant de commencer
+        """
+        etape = self._nouvelle_etape(nom)
+        threading.Thread(
+            target=self._executer, args=(etape, fonction, args, tuple(apres)),
+            name=f"demarrage-{nom}", daemon=True,
+        ).start()
+
+    def executer(self, nom: str, fonction: Callable, *args) -> Any:
+        """
+        Exécute une étape dans le thread appelant et retourne son résultat.
+
+        Args:
+            nom: Nom de l'étape
+            fonction: Fonction à exécuter
+            *args: Arguments de la fonction
+        """
+        etape = self._nouvelle_etape(nom)
+        self._executer(etape, fonction, args, ())
+        return self.resultat(nom)
+
+    def marquer(self, nom: str) -> None:
+        """Enregistre un jalon (étape de durée nulle), ex: première écoute possible."""
+        etape = self._nouvelle_etape(nom)
+        etape.debut = etape.fin = time.perf_counter()
+        etape.terminee.set()
+        JOURNAL.evenement('demarrage', etape=nom, debut_ms=round(1000 * (etape.debut - self.origine), 3), duree_ms=0.0)
+
+    def resultat(self, nom: str, timeout: Optional[float] = None) -> Any:
+        """
+        Attend la fin d'une étape et retourne son résultat.
+
+        Args:
+            nom: Nom de l'étape
+            timeout: Attente maximale en secondes (None = sans limite)
+
+        Returns:
+            Résultat de la fonction de l'étape ; son exception est relevée si elle a échoué
+
+        Raises:
+            TimeoutError: Si l'étape n'est pas terminée à temps
+        """
+        etape = self._etapes[nom]
+        if not etape.terminee.wait(timeout):
+            raise TimeoutError(f"Étape de démarrage '{nom}' non terminée après {timeout} s")
+        if etape.erreur is not None:
+            raise etape.erreur
+        return etape.resultat
+
+    def terminee(self, nom: str) -> bool:
+        """Indique si l'étape est terminée (avec ou sans erreur)."""
+        return self._etapes[nom].terminee.is_set()
+
+    def rapport(self) -> List[Dict]:
+        """
+        Retourne le détail des étapes, dans l'ordre de leur début.
+
+        Returns:
+            list: Pour chaque étape : nom, début et fin (ms depuis le lancement), durée, thread, erreur
+        """
+        lignes = []
+        for etape in self._etapes.values():
+            debut = etape.debut
+            lignes.append({
+                'etape': etape.nom,
+                'debut_ms': 1000 * (debut - self.origine) if debut is not None else None,
+                'fin_ms': 1000 * (etape.fin - self.origine) if etape.fin is not None else None,
+                'duree_ms': 1000 * etape.duree if etape.duree is not None else None,
+                'thread': etape.thread_nom,
+                'erreur': str(etape.erreur) if etape.erreur is not None else None,
+            })
+        lignes.sort(key=lambda ligne: float('inf') if ligne['debut_ms'] is None else ligne['debut_ms'])
+        return lignes
+
+    def afficher_rapport(self) -> None:
+        """Affiche le rapport de démarrage sur la console (début, fin et durée de chaque phase)."""
+        print("⏱️  Démarrage :")
+        for ligne in self.rapport():
+            if ligne['fin_ms'] is None:
+                print(f"   {ligne['etape']:<20} en cours")
+                continue
+            etat = f"  ❌ {ligne['erreur']}" if ligne['erreur'] else ""
+            print(f"   {ligne['etape']:<20} {ligne['debut_ms']:>7.0f} -> {ligne['fin_ms']:>7.0f} ms "
+                  f"({ligne['duree_ms']:>6.0f} ms, {ligne['thread']}){etat}")
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Détection d'intention par mots-clés avec un automate Aho-Corasick.
+
+Toutes les phrases de commande et toutes les combinaisons "verbe + logiciel"
+sont compilées une seule fois dans un automate ; le texte transcrit est
+ensuite parcouru en une seule passe, quel que soit le nombre de raccourcis.
+"""
+
+import json
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Verbes qui déclenchent le lancement d'un logiciel de SOFTWARE_DB
+VERBES_LANCEMENT = ('lance', 'ouvre', 'démarre', 'start')
+
+# Mots-clés par intention, dans l'ordre de priorité (la première intention trouvée l'emporte)
+MOTS_CLES_INTENTIONS: List[Tuple[str, List[str]]] = [
+    ('ACTION_SPOTIFY', [
+        'lance spotify', 'ouvre spotify', 'démarre spotify', 'start spotify',
+        'ouvrir spotify', 'démarrer spotify', 'spotify',
+    ]),
+    ('PLAY_PAUSE', [
+        'pause', 'arrête', 'reprends', 'stop',
+        'stoppe', 'arrête la musique', 'pause la musique',
+        'reprends la musique', 'stoppe la musique',
+        'reprend', 'relance', 'relance la musique', 'relance la chanson',
+    ]),
+    ('VOLUME_UP', [
+        'plus fort', 'monte le son', 'augmente le son',
+        'augmente le volume', 'monte le volume',
+    ]),
+    ('VOLUME_DOWN', [
+        'moins fort', 'baisse le son', 'diminue le son',
+        'diminue le volume', 'baisse le volume',
+    ]),
+    ('NEXT_SONG', [
+        'suivant', 'prochain', 'next', 'prochaine',
+        'suivante', 'passe',
+    ]),
+    ('PREVIOUS_SONG', [
+        'précédent', 'précédente', 'previous', 'revient',
+        'reviens', 'return', 'retour', 'retourne',
+    ]),
+    ('SHUFFLE', [
+        'shuffle', 'mélange', 'mélange la musique',
+        'mélange la chanson', 'aléatoire',
+    ]),
+    ('REPEAT', [
+        'repeat', 'répète', 'répète la chanson',
+        'répète la musique',
+    ]),
+    ('PLAYLIST', [
+        'met la playlist', 'joue la playlist', 'playlist',
+    ]),
+]
+
+# Intentions qui dépendent de la suite de la phrase : jamais déclenchées sur un résultat partiel
+INTENTIONS_A_COMPLETER = ('PLAYLIST',)
+
+# Mot "hors vocabulaire" de Vosk : tout ce qui n'est pas une commande est décodé en [unk]
+MOT_INCONNU = '[unk]'
+
+# Priorité "infinie" : aucun motif ne se termine sur ce noeud
+_AUCUNE = float('inf')
+
+
+def forme_parlee(nom: str) -> str:
+    """
+    Forme d'un nom de logiciel telle que Vosk peut la transcrire.
+
+    Les noms viennent des fichiers de raccourcis ("visual_studio_code", "obs-studio", "notepad++") ;
+    Vosk ne produit que des mots en minuscules séparés par des espaces : tout ce qui n'est pas une
+    lettre ou une apostrophe devient un séparateur. La grammaire et le détecteur partagent cette forme.
+
+    Args:
+        nom: Nom du logiciel dans SOFTWARE_DB
+
+    Returns:
+        str: Forme parlée ("visual studio code", "obs studio", "notepad"), vide si le nom n'a aucune lettre
+    """
+    return ' '.join(''.join(c if c.isalpha() or c == "'" else ' ' for c in nom.lower()).split())
+
+
+class AutomateAhoCorasick:
+    """
+    Automate Aho-Corasick minimal.
+
+    Chaque motif porte une priorité entière ; la recherche renvoie la plus
+    petite priorité parmi tous les motifs présents dans le texte.
+    """
+
+    def __init__(self) -> None:
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._echecs: List[int] = [0]
+        self._sorties: List[float] = [_AUCUNE]
+        self._parents: List[int] = [0]
+        self._profondeurs: List[int] = [0]
+        # Meilleure priorité des motifs qui prolongent strictement le préfixe de chaque noeud
+        self._suites: List[float] = [_AUCUNE]
+        self._construit = False
+
+    def ajouter(self, motif: str, priorite: int) -> None:
+        """
+        Ajoute un motif à l'automate.
+
+        Args:
+            motif: Texte à rechercher
+            priorite: Priorité du motif (plus petit = plus prioritaire)
+        """
+        if not motif:
+            return
+        noeud = 0
+        for caractere in motif:
+            suivant = self._transitions[noeud].get(caractere)
+            if suivant is None:
+                suivant = len(self._transitions)
+                self._transitions.append({})
+                self._echecs.append(0)
+                self._sorties.append(_AUCUNE)
+                self._parents.append(noeud)
+                self._profondeurs.append(self._profondeurs[noeud] + 1)
+                self._suites.append(_AUCUNE)
+                self._transitions[noeud][caractere] = suivant
+            noeud = suivant
+        self._sorties[noeud] = min(self._sorties[noeud], priorite)
+        self._construit = False
+
+    def construire(self) -> None:
+        """Calcule les liens d'échec (parcours en largeur) et propage les sorties."""
+        file_attente = []
+        for noeud in self._transitions[0].values():
+            self._echecs[noeud] = 0
+            file_attente.append(noeud)
+
+        # Parcours en largeur complet, puis remontée des feuilles vers la racine (sorties pas encore propagées)
+        i = 0
+        while i < len(file_attente):
+            file_attente.extend(self._transitions[file_attente[i]].values())
+            i += 1
+        self._suites = [_AUCUNE] * len(self._transitions)
+        for noeud in reversed(file_attente):
+            parent = self._parents[noeud]
+            self._suites[parent] = min(self._suites[parent], self._sorties[noeud], self._suites[noeud])
+
+        file_attente = list(self._transitions[0].values())
+        i = 0
+        while i < len(file_attente):
+            noeud = file_attente[i]
+            i += 1
+            for caractere, suivant in self._transitions[noeud].items():
+                file_attente.append(suivant)
+                echec = self._echecs[noeud]
+                while echec and caractere not in self._transitions[echec]:
+                    echec = self._echecs[echec]
+                cible = self._transitions[echec].get(caractere, 0)
+                self._echecs[suivant] = cible if cible != suivant else 0
+                # Un noeud "voit" aussi tous les motifs qui se terminent sur son lien d'échec
+                self._sorties[suivant] = min(self._sorties[suivant], self._sorties[self._echecs[suivant]])
+
+        self._construit = True
+
+    def meilleure_priorite(self, texte: str, priorite_minimale: int = 0) -> Optional[int]:
+        """
+        Parcourt le texte une seule fois et retourne la meilleure priorité trouvée.
+
+        Args:
+            texte: Texte à analyser
+            priorite_minimale: Priorité la plus basse possible (permet de s'arrêter tôt)
+
+        Returns:
+            int: Plus petite priorité présente dans le texte, None si aucun motif
+        """
+        if not self._construit:
+            self.construire()
+
+        transitions = self._transitions
+        echecs = self._echecs
+        sorties = self._sorties
+        meilleure = _AUCUNE
+        noeud = 0
+
+        for caractere in texte:
+            while noeud and caractere not in transitions[noeud]:
+                noeud = echecs[noeud]
+            noeud = transitions[noeud].get(caractere, 0)
+            if sorties[noeud] < meilleure:
+                meilleure = sorties[noeud]
+                if meilleure <= priorite_minimale:
+                    break
+
+        return None if meilleure == _AUCUNE else int(meilleure)
+
+    def peut_etre_prolonge(self, texte: str, priorite: int) -> bool:
+        """
+        Indique si la suite du texte pourrait compléter un motif plus prioritaire déjà commencé.
+
+        Un motif commencé au début d'un mot peut se prolonger n'importe comment (le dernier mot d'un partiel
+        peut encore s'allonger) ; un motif commencé au milieu d'un mot seulement par des mots entiers
+        ("relance" peut encore devenir "relance spotify", qui contient "lance spotify"). Un motif
+        entièrement contenu dans la suite ne peut jamais être exclu.
+
+        Args:
+            texte: Texte (partiel) déjà transcrit
+            priorite: Priorité de la commande trouvée dans le texte
+
+        Returns:
+            bool: True si un motif de priorité strictement meilleure peut encore apparaître
+        """
+        if not self._construit:
+            self.construire()
+
+        transitions = self._transitions
+        echecs = self._echecs
+        noeud = 0
+        for caractere in texte:
+            while noeud and caractere not in transitions[noeud]:
+                noeud = echecs[noeud]
+            noeud = transitions[noeud].get(caractere, 0)
+
+        # Noeud courant puis ses liens d'échec : tous les suffixes du texte qui commencent un motif
+        while noeud:
+            profondeur = self._profondeurs[noeud]
+            if profondeur == len(texte) or texte[-profondeur - 1] == ' ':
+                suite = self._suites[noeud]
+            else:
+                espace = transitions[noeud].get(' ')
+                suite = self._suites[espace] if espace is not None else _AUCUNE
+            if suite < priorite:
+                return True
+            noeud = echecs[noeud]
+        return False
+
+    def __len__(self) -> int:
+        return len(self._transitions)
+
+
+class DetecteurMotsCles:
+    """
+    Détecteur d'intention compilé pour une version donnée de SOFTWARE_DB.
+
+    L'ordre de priorité est celui de l'analyse historique : d'abord le
+    lancement des logiciels (du nom le plus long au plus court, puis dans
+    l'ordre de SOFTWARE_DB), puis les intentions de MOTS_CLES_INTENTIONS
+    dans l'ordre de la liste.
+    """
+
+    def __init__(self, noms_logiciels: Iterable[str]) -> None:
+        self._codes: List[str] = []
+        self._automate = AutomateAhoCorasick()
+        formes = {name: forme_parlee(name) for name in noms_logiciels}
+
+        # Le nom le plus long d'abord : "lance code insiders" contient aussi "lance code"
+        for name, forme in sorted(formes.items(), key=lambda element: -len(element[1])):
+            priorite = len(self._codes)
+            self._codes.append(f'LAUNCH_SOFTWARE:{name}')
+            # Forme transcrite par Vosk, et nom tel qu'écrit (texte saisi, transcription sans grammaire)
+            for variante in dict.fromkeys((forme, name.lower())):
+                if not variante:
+                    continue
+                for verbe in VERBES_LANCEMENT:
+                    self._automate.ajouter(f"{verbe} {variante}", priorite)
+
+        for code, mots_cles in MOTS_CLES_INTENTIONS:
+            priorite = len(self._codes)
+            self._codes.append(code)
+            for mot_cle in mots_cles:
+                self._automate.ajouter(mot_cle, priorite)
+
+        self._automate.construire()
+
+    def detecter(self, texte: str) -> Optional[str]:
+        """
+        Retourne le code d'intention détecté dans le texte.
+
+        Args:
+            texte: Texte transcrit à analyser
+
+        Returns:
+            str: Code d'intention, None si aucun mot-clé n'est présent
+        """
+        if not texte:
+            return None
+        priorite = self._automate.meilleure_priorite(texte.lower())
+        if priorite is None:
+            return None
+        return self._codes[priorite]
+
+    def detecter_definitif(self, texte: str) -> Optional[str]:
+        """
+        Comme detecter(), mais seulement si la suite de l'énoncé ne peut pas changer la commande.
+
+        Utilisé sur les résultats partiels de Vosk : "playlist" attend le nom de la playlist,
+        "lance code" pourrait encore devenir "lance code insiders", et "relance" (reprendre la lecture)
+        "relance spotify" (ouvrir Spotify, plus prioritaire).
+
+        Args:
+            texte: Texte partiel à analyser
+
+        Returns:
+            str: Code d'intention, None si aucun mot-clé ou si la commande est incomplète
+        """
+        if not texte:
+            return None
+        texte = texte.lower()
+        priorite = self._automate.meilleure_priorite(texte)
+        if priorite is None:
+            return None
+        code = self._codes[priorite]
+        if code in INTENTIONS_A_COMPLETER:
+            return None
+        # Une phrase plus longue et plus prioritaire peut encore prolonger le partiel
+        # (dont le nom d'un logiciel plus long : ils passent avant les noms qui en sont le début)
+        if self._automate.peut_etre_prolonge(texte, priorite):
+            return None
+        return code
+
+
+# (version de SOFTWARE_DB, détecteur compilé) ; un tuple pour une lecture atomique
+_cache_detecteur: Optional[Tuple[int, DetecteurMotsCles]] = None
+_verrou = threading.Lock()
+
+
+def obtenir_detecteur(software_db: Dict[str, str], version: int) -> DetecteurMotsCles:
+    """
+    Retourne le détecteur compilé pour la version de SOFTWARE_DB donnée.
+
+    L'automate n'est reconstruit que lorsque la version change.
+
+    Args:
+        software_db: Base de données des logiciels (nom -> chemin)
+        version: Numéro de version de la base de données
+
+    Returns:
+        DetecteurMotsCles: Détecteur prêt à l'emploi
+    """
+    global _cache_detecteur
+    cache = _cache_detecteur
+    if cache is not None and cache[0] == version:
+        return cache[1]
+
+    with _verrou:
+        if _cache_detecteur is None or _cache_detecteur[0] != version:
+            _cache_detecteur = (version, DetecteurMotsCles(list(software_db.keys())))
+        return _cache_detecteur[1]
+
+
+def phrases_commandes(noms_logiciels: Iterable[str]) -> List[str]:
+    """
+    Liste toutes les phrases de commande reconnues par le détecteur, sous leur forme parlée.
+
+    Args:
+        noms_logiciels: Noms des logiciels de SOFTWARE_DB
+
+    Returns:
+        list: Phrases en minuscules, sans doublons, dans l'ordre de priorité
+    """
+    phrases = []
+    for name in noms_logiciels:
+        # Même forme que celle reconnue par DetecteurMotsCles
+        nom_parle = forme_parlee(name)
+        if not nom_parle:
+            continue
+        for verbe in VERBES_LANCEMENT:
+            phrases.append(f"{verbe} {nom_parle}")
+    for _, mots_cles in MOTS_CLES_INTENTIONS:
+        phrases.extend(mots_cles)
+    return list(dict.fromkeys(phrases))
+
+
+def grammaire_commandes(noms_logiciels: Iterable[str]) -> str:
+    """
+    Construit la grammaire JSON passée au KaldiRecognizer en mode commande.
+
+    Args:
+        noms_logiciels: Noms des logiciels de SOFTWARE_DB
+
+    Returns:
+        str: Liste JSON des phrases de commande, plus [unk]
+    """
+    return json.dumps(phrases_commandes(noms_logiciels) + [MOT_INCONNU], ensure_ascii=False)
+
+
+# (version de SOFTWARE_DB, grammaire JSON)
+_cache_grammaire: Optional[Tuple[int, str]] = None
+
+
+def obtenir_grammaire(software_db: Dict[str, str], version: int) -> str:
+    """
+    Retourne la grammaire de commande pour la version de SOFTWARE_DB donnée.
+
+    Args:
+        software_db: Base de données des logiciels (nom -> chemin)
+        version: Numéro de version de la base de données
+
+    Returns:
+        str: Grammaire JSON, reconstruite uniquement quand la version change
+    """
+    global _cache_grammaire
+    cache = _cache_grammaire
+    if cache is not None and cache[0] == version:
+        return cache[1]
+
+    with _verrou:
+        if _cache_grammaire is None or _cache_grammaire[0] != version:
+            _cache_grammaire = (version, grammaire_commandes(list(software_db.keys())))
+        return _cache_grammaire[1]
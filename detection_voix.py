@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Détection d'activité vocale (VAD) devant le KaldiRecognizer.
+
+Chaque bloc audio est découpé en trames de 20 ms ; l'énergie et le taux de
+passage par zéro de toutes les trames sont calculés d'un coup avec NumPy.
+Seuls les segments de parole sont transmis au recognizer, précédés d'un
+tampon de pré-roll pour ne pas couper le premier mot, et prolongés d'une
+"hangover" pour laisser Vosk détecter la fin de l'énoncé.
+"""
+
+import math
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+import numpy as np
+
+
+class DetecteurVoix:
+    """
+    VAD énergie + taux de passage par zéro, avec plancher de bruit adaptatif.
+
+    Args:
+        sample_rate: Fréquence d'échantillonnage (audio 16 bits mono)
+        duree_trame_ms: Durée d'une trame d'analyse
+        marge_db: Écart au plancher de bruit au-delà duquel une trame est de la parole
+        marge_forte_db: Écart au-delà duquel la trame est de la parole quel que soit son taux de passage par zéro
+        energie_min_db: Énergie minimale absolue d'une trame de parole (dBFS)
+        zcr_max: Taux de passage par zéro maximal d'une trame voisée
+        hangover_ms: Durée pendant laquelle on continue à transmettre après la dernière trame de parole
+        preroll_ms: Audio transmis avant la première trame de parole
+        adaptation: Vitesse de remontée du plancher de bruit (0-1)
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        duree_trame_ms: int = 20,
+        marge_db: float = 9.0,
+        marge_forte_db: float = 18.0,
+        energie_min_db: float = -55.0,
+        zcr_max: float = 0.35,
+        hangover_ms: int = 600,
+        preroll_ms: int = 300,
+        adaptation: float = 0.05,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.taille_trame = sample_rate * duree_trame_ms // 1000
+        self.duree_trame_ms = duree_trame_ms
+        self.marge_db = marge_db
+        self.marge_forte_db = marge_forte_db
+        self.energie_min_db = energie_min_db
+        self.zcr_max = zcr_max
+        self.hangover_trames = max(1, hangover_ms // duree_trame_ms)
+        self.preroll_ms = preroll_ms
+        self.adaptation = adaptation
+
+        self.plancher_db = energie_min_db - marge_db
+        self._trames_depuis_parole = self.hangover_trames
+        self._en_parole = False
+        self._preroll: Deque[bytes] = deque()
+        self._preroll_echantillons = 0
+
+        self.trames_total = 0
+        self.trames_parole = 0
+        self.blocs_total = 0
+        self.blocs_transmis = 0
+        self.segments = 0
+
+    def analyser(self, bloc: bytes) -> np.ndarray:
+        """
+        Classe chaque trame du bloc en parole / non-parole.
+
+        Args:
+            bloc: Audio PCM 16 bits mono
+
+        Returns:
+            np.ndarray: Tableau booléen, une valeur par trame
+        """
+        echantillons = np.frombuffer(bloc, dtype=np.int16)
+        nb_trames = len(echantillons) // self.taille_trame
+        if nb_trames == 0:
+            return np.zeros(0, dtype=bool)
+
+        trames = echantillons[:nb_trames * self.taille_trame].reshape(nb_trames, self.taille_trame).astype(np.float32)
+        trames /= 32768.0
+
+        energie_db = 10.0 * np.log10(np.mean(trames * trames, axis=1) + 1e-10)
+        signes = np.signbit(trames)
+        zcr = np.count_nonzero(signes[:, 1:] != signes[:, :-1], axis=1) / (self.taille_trame - 1)
+
+        seuil = max(self.plancher_db + self.marge_db, self.energie_min_db)
+        seuil_fort = max(self.plancher_db + self.marge_forte_db, self.energie_min_db)
+        parole = (energie_db > seuil) & ((zcr < self.zcr_max) | (energie_db > seuil_fort))
+
+        # Plancher de bruit : suit immédiatement la trame la plus calme quand elle descend,
+        # remonte lentement sinon (un bruit de fond qui augmente finit par être absorbé)
+        minimum = float(np.min(energie_db))
+        if minimum < self.plancher_db:
+            self.plancher_db = minimum
+        else:
+            self.plancher_db += self.adaptation * (minimum - self.plancher_db)
+
+        self.trames_total += nb_trames
+        self.trames_parole += int(np.count_nonzero(parole))
+        return parole
+
+    def filtrer(self, bloc: bytes) -> Tuple[List[bytes], bool]:
+        """
+        Décide quels blocs transmettre au recognizer.
+
+        Args:
+            bloc: Audio PCM 16 bits mono
+
+        Returns:
+            tuple: (blocs à transmettre dans l'ordre, True si un segment de parole vient de se terminer)
+        """
+        self.blocs_total += 1
+        parole = self.analyser(bloc)
+
+        if parole.any():
+            # Trames restantes après la dernière trame de parole du bloc
+            derniere = len(parole) - 1 - int(np.argmax(parole[::-1]))
+            self._trames_depuis_parole = len(parole) - 1 - derniere
+        else:
+            self._trames_depuis_parole += len(parole)
+
+        actif = self._trames_depuis_parole < self.hangover_trames
+
+        if actif:
+            blocs = [bloc]
+            if not self._en_parole:
+                # Début de segment : on transmet aussi l'audio qui précède
+                self._en_parole = True
+                self.segments += 1
+                blocs = list(self._preroll) + blocs
+                self._preroll.clear()
+                self._preroll_echantillons = 0
+            self.blocs_transmis += len(blocs)
+            return blocs, False
+
+        self._memoriser_preroll(bloc)
+        if self._en_parole:
+            self._en_parole = False
+            return [], True
+        return [], False
+
+    def _memoriser_preroll(self, bloc: bytes) -> None:
+        self._preroll.append(bloc)
+        self._preroll_echantillons += len(bloc) // 2
+        limite = max(1, math.ceil(self.preroll_ms * self.sample_rate / 1000))
+        while len(self._preroll) > 1 and self._preroll_echantillons - len(self._preroll[0]) // 2 >= limite:
+            self._preroll_echantillons -= len(self._preroll.popleft()) // 2
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne la part de l'audio épargnée au recognizer.
+
+        Returns:
+            dict: trames analysées, trames de parole, blocs transmis/ignorés, fraction ignorée, segments
+        """
+        ignores = self.blocs_total - min(self.blocs_transmis, self.blocs_total)
+        return {
+            'trames': self.trames_total,
+            'trames_parole': self.trames_parole,
+            'blocs': self.blocs_total,
+            'blocs_transmis': self.blocs_transmis,
+            'blocs_ignores': ignores,
+            'fraction_ignoree': ignores / self.blocs_total if self.blocs_total else 0.0,
+            'segments': self.segments,
+            'plancher_db': self.plancher_db,
+        }
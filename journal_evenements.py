@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Journal d'événements structuré (JSONL) de l'assistant.
+
+Les étages de la boucle d'écoute ne font plus de print() : ils déposent un
+événement (dictionnaire horodaté par time.monotonic()) dans une file et
+reprennent la main. Un thread d'écriture vide la file par lots, écrit une
+ligne JSON par événement avec rotation par taille, et affiche sur la console
+le message associé, avec un débit limité.
+
+Chaque énoncé reçoit un identifiant qui relie ses événements de bout en bout
+(reconnaissance -> intention -> action -> synthèse vocale). Le thread qui
+traite un énoncé le déclare avec contexte_enonce() ; les événements émis
+pendant ce temps, y compris ceux des messages vocaux mis en file, en héritent.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+_CONTEXTE = threading.local()
+
+_OPTIONS = ('chemin', 'taille_max_octets', 'fichiers_conserves', 'taille_lot', 'intervalle_s', 'console', 'console_max_par_s')
+
+
+def enonce_courant() -> Optional[int]:
+    """Identifiant de l'énoncé traité par le thread appelant (None hors d'un énoncé)."""
+    return getattr(_CONTEXTE, 'enonce', None)
+
+
+@contextmanager
+def contexte_enonce(enonce: Optional[int]) -> Iterator[None]:
+    """
+    Rattache à un énoncé les événements émis par le thread appelant.
+
+    Args:
+        enonce: Identifiant de l'énoncé (voir JournalEvenements.nouvel_enonce)
+    """
+    precedent = enonce_courant()
+    _CONTEXTE.enonce = enonce
+    try:
+        yield
+    finally:
+        _CONTEXTE.enonce = precedent
+
+
+class JournalEvenements:
+    """
+    File d'événements vidée par un thread d'écriture (fichier JSONL et vue console).
+
+    Le thread démarre au premier événement ; arreter() écrit ce qui reste en file.
+
+    Args:
+        chemin: Fichier JSONL (None = pas de fichier, console seule)
+        taille_max_octets: Taille au-delà de laquelle le fichier est archivé (chemin.1, chemin.2...)
+        fichiers_conserves: Nombre d'archives conservées
+        taille_lot: Nombre maximal d'événements écrits d'un coup
+        intervalle_s: Attente maximale d'un événement avant écriture
+        console: Afficher le message des événements sur la console
+        console_max_par_s: Messages console par seconde au-delà desquels les suivants sont masqués
+    """
+
+    def __init__(
+        self,
+        chemin: Optional[str] = None,
+        taille_max_octets: int = 5 * 1024 * 1024,
+        fichiers_conserves: int = 3,
+        taille_lot: int = 256,
+        intervalle_s: float = 0.2,
+        console: bool = True,
+        console_max_par_s: float = 20.0,
+    ) -> None:
+        self.chemin = chemin
+        self.taille_max_octets = taille_max_octets
+        self.fichiers_conserves = fichiers_conserves
+        self.taille_lot = taille_lot
+        self.intervalle_s = intervalle_s
+        self.console = console
+        self.console_max_par_s = console_max_par_s
+
+        self._file: queue.SimpleQueue = queue.SimpleQueue()
+        self._enonces = itertools.count(1)
+        self._verrou = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._arret = threading.Event()
+        self._atexit = False
+        self._fichier = None
+        self._taille = 0
+        self._reouvrir = False
+
+        # Seau à jetons de la vue console
+        self._jetons = console_max_par_s
+        self._dernier_jeton = time.monotonic()
+        self._masques = 0
+
+        self.evenements = 0
+        self.ecrits = 0
+        self.lots = 0
+        self.rotations = 0
+        self.console_masques = 0
+
+    def configurer(self, **options) -> None:
+        """
+        Modifie les options du constructeur.
+
+        Un nouveau chemin est pris en compte même si des événements ont déjà été enregistrés :
+        le thread d'écriture ouvre le nouveau fichier avant d'écrire le lot suivant.
+        """
+        for nom in options:
+            if nom not in _OPTIONS:
+                raise ValueError(f"Option inconnue : {nom}")
+        with self._verrou:
+            ancien_chemin = self.chemin
+            for nom, valeur in options.items():
+                setattr(self, nom, valeur)
+            self._jetons = self.console_max_par_s
+            if self._thread is not None and self.chemin != ancien_chemin:
+                self._reouvrir = True
+
+    def nouvel_enonce(self) -> int:
+        """Retourne un nouvel identifiant d'énoncé."""
+        return next(self._enonces)
+
+    def evenement(self, type_evenement: str, message: Optional[str] = None, enonce: Optional[int] = None, **champs) -> None:
+        """
+        Enregistre un événement sans bloquer l'appelant.
+
+        Args:
+            type_evenement: Type de l'événement (ex: 'asr.final', 'intention', 'erreur')
+            message: Texte affiché sur la console (None = fichier seulement)
+            enonce: Identifiant de l'énoncé (par défaut celui du thread appelant)
+            **champs: Données de l'événement (sérialisables en JSON)
+        """
+        if self._thread is None:
+            self._demarrer()
+        evenement = {
+            't': round(time.monotonic(), 6),
+            'type': type_evenement,
+            'enonce': enonce if enonce is not None else enonce_courant(),
+        }
+        evenement.update(champs)
+        if message is not None:
+            evenement['message'] = message
+        self.evenements += 1
+        self._file.put(evenement)
+
+    # ---------- Thread d'écriture ----------
+
+    def _demarrer(self) -> None:
+        with self._verrou:
+            if self._thread is not None:
+                return
+            self._arret.clear()
+            self._reouvrir = False
+            if self.chemin:
+                self._ouvrir()
+                self._file.put(self._ancre())
+            self._thread = threading.Thread(target=self._boucle, name="journal-evenements", daemon=True)
+            self._thread.start()
+            if not self._atexit:
+                # Les derniers messages ne doivent pas être perdus à la sortie du programme
+                atexit.register(self.arreter)
+                self._atexit = True
+
+    @staticmethod
+    def _ancre() -> Dict:
+        """Ancre entre l'horloge monotone des événements et l'heure réelle."""
+        return {'t': round(time.monotonic(), 6), 'type': 'journal.debut', 'enonce': None,
+                'horloge': time.time(), 'pid': os.getpid()}
+
+    def _changer_fichier(self, lot: List[Dict]) -> None:
+        """Ferme le fichier courant et ouvre celui de la nouvelle configuration (thread d'écriture)."""
+        self._reouvrir = False
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+        if self.chemin:
+            try:
+                self._ouvrir()
+            except OSError as e:
+                print(f"⚠️  Ouverture du journal d'événements impossible : {e}")
+                return
+            lot.insert(0, self._ancre())
+
+    def _ouvrir(self) -> None:
+        dossier = os.path.dirname(self.chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        self._fichier = open(self.chemin, 'a', encoding='utf-8')
+        self._taille = self._fichier.tell()
+
+    def _tourner(self) -> None:
+        """Archive le fichier courant (chemin -> chemin.1 -> chemin.2...) et en ouvre un nouveau."""
+        self._fichier.close()
+        for indice in range(self.fichiers_conserves - 1, 0, -1):
+            source = f"{self.chemin}.{indice}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.chemin}.{indice + 1}")
+        if self.fichiers_conserves > 0:
+            os.replace(self.chemin, f"{self.chemin}.1")
+        else:
+            os.remove(self.chemin)
+        self.rotations += 1
+        self._ouvrir()
+
+    def _boucle(self) -> None:
+        while True:
+            try:
+                lot = [self._file.get(timeout=self.intervalle_s)]
+            except queue.Empty:
+                if self._arret.is_set():
+                    break
+                continue
+            while len(lot) < self.taille_lot:
+                try:
+                    lot.append(self._file.get_nowait())
+                except queue.Empty:
+                    break
+            self._traiter_lot(lot)
+        if self._masques:
+            print(f"   ... {self._masques} messages masqués (voir le journal d'événements)")
+            self._masques = 0
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+
+    def _traiter_lot(self, lot: List[Dict]) -> None:
+        if self._reouvrir:
+            self._changer_fichier(lot)
+        if self._fichier is not None:
+            try:
+                texte = ''.join(json.dumps(evenement, ensure_ascii=False, default=str) + '\n' for evenement in lot)
+                taille = len(texte.encode('utf-8'))
+                if self._taille and self._taille + taille > self.taille_max_octets:
+                    self._tourner()
+                self._fichier.write(texte)
+                self._fichier.flush()
+                self._taille += taille
+                self.ecrits += len(lot)
+                self.lots += 1
+            except (OSError, TypeError, ValueError) as e:
+                print(f"⚠️  Écriture du journal d'événements impossible : {e}")
+        if self.console:
+            for evenement in lot:
+                message = evenement.get('message')
+                if message is not None:
+                    self._afficher(message)
+
+    def _afficher(self, message: str) -> None:
+        maintenant = time.monotonic()
+        self._jetons = min(self.console_max_par_s, self._jetons + (maintenant - self._dernier_jeton) * self.console_max_par_s)
+        self._dernier_jeton = maintenant
+        if self._jetons < 1:
+            self._masques += 1
+            self.console_masques += 1
+            return
+        self._jetons -= 1
+        if self._masques:
+            print(f"   ... {self._masques} messages masqués (voir le journal d'événements)")
+            self._masques = 0
+        print(message)
+
+    def arreter(self, timeout: float = 2.0) -> None:
+        """Écrit les événements restants et arrête le thread d'écriture."""
+        with self._verrou:
+            thread = self._thread
+            if thread is None:
+                return
+            self._arret.set()
+        thread.join(timeout)
+        with self._verrou:
+            self._thread = None
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les compteurs du journal.
+
+        Returns:
+            dict: événements reçus, écrits, lots, rotations, messages console masqués, en file
+        """
+        return {
+            'evenements': self.evenements,
+            'ecrits': self.ecrits,
+            'lots': self.lots,
+            'evenements_par_lot': self.ecrits / self.lots if self.lots else 0.0,
+            'rotations': self.rotations,
+            'console_masques': self.console_masques,
+            'en_file': self._file.qsize(),
+        }
+
+
+# Journal partagé par tous les modules de l'assistant (console seule tant qu'aucun fichier n'est configuré)
+JOURNAL = JournalEvenements()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compteurs et histogrammes de latence de l'assistant, au format texte Prometheus.
+
+Les instruments sont déclarés une fois par module auprès du registre partagé
+METRIQUES. Tant que le registre n'est pas activé, observer() et incrementer()
+retournent immédiatement : la boucle d'écoute ne paie qu'un appel de méthode.
+Une fois activé, les valeurs sont exposées sur un point d'accès HTTP local
+(/metrics) et/ou écrites périodiquement dans un fichier (compatible avec le
+collecteur "textfile" de node_exporter).
+"""
+
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Bornes des histogrammes de latence, en secondes
+BORNES_LATENCE = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _etiquettes_texte(etiquettes: Tuple[Tuple[str, str], ...], supplementaires: str = "") -> str:
+    parties = [f'{cle}="{valeur}"' for cle, valeur in etiquettes]
+    if supplementaires:
+        parties.append(supplementaires)
+    return "{" + ",".join(parties) + "}" if parties else ""
+
+
+class Compteur:
+    """Compteur monotone (total depuis le démarrage)."""
+
+    type_prometheus = 'counter'
+
+    def __init__(self, nom: str, etiquettes: Tuple[Tuple[str, str], ...] = ()) -> None:
+        self.nom = nom
+        self.etiquettes = etiquettes
+        self.actif = False
+        self._verrou = threading.Lock()
+        self.valeur = 0.0
+
+    def incrementer(self, valeur: float = 1.0) -> None:
+        if not self.actif:
+            return
+        with self._verrou:
+            self.valeur += valeur
+
+    def lignes(self) -> List[str]:
+        with self._verrou:
+            valeur = self.valeur
+        return [f"{self.nom}{_etiquettes_texte(self.etiquettes)} {valeur:g}"]
+
+
+class Histogramme:
+    """
+    Histogramme à bornes fixes (somme, nombre d'observations et compte par intervalle).
+
+    Args:
+        nom: Nom de la métrique
+        bornes: Bornes supérieures des intervalles, croissantes
+        etiquettes: Couples (clé, valeur) propres à cette série
+    """
+
+    type_prometheus = 'histogram'
+
+    def __init__(self, nom: str, bornes: Sequence[float] = BORNES_LATENCE, etiquettes: Tuple[Tuple[str, str], ...] = ()) -> None:
+        self.nom = nom
+        self.bornes = tuple(bornes)
+        self.etiquettes = etiquettes
+        self.actif = False
+        self._verrou = threading.Lock()
+        self._comptes = [0] * (len(self.bornes) + 1)
+        self.somme = 0.0
+        self.nombre = 0
+
+    def observer(self, valeur: float) -> None:
+        if not self.actif:
+            return
+        indice = bisect.bisect_left(self.bornes, valeur)
+        with self._verrou:
+            self._comptes[indice] += 1
+            self.somme += valeur
+            self.nombre += 1
+
+    def lignes(self) -> List[str]:
+        with self._verrou:
+            comptes = list(self._comptes)
+            somme, nombre = self.somme, self.nombre
+        lignes = []
+        cumul = 0
+        for borne, compte in zip(self.bornes + (float('inf'),), comptes):
+            cumul += compte
+            le = '+Inf' if borne == float('inf') else f'{borne:g}'
+            serie = _etiquettes_texte(self.etiquettes, f'le="{le}"')
+            lignes.append(f"{self.nom}_bucket{serie} {cumul}")
+        lignes.append(f"{self.nom}_sum{_etiquettes_texte(self.etiquettes)} {somme:g}")
+        lignes.append(f"{self.nom}_count{_etiquettes_texte(self.etiquettes)} {nombre}")
+        return lignes
+
+
+class RegistreMetriques:
+    """
+    Registre des instruments, désactivé par défaut.
+
+    Un même nom peut porter plusieurs séries distinguées par leurs étiquettes
+    (ex: assistant_intentions_total{source="cache"}).
+    """
+
+    def __init__(self) -> None:
+        self.actif = False
+        self._verrou = threading.Lock()
+        self._instruments: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], object] = {}
+        self._aides: Dict[str, str] = {}
+        self._serveur: Optional[ThreadingHTTPServer] = None
+        self._export_arret = threading.Event()
+        self._export_thread: Optional[threading.Thread] = None
+        self._export_chemin: Optional[str] = None
+
+    def _declarer(self, classe, nom: str, aide: str, etiquettes: Optional[Dict[str, str]], **options):
+        cle = (nom, tuple(sorted((etiquettes or {}).items())))
+        with self._verrou:
+            instrument = self._instruments.get(cle)
+            if instrument is None:
+                instrument = classe(nom, etiquettes=cle[1], **options)
+                instrument.actif = self.actif
+                self._instruments[cle] = instrument
+                self._aides.setdefault(nom, aide)
+            return instrument
+
+    def compteur(self, nom: str, aide: str, etiquettes: Optional[Dict[str, str]] = None) -> Compteur:
+        """Retourne le compteur `nom` (créé au premier appel)."""
+        return self._declarer(Compteur, nom, aide, etiquettes)
+
+    def histogramme(
+        self,
+        nom: str,
+        aide: str,
+        etiquettes: Optional[Dict[str, str]] = None,
+        bornes: Sequence[float] = BORNES_LATENCE,
+    ) -> Histogramme:
+        """Retourne l'histogramme `nom` (créé au premier appel)."""
+        return self._declarer(Histogramme, nom, aide, etiquettes, bornes=bornes)
+
+    def activer(self, actif: bool = True) -> None:
+        """Active (ou désactive) la collecte sur tous les instruments, déclarés ou à venir."""
+        with self._verrou:
+            self.actif = actif
+            for instrument in self._instruments.values():
+                instrument.actif = actif
+
+    def format_prometheus(self) -> str:
+        """
+        Retourne toutes les séries au format texte d'exposition Prometheus.
+
+        Returns:
+            str: Texte prêt à être servi sur /metrics
+        """
+        with self._verrou:
+            instruments = sorted(self._instruments.items(), key=lambda element: element[0])
+            aides = dict(self._aides)
+        lignes = []
+        nom_precedent = None
+        for (nom, _), instrument in instruments:
+            if nom != nom_precedent:
+                lignes.append(f"# HELP {nom} {aides[nom]}")
+                lignes.append(f"# TYPE {nom} {instrument.type_prometheus}")
+                nom_precedent = nom
+            lignes.extend(instrument.lignes())
+        return "\n".join(lignes) + "\n"
+
+    # ---------- Export ----------
+
+    def servir(self, port: int, hote: str = "127.0.0.1") -> None:
+        """
+        Expose les métriques sur http://hote:port/metrics dans un thread dédié.
+
+        Args:
+            port: Port d'écoute (0 = port libre choisi par le système, voir port_serveur())
+            hote: Interface d'écoute (locale par défaut)
+        """
+        registre = self
+
+        class _Gestionnaire(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                corps = registre.format_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+
+            def log_message(self, format, *args) -> None:
+                pass
+
+        self._serveur = ThreadingHTTPServer((hote, port), _Gestionnaire)
+        self._serveur.daemon_threads = True
+        threading.Thread(target=self._serveur.serve_forever, name="metriques-http", daemon=True).start()
+
+    def port_serveur(self) -> Optional[int]:
+        return self._serveur.server_address[1] if self._serveur is not None else None
+
+    def ecrire_fichier(self, chemin: str) -> None:
+        """Écrit les métriques dans un fichier (remplacement atomique)."""
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            f.write(self.format_prometheus())
+        os.replace(temporaire, chemin)
+
+    def exporter_periodiquement(self, chemin: str, periode_s: float = 10.0) -> None:
+        """
+        Réécrit le fichier de métriques toutes les `periode_s` secondes, dans un thread dédié.
+
+        Args:
+            chemin: Fichier de sortie
+            periode_s: Intervalle entre deux écritures
+        """
+        self._export_chemin = chemin
+        self._export_arret.clear()
+
+        def boucle() -> None:
+            while not self._export_arret.wait(periode_s):
+                try:
+                    self.ecrire_fichier(chemin)
+                except OSError as e:
+                    print(f"⚠️  Écriture des métriques impossible : {e}")
+
+        self._export_thread = threading.Thread(target=boucle, name="metriques-fichier", daemon=True)
+        self._export_thread.start()
+
+    def arreter(self) -> None:
+        """Arrête le point d'accès HTTP et l'export périodique (le fichier est écrit une dernière fois)."""
+        if self._serveur is not None:
+            self._serveur.shutdown()
+            self._serveur.server_close()
+            self._serveur = None
+        if self._export_thread is not None:
+            self._export_arret.set()
+            self._export_thread.join(timeout=2)
+            self._export_thread = None
+            try:
+                self.ecrire_fichier(self._export_chemin)
+            except OSError as e:
+                print(f"⚠️  Écriture des métriques impossible : {e}")
+
+
+# Registre partagé par tous les modules de l'assistant
+METRIQUES = RegistreMetriques()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registre des modèles Vosk partagés par tout le processus.
+
+Chaque modèle n'est chargé qu'une seule fois ; les sessions d'écoute
+(commandes, dictée du nom de playlist...) reçoivent simplement un nouveau
+KaldiRecognizer construit sur le modèle déjà en mémoire.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+
+def memoire_residente_mo() -> Optional[float]:
+    """
+    Mesure la mémoire résidente du processus courant.
+
+    Returns:
+        float: Mémoire résidente en Mo, None si la mesure est impossible
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+
+    # Linux : /proc/self/statm donne le nombre de pages résidentes
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Windows : GetProcessMemoryInfo via ctypes
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ('cb', wintypes.DWORD),
+                    ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t),
+                    ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t),
+                    ('PeakPagefileUsage', ctypes.c_size_t),
+                ]
+
+            compteurs = PROCESS_MEMORY_COUNTERS()
+            compteurs.cb = ctypes.sizeof(compteurs)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(compteurs), compteurs.cb):
+                return compteurs.WorkingSetSize / (1024 * 1024)
+        except Exception:
+            pass
+
+    return None
+
+
+class RegistreModelesVosk:
+    """
+    Charge chaque modèle Vosk une seule fois et distribue des recognizers
+    construits sur le modèle partagé.
+    """
+
+    def __init__(self) -> None:
+        self._modeles: Dict[str, object] = {}
+        self._statistiques: Dict[str, dict] = {}
+        self._verrous: Dict[str, threading.Lock] = {}
+        self._verrou_global = threading.Lock()
+
+    def _verrou_pour(self, chemin: str) -> threading.Lock:
+        with self._verrou_global:
+            if chemin not in self._verrous:
+                self._verrous[chemin] = threading.Lock()
+            return self._verrous[chemin]
+
+    def obtenir(self, chemin: str):
+        """
+        Retourne le modèle Vosk situé dans `chemin`, en le chargeant au premier appel.
+
+        Args:
+            chemin: Dossier du modèle Vosk
+
+        Returns:
+            vosk.Model: Modèle partagé
+        """
+        chemin = os.path.abspath(chemin)
+        modele = self._modeles.get(chemin)
+        if modele is not None:
+            return modele
+
+        # Un verrou par modèle : deux threads qui demandent le même modèle
+        # pendant son chargement attendent le premier au lieu d'en charger un second.
+        with self._verrou_pour(chemin):
+            modele = self._modeles.get(chemin)
+            if modele is not None:
+                return modele
+
+            import vosk
+
+            memoire_avant = memoire_residente_mo()
+            debut = time.perf_counter()
+            modele = vosk.Model(chemin)
+            duree = time.perf_counter() - debut
+            memoire_apres = memoire_residente_mo()
+
+            memoire_mo = None
+            if memoire_avant is not None and memoire_apres is not None:
+                memoire_mo = memoire_apres - memoire_avant
+
+            self._statistiques[chemin] = {
+                'duree_chargement_s': duree,
+                'memoire_mo': memoire_mo,
+                'memoire_residente_mo': memoire_apres,
+                'recognizers_crees': 0,
+                'recognizers_grammaire': 0,
+            }
+            self._modeles[chemin] = modele
+
+            if memoire_mo is not None:
+                print(f"✅ Modèle Vosk chargé en {duree:.2f} s (+{memoire_mo:.0f} Mo, total {memoire_apres:.0f} Mo)")
+            else:
+                print(f"✅ Modèle Vosk chargé en {duree:.2f} s")
+            return modele
+
+    def creer_recognizer(self, chemin: str, sample_rate: int, mots: bool = True, grammaire: Optional[str] = None):
+        """
+        Crée un KaldiRecognizer sur le modèle partagé (opération peu coûteuse).
+
+        Args:
+            chemin: Dossier du modèle Vosk
+            sample_rate: Fréquence d'échantillonnage de l'audio
+            mots: Active le détail des mots dans les résultats
+            grammaire: Liste JSON de phrases autorisées (None = vocabulaire libre du modèle)
+
+        Returns:
+            vosk.KaldiRecognizer: Nouveau recognizer
+        """
+        import vosk
+
+        modele = self.obtenir(chemin)
+        if grammaire is not None:
+            # Seuls les modèles à graphe dynamique (modèles "small") tiennent compte de la grammaire
+            recognizer = vosk.KaldiRecognizer(modele, sample_rate, grammaire)
+        else:
+            recognizer = vosk.KaldiRecognizer(modele, sample_rate)
+        recognizer.SetWords(mots)
+        stats = self._statistiques[os.path.abspath(chemin)]
+        stats['recognizers_crees'] += 1
+        if grammaire is not None:
+            stats['recognizers_grammaire'] += 1
+        return recognizer
+
+    def statistiques(self) -> Dict[str, dict]:
+        """
+        Retourne, pour chaque modèle chargé, la durée de chargement,
+        la mémoire consommée et le nombre de recognizers distribués.
+        """
+        return {chemin: dict(stats) for chemin, stats in self._statistiques.items()}
+
+
+# Registre unique pour tout le processus
+REGISTRE_MODELES = RegistreModelesVosk()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serveur HTTP local imitant l'API Ollama.
+
+Permet de tester et de mesurer le client Ollama de l'assistant sans Ollama
+ni modèle : /api/tags, /api/generate (streamé ou non) et /api/embed
+(trigrammes de caractères hachés) sont simulés,
+avec une latence configurable et un décompte des connexions TCP reçues.
+Le chargement du modèle est simulé lui aussi : la première requête (ou la
+première après l'expiration du keep_alive) attend `duree_chargement_s`, et
+une requête au prompt vide charge le modèle sans rien générer.
+
+L'évaluation du prompt est simulée comme dans Ollama : le prompt (précédé
+des tokens de `context` s'il y en a) est découpé en tokens, et seuls ceux
+qui suivent le plus long préfixe commun avec la requête précédente (cache
+du préfixe) sont évalués. Les réponses portent prompt_eval_count,
+prompt_eval_duration, eval_count, total_duration et context, ainsi que
+les logprobs des tokens générés quand la requête les demande.
+
+Utilisation autonome :
+    python ollama_factice.py --port 11434 --reponse IGNORE
+"""
+
+import argparse
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from classification_exemples import EmbeddeurNgrammes
+from residence_ollama import duree_keep_alive
+
+
+# Taille de contexte d'un modèle chargé sans option num_ctx
+NUM_CTX_DEFAUT = 2048
+
+
+class _GestionnaireOllama(BaseHTTPRequestHandler):
+    # HTTP/1.1 pour que les connexions restent ouvertes entre deux requêtes
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self) -> None:
+        super().setup()
+        # Comme le vrai serveur Ollama : pas d'algorithme de Nagle sur les petites réponses
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.factice._nouvelle_connexion()
+
+    def log_message(self, format: str, *args) -> None:
+        # Pas de journal sur la console
+        pass
+
+    def _envoyer_json(self, statut: int, corps: Dict) -> None:
+        donnees = json.dumps(corps).encode('utf-8')
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(donnees)))
+        self.end_headers()
+        self.wfile.write(donnees)
+
+    def _envoyer_morceau(self, donnees: bytes) -> None:
+        self.wfile.write(f"{len(donnees):X}\r\n".encode('ascii') + donnees + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        factice = self.server.factice
+        if self.path == '/api/tags':
+            self._envoyer_json(200, {'models': [{'name': nom} for nom in factice.modeles]})
+        else:
+            self._envoyer_json(404, {'error': 'not found'})
+
+    def do_POST(self) -> None:
+        factice = self.server.factice
+        longueur = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(longueur) or b'{}')
+        except ValueError:
+            self._envoyer_json(400, {'error': 'invalid json'})
+            return
+
+        if self.path == '/api/embed':
+            textes = payload.get('input', [])
+            textes = [textes] if isinstance(textes, str) else textes
+            if factice.latence_s:
+                time.sleep(factice.latence_s)
+            self._envoyer_json(200, {'model': payload.get('model', ''),
+                                     'embeddings': factice.embeddeur(textes).tolist()})
+            return
+        if self.path != '/api/generate':
+            self._envoyer_json(404, {'error': 'not found'})
+            return
+
+        factice._enregistrer_requete(payload)
+        if factice._echouer():
+            # Serveur momentanément indisponible (modèle en cours de chargement par un autre client...)
+            self._envoyer_json(503, {'error': 'server busy'})
+            return
+        chargement_s = factice._charger(payload)
+
+        if not payload.get('prompt'):
+            # Prompt vide : Ollama charge le modèle et répond aussitôt, sans générer
+            self._envoyer_json(200, {
+                'model': payload.get('model', ''),
+                'response': '',
+                'done': True,
+                'done_reason': 'load',
+                'load_duration': int(chargement_s * 1e9),
+            })
+            return
+
+        debut = time.perf_counter()
+        if factice.latence_s:
+            time.sleep(factice.latence_s)
+        sequence, evalues, duree_evaluation = factice._evaluer_prompt(payload)
+
+        tokens = factice.generer_tokens(payload)
+
+        def logprobs(morceaux: List[str]) -> Dict:
+            # Même forme qu'Ollama : une entrée par token généré
+            if not payload.get('logprobs'):
+                return {}
+            return {'logprobs': [{'token': token, 'logprob': factice.logprob_token} for token in morceaux]}
+
+        def resume() -> Dict:
+            # Champs du dernier objet d'une réponse Ollama (durées en nanosecondes)
+            contexte = sequence + [factice._identifiant(token) for token in tokens]
+            factice._memoriser(contexte)
+            champs = {
+                'model': payload.get('model', ''),
+                'done': True,
+                'load_duration': int(chargement_s * 1e9),
+                'prompt_eval_count': evalues,
+                'prompt_eval_duration': int(duree_evaluation * 1e9),
+                'eval_count': len(tokens),
+                'eval_duration': int(factice.latence_token_s * len(tokens) * 1e9),
+                'total_duration': int((time.perf_counter() - debut + chargement_s) * 1e9),
+            }
+            # Comme Ollama, le mode brut (raw) ne renvoie pas de contexte
+            if not payload.get('raw'):
+                champs['context'] = contexte
+            return champs
+
+        if not payload.get('stream', True):
+            # La génération complète coûte autant que le flux : tous les tokens sont produits
+            if factice.latence_token_s:
+                time.sleep(factice.latence_token_s * len(tokens))
+            corps = resume()
+            corps['response'] = ''.join(tokens)
+            corps.update(logprobs(tokens))
+            self._envoyer_json(200, corps)
+            return
+
+        # Réponse NDJSON streamée en "chunked transfer encoding"
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for token in tokens:
+                if factice.latence_token_s:
+                    time.sleep(factice.latence_token_s)
+                ligne = json.dumps({'model': payload.get('model', ''), 'response': token, 'done': False, **logprobs([token])})
+                self._envoyer_morceau(ligne.encode('utf-8') + b"\n")
+                factice._token_envoye()
+            fin = json.dumps(dict(resume(), response=''))
+            self._envoyer_morceau(fin.encode('utf-8') + b"\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Le client a interrompu la génération
+            self.close_connection = True
+
+
+class ServeurOllamaFactice:
+    """
+    Faux serveur Ollama lancé dans un thread.
+
+    Args:
+        port: Port d'écoute (0 = port libre choisi par le système)
+        modeles: Noms des modèles renvoyés par /api/tags
+        reponse: Texte généré, ou fonction (payload -> texte)
+        latence_s: Attente avant chaque réponse de /api/generate
+        latence_token_s: Attente entre deux tokens en mode streamé
+        duree_chargement_s: Attente de la première requête quand le modèle n'est pas en mémoire
+        latence_prompt_token_s: Durée d'évaluation de chaque token du prompt absent du cache
+        cache_prefixe: Réutiliser le préfixe commun avec la requête précédente (comme Ollama)
+        logprob_token: Log-probabilité renvoyée pour chaque token généré (requêtes avec logprobs)
+        echecs: Nombre de requêtes /api/generate auxquelles répondre 503 avant de répondre normalement
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        modeles: Optional[List[str]] = None,
+        reponse: Union[str, Callable[[Dict], str]] = 'IGNORE',
+        latence_s: float = 0.0,
+        latence_token_s: float = 0.0,
+        duree_chargement_s: float = 0.0,
+        latence_prompt_token_s: float = 0.0,
+        cache_prefixe: bool = True,
+        logprob_token: float = 0.0,
+        echecs: int = 0,
+    ) -> None:
+        self.modeles = modeles if modeles is not None else ['mistral:latest']
+        self.reponse = reponse
+        self.latence_s = latence_s
+        self.latence_token_s = latence_token_s
+        self.duree_chargement_s = duree_chargement_s
+        self.latence_prompt_token_s = latence_prompt_token_s
+        self.cache_prefixe = cache_prefixe
+        self.logprob_token = logprob_token
+        self.echecs = echecs
+        self.embeddeur = EmbeddeurNgrammes()
+
+        # Tokens simulés : un identifiant par mot (espaces précédents compris) ; séquence en cache (un seul slot)
+        self._vocabulaire: Dict[str, int] = {}
+        self._cache_kv: List[int] = []
+        self._verrou_slot = threading.Lock()
+        self.tokens_prompt_evalues = 0
+
+        # Instant (time.monotonic) où le modèle sera déchargé ; None = pas en mémoire
+        self._decharge_a: Optional[float] = None
+        self._num_ctx: Optional[int] = None
+        self._verrou_modele = threading.Lock()
+
+        self.connexions = 0
+        self.chargements = 0
+        self.tokens_envoyes = 0
+        self.requetes: List[Dict] = []
+        self._verrou = threading.Lock()
+
+        self._serveur = ThreadingHTTPServer(('127.0.0.1', port), _GestionnaireOllama)
+        self._serveur.daemon_threads = True
+        self._serveur.factice = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url_base(self) -> str:
+        hote, port = self._serveur.server_address[:2]
+        return f"http://{hote}:{port}"
+
+    def generer_tokens(self, payload: Dict) -> List[str]:
+        """Découpe la réponse simulée en tokens d'environ quatre caractères, limités par num_predict."""
+        texte = self.reponse(payload) if callable(self.reponse) else self.reponse
+        tokens = [texte[i:i + 4] for i in range(0, len(texte), 4)] or ['']
+        num_predict = payload.get('options', {}).get('num_predict')
+        if num_predict is not None and num_predict >= 0:
+            tokens = tokens[:num_predict]
+        return tokens
+
+    def _charger(self, payload: Dict) -> float:
+        """
+        Simule le chargement du modèle si besoin et applique le keep_alive ; retourne l'attente en secondes.
+
+        Comme Ollama, un num_ctx différent de celui du modèle en mémoire impose de le recharger.
+        """
+        num_ctx = payload.get('options', {}).get('num_ctx', NUM_CTX_DEFAUT)
+        with self._verrou_modele:
+            attente = 0.0
+            if self._decharge_a is None or time.monotonic() >= self._decharge_a or num_ctx != self._num_ctx:
+                attente = self.duree_chargement_s
+                if attente:
+                    time.sleep(attente)
+                self.chargements += 1
+                self._num_ctx = num_ctx
+                with self._verrou_slot:
+                    self._cache_kv = []
+            # keep_alive par défaut d'Ollama : 5 minutes
+            keep_alive = duree_keep_alive(payload.get('keep_alive', '5m'))
+            self._decharge_a = float('inf') if keep_alive is None else time.monotonic() + keep_alive
+            return attente
+
+    def _identifiant(self, token: str) -> int:
+        with self._verrou:
+            return self._vocabulaire.setdefault(token, len(self._vocabulaire) + 1)
+
+    def tokeniser(self, texte: str) -> List[int]:
+        """Découpe un texte en tokens simulés (un par mot, espaces précédents compris)."""
+        return [self._identifiant(mot) for mot in re.findall(r'\s*\S+|\s+', texte)]
+
+    def _evaluer_prompt(self, payload: Dict) -> Tuple[List[int], int, float]:
+        """
+        Évalue le prompt (context + system + prompt, ou prompt brut) en réutilisant le préfixe en cache.
+
+        Returns:
+            tuple: (séquence complète, nombre de tokens évalués, durée de l'évaluation en secondes)
+        """
+        texte = payload.get('prompt', '')
+        if not payload.get('raw') and payload.get('system'):
+            texte = f"{payload['system']}\n\n{texte}"
+        sequence = list(payload.get('context') or []) + self.tokeniser(texte)
+        with self._verrou_slot:
+            communs = 0
+            if self.cache_prefixe:
+                for a, b in zip(sequence, self._cache_kv):
+                    if a != b:
+                        break
+                    communs += 1
+            evalues = len(sequence) - communs
+            duree = evalues * self.latence_prompt_token_s
+            if duree:
+                time.sleep(duree)
+            self._cache_kv = sequence
+            self.tokens_prompt_evalues += evalues
+        return sequence, evalues, duree
+
+    def _memoriser(self, sequence: List[int]) -> None:
+        with self._verrou_slot:
+            self._cache_kv = sequence
+
+    def modele_charge(self) -> bool:
+        """Indique si le modèle simulé est en mémoire."""
+        return self._decharge_a is not None and time.monotonic() < self._decharge_a
+
+    def _nouvelle_connexion(self) -> None:
+        with self._verrou:
+            self.connexions += 1
+
+    def _token_envoye(self) -> None:
+        with self._verrou:
+            self.tokens_envoyes += 1
+
+    def _enregistrer_requete(self, payload: Dict) -> None:
+        with self._verrou:
+            self.requetes.append(payload)
+
+    def _echouer(self) -> bool:
+        with self._verrou:
+            if self.echecs <= 0:
+                return False
+            self.echecs -= 1
+            return True
+
+    def demarrer(self) -> 'ServeurOllamaFactice':
+        self._thread = threading.Thread(target=self._serveur.serve_forever, name="ollama-factice", daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self) -> None:
+        self._serveur.shutdown()
+        self._serveur.server_close()
+
+    def __enter__(self) -> 'ServeurOllamaFactice':
+        return self.demarrer()
+
+    def __exit__(self, *exc) -> None:
+        self.arreter()
+
+
+def main() -> None:
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Faux serveur Ollama pour les tests")
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--reponse', default='IGNORE', help="Texte renvoyé par /api/generate")
+    parser.add_argument('--latence', type=float, default=0.0, help="Latence avant réponse (s)")
+    parser.add_argument('--latence-token', type=float, default=0.0, help="Latence par token en mode streamé (s)")
+    parser.add_argument('--chargement', type=float, default=0.0, help="Durée de chargement simulée du modèle (s)")
+    parser.add_argument('--latence-prompt-token', type=float, default=0.0,
+                        help="Durée d'évaluation simulée par token du prompt absent du cache (s)")
+    parser.add_argument('--sans-cache-prefixe', action='store_true', help="Réévalue tout le prompt à chaque requête")
+    args = parser.parse_args()
+
+    serveur = ServeurOllamaFactice(args.port, reponse=args.reponse, latence_s=args.latence, latence_token_s=args.latence_token,
+                                   duree_chargement_s=args.chargement, latence_prompt_token_s=args.latence_prompt_token,
+                                   cache_prefixe=not args.sans_cache_prefixe)
+    print(f"🧪 Faux serveur Ollama sur {serveur.url_base} (Ctrl+C pour arrêter)")
+    try:
+        serveur._serveur.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt du faux serveur")
+
+
+if __name__ == "__main__":
+    main()
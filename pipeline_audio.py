@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline d'écoute en étages indépendants.
+
+    capture -> [blocs audio] -> reconnaissance -> [textes] -> intention -> [actions] -> action/voix
+
+Chaque étage tourne dans son propre thread et communique par des files
+bornées. Avec une source temps réel (micro), la capture ne bloque jamais :
+si la reconnaissance prend du retard, les blocs les plus anciens sont
+abandonnés (et comptés) au lieu de laisser le tampon du micro déborder en
+silence. Avec une source lue à pleine vitesse (fichier, stdin), la capture
+attend au contraire que la reconnaissance ait de la place : aucun bloc
+n'est perdu.
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from journal_evenements import JOURNAL, contexte_enonce
+from metriques import METRIQUES
+
+
+_LECTURE_CAPTURE = METRIQUES.histogramme('assistant_capture_lecture_secondes', "Durée de lecture d'un bloc audio")
+_ACCEPT_WAVEFORM = METRIQUES.histogramme('assistant_vosk_accept_waveform_secondes', "Durée d'un appel à AcceptWaveform")
+_BLOCS_DECODES = METRIQUES.compteur('assistant_blocs_decodes_total', "Blocs audio transmis au recognizer")
+_RESULTATS_FINALS = METRIQUES.compteur('assistant_resultats_finals_total', "Résultats finals non vides du recognizer")
+_DUREE_ACTION = METRIQUES.histogramme('assistant_action_secondes', "Durée d'exécution d'une action")
+
+
+class FileBornee:
+    """
+    File bornée dont l'ajout ne bloque jamais : quand elle est pleine,
+    l'élément le plus ancien est abandonné.
+
+    Args:
+        nom: Nom de la file (pour les statistiques)
+        taille: Nombre maximal d'éléments
+    """
+
+    def __init__(self, nom: str, taille: int) -> None:
+        self.nom = nom
+        self._file: queue.Queue = queue.Queue(maxsize=taille)
+        self.perdus = 0
+        self.profondeur_max = 0
+
+    def ajouter(self, element) -> None:
+        """Ajoute un élément sans bloquer, en abandonnant le plus ancien si besoin."""
+        while True:
+            try:
+                self._file.put_nowait(element)
+                break
+            except queue.Full:
+                try:
+                    self._file.get_nowait()
+                    self.perdus += 1
+                except queue.Empty:
+                    pass
+        profondeur = self._file.qsize()
+        if profondeur > self.profondeur_max:
+            self.profondeur_max = profondeur
+
+    def ajouter_en_attendant(self, element, timeout: float) -> bool:
+        """
+        Ajoute un élément en attendant une place libre (aucun abandon).
+
+        Returns:
+            bool: False si la file est restée pleine pendant `timeout` secondes
+        """
+        try:
+            self._file.put(element, timeout=timeout)
+        except queue.Full:
+            return False
+        profondeur = self._file.qsize()
+        if profondeur > self.profondeur_max:
+            self.profondeur_max = profondeur
+        return True
+
+    def prendre(self, timeout: float):
+        """Retire le prochain élément ; lève queue.Empty après `timeout` secondes."""
+        return self._file.get(timeout=timeout)
+
+    def vider(self) -> int:
+        """Vide la file et retourne le nombre d'éléments retirés."""
+        retires = 0
+        while True:
+            try:
+                self._file.get_nowait()
+                retires += 1
+            except queue.Empty:
+                return retires
+
+    def profondeur(self) -> int:
+        return self._file.qsize()
+
+    def statistiques(self) -> Dict:
+        return {'profondeur': self.profondeur(), 'profondeur_max': self.profondeur_max, 'perdus': self.perdus}
+
+
+class _CompteurEtage:
+    """Compteurs d'un étage : éléments traités, erreurs et temps de traitement."""
+
+    def __init__(self) -> None:
+        self.traites = 0
+        self.erreurs = 0
+        self.duree_totale_s = 0.0
+        self.duree_max_s = 0.0
+
+    def mesurer(self, duree: float) -> None:
+        self.traites += 1
+        self.duree_totale_s += duree
+        if duree > self.duree_max_s:
+            self.duree_max_s = duree
+
+    def statistiques(self) -> Dict:
+        return {
+            'traites': self.traites,
+            'erreurs': self.erreurs,
+            'duree_totale_s': self.duree_totale_s,
+            'duree_moyenne_ms': 1000 * self.duree_totale_s / self.traites if self.traites else 0.0,
+            'duree_max_ms': 1000 * self.duree_max_s,
+        }
+
+
+class SuiviPartiels:
+    """
+    Engagement anticipé : une commande est déclenchée dès que le résultat
+    partiel est resté identique pendant `blocs_stables` blocs et désigne une
+    commande sans ambiguïté. Le résultat final du même énoncé est ensuite
+    écarté pour que deux actions ne s'exécutent pas pour un seul énoncé,
+    même s'il désigne une autre commande que celle déjà exécutée.
+
+    Args:
+        intention_partielle: Fonction texte -> code d'intention sûr (None = attendre le résultat final)
+        blocs_stables: Nombre de blocs supplémentaires pendant lesquels le partiel ne doit pas changer
+    """
+
+    def __init__(self, intention_partielle: Callable[[str], Optional[str]], blocs_stables: int = 2) -> None:
+        self._intention_partielle = intention_partielle
+        self.blocs_stables = blocs_stables
+        self._partiel = ""
+        self._repetitions = 0
+        self._debut_enonce: Optional[float] = None
+        self._engagement: Optional[str] = None
+
+        self.engages = 0
+        self.doublons_evites = 0
+        self.desaccords = 0
+        self.latence_partiel_s = 0.0
+        self.enonces_finals = 0
+        self.latence_final_s = 0.0
+        self.gain_total_s = 0.0
+        self._instant_engagement = 0.0
+
+    def partiel(self, texte: str, instant: float) -> Optional[str]:
+        """
+        Prend en compte un résultat partiel.
+
+        Args:
+            texte: Texte partiel (nettoyé)
+            instant: Horodatage du bloc (secondes)
+
+        Returns:
+            str: Code d'intention à exécuter immédiatement, None sinon
+        """
+        if not texte:
+            return None
+        if self._debut_enonce is None:
+            self._debut_enonce = instant
+        if texte != self._partiel:
+            self._partiel = texte
+            self._repetitions = 0
+            return None
+        self._repetitions += 1
+        if self._engagement is not None or self._repetitions < self.blocs_stables:
+            return None
+
+        code = self._intention_partielle(texte)
+        if code:
+            self._engagement = code
+            self._instant_engagement = instant
+            self.engages += 1
+            self.latence_partiel_s += instant - self._debut_enonce
+        return code
+
+    def final(self, texte: str, instant: float) -> bool:
+        """
+        Termine l'énoncé en cours.
+
+        Args:
+            texte: Texte final (nettoyé)
+            instant: Horodatage du résultat final (secondes)
+
+        Returns:
+            bool: True si une commande a déjà été exécutée par anticipation pour cet énoncé et que ce résultat
+                doit être écarté
+        """
+        engagement = self._engagement
+        if texte and self._debut_enonce is not None:
+            self.enonces_finals += 1
+            self.latence_final_s += instant - self._debut_enonce
+            if engagement is not None:
+                self.gain_total_s += instant - self._instant_engagement
+        self.reinitialiser()
+
+        if engagement is None:
+            return False
+        # Une seule action par énoncé : un texte final qui désigne une autre commande est écarté lui aussi
+        # (detecter_definitif() refuse déjà les partiels qu'une commande plus prioritaire peut prolonger)
+        if not texte or self._intention_partielle(texte) == engagement:
+            self.doublons_evites += 1
+        else:
+            self.desaccords += 1
+        return True
+
+    def reinitialiser(self) -> None:
+        """Oublie l'énoncé en cours (changement de recognizer...)."""
+        self._partiel = ""
+        self._repetitions = 0
+        self._debut_enonce = None
+        self._engagement = None
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne la latence de la voie partielle et de la voie "résultat final", depuis le début de l'énoncé.
+
+        Returns:
+            dict: engagements, doublons évités, résultats finals contredisant l'engagement (écartés),
+                latences moyennes et gain moyen en ms
+        """
+        return {
+            'engages': self.engages,
+            'doublons_evites': self.doublons_evites,
+            'desaccords': self.desaccords,
+            'latence_partiel_ms': 1000 * self.latence_partiel_s / self.engages if self.engages else 0.0,
+            'latence_final_ms': 1000 * self.latence_final_s / self.enonces_finals if self.enonces_finals else 0.0,
+            'gain_moyen_ms': 1000 * self.gain_total_s / self.engages if self.engages else 0.0,
+        }
+
+
+class PipelineVocal:
+    """
+    Pipeline capture -> reconnaissance -> intention -> action.
+
+    Args:
+        lire_bloc: Fonction qui retourne le prochain bloc audio (bytes vides = fin du flux)
+        recognizer: KaldiRecognizer utilisé pour les commandes (None = fourni plus tard par
+            remplacer_recognizer ; l'audio capturé d'ici là attend dans la file audio)
+        analyser: Fonction texte -> code d'intention (ou None)
+        executer: Fonction (code d'intention, texte) -> None
+        taille_file_audio: Nombre de blocs audio en attente avant abandon des plus anciens
+        taille_file_textes: Nombre de textes en attente d'analyse
+        taille_file_actions: Nombre d'actions en attente d'exécution
+        detecteur_voix: Détecteur d'activité vocale (DetecteurVoix) ; seule la parole atteint le recognizer
+        recognizer_dictee: KaldiRecognizer à vocabulaire libre utilisé pendant une dictée
+            (None = le recognizer des commandes sert aussi pour la dictée)
+        suivi_partiels: Engagement anticipé sur les résultats partiels stables (SuiviPartiels)
+        speculateur: Classification spéculative des résultats partiels (ClassificationSpeculative) ;
+            `analyser` est chargé de récupérer sa réponse pour le texte final
+        sans_perte: Si True, chaque étage attend que le suivant ait de la place au lieu d'abandonner
+            des éléments (sources lues plus vite que le temps réel)
+        debut_enonce: Fonction appelée (thread de reconnaissance) au premier résultat partiel de chaque
+            énoncé, ex: couper la réponse vocale en cours quand l'utilisateur reprend la parole
+    """
+
+    def __init__(
+        self,
+        lire_bloc: Callable[[], bytes],
+        recognizer,
+        analyser: Callable[[str], Optional[str]],
+        executer: Callable[[str, str], None],
+        taille_file_audio: int = 64,
+        taille_file_textes: int = 8,
+        taille_file_actions: int = 8,
+        detecteur_voix=None,
+        recognizer_dictee=None,
+        suivi_partiels: Optional[SuiviPartiels] = None,
+        speculateur=None,
+        sans_perte: bool = False,
+        debut_enonce: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._lire_bloc = lire_bloc
+        self._recognizer = recognizer
+        self._recognizer_dictee = recognizer_dictee
+        self._recognizer_en_cours = recognizer
+        self._recognizer_en_attente = None
+        self._suivi_partiels = suivi_partiels
+        self._speculateur = speculateur
+        self._sans_perte = sans_perte
+        self._debut_enonce = debut_enonce
+        self._detecteur_voix = detecteur_voix
+        self._analyser = analyser
+        self._executer = executer
+
+        self.file_audio = FileBornee('audio', taille_file_audio)
+        self.file_textes = FileBornee('textes', taille_file_textes)
+        self.file_actions = FileBornee('actions', taille_file_actions)
+
+        self._compteurs = {nom: _CompteurEtage() for nom in ('capture', 'reconnaissance', 'intention', 'action')}
+        self._arret = threading.Event()
+        self._fin_flux = threading.Event()
+        self._threads = []
+
+        # Dictée en cours (ex: nom de playlist) : le prochain texte final lui est destiné
+        self._dictee: Optional[queue.Queue] = None
+        self._dernier_partiel = ""
+        self._dernier_texte = ""
+        # Identifiant de l'énoncé en cours de reconnaissance (journal d'événements)
+        self._enonce: Optional[int] = None
+
+    # ---------- Étages ----------
+
+    def _etage_capture(self) -> None:
+        compteur = self._compteurs['capture']
+        while not self._arret.is_set():
+            debut = time.perf_counter()
+            try:
+                data = self._lire_bloc()
+            except Exception as e:
+                compteur.erreurs += 1
+                JOURNAL.evenement('erreur', f"❌ Erreur lors de la capture audio : {e}", etage='capture', erreur=str(e))
+                continue
+            if not data:
+                # Fin du flux (source fichier) : les étages suivants finissent leur travail
+                self._fin_flux.set()
+                return
+            duree = time.perf_counter() - debut
+            compteur.mesurer(duree)
+            _LECTURE_CAPTURE.observer(duree)
+            self._deposer(self.file_audio, data)
+
+    def _deposer(self, file: FileBornee, element) -> None:
+        """Ajoute un élément à une file, en attendant une place libre en mode sans perte."""
+        if not self._sans_perte:
+            file.ajouter(element)
+            return
+        while not file.ajouter_en_attendant(element, timeout=0.1):
+            if self._arret.is_set():
+                return
+
+    def _etage_reconnaissance(self) -> None:
+        compteur = self._compteurs['reconnaissance']
+        while not self._arret.is_set():
+            if self._recognizer is None and self._recognizer_en_attente is None:
+                # Modèle encore en chargement : l'audio capturé d'ici là attend dans la file
+                self._arret.wait(0.02)
+                continue
+            try:
+                data = self.file_audio.prendre(timeout=0.1)
+            except queue.Empty:
+                if self._fin_flux.is_set():
+                    self._terminer_reconnaissance()
+                    return
+                continue
+
+            debut = time.perf_counter()
+            try:
+                self._choisir_recognizer()
+                if self._detecteur_voix is not None:
+                    # Le silence n'est pas décodé ; la fin d'un segment force le résultat final
+                    blocs, fin_segment = self._detecteur_voix.filtrer(data)
+                else:
+                    blocs, fin_segment = [data], False
+                for bloc in blocs:
+                    self._reconnaitre(bloc)
+                if fin_segment:
+                    self._finaliser()
+            except Exception as e:
+                compteur.erreurs += 1
+                JOURNAL.evenement('erreur', f"❌ Erreur lors de la reconnaissance : {e}", etage='reconnaissance', erreur=str(e))
+            compteur.mesurer(time.perf_counter() - debut)
+
+    def _choisir_recognizer(self) -> None:
+        """Bascule entre le recognizer des commandes et celui de la dictée (thread de reconnaissance)."""
+        if self._recognizer_en_attente is not None and not self._dernier_partiel:
+            # Nouvelle grammaire : appliquée entre deux énoncés pour ne pas couper une commande
+            if self._recognizer_en_cours is self._recognizer:
+                self._recognizer_en_cours = self._recognizer_en_attente
+            self._recognizer = self._recognizer_en_attente
+            self._recognizer_en_attente = None
+
+        voulu = self._recognizer
+        if self._dictee is not None and self._recognizer_dictee is not None:
+            voulu = self._recognizer_dictee
+        if voulu is not self._recognizer_en_cours:
+            # L'audio déjà accumulé par l'autre recognizer ne concerne pas ce mode
+            voulu.Reset()
+            self._recognizer_en_cours = voulu
+            self._dernier_partiel = ""
+            self._enonce = None
+            if self._suivi_partiels is not None:
+                self._suivi_partiels.reinitialiser()
+            if self._speculateur is not None:
+                self._speculateur.abandonner()
+
+    @staticmethod
+    def _nettoyer(texte: str) -> str:
+        """Retire les mots hors grammaire ([unk]) d'un résultat Vosk."""
+        return ' '.join(mot for mot in texte.split() if mot != '[unk]')
+
+    def _reconnaitre(self, data: bytes) -> None:
+        recognizer = self._recognizer_en_cours
+        debut = time.perf_counter()
+        fin_enonce = recognizer.AcceptWaveform(data)
+        _ACCEPT_WAVEFORM.observer(time.perf_counter() - debut)
+        _BLOCS_DECODES.incrementer()
+        if fin_enonce:
+            texte = self._nettoyer(json.loads(recognizer.Result()).get('text', ''))
+            self._fin_enonce(texte)
+        else:
+            partial = json.loads(recognizer.PartialResult())
+            partiel = self._nettoyer(partial.get('partial', ''))
+            if partiel and partiel != self._dernier_partiel:
+                if self._enonce is None:
+                    self._enonce = JOURNAL.nouvel_enonce()
+                    if self._debut_enonce is not None:
+                        self._debut_enonce()
+                JOURNAL.evenement('asr.partiel', enonce=self._enonce, texte=partiel)
+            self._dernier_partiel = partiel
+            if self._dictee is not None:
+                return
+            if self._suivi_partiels is not None:
+                intention = self._suivi_partiels.partiel(partiel, time.perf_counter())
+                if intention:
+                    JOURNAL.evenement('asr.anticipe', f"⚡ Commande anticipée : {partiel}",
+                                      enonce=self._enonce, texte=partiel, intention=intention)
+                    self._deposer(self.file_actions, (intention, partiel, self._enonce))
+            if self._speculateur is not None:
+                self._speculateur.observer_partiel(self._dernier_partiel)
+
+    def _finaliser(self) -> None:
+        texte = self._nettoyer(json.loads(self._recognizer_en_cours.FinalResult()).get('text', ''))
+        self._fin_enonce(texte)
+
+    def _fin_enonce(self, texte: str) -> None:
+        self._dernier_partiel = ""
+        enonce = self._enonce
+        self._enonce = None
+        if texte:
+            _RESULTATS_FINALS.incrementer()
+            if enonce is None:
+                enonce = JOURNAL.nouvel_enonce()
+        if self._suivi_partiels is not None and self._suivi_partiels.final(texte, time.perf_counter()):
+            # Déjà exécuté à partir du résultat partiel
+            JOURNAL.evenement('asr.final', enonce=enonce, texte=texte, ignore='deja_anticipe')
+            self._dernier_texte = texte
+            transmis = False
+        else:
+            transmis = self._transmettre_texte(texte, enonce)
+        if not transmis and self._speculateur is not None:
+            # Le texte ne sera pas analysé : la requête spéculative éventuelle ne servira pas
+            self._speculateur.abandonner()
+
+    def _terminer_reconnaissance(self) -> None:
+        """Récupère le dernier énoncé en fin de flux."""
+        self._finaliser()
+        self._deposer(self.file_textes, None)
+
+    def _transmettre_texte(self, texte: str, enonce: Optional[int] = None) -> bool:
+        """Envoie le texte à la dictée en cours ou à l'étage d'analyse ; True s'il part à l'analyse."""
+        if not texte:
+            return False
+        dictee = self._dictee
+        if dictee is not None:
+            self._dictee = None
+            JOURNAL.evenement('asr.dictee', enonce=enonce, texte=texte)
+            dictee.put(texte)
+            return False
+        if texte == self._dernier_texte:
+            JOURNAL.evenement('asr.final', enonce=enonce, texte=texte, ignore='repetition')
+            return False
+        JOURNAL.evenement('asr.final', f"🎤 Vous avez dit : {texte}", enonce=enonce, texte=texte)
+        self._dernier_texte = texte
+        self._deposer(self.file_textes, (texte, enonce))
+        return True
+
+    def _etage_intention(self) -> None:
+        compteur = self._compteurs['intention']
+        while not self._arret.is_set():
+            try:
+                element = self.file_textes.prendre(timeout=0.1)
+            except queue.Empty:
+                continue
+            if element is None:
+                self._deposer(self.file_actions, None)
+                return
+
+            texte, enonce = element
+            debut = time.perf_counter()
+            try:
+                with contexte_enonce(enonce):
+                    intention = self._analyser(texte)
+                duree = time.perf_counter() - debut
+                if intention:
+                    JOURNAL.evenement('intention', f"🧠 Intention détectée : {intention}", enonce=enonce,
+                                      intention=intention, duree_ms=round(1000 * duree, 3))
+                    self._deposer(self.file_actions, (intention, texte, enonce))
+                else:
+                    JOURNAL.evenement('intention', enonce=enonce, intention=None, duree_ms=round(1000 * duree, 3))
+            except Exception as e:
+                compteur.erreurs += 1
+                JOURNAL.evenement('erreur', f"❌ Erreur lors de l'analyse de l'intention : {e}", enonce=enonce,
+                                  etage='intention', erreur=str(e))
+            compteur.mesurer(time.perf_counter() - debut)
+
+    def _etage_action(self) -> None:
+        compteur = self._compteurs['action']
+        while not self._arret.is_set():
+            try:
+                element = self.file_actions.prendre(timeout=0.1)
+            except queue.Empty:
+                continue
+            if element is None:
+                self._arret.set()
+                return
+
+            intention, texte, enonce = element
+            debut = time.perf_counter()
+            try:
+                # Les messages vocaux de l'action sont rattachés au même énoncé
+                with contexte_enonce(enonce):
+                    self._executer(intention, texte)
+            except Exception as e:
+                compteur.erreurs += 1
+                JOURNAL.evenement('erreur', f"❌ Erreur lors de l'exécution de l'action : {e}", enonce=enonce,
+                                  etage='action', erreur=str(e))
+            duree = time.perf_counter() - debut
+            compteur.mesurer(duree)
+            _DUREE_ACTION.observer(duree)
+            JOURNAL.evenement('action', enonce=enonce, intention=intention, duree_ms=round(1000 * duree, 3))
+
+    # ---------- Contrôle ----------
+
+    def demarrer(self) -> None:
+        """Lance les quatre étages dans leurs threads."""
+        for nom, cible in (
+            ('capture', self._etage_capture),
+            ('reconnaissance', self._etage_reconnaissance),
+            ('intention', self._etage_intention),
+            ('action', self._etage_action),
+        ):
+            thread = threading.Thread(target=cible, name=f"pipeline-{nom}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def actif(self) -> bool:
+        return not self._arret.is_set()
+
+    def attendre(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin du pipeline (fin du flux audio ou arrêt demandé).
+
+        Returns:
+            bool: True si le pipeline est terminé
+        """
+        return self._arret.wait(timeout)
+
+    def arreter(self) -> None:
+        """Arrête tous les étages et attend leurs threads."""
+        self._arret.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+
+    def remplacer_recognizer(self, recognizer, recognizer_dictee=None) -> None:
+        """
+        Remplace le recognizer des commandes (ex: grammaire reconstruite après un changement de SOFTWARE_DB),
+        ou installe le premier quand le pipeline a démarré avant la fin du chargement du modèle.
+
+        Le remplacement est effectué par le thread de reconnaissance, entre deux énoncés.
+
+        Args:
+            recognizer: Nouveau KaldiRecognizer
+            recognizer_dictee: Nouveau recognizer de dictée (None = inchangé)
+        """
+        if recognizer_dictee is not None:
+            self._recognizer_dictee = recognizer_dictee
+        self._recognizer_en_attente = recognizer
+
+    def attendre_dictee(self, delai_partiel: float, delai_max: float) -> str:
+        """
+        Détourne le prochain texte reconnu vers l'appelant (dictée d'un nom de playlist...).
+
+        Args:
+            delai_partiel: Après ce délai, un résultat partiel suffisamment long est accepté
+            delai_max: Délai maximal d'attente en secondes
+
+        Returns:
+            str: Texte dicté, chaîne vide si rien n'a été entendu
+        """
+        reponse: queue.Queue = queue.Queue(maxsize=1)
+        self._dernier_partiel = ""
+        self._dictee = reponse
+        debut = time.monotonic()
+        try:
+            while time.monotonic() - debut < delai_max and not self._arret.is_set():
+                try:
+                    return reponse.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+                partiel = self._dernier_partiel
+                if time.monotonic() - debut > delai_partiel and len(partiel) > 2:
+                    JOURNAL.evenement('asr.dictee', f"🎤 Texte capté (partiel) : {partiel}", texte=partiel, partiel=True)
+                    return partiel
+            return ""
+        finally:
+            self._dictee = None
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les profondeurs de files, blocs perdus et temps de traitement de chaque étage.
+        """
+        stats = {
+            'etages': {nom: compteur.statistiques() for nom, compteur in self._compteurs.items()},
+            'files': {f.nom: f.statistiques() for f in (self.file_audio, self.file_textes, self.file_actions)},
+        }
+        if self._detecteur_voix is not None:
+            stats['detection_voix'] = self._detecteur_voix.statistiques()
+        if self._suivi_partiels is not None:
+            stats['engagement_anticipe'] = self._suivi_partiels.statistiques()
+        if self._speculateur is not None:
+            stats['speculation'] = self._speculateur.statistiques()
+        return stats
+
+    def afficher_statistiques(self) -> None:
+        """Affiche un résumé des statistiques sur la console."""
+        stats = self.statistiques()
+        for nom, etage in stats['etages'].items():
+            print(f"   {nom:<15} {etage['traites']:>7} traités, {etage['duree_moyenne_ms']:.1f} ms en moyenne, "
+                  f"{etage['duree_max_ms']:.1f} ms max, {etage['erreurs']} erreurs")
+        for nom, file in stats['files'].items():
+            print(f"   file {nom:<10} profondeur {file['profondeur']} (max {file['profondeur_max']}), {file['perdus']} perdus")
+        if 'detection_voix' in stats:
+            vad = stats['detection_voix']
+            print(f"   détection voix : {vad['fraction_ignoree']:.0%} des blocs non décodés, {vad['segments']} segments de parole")
+        if 'engagement_anticipe' in stats:
+            anticipe = stats['engagement_anticipe']
+            print(f"   commandes anticipées : {anticipe['engages']} ({anticipe['doublons_evites']} doublons évités, "
+                  f"{anticipe['desaccords']} résultats finals différents écartés), "
+                  f"{anticipe['latence_partiel_ms']:.0f} ms après le début de l'énoncé contre "
+                  f"{anticipe['latence_final_ms']:.0f} ms pour le résultat final (gain moyen {anticipe['gain_moyen_ms']:.0f} ms)")
+        if 'speculation' in stats:
+            spec = stats['speculation']
+            print(f"   spéculation LLM : {spec['lancees']} requêtes, {spec['hits']} hits, {spec['misses']} misses "
+                  f"({spec['annulees']} annulées), {spec['temps_gagne_ms']:.0f} ms gagnés, "
+                  f"{spec['temps_gaspille_ms']:.0f} ms de LLM gaspillés")
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recherche approximative des noms de logiciels, tolérante aux erreurs de Vosk.
+
+Quand "lance discorde" ne correspond à aucun mot-clé exact, les mots qui
+suivent le verbe sont cherchés dans un index de SOFTWARE_DB :
+
+1. Candidats : trigrammes de caractères du nom et de sa clé phonétique
+   française, via un index inversé (seuls les noms qui partagent des
+   trigrammes avec la requête sont examinés).
+2. Vérification : distance d'édition bornée (on abandonne dès que la borne
+   est dépassée) sur le texte et sur la clé phonétique.
+
+Le résultat est une liste de candidats classés avec leur score (0 à 1).
+"""
+
+import heapq
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from detection_mots_cles import VERBES_LANCEMENT
+
+
+# Formes du verbe acceptées devant un nom approximatif (sans accents)
+VERBES_RECHERCHE = tuple(dict.fromkeys(
+    [unicodedata.normalize('NFKD', verbe).encode('ascii', 'ignore').decode() for verbe in VERBES_LANCEMENT]
+    + ['lancer', 'ouvrir', 'demarrer', 'lances', 'ouvres', 'demarres']
+))
+
+# Mots ignorés entre le verbe et le nom ("lance moi le navigateur")
+MOTS_IGNORES = ('le', 'la', 'les', 'l', 'un', 'une', 'moi', 'donc', 'euh')
+
+# Une correspondance phonétique parfaite vaut un peu moins qu'une correspondance exacte du texte
+FACTEUR_PHONETIQUE = 0.95
+
+_NON_ALPHANUMERIQUE = re.compile(r'[^a-z0-9]+')
+
+# Règles phonétiques appliquées dans l'ordre (texte en minuscules, sans accents ni espaces)
+_REGLES_PHONETIQUES = [(re.compile(motif), remplacement) for motif, remplacement in (
+    (r'ph', 'f'),
+    (r'gn', 'n'),
+    (r'sch|sh|ch', 'C'),
+    (r'ck|qu|q', 'k'),
+    (r'c(?=[eiy])', 's'),
+    (r'c', 'k'),
+    (r'gu(?=[eiy])', 'g'),
+    (r'g(?=[eiy])', 'j'),
+    (r'x', 'ks'),
+    (r'z', 's'),
+    (r'w', 'v'),
+    (r'h', ''),
+    (r'eau|au', 'o'),
+    (r'ou', 'u'),
+    (r'oi', 'ua'),
+    (r'ai|ei', 'e'),
+    (r'y', 'i'),
+    (r'(?:ain|ein|in|im|un)(?![aeiou])', 'I'),
+    (r'(?:an|am|en|em)(?![aeiou])', 'A'),
+    (r'(?:on|om)(?![aeiou])', 'O'),
+    (r'(?:er|ez|et)$', 'e'),
+    (r'(.)\1+', r'\1'),
+)]
+
+
+def normaliser_nom(texte: str) -> str:
+    """
+    Met un nom ou une transcription sous forme comparable.
+
+    Args:
+        texte: Nom de logiciel ou texte transcrit
+
+    Returns:
+        str: Minuscules, sans accents, mots alphanumériques séparés par une espace
+    """
+    texte = unicodedata.normalize('NFKD', texte.lower())
+    texte = ''.join(c for c in texte if not unicodedata.combining(c))
+    return ' '.join(_NON_ALPHANUMERIQUE.sub(' ', texte).split())
+
+
+def cle_phonetique(texte: str) -> str:
+    """
+    Calcule une clé phonétique française simplifiée ("discorde" et "discord" -> "diskor").
+
+    Les espaces sont retirés : Vosk coupe ou fusionne parfois les mots d'un nom.
+
+    Args:
+        texte: Texte normalisé (voir normaliser_nom)
+
+    Returns:
+        str: Clé phonétique
+    """
+    cle = texte.replace(' ', '')
+    for motif, remplacement in _REGLES_PHONETIQUES:
+        cle = motif.sub(remplacement, cle)
+    # Lettres finales muettes : "e" puis une consonne ("discorde" -> "discord" -> "discor")
+    if len(cle) > 2 and cle.endswith('e'):
+        cle = cle[:-1]
+    if len(cle) > 2 and cle[-1] in 'sdtxp':
+        cle = cle[:-1]
+    return cle
+
+
+def ngrammes(texte: str, taille: int = 3) -> Set[str]:
+    """Trigrammes (par défaut) du texte encadré d'espaces : les débuts et fins de mot comptent."""
+    texte = f" {texte} "
+    return {texte[i:i + taille] for i in range(max(1, len(texte) - taille + 1))}
+
+
+def distance_bornee(a: str, b: str, borne: int) -> int:
+    """
+    Distance de Levenshtein limitée à une bande autour de la diagonale.
+
+    Args:
+        a: Première chaîne
+        b: Seconde chaîne
+        borne: Distance maximale intéressante
+
+    Returns:
+        int: Distance d'édition, ou borne + 1 dès qu'elle est dépassée
+    """
+    if abs(len(a) - len(b)) > borne:
+        return borne + 1
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    longueur_b = len(b)
+    hors_borne = borne + 1
+    precedente = [j if j <= borne else hors_borne for j in range(longueur_b + 1)]
+    courante = [hors_borne] * (longueur_b + 1)
+    for i in range(1, len(a) + 1):
+        debut = i - borne if i > borne else 1
+        fin = i + borne if i + borne < longueur_b else longueur_b
+        # Cases hors de la bande : hors borne
+        courante[debut - 1] = i if i <= borne else hors_borne
+        caractere = a[i - 1]
+        minimum = courante[debut - 1]
+        gauche = minimum
+        for j in range(debut, fin + 1):
+            cout = precedente[j - 1] + (caractere != b[j - 1])
+            haut = precedente[j] + 1
+            if haut < cout:
+                cout = haut
+            if gauche + 1 < cout:
+                cout = gauche + 1
+            courante[j] = cout
+            gauche = cout
+            if cout < minimum:
+                minimum = cout
+        if minimum > borne:
+            return hors_borne
+        if fin < longueur_b:
+            courante[fin + 1] = hors_borne
+        precedente, courante = courante, precedente
+    return min(precedente[longueur_b], hors_borne)
+
+
+def _similarite(a: str, b: str) -> float:
+    """1 - distance / longueur, ou 0 si les chaînes diffèrent de plus d'un tiers."""
+    longueur = max(len(a), len(b))
+    if not longueur:
+        return 0.0
+    borne = max(1, longueur // 3)
+    distance = distance_bornee(a, b, borne)
+    return 0.0 if distance > borne else 1.0 - distance / longueur
+
+
+class IndexLogiciels:
+    """
+    Index approximatif des noms de SOFTWARE_DB.
+
+    Args:
+        noms: Noms des logiciels
+        candidats_max: Nombre de candidats vérifiés par distance d'édition
+    """
+
+    def __init__(self, noms: Iterable[str], candidats_max: int = 12) -> None:
+        self.noms: List[str] = list(noms)
+        self.candidats_max = candidats_max
+        self._formes = [normaliser_nom(nom.replace('_', ' ')) for nom in self.noms]
+        self._cles = [cle_phonetique(forme) for forme in self._formes]
+        self._index: Dict[str, List[int]] = {}
+        self._nb_ngrammes: List[int] = []
+        for indice, (forme, cle) in enumerate(zip(self._formes, self._cles)):
+            termes = self._termes(forme, cle)
+            self._nb_ngrammes.append(len(termes))
+            for terme in termes:
+                self._index.setdefault(terme, []).append(indice)
+        # Un nom de N mots peut être transcrit en N+1 mots ("v l c", "disc ord")
+        self._mots_max = max((len(forme.split()) for forme in self._formes), default=0) + 1
+
+    @staticmethod
+    def _termes(forme: str, cle: str) -> Set[str]:
+        # Les trigrammes phonétiques sont préfixés pour ne pas se mélanger à ceux du texte
+        return ngrammes(forme) | {'#' + ngramme for ngramme in ngrammes(cle)}
+
+    def rechercher(self, requete: str, limite: int = 5, score_min: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Cherche les noms les plus proches d'une requête.
+
+        Args:
+            requete: Nom tel que transcrit (ex: "discorde")
+            limite: Nombre maximal de résultats
+            score_min: Score en dessous duquel un candidat est écarté
+
+        Returns:
+            list: Couples (nom, score entre 0 et 1), du meilleur au moins bon
+        """
+        forme = normaliser_nom(requete)
+        if not forme or not self.noms:
+            return []
+        cle = cle_phonetique(forme)
+        termes = self._termes(forme, cle)
+
+        communs: Dict[int, int] = {}
+        for terme in termes:
+            for indice in self._index.get(terme, ()):
+                communs[indice] = communs.get(indice, 0) + 1
+        if not communs:
+            return []
+
+        # Coefficient de Dice sur les trigrammes : seuls les meilleurs candidats sont vérifiés
+        nb_termes = len(termes)
+        candidats = heapq.nlargest(
+            self.candidats_max, communs,
+            key=lambda indice: communs[indice] / (nb_termes + self._nb_ngrammes[indice]),
+        )
+
+        resultats = []
+        for indice in candidats:
+            score = _similarite(forme, self._formes[indice])
+            if score < FACTEUR_PHONETIQUE:
+                # La clé phonétique ne peut améliorer qu'un score inférieur à FACTEUR_PHONETIQUE
+                score = max(score, FACTEUR_PHONETIQUE * _similarite(cle, self._cles[indice]))
+            if score > 0 and score >= score_min:
+                resultats.append((self.noms[indice], score))
+        resultats.sort(key=lambda resultat: -resultat[1])
+        return resultats[:limite]
+
+    def rechercher_lancement(self, texte: str, score_min: float = 0.75) -> Optional[Tuple[str, float]]:
+        """
+        Cherche le logiciel désigné après un verbe de lancement ("lance discorde").
+
+        Args:
+            texte: Texte transcrit complet
+            score_min: Score minimal du meilleur candidat
+
+        Returns:
+            tuple: (nom, score) du meilleur logiciel, None si aucun verbe ou aucun nom assez proche
+        """
+        mots = normaliser_nom(texte).split()
+        meilleur: Optional[Tuple[str, float]] = None
+        for position, mot in enumerate(mots):
+            if mot not in VERBES_RECHERCHE:
+                continue
+            suite = mots[position + 1:]
+            while suite and suite[0] in MOTS_IGNORES:
+                suite = suite[1:]
+            # Le nom peut compter plusieurs mots : on essaie chaque longueur
+            for longueur in range(1, min(self._mots_max, len(suite)) + 1):
+                resultats = self.rechercher(' '.join(suite[:longueur]), limite=1, score_min=score_min)
+                if resultats and (meilleur is None or resultats[0][1] > meilleur[1]):
+                    meilleur = resultats[0]
+        return meilleur
+
+
+# (version de SOFTWARE_DB, index) ; un tuple pour une lecture atomique
+_cache_index: Optional[Tuple[int, IndexLogiciels]] = None
+_verrou = threading.Lock()
+
+
+def obtenir_index(software_db: Dict[str, str], version: int) -> IndexLogiciels:
+    """
+    Retourne l'index approximatif pour la version de SOFTWARE_DB donnée.
+
+    Args:
+        software_db: Base de données des logiciels (nom -> chemin)
+        version: Numéro de version de la base de données
+
+    Returns:
+        IndexLogiciels: Index reconstruit uniquement quand la version change
+    """
+    global _cache_index
+    cache = _cache_index
+    if cache is not None and cache[0] == version:
+        return cache[1]
+
+    with _verrou:
+        if _cache_index is None or _cache_index[0] != version:
+            _cache_index = (version, IndexLogiciels(list(software_db.keys())))
+        return _cache_index[1]
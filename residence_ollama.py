@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Résidence du modèle Ollama en mémoire.
+
+Ollama ne charge un modèle qu'à la première génération, et le décharge
+`keep_alive` après la dernière requête : sans préchargement, la première
+commande envoyée au LLM attend le chargement de mistral (plusieurs secondes
+sur CPU) et finit souvent en timeout.
+
+Le planificateur :
+1. charge le modèle au démarrage avec une requête au prompt vide (Ollama
+   charge le modèle et répond sans rien générer) ;
+2. tant que l'assistant est utilisé, renouvelle la résidence un peu avant
+   l'expiration du `keep_alive` ;
+3. après `inactivite_max_s` sans activité, cesse de la renouveler : Ollama
+   décharge le modèle et libère la mémoire. La prochaine activité (un
+   résultat partiel de la reconnaissance suffit) relance le chargement.
+"""
+
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional, Union
+
+import requests
+
+from journal_evenements import JOURNAL
+from metriques import METRIQUES
+
+
+_DUREE_CHARGEMENT = METRIQUES.histogramme(
+    'assistant_ollama_chargement_secondes', "Durée d'une requête de chargement ou de rafraîchissement du modèle Ollama",
+    bornes=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0),
+)
+
+_FORMAT_DUREE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$')
+_UNITES = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0, None: 1.0}
+
+
+def duree_keep_alive(valeur: Union[str, int, float]) -> Optional[float]:
+    """
+    Convertit un `keep_alive` Ollama en secondes.
+
+    Args:
+        valeur: Nombre de secondes, ou durée ("30m", "1h", "45s") ; négatif = jamais déchargé
+
+    Returns:
+        float: Durée en secondes, None si le modèle n'est jamais déchargé
+
+    Raises:
+        ValueError: Si la durée n'est pas reconnue
+    """
+    if isinstance(valeur, (int, float)):
+        secondes = float(valeur)
+    else:
+        correspondance = _FORMAT_DUREE.match(str(valeur))
+        if correspondance is None:
+            raise ValueError(f"keep_alive non reconnu : {valeur!r}")
+        secondes = float(correspondance.group(1)) * _UNITES[correspondance.group(2)]
+    return None if secondes < 0 else secondes
+
+
+class ResidenceOllama:
+    """
+    Précharge le modèle Ollama et renouvelle sa résidence pendant l'utilisation.
+
+    Args:
+        client: ClientOllama partagé
+        modele: Fonction qui retourne le nom exact du modèle (résolu à chaque requête)
+        keep_alive: Résidence demandée à Ollama par chaque requête ("10m", 600, "-1"...)
+        inactivite_max_s: Durée sans activité après laquelle la résidence n'est plus renouvelée (None = jamais)
+        marge_s: Le renouvellement a lieu cette durée avant l'expiration du keep_alive
+        timeout_s: Délai maximal d'une requête de chargement (le premier chargement peut être long)
+        attente_echec_s: Attente avant une nouvelle tentative après un échec
+        options: Options Ollama des requêtes de chargement ; num_ctx doit être celui des classifications,
+            sinon Ollama recharge le modèle à la première d'entre elles
+        apres_chargement: Fonction appelée après chaque chargement (ex: évaluer le préfixe du prompt)
+    """
+
+    def __init__(
+        self,
+        client,
+        modele: Callable[[], str],
+        keep_alive: Union[str, int, float] = "10m",
+        inactivite_max_s: Optional[float] = 30 * 60,
+        marge_s: float = 60.0,
+        timeout_s: float = 120.0,
+        attente_echec_s: float = 30.0,
+        options: Optional[Dict] = None,
+        apres_chargement: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.client = client
+        self.modele = modele
+        self.keep_alive = keep_alive
+        self.keep_alive_s = duree_keep_alive(keep_alive)
+        self.inactivite_max_s = inactivite_max_s
+        self.marge_s = marge_s
+        self.timeout_s = timeout_s
+        self.attente_echec_s = attente_echec_s
+        self.options = options
+        self.apres_chargement = apres_chargement
+
+        self._verrou = threading.Lock()
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Instants (time.monotonic) de la dernière requête reçue par Ollama et de la dernière activité de l'utilisateur
+        self._derniere_requete: Optional[float] = None
+        self._derniere_activite = time.monotonic()
+        self._echec_jusqu_a = 0.0
+        self.charge = False
+
+        self.chargements = 0
+        self.rafraichissements = 0
+        self.expirations = 0
+        self.echecs = 0
+        self.duree_dernier_chargement_s: Optional[float] = None
+
+    # ---------- Requêtes ----------
+
+    def prechauffer(self, raison: str = 'chargement') -> Optional[float]:
+        """
+        Charge le modèle (ou renouvelle sa résidence) avec une requête au prompt vide.
+
+        Args:
+            raison: 'chargement' ou 'rafraichissement' (journal d'événements)
+
+        Returns:
+            float: Durée de la requête en secondes, None en cas d'échec
+        """
+        modele = self.modele()
+        debut = time.perf_counter()
+        payload = {'model': modele, 'prompt': '', 'keep_alive': self.keep_alive}
+        if self.options:
+            payload['options'] = self.options
+        try:
+            reponse = self.client.generer(payload, timeout=self.timeout_s)
+        except requests.exceptions.RequestException as e:
+            self.echecs += 1
+            self._echec_jusqu_a = time.monotonic() + self.attente_echec_s
+            JOURNAL.evenement('ollama.residence', f"⚠️  Chargement du modèle Ollama '{modele}' impossible : {e}",
+                              action='echec', raison=raison, modele=modele, erreur=str(e))
+            return None
+        duree = time.perf_counter() - debut
+        _DUREE_CHARGEMENT.observer(duree)
+
+        # load_duration (ns) : temps passé par Ollama à charger le modèle en mémoire (0 s'il l'était déjà)
+        chargement_s = reponse.get('load_duration', 0) / 1e9
+        with self._verrou:
+            self._derniere_requete = time.monotonic()
+            self.charge = True
+            if raison == 'chargement':
+                self.chargements += 1
+                self.duree_dernier_chargement_s = duree
+            else:
+                self.rafraichissements += 1
+        if raison == 'chargement':
+            message = f"🔥 Modèle Ollama '{modele}' prêt en {duree:.2f} s (chargement {chargement_s:.2f} s)"
+        else:
+            message = f"🔥 Résidence du modèle Ollama '{modele}' renouvelée ({1000 * duree:.0f} ms)"
+        JOURNAL.evenement('ollama.residence', message, action=raison, modele=modele,
+                          duree_ms=round(1000 * duree, 3), chargement_ms=round(1000 * chargement_s, 3))
+        if raison == 'chargement' and self.apres_chargement is not None:
+            try:
+                self.apres_chargement()
+            except Exception as e:
+                JOURNAL.evenement('erreur', f"⚠️  Préparation après chargement du modèle Ollama : {e}",
+                                  etage='residence_ollama', erreur=str(e))
+        return duree
+
+    def signaler_requete(self) -> None:
+        """À appeler après chaque requête de génération : Ollama vient de repartir pour un keep_alive complet."""
+        with self._verrou:
+            maintenant = time.monotonic()
+            self._derniere_requete = maintenant
+            self._derniere_activite = maintenant
+            self.charge = True
+        self._reveil.set()
+
+    def signaler_activite(self) -> None:
+        """
+        À appeler quand l'utilisateur parle : la résidence est renouvelée tant que l'assistant
+        est utilisé, et un modèle déchargé est rechargé avant que la commande ne l'attende.
+        """
+        self._derniere_activite = time.monotonic()
+        if not self.charge:
+            self._reveil.set()
+
+    # ---------- Planification ----------
+
+    def _inactif(self, maintenant: float) -> bool:
+        return self.inactivite_max_s is not None and maintenant - self._derniere_activite > self.inactivite_max_s
+
+    def _prochaine_action(self) -> Optional[float]:
+        """Effectue l'action due (chargement, renouvellement, expiration) et retourne l'attente avant la suivante."""
+        maintenant = time.monotonic()
+        if maintenant < self._echec_jusqu_a:
+            return self._echec_jusqu_a - maintenant
+
+        if not self.charge:
+            if self._inactif(maintenant):
+                # Personne n'utilise l'assistant : attendre une activité
+                return None
+            self.prechauffer('chargement')
+            return 0.0
+
+        if not self.keep_alive_s:
+            # keep_alive négatif : Ollama garde le modèle indéfiniment ; nul : déchargement voulu après chaque requête
+            return None
+        expiration = self._derniere_requete + self.keep_alive_s
+        marge = min(self.marge_s, self.keep_alive_s / 2)
+        if self._inactif(maintenant):
+            if maintenant >= expiration:
+                with self._verrou:
+                    self.charge = False
+                    self.expirations += 1
+                inactivite = maintenant - self._derniere_activite
+                JOURNAL.evenement('ollama.residence', f"💤 Modèle Ollama déchargé après {inactivite / 60:.0f} min d'inactivité",
+                                  action='expiration', inactivite_s=round(inactivite, 3))
+                return None
+            return expiration - maintenant
+        if maintenant >= expiration - marge:
+            self.prechauffer('rafraichissement')
+            return 0.0
+        return expiration - marge - maintenant
+
+    def _boucle(self) -> None:
+        while not self._arret.is_set():
+            try:
+                attente = self._prochaine_action()
+            except Exception as e:
+                JOURNAL.evenement('erreur', f"❌ Résidence du modèle Ollama : {e}", etage='residence_ollama', erreur=str(e))
+                attente = self.attente_echec_s
+            if attente == 0.0:
+                continue
+            self._reveil.wait(attente)
+            self._reveil.clear()
+
+    def demarrer(self) -> None:
+        """Lance le thread qui renouvelle la résidence du modèle (le chargement initial est fait par prechauffer())."""
+        if self._thread is not None:
+            return
+        self._arret.clear()
+        self._thread = threading.Thread(target=self._boucle, name="residence-ollama", daemon=True)
+        self._thread.start()
+
+    def arreter(self) -> None:
+        """Arrête le thread de planification (le modèle reste chargé jusqu'à l'expiration de son keep_alive)."""
+        self._arret.set()
+        self._reveil.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les compteurs du planificateur.
+
+        Returns:
+            dict: chargements, renouvellements, expirations, échecs, durée du dernier chargement, état
+        """
+        return {
+            'charge': self.charge,
+            'chargements': self.chargements,
+            'rafraichissements': self.rafraichissements,
+            'expirations': self.expirations,
+            'echecs': self.echecs,
+            'duree_dernier_chargement_s': self.duree_dernier_chargement_s,
+        }
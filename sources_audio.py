@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sources audio interchangeables pour le pipeline d'écoute.
+
+Toutes les sources livrent des blocs PCM 16 bits mono à la fréquence
+demandée (SAMPLE_RATE), quel que soit le format d'origine : microphone
+PyAudio, fichier WAV, flux PCM brut (fichier ou stdin). Les sources fichier
+peuvent être lues au rythme du temps réel (rejeu d'un enregistrement) ou
+aussi vite que possible (traitement hors ligne, machine sans carte son).
+"""
+
+import sys
+import time
+import wave
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+
+class Reechantillonneur:
+    """
+    Conversion en flux vers du PCM 16 bits mono : mixage des canaux et
+    rééchantillonnage par interpolation linéaire, sans discontinuité entre deux blocs.
+
+    Args:
+        frequence_source: Fréquence d'échantillonnage d'origine
+        frequence_cible: Fréquence voulue
+        canaux: Nombre de canaux entrelacés
+        largeur: Taille d'un échantillon en octets (1, 2, 3 ou 4)
+    """
+
+    def __init__(self, frequence_source: int, frequence_cible: int, canaux: int = 1, largeur: int = 2) -> None:
+        if largeur not in (1, 2, 3, 4):
+            raise ValueError(f"Taille d'échantillon non supportée : {largeur} octets")
+        self.frequence_source = frequence_source
+        self.frequence_cible = frequence_cible
+        self.canaux = canaux
+        self.largeur = largeur
+        self._pas = frequence_source / frequence_cible
+        # Position (en échantillons source) du prochain échantillon cible, relative au dernier échantillon gardé
+        self._position = 0.0
+        self._precedent: Optional[np.ndarray] = None
+        self._reste = b""
+
+    @property
+    def identite(self) -> bool:
+        """True si aucune conversion n'est nécessaire."""
+        return self.frequence_source == self.frequence_cible and self.canaux == 1 and self.largeur == 2
+
+    def _decoder(self, donnees: bytes) -> np.ndarray:
+        """Décode des octets PCM entrelacés en échantillons mono float32 (échelle int16)."""
+        if self.largeur == 1:
+            echantillons = (np.frombuffer(donnees, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+        elif self.largeur == 2:
+            echantillons = np.frombuffer(donnees, dtype='<i2').astype(np.float32)
+        elif self.largeur == 3:
+            octets = np.frombuffer(donnees, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            valeurs = octets[:, 0] | (octets[:, 1] << 8) | (octets[:, 2] << 16)
+            valeurs = np.where(valeurs & 0x800000, valeurs - 0x1000000, valeurs)
+            echantillons = valeurs.astype(np.float32) / 256.0
+        else:
+            echantillons = np.frombuffer(donnees, dtype='<i4').astype(np.float32) / 65536.0
+        if self.canaux > 1:
+            echantillons = echantillons.reshape(-1, self.canaux).mean(axis=1)
+        return echantillons
+
+    def convertir(self, donnees: bytes) -> bytes:
+        """
+        Convertit un bloc ; les octets d'une trame incomplète sont gardés pour le bloc suivant.
+
+        Args:
+            donnees: PCM au format source
+
+        Returns:
+            bytes: PCM 16 bits mono à la fréquence cible (peut être vide)
+        """
+        if self.identite:
+            return donnees
+        donnees = self._reste + donnees
+        taille_trame = self.canaux * self.largeur
+        utile = len(donnees) - len(donnees) % taille_trame
+        self._reste = donnees[utile:]
+        echantillons = self._decoder(donnees[:utile])
+        if len(echantillons) == 0:
+            return b""
+
+        if self.frequence_source != self.frequence_cible:
+            # Le dernier échantillon du bloc précédent sert de point d'ancrage à l'interpolation
+            if self._precedent is not None:
+                echantillons = np.concatenate((self._precedent, echantillons))
+                origine = self._position
+            else:
+                origine = 0.0
+            positions = np.arange(origine, len(echantillons) - 1, self._pas)
+            sortie = np.interp(positions, np.arange(len(echantillons)), echantillons)
+            suivante = positions[-1] + self._pas if len(positions) else origine
+            self._position = suivante - (len(echantillons) - 1)
+            self._precedent = echantillons[-1:]
+            echantillons = sortie
+
+        return np.clip(np.round(echantillons), -32768, 32767).astype('<i2').tobytes()
+
+
+class SourceAudio(ABC):
+    """
+    Interface commune des sources audio.
+
+    Args:
+        sample_rate: Fréquence des blocs livrés
+        taille_bloc: Nombre d'échantillons par bloc livré
+    """
+
+    # True si la source produit l'audio au rythme du temps réel (le pipeline peut alors abandonner
+    # des blocs en cas de retard) ; False si elle attend qu'on la lise (aucun bloc ne doit être perdu)
+    temps_reel = True
+
+    def __init__(self, sample_rate: int = 16000, taille_bloc: int = 4000) -> None:
+        self.sample_rate = sample_rate
+        self.taille_bloc = taille_bloc
+
+    def ouvrir(self) -> "SourceAudio":
+        return self
+
+    @abstractmethod
+    def lire(self) -> bytes:
+        """
+        Retourne le prochain bloc audio.
+
+        Returns:
+            bytes: PCM 16 bits mono de `taille_bloc` échantillons (moins pour le dernier), vide en fin de flux
+        """
+
+    def fermer(self) -> None:
+        pass
+
+    def __enter__(self) -> "SourceAudio":
+        return self.ouvrir()
+
+    def __exit__(self, *exc) -> None:
+        self.fermer()
+
+
+class SourceMicro(SourceAudio):
+    """
+    Microphone via PyAudio.
+
+    Args:
+        sample_rate: Fréquence des blocs livrés
+        taille_bloc: Nombre d'échantillons par bloc livré
+        frequence_capture: Fréquence d'ouverture du micro si le périphérique refuse `sample_rate`
+            (None = capture directe à `sample_rate`)
+        peripherique: Index du périphérique d'entrée PyAudio (None = périphérique par défaut)
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        taille_bloc: int = 4000,
+        frequence_capture: Optional[int] = None,
+        peripherique: Optional[int] = None,
+    ) -> None:
+        super().__init__(sample_rate, taille_bloc)
+        self.frequence_capture = frequence_capture or sample_rate
+        self.peripherique = peripherique
+        self._reechantillonneur = Reechantillonneur(self.frequence_capture, sample_rate)
+        self._trames_capture = max(1, round(taille_bloc * self.frequence_capture / sample_rate))
+        self._audio = None
+        self._flux = None
+
+    def ouvrir(self) -> "SourceMicro":
+        import pyaudio
+
+        self._audio = pyaudio.PyAudio()
+        self._flux = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.frequence_capture,
+            input=True,
+            input_device_index=self.peripherique,
+            frames_per_buffer=self._trames_capture,
+        )
+        return self
+
+    def lire(self) -> bytes:
+        data = self._flux.read(self._trames_capture, exception_on_overflow=False)
+        return self._reechantillonneur.convertir(data)
+
+    def fermer(self) -> None:
+        if self._flux is not None:
+            self._flux.stop_stream()
+            self._flux.close()
+            self._flux = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+
+class _SourceFichier(SourceAudio):
+    """
+    Base des sources lues depuis un fichier ou un tube, avec rythme temps réel optionnel.
+
+    Args:
+        sample_rate: Fréquence des blocs livrés
+        taille_bloc: Nombre d'échantillons par bloc livré
+        temps_reel: Si True, chaque bloc est livré au moment où il aurait été capté par un micro
+    """
+
+    def __init__(self, sample_rate: int, taille_bloc: int, temps_reel: bool) -> None:
+        super().__init__(sample_rate, taille_bloc)
+        self.temps_reel = temps_reel
+        self._reechantillonneur: Optional[Reechantillonneur] = None
+        self._tampon = b""
+        self._fin = False
+        self._debut: Optional[float] = None
+        self._echantillons_livres = 0
+
+    @abstractmethod
+    def _lire_brut(self) -> bytes:
+        """Lit le prochain morceau au format source ; vide en fin de fichier."""
+
+    def _taille_lecture(self) -> int:
+        """Nombre d'octets source correspondant à peu près à un bloc livré."""
+        reech = self._reechantillonneur
+        trames = max(1, round(self.taille_bloc * reech.frequence_source / reech.frequence_cible))
+        return trames * reech.canaux * reech.largeur
+
+    def lire(self) -> bytes:
+        taille = 2 * self.taille_bloc
+        while len(self._tampon) < taille and not self._fin:
+            brut = self._lire_brut()
+            if not brut:
+                self._fin = True
+                break
+            self._tampon += self._reechantillonneur.convertir(brut)
+
+        bloc, self._tampon = self._tampon[:taille], self._tampon[taille:]
+        if not bloc:
+            return b""
+
+        if self.temps_reel:
+            # Attendre l'instant où la fin de ce bloc aurait été captée
+            if self._debut is None:
+                self._debut = time.monotonic()
+            self._echantillons_livres += len(bloc) // 2
+            attente = self._debut + self._echantillons_livres / self.sample_rate - time.monotonic()
+            if attente > 0:
+                time.sleep(attente)
+        return bloc
+
+
+class SourceWav(_SourceFichier):
+    """
+    Fichier WAV PCM (8, 16, 24 ou 32 bits, mono ou multicanal, toute fréquence).
+
+    Args:
+        chemin: Fichier WAV
+        sample_rate: Fréquence des blocs livrés
+        taille_bloc: Nombre d'échantillons par bloc livré
+        temps_reel: Si False, le fichier est lu aussi vite que le pipeline le consomme
+    """
+
+    def __init__(self, chemin: str, sample_rate: int = 16000, taille_bloc: int = 4000, temps_reel: bool = True) -> None:
+        super().__init__(sample_rate, taille_bloc, temps_reel)
+        self.chemin = chemin
+        self._wav = None
+
+    def ouvrir(self) -> "SourceWav":
+        self._wav = wave.open(self.chemin, 'rb')
+        if self._wav.getcomptype() != 'NONE':
+            raise ValueError(f"{self.chemin} : seul le WAV PCM non compressé est supporté")
+        self._reechantillonneur = Reechantillonneur(
+            self._wav.getframerate(), self.sample_rate, self._wav.getnchannels(), self._wav.getsampwidth()
+        )
+        return self
+
+    def _lire_brut(self) -> bytes:
+        reech = self._reechantillonneur
+        return self._wav.readframes(self._taille_lecture() // (reech.canaux * reech.largeur))
+
+    def fermer(self) -> None:
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+class SourcePcm(_SourceFichier):
+    """
+    Flux PCM brut little-endian sans en-tête (fichier, tube, socket...).
+
+    Args:
+        flux: Flux binaire ouvert, ou chemin d'un fichier
+        frequence: Fréquence d'échantillonnage du flux
+        canaux: Nombre de canaux entrelacés
+        largeur: Taille d'un échantillon en octets
+        sample_rate: Fréquence des blocs livrés
+        taille_bloc: Nombre d'échantillons par bloc livré
+        temps_reel: Si False, le flux est lu aussi vite que le pipeline le consomme
+    """
+
+    def __init__(
+        self,
+        flux,
+        frequence: int = 16000,
+        canaux: int = 1,
+        largeur: int = 2,
+        sample_rate: int = 16000,
+        taille_bloc: int = 4000,
+        temps_reel: bool = False,
+    ) -> None:
+        super().__init__(sample_rate, taille_bloc, temps_reel)
+        self._source = flux
+        self._flux: Optional[BinaryIO] = None
+        self._ferme_a_la_fin = False
+        self._reechantillonneur = Reechantillonneur(frequence, sample_rate, canaux, largeur)
+
+    def ouvrir(self) -> "SourcePcm":
+        if isinstance(self._source, str):
+            self._flux = open(self._source, 'rb')
+            self._ferme_a_la_fin = True
+        else:
+            self._flux = self._source
+        return self
+
+    def _lire_brut(self) -> bytes:
+        # read1 rend ce qui est disponible sur un tube au lieu d'attendre un bloc complet
+        lecture = getattr(self._flux, 'read1', self._flux.read)
+        return lecture(self._taille_lecture())
+
+    def fermer(self) -> None:
+        if self._flux is not None and self._ferme_a_la_fin:
+            self._flux.close()
+        self._flux = None
+
+
+class SourceStdin(SourcePcm):
+    """
+    PCM brut lu sur l'entrée standard (ex: `arecord -f S16_LE -r 16000 | python assistant_spotify.py --source -`).
+
+    Args:
+        frequence: Fréquence d'échantillonnage du flux
+        canaux: Nombre de canaux entrelacés
+        largeur: Taille d'un échantillon en octets
+        sample_rate: Fréquence des blocs livrés
+        taille_bloc: Nombre d'échantillons par bloc livré
+        temps_reel: Si True, le flux est rythmé comme un micro (rejeu d'un fichier avec `cat`)
+    """
+
+    def __init__(
+        self,
+        frequence: int = 16000,
+        canaux: int = 1,
+        largeur: int = 2,
+        sample_rate: int = 16000,
+        taille_bloc: int = 4000,
+        temps_reel: bool = False,
+    ) -> None:
+        super().__init__(sys.stdin.buffer, frequence, canaux, largeur, sample_rate, taille_bloc, temps_reel)
+
+
+def creer_source(
+    description: str,
+    sample_rate: int = 16000,
+    taille_bloc: int = 4000,
+    temps_reel: bool = True,
+    frequence_pcm: int = 16000,
+    canaux_pcm: int = 1,
+) -> SourceAudio:
+    """
+    Construit une source audio à partir d'une description textuelle.
+
+    Args:
+        description: "micro", "-" (PCM brut sur stdin), "chemin.wav" ou "pcm:chemin" (PCM brut)
+        sample_rate: Fréquence des blocs livrés
+        taille_bloc: Nombre d'échantillons par bloc livré
+        temps_reel: Rythme temps réel pour les sources fichier (ignoré pour le micro)
+        frequence_pcm: Fréquence des flux PCM bruts (stdin, pcm:)
+        canaux_pcm: Nombre de canaux des flux PCM bruts
+
+    Returns:
+        SourceAudio: Source non encore ouverte
+    """
+    if description == 'micro':
+        return SourceMicro(sample_rate, taille_bloc)
+    if description == '-':
+        return SourceStdin(frequence_pcm, canaux_pcm, 2, sample_rate, taille_bloc, temps_reel)
+    if description.startswith('pcm:'):
+        return SourcePcm(description[4:], frequence_pcm, canaux_pcm, 2, sample_rate, taille_bloc, temps_reel)
+    if description.lower().endswith('.wav'):
+        return SourceWav(description, sample_rate, taille_bloc, temps_reel)
+    raise ValueError(f"Source audio inconnue : {description} (micro, -, fichier .wav ou pcm:fichier)")
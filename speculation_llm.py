@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Classification spéculative à partir des résultats partiels de Vosk.
+
+Quand un texte partiel est assez long et ne change plus, la requête de
+classification part en arrière-plan sans attendre la fin de l'énoncé.
+Si le texte final est le même (une fois normalisé), sa réponse est
+réutilisée ; si le texte diverge, la requête est annulée. Les succès, les
+échecs et le temps de LLM gaspillé sont comptés pour régler les seuils.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from cache_intentions import normaliser_texte
+from journal_evenements import JOURNAL
+
+
+class _Speculation:
+    """Une requête de classification lancée sur un texte partiel."""
+
+    def __init__(self, texte: str, cle: str) -> None:
+        self.texte = texte
+        self.cle = cle
+        self.annulation = threading.Event()
+        self.terminee = threading.Event()
+        self.intention: Optional[str] = None
+        self.debut = time.perf_counter()
+        self.fin: Optional[float] = None
+
+    def duree(self) -> float:
+        return (self.fin if self.fin is not None else time.perf_counter()) - self.debut
+
+
+class ClassificationSpeculative:
+    """
+    Lance la classification d'un texte partiel stable et la réutilise si le texte final correspond.
+
+    Args:
+        classifier: Fonction (texte, événement d'annulation) -> code d'intention (None si annulée ou en erreur)
+        necessite_llm: Fonction texte -> bool ; False si le texte n'a pas besoin du LLM (mots-clés, cache...)
+        longueur_min: Nombre minimal de mots du texte partiel
+        blocs_stables: Nombre de blocs supplémentaires pendant lesquels le partiel ne doit pas changer
+    """
+
+    def __init__(
+        self,
+        classifier: Callable[[str, threading.Event], Optional[str]],
+        necessite_llm: Callable[[str], bool],
+        longueur_min: int = 3,
+        blocs_stables: int = 1,
+    ) -> None:
+        self._classifier = classifier
+        self._necessite_llm = necessite_llm
+        self.longueur_min = longueur_min
+        self.blocs_stables = blocs_stables
+
+        self._verrou = threading.Lock()
+        self._en_cours: Optional[_Speculation] = None
+        self._partiel = ""
+        self._repetitions = 0
+
+        self.lancees = 0
+        self.hits = 0
+        self.misses = 0
+        self.annulees = 0
+        self.temps_gaspille_s = 0.0
+        self.temps_gagne_s = 0.0
+
+    def _executer(self, speculation: _Speculation) -> None:
+        try:
+            speculation.intention = self._classifier(speculation.texte, speculation.annulation)
+        except Exception as e:
+            JOURNAL.evenement('erreur', f"⚠️  Classification spéculative en échec : {e}", etage='speculation', erreur=str(e))
+            speculation.intention = None
+        finally:
+            speculation.fin = time.perf_counter()
+            speculation.terminee.set()
+
+    def _abandonner(self, speculation: _Speculation) -> None:
+        """Annule une spéculation devenue inutile (appelé avec le verrou)."""
+        if not speculation.terminee.is_set():
+            speculation.annulation.set()
+            self.annulees += 1
+        self.misses += 1
+        self.temps_gaspille_s += speculation.duree()
+
+    def observer_partiel(self, texte: str) -> None:
+        """
+        Prend en compte un résultat partiel (thread de reconnaissance).
+
+        Args:
+            texte: Texte partiel (nettoyé)
+        """
+        if not texte:
+            return
+        cle = normaliser_texte(texte)
+        # reprendre() et abandonner() remettent le partiel à zéro depuis d'autres threads
+        with self._verrou:
+            if texte != self._partiel:
+                self._partiel = texte
+                self._repetitions = 0
+            else:
+                self._repetitions += 1
+            repetitions = self._repetitions
+            en_cours = self._en_cours
+            if en_cours is not None:
+                if en_cours.cle == cle:
+                    return
+                # Le texte a divergé : la réponse en cours ne servira pas
+                self._abandonner(en_cours)
+                self._en_cours = None
+
+        if repetitions < self.blocs_stables or len(cle.split()) < self.longueur_min:
+            return
+        if not self._necessite_llm(texte):
+            return
+
+        speculation = _Speculation(texte, cle)
+        with self._verrou:
+            self._en_cours = speculation
+            self.lancees += 1
+        threading.Thread(target=self._executer, args=(speculation,), name="speculation-llm", daemon=True).start()
+
+    def reprendre(self, texte: str, timeout: float = 15) -> Optional[str]:
+        """
+        Récupère la réponse spéculative pour le texte final (thread d'analyse).
+
+        Args:
+            texte: Texte final transcrit
+            timeout: Attente maximale de la requête en cours, en secondes
+
+        Returns:
+            str: Code d'intention si une spéculation correspond au texte, None sinon
+        """
+        cle = normaliser_texte(texte)
+        with self._verrou:
+            speculation = self._en_cours
+            self._en_cours = None
+            self._partiel = ""
+            self._repetitions = 0
+            if speculation is None:
+                return None
+            if speculation.cle != cle:
+                self._abandonner(speculation)
+                return None
+
+        # Temps de LLM déjà écoulé au moment où le texte final arrive
+        deja_fait = speculation.duree()
+        if not speculation.terminee.wait(timeout) or speculation.intention is None:
+            with self._verrou:
+                self.misses += 1
+                self.temps_gaspille_s += speculation.duree()
+            return None
+
+        with self._verrou:
+            self.hits += 1
+            self.temps_gagne_s += deja_fait
+        return speculation.intention
+
+    def abandonner(self) -> None:
+        """Annule la spéculation en cours (énoncé vide, dictée...)."""
+        with self._verrou:
+            speculation = self._en_cours
+            self._en_cours = None
+            self._partiel = ""
+            self._repetitions = 0
+            if speculation is not None:
+                self._abandonner(speculation)
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les compteurs de la spéculation pour régler les seuils.
+
+        Returns:
+            dict: lancées, hits, misses, annulées, taux de succès, temps gaspillé et gagné (ms)
+        """
+        with self._verrou:
+            total = self.hits + self.misses
+            return {
+                'lancees': self.lancees,
+                'hits': self.hits,
+                'misses': self.misses,
+                'annulees': self.annulees,
+                'taux_hits': self.hits / total if total else 0.0,
+                'temps_gaspille_ms': 1000 * self.temps_gaspille_s,
+                'temps_gagne_ms': 1000 * self.temps_gagne_s,
+            }
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthèse vocale dans un thread dédié.
+
+Les appelants déposent leurs messages dans une file à priorités et
+reprennent la main immédiatement. Le thread vocal possède le moteur pyttsx3
+(qui doit rester sur le thread qui l'a créé), abandonne les messages
+périmés, fusionne les doublons et interrompt la phrase en cours lorsqu'un
+message plus prioritaire arrive (barge-in).
+
+Les phrases présentes dans le cache audio (voir cache_phrases.py) sont
+jouées directement depuis la mémoire au lieu d'être synthétisées. Leur rendu
+utilise le même moteur, donc le même thread : il ne commence que si aucun
+message n'attend, mais une réponse arrivée pendant un rendu attend qu'il se
+termine (une phrase courte, de l'ordre de quelques centaines de ms).
+"""
+
+import itertools
+import queue
+import threading
+import time
+import wave
+from typing import Callable, Dict, Iterable, Optional
+
+from journal_evenements import JOURNAL, enonce_courant
+from metriques import METRIQUES
+
+
+# Priorités des messages (plus petit = plus urgent)
+PRIORITE_HAUTE = 0     # Erreurs, questions à l'utilisateur
+PRIORITE_NORMALE = 1   # Confirmations d'action
+PRIORITE_BASSE = 2     # Messages d'accueil, informations
+_PRIORITE_RENDU = 3    # Mise en cache des phrases, quand l'assistant n'a rien d'autre à dire
+_PRIORITE_ARRET = -1
+
+_DUREE_PAROLE = METRIQUES.histogramme('assistant_tts_secondes', "Durée de prononciation d'un message")
+_ATTENTE_PAROLE = METRIQUES.histogramme('assistant_tts_attente_secondes', "Attente d'un message en file avant prononciation")
+
+
+class _Message:
+    def __init__(self, texte: str, priorite: int, rendu: bool = False) -> None:
+        self.texte = texte
+        self.priorite = priorite
+        self.rendu = rendu
+        self.horodatage = time.perf_counter()
+        self.termine = threading.Event()
+        # Remplacé par le même texte plus prioritaire : ignoré quand il sort de la file
+        self.annule = False
+        # Énoncé à l'origine du message (journal d'événements)
+        self.enonce = enonce_courant()
+
+
+class MoteurFactice:
+    """
+    Moteur TTS sans carte son, compatible avec l'interface pyttsx3 utilisée ici.
+
+    La "lecture" dure `duree_par_caractere` secondes par caractère et peut
+    être interrompue par stop(), comme un vrai moteur.
+
+    Args:
+        duree_par_caractere: Durée simulée de prononciation d'un caractère
+    """
+
+    def __init__(self, duree_par_caractere: float = 0.005) -> None:
+        self.duree_par_caractere = duree_par_caractere
+        self.prononces = []
+        self._textes = []
+        self._fichiers = []
+        self._rappels = {}
+        self._proprietes = {'voice': 'factice', 'rate': 150, 'volume': 1.0}
+        self._stop = threading.Event()
+
+    def connect(self, evenement: str, rappel: Callable) -> None:
+        self._rappels.setdefault(evenement, []).append(rappel)
+
+    def getProperty(self, nom: str):
+        return self._proprietes.get(nom)
+
+    def setProperty(self, nom: str, valeur) -> None:
+        self._proprietes[nom] = valeur
+
+    def say(self, texte: str) -> None:
+        self._textes.append(texte)
+
+    def save_to_file(self, texte: str, chemin: str) -> None:
+        self._fichiers.append((texte, chemin))
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def runAndWait(self) -> None:
+        self._stop.clear()
+        fichiers, self._fichiers = self._fichiers, []
+        for texte, chemin in fichiers:
+            # Silence de la durée de la phrase, en 16 bits mono à 16 kHz
+            with wave.open(chemin, 'wb') as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(16000)
+                wav.writeframes(b'\x00\x00' * int(16000 * self.duree_par_caractere * len(texte)))
+        textes, self._textes = self._textes, []
+        for texte in textes:
+            position = 0
+            for mot in texte.split():
+                for rappel in self._rappels.get('started-word', []):
+                    rappel(None, position, len(mot))
+                if self._stop.wait(self.duree_par_caractere * (len(mot) + 1)):
+                    return
+                position += len(mot) + 1
+            self.prononces.append(texte)
+
+
+class TravailleurVocal:
+    """
+    Thread vocal avec file à priorités.
+
+    Args:
+        fabrique_moteur: Fonction qui crée le moteur TTS (appelée dans le thread vocal)
+        age_max_s: Âge au-delà duquel un message non prioritaire n'est plus prononcé
+        cache_phrases: Cache audio des phrases fixes (CachePhrases), optionnel
+        lecteur: Sortie audio des phrases en cache (LecteurAudio), requise avec cache_phrases
+    """
+
+    def __init__(
+        self,
+        fabrique_moteur: Callable[[], object],
+        age_max_s: float = 10.0,
+        cache_phrases=None,
+        lecteur=None,
+    ) -> None:
+        self._fabrique_moteur = fabrique_moteur
+        self.age_max_s = age_max_s
+        self.cache_phrases = cache_phrases
+        self.lecteur = lecteur
+
+        self._file: queue.PriorityQueue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._verrou = threading.Lock()
+        self._en_attente: Dict[str, _Message] = {}
+        self._en_cours: Optional[_Message] = None
+        self._interrompre = threading.Event()
+        self._arret = threading.Event()
+        self._pret = threading.Event()
+        self._inactif = threading.Event()
+        self._inactif.set()
+        self._erreur_init: Optional[Exception] = None
+        self._thread: Optional[threading.Thread] = None
+        self.moteur = None
+
+        self._stats = {
+            'messages': 0,
+            'prononces': 0,
+            'fusionnes': 0,
+            'perimes': 0,
+            'interrompus': 0,
+            'depuis_cache': 0,
+            'attente_totale_s': 0.0,
+            'attente_max_s': 0.0,
+            'parole_totale_s': 0.0,
+        }
+
+    # ---------- Cycle de vie ----------
+
+    def demarrer(self, timeout: float = 10.0) -> 'TravailleurVocal':
+        """
+        Lance le thread vocal et attend que le moteur soit prêt.
+
+        Raises:
+            RuntimeError: Si le moteur n'a pas pu être initialisé
+        """
+        self._thread = threading.Thread(target=self._boucle, name="synthese-vocale", daemon=True)
+        self._thread.start()
+        if not self._pret.wait(timeout):
+            raise RuntimeError("Le moteur de synthèse vocale ne répond pas")
+        if self._erreur_init is not None:
+            raise RuntimeError(f"Initialisation du moteur impossible : {self._erreur_init}")
+        return self
+
+    def arreter(self, vider: bool = True, timeout: float = 10.0) -> None:
+        """
+        Arrête le thread vocal.
+
+        Args:
+            vider: Prononcer d'abord les messages déjà en file
+            timeout: Attente maximale en secondes
+        """
+        if vider:
+            self.attendre_silence(timeout)
+        else:
+            self.interrompre()
+        self._arret.set()
+        self._file.put((_PRIORITE_ARRET, next(self._sequence), None))
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.lecteur is not None:
+            self.lecteur.fermer()
+
+    # ---------- API appelants ----------
+
+    def dire(self, texte: str, priorite: int = PRIORITE_NORMALE, attendre: bool = False) -> None:
+        """
+        Met un message en file et rend la main immédiatement.
+
+        Args:
+            texte: Texte à prononcer
+            priorite: PRIORITE_HAUTE, PRIORITE_NORMALE ou PRIORITE_BASSE
+            attendre: Bloquer jusqu'à la fin de la prononciation (ex: avant d'écouter une réponse)
+        """
+        if not texte:
+            return
+        with self._verrou:
+            self._stats['messages'] += 1
+            # Même texte déjà en attente : une seule prononciation suffit
+            existant = self._en_attente.get(texte)
+            if existant is not None and existant.priorite > priorite:
+                # Le message moins prioritaire reste dans la file : il sera ignoré à sa sortie
+                existant.annule = True
+                self._stats['fusionnes'] += 1
+                existant = None
+            # Barge-in : un message plus urgent coupe la phrase en cours
+            en_cours = self._en_cours
+            if en_cours is not None and priorite < en_cours.priorite:
+                self._couper_en_cours()
+
+            if existant is not None:
+                self._stats['fusionnes'] += 1
+                message = existant
+            else:
+                message = _Message(texte, priorite)
+                self._en_attente[texte] = message
+                self._inactif.clear()
+                self._file.put((priorite, next(self._sequence), message))
+
+        if attendre:
+            message.termine.wait()
+
+    def precalculer(self, textes: Iterable[str]) -> int:
+        """
+        Demande la mise en cache audio de phrases, pendant les silences de l'assistant.
+
+        Chaque rendu occupe le moteur le temps d'une phrase : un message déposé pendant ce temps attend la fin du rendu.
+
+        Args:
+            textes: Phrases à rendre (celles déjà en cache sont ignorées)
+
+        Returns:
+            int: Nombre de phrases mises en file de rendu
+        """
+        if self.cache_phrases is None:
+            return 0
+        textes = list(textes)
+        for texte in textes:
+            self._file.put((_PRIORITE_RENDU, next(self._sequence), _Message(texte, _PRIORITE_RENDU, rendu=True)))
+        if textes:
+            # Message de fin de série : enregistre l'index du cache
+            self._file.put((_PRIORITE_RENDU, next(self._sequence), _Message('', _PRIORITE_RENDU, rendu=True)))
+        return len(textes)
+
+    def interrompre(self) -> None:
+        """Coupe la phrase en cours et abandonne tous les messages en attente."""
+        with self._verrou:
+            self._vider_file()
+            self._couper_en_cours()
+            self._signaler_inactivite()
+
+    def attendre_silence(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend que tous les messages en file aient été prononcés.
+
+        Returns:
+            bool: True si l'assistant est silencieux
+        """
+        return self._inactif.wait(timeout)
+
+    def statistiques(self) -> Dict:
+        """
+        Retourne les compteurs du thread vocal et les latences mesurées
+        (attente en file avant prononciation, durée de parole).
+        """
+        with self._verrou:
+            stats = dict(self._stats)
+        prononces = stats['prononces']
+        stats['attente_moyenne_ms'] = 1000 * stats['attente_totale_s'] / prononces if prononces else 0.0
+        stats['attente_max_ms'] = 1000 * stats['attente_max_s']
+        stats['parole_moyenne_ms'] = 1000 * stats['parole_totale_s'] / prononces if prononces else 0.0
+        stats['en_file'] = self._file.qsize()
+        return stats
+
+    # ---------- Thread vocal ----------
+
+    def _vider_file(self) -> None:
+        while True:
+            try:
+                element = self._file.get_nowait()
+            except queue.Empty:
+                break
+            message = element[2]
+            if message is not None and message.rendu:
+                # Les rendus (toujours en fin de file) ne sont pas des paroles : on les garde
+                self._file.put(element)
+                break
+            if message is not None:
+                self._retirer_attente(message)
+                message.termine.set()
+
+    def _retirer_attente(self, message: _Message) -> None:
+        # Le même texte peut avoir été remis en file avec une priorité plus haute : ne retirer que ce message-ci
+        if self._en_attente.get(message.texte) is message:
+            del self._en_attente[message.texte]
+
+    def _couper_en_cours(self) -> None:
+        # Le moteur est stoppé depuis son propre thread, au prochain mot (voir _sur_mot)
+        if self._en_cours is not None:
+            self._interrompre.set()
+
+    def _sur_mot(self, *args) -> None:
+        # Appelé par le moteur dans le thread vocal : seul endroit sûr pour stopper pyttsx3
+        if self._interrompre.is_set():
+            self.moteur.stop()
+
+    def _boucle(self) -> None:
+        try:
+            self.moteur = self._fabrique_moteur()
+            self.moteur.connect('started-word', self._sur_mot)
+        except Exception as e:
+            self._erreur_init = e
+            self._pret.set()
+            return
+        if self.cache_phrases is not None:
+            try:
+                self.cache_phrases.configurer(
+                    self.moteur.getProperty('voice'),
+                    self.moteur.getProperty('rate'),
+                    self.moteur.getProperty('volume'),
+                )
+            except Exception as e:
+                print(f"⚠️  Cache audio des phrases désactivé : {e}")
+                self.cache_phrases = None
+        self._pret.set()
+
+        while not self._arret.is_set():
+            _, _, message = self._file.get()
+            if message is None:
+                continue
+            if message.rendu:
+                self._rendre(message)
+                continue
+
+            with self._verrou:
+                if message.annule:
+                    # Déjà prononcé (ou en file) avec une priorité plus haute
+                    message.termine.set()
+                    continue
+                self._retirer_attente(message)
+                attente = time.perf_counter() - message.horodatage
+                if message.priorite != PRIORITE_HAUTE and attente > self.age_max_s:
+                    # Réponse périmée (ex: confirmation d'une commande d'il y a longtemps)
+                    self._stats['perimes'] += 1
+                    message.termine.set()
+                    self._signaler_inactivite()
+                    continue
+                self._en_cours = message
+                self._interrompre.clear()
+
+            debut = time.perf_counter()
+            try:
+                self.prononcer(message.texte)
+            except Exception as e:
+                JOURNAL.evenement('erreur', f"❌ Erreur lors de la synthèse vocale : {e}", enonce=message.enonce,
+                                  etage='voix', erreur=str(e))
+            duree = time.perf_counter() - debut
+            _DUREE_PAROLE.observer(duree)
+            _ATTENTE_PAROLE.observer(attente)
+            JOURNAL.evenement('tts', enonce=message.enonce, texte=message.texte, attente_ms=round(1000 * attente, 3),
+                              duree_ms=round(1000 * duree, 3), interrompu=self._interrompre.is_set())
+
+            with self._verrou:
+                self._en_cours = None
+                if self._interrompre.is_set():
+                    self._stats['interrompus'] += 1
+                self._stats['prononces'] += 1
+                self._stats['attente_totale_s'] += attente
+                self._stats['attente_max_s'] = max(self._stats['attente_max_s'], attente)
+                self._stats['parole_totale_s'] += duree
+                message.termine.set()
+                self._signaler_inactivite()
+
+    def _rendre(self, message: _Message) -> None:
+        if self.cache_phrases is None:
+            return
+        if not message.texte:
+            self.cache_phrases.terminer_rendu()
+            return
+        self._interrompre.clear()
+        self.cache_phrases.rendre(self.moteur, message.texte)
+
+    def prononcer(self, texte: str) -> None:
+        """Prononce un texte avec le moteur (appelé uniquement depuis le thread vocal)."""
+        if self.cache_phrases is not None and self.lecteur is not None:
+            phrase = self.cache_phrases.audio(texte)
+            if phrase is not None:
+                self._stats['depuis_cache'] += 1
+                self.lecteur.jouer(phrase, self._interrompre)
+                return
+        self.moteur.say(texte)
+        self.moteur.runAndWait()
+
+    def _signaler_inactivite(self) -> None:
+        # Les rendus en file ne comptent pas : seul ce qui doit être prononcé compte
+        if not self._en_attente and self._en_cours is None:
+            self._inactif.set()
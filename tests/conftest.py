@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration commune des tests.
+
+Les modules de l'assistant sont à la racine du dépôt ; les tests qui parlent
+à Ollama utilisent le faux serveur d'ollama_factice, sans Ollama ni modèle.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client_ollama import ClientOllama  # noqa: E402
+from ollama_factice import ServeurOllamaFactice  # noqa: E402
+
+
+@pytest.fixture
+def serveur():
+    """Faux serveur Ollama répondant IGNORE, sans latence."""
+    with ServeurOllamaFactice(reponse='IGNORE') as serveur:
+        yield serveur
+
+
+@pytest.fixture
+def client(serveur):
+    """Client Ollama connecté au faux serveur, sans attente entre deux tentatives."""
+    client = ClientOllama(serveur.url_base, facteur_attente=0)
+    yield client
+    client.fermer()
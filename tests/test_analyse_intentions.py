@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'analyse d'intention de l'assistant, contre le faux serveur Ollama."""
+
+import pytest
+
+import analyse_intentions as intentions
+from client_ollama import ClientOllama
+from ollama_factice import ServeurOllamaFactice
+
+
+@pytest.fixture
+def ollama(serveur, monkeypatch):
+    """Analyse d'intention branchée sur le faux serveur, avec deux logiciels."""
+    client_origine = intentions.CLIENT_OLLAMA
+    intentions.changer_client_ollama(ClientOllama(serveur.url_base, facteur_attente=0))
+    monkeypatch.setattr(intentions, 'OLLAMA_MODEL_ACTUAL', serveur.modeles[0])
+    monkeypatch.setattr(intentions, 'SOFTWARE_DB', {'discord': 'discord.lnk', 'firefox': 'firefox.lnk'})
+    monkeypatch.setattr(intentions, 'SOFTWARE_DB_VERSION', intentions.SOFTWARE_DB_VERSION + 1000)
+    yield serveur
+    intentions.CLIENT_OLLAMA.fermer()
+    intentions.changer_client_ollama(client_origine)
+
+
+def test_classifier_ollama_confiance(ollama):
+    catalogue = intentions.catalogue_classification()
+    ollama.reponse = catalogue.codes['LAUNCH_SOFTWARE:firefox']
+
+    intention, confiance = intentions.classifier_ollama_confiance("mets-moi le navigateur")
+
+    assert intention == 'LAUNCH_SOFTWARE:firefox'
+    assert 0 < confiance <= 1
+    # Préparation du préfixe puis classification, toutes deux sur le faux serveur
+    assert len(ollama.requetes) == 2
+    assert ollama.requetes[0]['prompt'] == catalogue.instructions
+    assert ollama.requetes[1]['context']
+    assert "mets-moi le navigateur" in ollama.requetes[1]['prompt']
+
+
+def test_le_prefixe_suit_le_client(ollama):
+    intentions.classifier_ollama_confiance("mets-moi le navigateur")
+
+    # Un nouveau serveur ne connaît pas le contexte de l'ancien : le préfixe y est réévalué
+    with ServeurOllamaFactice(reponse='0') as autre:
+        intentions.CLIENT_OLLAMA.fermer()
+        intentions.changer_client_ollama(ClientOllama(autre.url_base, facteur_attente=0))
+        intentions.classifier_ollama_confiance("mets-moi le navigateur")
+        intentions.CLIENT_OLLAMA.fermer()
+
+    assert len(autre.requetes) == 2
+    assert len(ollama.requetes) == 2
+
+
+def test_empreinte_cache_suit_la_classification(ollama, monkeypatch):
+    codes = intentions.empreinte_cache()
+    assert intentions.empreinte_cache() == codes
+
+    monkeypatch.setattr(intentions, 'SOFTWARE_DB', {'discord': 'discord.lnk'})
+    monkeypatch.setattr(intentions, 'SOFTWARE_DB_VERSION', intentions.SOFTWARE_DB_VERSION + 1)
+    autres_logiciels = intentions.empreinte_cache()
+    assert autres_logiciels != codes
+
+    monkeypatch.setattr(intentions, 'OLLAMA_PREFIXE', 'systeme')
+    assert intentions.empreinte_cache() not in (codes, autres_logiciels)
+
+
+def test_speculation_incertaine_ecartee(ollama):
+    catalogue = intentions.catalogue_classification()
+    ollama.reponse = catalogue.codes['LAUNCH_SOFTWARE:firefox']
+
+    assert intentions.classifier_ollama("mets-moi le navigateur") == 'LAUNCH_SOFTWARE:firefox'
+
+    # Sous le seuil de l'étage 'ollama' : ni IGNORE retenu par la cascade, ni entrée de cache
+    ollama.logprob_token = -5.0
+    assert intentions.classifier_ollama("mets-moi le navigateur") is None
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'index incrémental du dossier des raccourcis."""
+
+import os
+
+import pytest
+
+from base_raccourcis import BaseRaccourcis
+
+
+def creer(chemin):
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    chemin.write_text('')
+    avancer_mtime(chemin.parent)
+
+
+def avancer_mtime(dossier):
+    """Garantit une date de modification différente, quelle que soit la résolution du système de fichiers."""
+    mtime = os.stat(dossier).st_mtime + 10
+    os.utime(dossier, (mtime, mtime))
+
+
+@pytest.fixture
+def raccourcis(tmp_path):
+    dossier = tmp_path / 'shortcuts'
+    creer(dossier / 'Spotify_shortcut.lnk')
+    creer(dossier / 'jeux' / 'Steam.url')
+    creer(dossier / 'notes.txt')
+    return dossier
+
+
+def test_premier_parcours(raccourcis):
+    base = BaseRaccourcis(str(raccourcis))
+    evenements = []
+    base.abonner(lambda version, ajoutes, retires: evenements.append((version, ajoutes, retires)))
+
+    assert base.rescanner() is True
+    assert sorted(base.logiciels()) == ['spotify', 'steam']
+    assert base.logiciels()['steam'] == os.path.join(str(raccourcis), 'jeux', 'Steam.url')
+    assert evenements == [(1, ['spotify', 'steam'], [])]
+
+
+def test_dossiers_inchanges_non_relus(raccourcis):
+    base = BaseRaccourcis(str(raccourcis))
+    base.rescanner()
+    relus = base.dossiers_relus
+
+    assert base.rescanner() is False
+    assert base.dossiers_relus == relus
+    assert base.version == 1
+
+
+def test_seul_le_dossier_modifie_est_relu(raccourcis):
+    base = BaseRaccourcis(str(raccourcis))
+    evenements = []
+    base.abonner(lambda version, ajoutes, retires: evenements.append((version, ajoutes, retires)))
+    base.rescanner()
+    relus = base.dossiers_relus
+
+    creer(raccourcis / 'jeux' / 'Discord_shortcut.lnk')
+    assert base.rescanner() is True
+    assert base.dossiers_relus == relus + 1
+
+    (raccourcis / 'Spotify_shortcut.lnk').unlink()
+    avancer_mtime(raccourcis)
+    assert base.rescanner() is True
+
+    assert sorted(base.logiciels()) == ['discord', 'steam']
+    assert evenements[1:] == [(2, ['discord'], []), (3, [], ['spotify'])]
+
+
+def test_reprise_depuis_le_cache(raccourcis, tmp_path):
+    cache = str(tmp_path / 'cache_raccourcis.json')
+    BaseRaccourcis(str(raccourcis), chemin_cache=cache).rescanner()
+
+    base = BaseRaccourcis(str(raccourcis), chemin_cache=cache)
+    assert base.charger() == 2
+    # Rien n'a changé depuis le lancement précédent : aucun dossier relu
+    base.rescanner()
+    assert base.dossiers_relus == 0
+    assert sorted(base.logiciels()) == ['spotify', 'steam']
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Tests du cache des intentions classifiées par le LLM."""
+
+import time
+
+from cache_intentions import CacheIntentions, empreinte_classification, empreinte_logiciels, normaliser_texte
+
+
+def test_normaliser_texte():
+    assert normaliser_texte("Euh, Mets la Musique SUIVANTE !") == normaliser_texte("mets la musique suivante")
+    assert normaliser_texte("précédente") == "precedente"
+
+
+def test_hit_et_miss():
+    cache = CacheIntentions()
+
+    assert cache.obtenir("passe à la suivante", 'mistral', 'v1') is None
+    cache.enregistrer("passe à la suivante", 'mistral', 'v1', 'NEXT_SONG')
+
+    assert cache.obtenir("Passe à la suivante !", 'mistral', 'v1') == 'NEXT_SONG'
+    statistiques = cache.statistiques()
+    assert (statistiques['hits'], statistiques['misses']) == (1, 1)
+    assert statistiques['taux_hits'] == 0.5
+
+
+def test_cle_depend_du_modele_et_des_logiciels():
+    cache = CacheIntentions()
+    cache.enregistrer("ouvre l'éditeur", 'mistral', 'v1', 'LAUNCH_SOFTWARE:code')
+
+    assert cache.obtenir("ouvre l'éditeur", 'llama3', 'v1') is None
+    assert cache.obtenir("ouvre l'éditeur", 'mistral', 'v2') is None
+
+
+def test_empreinte_logiciels():
+    assert empreinte_logiciels(['code', 'obs']) == empreinte_logiciels(['obs', 'code'])
+    assert empreinte_logiciels(['code']) != empreinte_logiciels(['code', 'obs'])
+
+
+def test_eviction_lru():
+    cache = CacheIntentions(capacite=2)
+    cache.enregistrer("un", 'm', 'v', 'A')
+    cache.enregistrer("deux", 'm', 'v', 'B')
+    # "un" devient le plus récemment utilisé : "deux" est évincé
+    cache.obtenir("un", 'm', 'v')
+    cache.enregistrer("trois", 'm', 'v', 'C')
+
+    assert cache.contient("un", 'm', 'v')
+    assert not cache.contient("deux", 'm', 'v')
+    assert cache.statistiques()['evictions'] == 1
+
+
+def test_expiration():
+    cache = CacheIntentions(ttl_s=0.05)
+    cache.enregistrer("stop", 'm', 'v', 'PLAY_PAUSE')
+    time.sleep(0.1)
+
+    assert cache.obtenir("stop", 'm', 'v') is None
+    assert cache.statistiques()['expirations'] == 1
+
+
+def test_persistance(tmp_path):
+    chemin = str(tmp_path / 'cache_intentions.json')
+    cache = CacheIntentions(chemin=chemin)
+    cache.enregistrer("monte le son", 'm', 'v', 'VOLUME_UP')
+    cache.sauvegarder()
+
+    recharge = CacheIntentions(chemin=chemin)
+    assert recharge.charger() == 1
+    assert recharge.obtenir("monte le son", 'm', 'v') == 'VOLUME_UP'
+
+
+def test_sauvegarde_automatique(tmp_path):
+    chemin = tmp_path / 'cache_intentions.json'
+    cache = CacheIntentions(chemin=str(chemin), sauvegarde_toutes=2)
+    cache.enregistrer("un", 'm', 'v', 'A')
+    assert not chemin.exists()
+    cache.enregistrer("deux", 'm', 'v', 'B')
+    assert chemin.exists()
+
+
+def test_fichier_illisible(tmp_path):
+    chemin = tmp_path / 'cache_intentions.json'
+    chemin.write_text('{pas du json', encoding='utf-8')
+
+    assert CacheIntentions(chemin=str(chemin)).charger() == 0
+
+
+def test_empreinte_classification():
+    reference = empreinte_classification('abc', 'codes/contexte', "Réponds par un code.")
+
+    assert empreinte_classification('abc', 'codes/contexte', "Réponds par un code.") == reference
+    assert empreinte_classification('abd', 'codes/contexte', "Réponds par un code.") != reference
+    assert empreinte_classification('abc', 'spotify/contexte', "Réponds par un code.") != reference
+    assert empreinte_classification('abc', 'codes/contexte', "Réponds par un label.") != reference
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Tests de la cascade de classification d'intention."""
+
+import threading
+import time
+
+from cascade_intentions import CascadeIntentions, EtageCascade
+from classification_llm import classifier_en_flux
+from client_ollama import ClientOllama
+from detection_mots_cles import DetecteurMotsCles
+from ollama_factice import ServeurOllamaFactice
+
+
+def etage_fixe(proposition):
+    """Étage qui propose toujours la même chose."""
+    appels = []
+
+    def fonction(texte, annulation):
+        appels.append(texte)
+        return proposition
+
+    fonction.appels = appels
+    return fonction
+
+
+def test_premier_etage_qui_conclut():
+    detecteur = DetecteurMotsCles(['discord'])
+
+    def mots_cles(texte, annulation):
+        intention = detecteur.detecter(texte)
+        return (intention, None) if intention else None
+
+    secours = etage_fixe(('IGNORE', None))
+    cascade = CascadeIntentions([EtageCascade('mots_cles', mots_cles), EtageCascade('secours', secours)])
+
+    resultat = cascade.analyser("ouvre discord")
+    assert (resultat.intention, resultat.etage) == ('LAUNCH_SOFTWARE:discord', 'mots_cles')
+    assert secours.appels == []
+
+    resultat = cascade.analyser("quelle heure est-il")
+    assert (resultat.intention, resultat.etage) == ('IGNORE', 'secours')
+
+    etages = cascade.statistiques()['etages']
+    assert etages['mots_cles']['retenue'] == 1 and etages['mots_cles']['vide'] == 1
+    assert etages['mots_cles']['part_analyses'] == 0.5
+
+
+def test_proposition_sous_le_seuil():
+    cascade = CascadeIntentions([
+        EtageCascade('exemples', etage_fixe(('NEXT_SONG', 0.4)), seuil=0.8),
+        EtageCascade('llm', etage_fixe(('PREVIOUS_SONG', 0.9)), seuil=0.8),
+    ])
+
+    resultat = cascade.analyser("reviens en arrière")
+    assert (resultat.intention, resultat.etage, resultat.confiance) == ('PREVIOUS_SONG', 'llm', 0.9)
+    assert cascade.etage('exemples').statistiques()['sous_seuil'] == 1
+
+
+def test_aucun_etage_ne_conclut():
+    cascade = CascadeIntentions([EtageCascade('vide', etage_fixe(None))])
+
+    assert cascade.analyser("bonjour") is None
+    assert cascade.statistiques()['non_resolues'] == 1
+
+
+def test_erreur_passe_a_l_etage_suivant():
+    def en_panne(texte, annulation):
+        raise RuntimeError("Ollama injoignable")
+
+    cascade = CascadeIntentions([
+        EtageCascade('panne', en_panne),
+        EtageCascade('panne_budget', en_panne, budget_s=1),
+        EtageCascade('secours', etage_fixe(('IGNORE', None))),
+    ])
+
+    assert cascade.analyser("bonjour").etage == 'secours'
+    assert cascade.etage('panne').statistiques()['erreur'] == 1
+    assert cascade.etage('panne_budget').statistiques()['erreur'] == 1
+
+
+def test_depassement_du_budget_annule_l_etage():
+    annulations = []
+
+    def lent(texte, annulation):
+        annulations.append(annulation)
+        annulation.wait(5)
+        return ('NEXT_SONG', None)
+
+    cascade = CascadeIntentions([EtageCascade('lent', lent, budget_s=0.05),
+                                 EtageCascade('secours', etage_fixe(('IGNORE', None)))])
+
+    debut = time.perf_counter()
+    resultat = cascade.analyser("passe")
+    assert time.perf_counter() - debut < 1
+    assert resultat.etage == 'secours'
+    assert annulations[0].is_set()
+    assert cascade.etage('lent').statistiques()['depassement'] == 1
+
+
+def test_etage_llm_hors_budget_arrete_la_generation():
+    """Un étage LLM annulé ferme son flux : le faux serveur cesse de produire des tokens."""
+    with ServeurOllamaFactice(reponse='mot ' * 50 + 'NEXT_SONG', latence_token_s=0.02) as serveur:
+        client = ClientOllama(serveur.url_base)
+        termine = threading.Event()
+
+        def llm(texte, annulation):
+            try:
+                payload = {'model': 'mistral:latest', 'prompt': f"Texte: {texte}\n\nRéponse:"}
+                intention, _ = classifier_en_flux(client, payload, annulation=annulation)
+                return (intention, None) if intention else None
+            finally:
+                termine.set()
+
+        cascade = CascadeIntentions([EtageCascade('llm', llm, budget_s=0.1)])
+        try:
+            assert cascade.analyser("mets la suite") is None
+            assert termine.wait(2)
+            # Laisser au serveur le temps de constater la fermeture
+            time.sleep(0.2)
+            envoyes = serveur.tokens_envoyes
+            time.sleep(0.2)
+
+            assert envoyes < 20
+            assert serveur.tokens_envoyes == envoyes
+            assert cascade.etage('llm').statistiques()['depassement'] == 1
+        finally:
+            client.fermer()
+
+
+def test_etage_llm_dans_le_budget(client):
+    def llm(texte, annulation):
+        payload = {'model': 'mistral:latest', 'prompt': f"Texte: {texte}\n\nRéponse:"}
+        intention, _ = classifier_en_flux(client, payload, annulation=annulation)
+        return (intention, None) if intention else None
+
+    cascade = CascadeIntentions([EtageCascade('llm', llm, budget_s=5)])
+
+    resultat = cascade.analyser("raconte une blague")
+    assert (resultat.intention, resultat.etage) == ('IGNORE', 'llm')
+    statistiques = cascade.etage('llm').statistiques()
+    assert statistiques['taux_reussite'] == 1.0
+    assert 0 < statistiques['duree_moyenne_ms'] <= statistiques['duree_max_ms']
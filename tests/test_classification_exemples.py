@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'index des phrases d'exemple (construction incrémentale, classement par similarité)."""
+
+import pytest
+
+from classification_exemples import EmbeddeurNgrammes, IndexExemples, exemples_intentions
+
+EXEMPLES = {
+    'NEXT_SONG': ["musique suivante", "passe au morceau suivant"],
+    'VOLUME_UP': ["monte le son", "plus fort"],
+}
+
+
+@pytest.fixture
+def couples():
+    return exemples_intentions(['discord'], EXEMPLES)
+
+
+def test_exemples_intentions(couples):
+    assert couples == sorted(set(couples))
+    assert ('NEXT_SONG', "musique suivante") in couples
+    assert any(intention == 'LAUNCH_SOFTWARE:discord' for intention, _ in couples)
+
+
+def test_construire_puis_classer(tmp_path, couples):
+    index = IndexExemples(str(tmp_path), EmbeddeurNgrammes())
+
+    assert index.construire(couples) == len(couples)
+    assert len(index) == len(couples)
+
+    # Formule de politesse retirée à la normalisation : identique à un exemple
+    intention, similarite, marge = index.classer("musique suivante s'il te plaît")
+    assert intention == 'NEXT_SONG'
+    assert similarite == pytest.approx(1, abs=1e-5)
+    assert 0 < marge < similarite
+
+    assert index.classer("monte un peu le son")[0] == 'VOLUME_UP'
+
+
+def test_index_vide(tmp_path):
+    index = IndexExemples(str(tmp_path), EmbeddeurNgrammes())
+
+    assert index.classer("musique suivante") is None
+
+
+def test_reprise_sans_revectoriser(tmp_path, couples):
+    IndexExemples(str(tmp_path), EmbeddeurNgrammes()).construire(couples)
+
+    index = IndexExemples(str(tmp_path), EmbeddeurNgrammes())
+    assert index.construire(couples) == 0
+    assert index.vectorisations == 0
+    assert index.classer("plus fort")[0] == 'VOLUME_UP'
+
+
+def test_seules_les_nouvelles_phrases_sont_vectorisees(tmp_path, couples):
+    IndexExemples(str(tmp_path), EmbeddeurNgrammes()).construire(couples)
+
+    index = IndexExemples(str(tmp_path), EmbeddeurNgrammes())
+    etendus = exemples_intentions(['discord', 'firefox'], EXEMPLES)
+    nouveaux = len(etendus) - len(couples)
+
+    assert index.construire(etendus) == nouveaux
+    assert index.vectorisations == nouveaux
+    assert index.classer("lance firefox")[0] == 'LAUNCH_SOFTWARE:firefox'
+    # Une seule matrice conservée dans le dossier
+    assert len(list(tmp_path.glob('exemples-*.npy'))) == 1
+
+
+def test_autre_embeddeur_reconstruit(tmp_path, couples):
+    IndexExemples(str(tmp_path), EmbeddeurNgrammes(dimension=1024)).construire(couples)
+
+    index = IndexExemples(str(tmp_path), EmbeddeurNgrammes(dimension=512))
+    assert index.construire(couples) == len(couples)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Tests de la classification par Ollama : catalogue des codes d'intention, préfixe réutilisé entre deux requêtes."""
+
+import time
+
+import pytest
+
+from classification_llm import CatalogueIntentions, PrefixeClassification, obtenir_catalogue
+
+INSTRUCTIONS = "Réponds IGNORE.\n\n"
+
+
+def test_contexte_evalue_une_fois(client, serveur):
+    prefixe = PrefixeClassification(client, INSTRUCTIONS, {'num_ctx': 1024})
+
+    premier = prefixe.payload('mistral:latest', "bonjour")
+    second = prefixe.payload('mistral:latest', "au revoir")
+
+    assert prefixe.preparations == 1
+    assert len(serveur.requetes) == 1
+    assert premier['context'] == second['context']
+    assert second['prompt'] == PrefixeClassification.suffixe("au revoir")
+
+
+def test_preparation_en_cours_prompt_complet(client, serveur):
+    prefixe = PrefixeClassification(client, INSTRUCTIONS, {'num_ctx': 1024})
+
+    # Une autre requête évalue les instructions : on n'attend pas au-delà de son propre délai
+    with prefixe._verrou_preparation:
+        debut = time.perf_counter()
+        payload = prefixe.payload('mistral:latest', "bonjour", timeout=0.1)
+        duree = time.perf_counter() - debut
+
+    assert duree < 1
+    assert 'context' not in payload
+    assert payload['prompt'] == INSTRUCTIONS + PrefixeClassification.suffixe("bonjour")
+    assert serveur.requetes == []
+
+
+@pytest.fixture
+def catalogue():
+    return CatalogueIntentions(['vlc', 'discord', 'firefox'])
+
+
+def test_catalogue_codes(catalogue):
+    # Intentions de 0 à 9, puis les logiciels triés
+    assert catalogue.intentions['0'] == 'IGNORE'
+    assert catalogue.intentions['3'] == 'NEXT_SONG'
+    assert catalogue.intentions['10'] == 'LAUNCH_SOFTWARE:discord'
+    assert catalogue.intentions['12'] == 'LAUNCH_SOFTWARE:vlc'
+    assert catalogue.codes['LAUNCH_SOFTWARE:firefox'] == '11'
+    assert "11: ouvrir le logiciel firefox" in catalogue.instructions
+    assert catalogue.num_predict == 4
+
+
+@pytest.mark.parametrize("texte, termine, intention", [
+    ("3", False, 'NEXT_SONG'),               # aucun code plus long ne commence par 3
+    ("1", False, None),                      # 10, 11 ou 12 restent possibles
+    (" 1", True, 'ACTION_SPOTIFY'),
+    ("1 ", False, 'ACTION_SPOTIFY'),
+    ("11", False, 'LAUNCH_SOFTWARE:firefox'),
+    ("42", True, 'IGNORE'),                  # numéro inconnu
+    ("NEXT", False, None),
+    ("NEXT_SONG", True, 'NEXT_SONG'),        # label en toutes lettres, une fois la réponse finie
+])
+def test_catalogue_decoder(catalogue, texte, termine, intention):
+    assert catalogue.decoder(texte, termine) == intention
+
+
+def test_obtenir_catalogue_par_version():
+    premier = obtenir_catalogue({'vlc': 'vlc.lnk'}, 10_001)
+
+    assert obtenir_catalogue({'vlc': 'vlc.lnk', 'discord': 'discord.lnk'}, 10_001) is premier
+    second = obtenir_catalogue({'vlc': 'vlc.lnk', 'discord': 'discord.lnk'}, 10_002)
+    assert second is not premier
+    assert 'LAUNCH_SOFTWARE:discord' in second.codes
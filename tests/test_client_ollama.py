@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Tests du client Ollama partagé : tentatives, flux interrompu, chronométrage."""
+
+import time
+
+import pytest
+import requests
+
+from client_ollama import ClientOllama
+from ollama_factice import ServeurOllamaFactice
+
+
+def test_lister_modeles(client):
+    assert client.lister_modeles() == ['mistral:latest']
+
+
+def test_generer_ajoute_le_keep_alive(client, serveur):
+    reponse = client.generer({'model': 'mistral', 'prompt': 'stop'})
+
+    assert reponse['response'] == 'IGNORE'
+    assert serveur.requetes[-1]['keep_alive'] == '30m'
+    assert serveur.requetes[-1]['stream'] is False
+
+
+def test_nouvelle_tentative_sur_503(client, serveur):
+    serveur.echecs = 2
+
+    reponse = client.generer({'model': 'mistral', 'prompt': 'stop'})
+
+    assert reponse['response'] == 'IGNORE'
+    assert len(serveur.requetes) == 3
+
+
+def test_tentatives_epuisees():
+    with ServeurOllamaFactice(echecs=5) as serveur:
+        client = ClientOllama(serveur.url_base, tentatives=1, facteur_attente=0)
+        try:
+            with pytest.raises(requests.exceptions.HTTPError) as erreur:
+                client.generer({'model': 'mistral', 'prompt': 'stop'})
+        finally:
+            client.fermer()
+
+    assert erreur.value.response.status_code == 503
+    assert len(serveur.requetes) == 2
+
+
+def test_connexion_reutilisee(client, serveur):
+    for _ in range(5):
+        client.generer({'model': 'mistral', 'prompt': 'stop'})
+
+    assert serveur.connexions == 1
+    assert client.statistiques()['nouvelles_connexions'] == 1
+
+
+def test_flux_complet(client):
+    morceaux = list(client.generer_flux({'model': 'mistral', 'prompt': 'stop'}))
+
+    assert ''.join(m['response'] for m in morceaux) == 'IGNORE'
+    assert morceaux[-1]['done'] is True
+    assert 'context' in morceaux[-1]
+
+
+def test_flux_interrompu_arrete_la_generation():
+    reponse = 'mot ' * 100
+    with ServeurOllamaFactice(reponse=reponse, latence_token_s=0.01) as serveur:
+        client = ClientOllama(serveur.url_base)
+        try:
+            flux = client.generer_flux({'model': 'mistral', 'prompt': 'stop'})
+            for _ in range(3):
+                next(flux)
+            flux.close()
+            # Laisser au serveur le temps de constater la fermeture
+            time.sleep(0.2)
+            envoyes = serveur.tokens_envoyes
+            time.sleep(0.2)
+
+            assert envoyes < 100
+            assert serveur.tokens_envoyes == envoyes
+
+            # La requête suivante ouvre une nouvelle connexion et fonctionne normalement
+            serveur.reponse = 'IGNORE'
+            assert client.generer({'model': 'mistral', 'prompt': 'stop'})['response'] == 'IGNORE'
+        finally:
+            client.fermer()
+
+
+def test_mesures(client):
+    client.generer({'model': 'mistral', 'prompt': 'stop'})
+    premiere = client.derniere_mesure()
+    client.generer({'model': 'mistral', 'prompt': 'stop'})
+    seconde = client.derniere_mesure()
+
+    assert premiere.chemin == '/api/generate'
+    assert premiere.statut == 200
+    assert premiere.nouvelle_connexion and premiere.duree_connexion_s > 0
+    assert not seconde.nouvelle_connexion and seconde.duree_connexion_s == 0.0
+    assert 0 < seconde.duree_premier_octet_s <= seconde.duree_totale_s
+
+
+def test_mesure_du_premier_octet():
+    with ServeurOllamaFactice(latence_s=0.1) as serveur:
+        client = ClientOllama(serveur.url_base)
+        try:
+            client.generer({'model': 'mistral', 'prompt': 'stop'})
+        finally:
+            client.fermer()
+
+    assert client.derniere_mesure().duree_premier_octet_s >= 0.1
+    statistiques = client.statistiques()
+    assert statistiques['requetes'] == 1
+    assert statistiques['premier_octet_moyen_ms'] >= 100
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'automate de mots-clés et de la grammaire Vosk qui en dérive."""
+
+import json
+
+import pytest
+
+from detection_mots_cles import (
+    MOT_INCONNU, MOTS_CLES_INTENTIONS, VERBES_LANCEMENT, AutomateAhoCorasick, DetecteurMotsCles,
+    forme_parlee, grammaire_commandes, obtenir_detecteur, phrases_commandes,
+)
+
+LOGICIELS = ['spotify', 'code', 'code_insiders', 'visual_studio_code', 'obs-studio', 'notepad++', 'discord']
+
+
+def detecter_lineaire(noms, texte):
+    """Analyse de référence : un test `in` par mot-clé, dans l'ordre de priorité."""
+    texte = texte.lower()
+    for name in sorted(noms, key=lambda n: -len(forme_parlee(n))):
+        for variante in (forme_parlee(name), name.lower()):
+            if any(f"{verbe} {variante}" in texte for verbe in VERBES_LANCEMENT):
+                return f'LAUNCH_SOFTWARE:{name}'
+    for code, mots_cles in MOTS_CLES_INTENTIONS:
+        if any(mot_cle in texte for mot_cle in mots_cles):
+            return code
+    return None
+
+
+@pytest.fixture(scope='module')
+def detecteur():
+    return DetecteurMotsCles(LOGICIELS)
+
+
+def test_automate_priorites():
+    automate = AutomateAhoCorasick()
+    automate.ajouter('lance spotify', 0)
+    automate.ajouter('lance', 1)
+    automate.ajouter('spot', 2)
+
+    assert automate.meilleure_priorite('bon lance spotify') == 0
+    assert automate.meilleure_priorite('relance') == 1
+    assert automate.meilleure_priorite('un spot') == 2
+    assert automate.meilleure_priorite('rien') is None
+
+
+def test_automate_lien_echec():
+    # "aab" : le motif "ab" commence pendant l'échec de "aac"
+    automate = AutomateAhoCorasick()
+    automate.ajouter('aac', 0)
+    automate.ajouter('ab', 1)
+
+    assert automate.meilleure_priorite('aab') == 1
+    assert automate.meilleure_priorite('xaacx') == 0
+
+
+@pytest.mark.parametrize('texte', [
+    "lance spotify", "ouvre code", "lance code insiders", "démarre visual studio code",
+    "start obs studio", "ouvre notepad++", "relance la musique", "monte le volume s'il te plaît",
+    "chanson suivante", "mets la playlist chill", "baisse le son et passe", "bonjour tout le monde", "",
+])
+def test_equivalent_analyse_lineaire(detecteur, texte):
+    assert detecteur.detecter(texte) == detecter_lineaire(LOGICIELS, texte)
+
+
+def test_nom_le_plus_long_prioritaire(detecteur):
+    assert detecteur.detecter("lance code insiders") == 'LAUNCH_SOFTWARE:code_insiders'
+    assert detecteur.detecter("lance code") == 'LAUNCH_SOFTWARE:code'
+
+
+@pytest.mark.parametrize('name,forme', [
+    ('visual_studio_code', 'visual studio code'),
+    ('obs-studio', 'obs studio'),
+    ('notepad++', 'notepad'),
+    ('Discord', 'discord'),
+    ('7zip', 'zip'),
+    ('++', ''),
+])
+def test_forme_parlee(name, forme):
+    assert forme_parlee(name) == forme
+
+
+def test_grammaire_et_detecteur(detecteur):
+    """Chaque phrase que Vosk peut transcrire avec la grammaire est reconnue par le détecteur."""
+    grammaire = json.loads(grammaire_commandes(LOGICIELS))
+    assert grammaire[-1] == MOT_INCONNU
+    assert grammaire[:-1] == phrases_commandes(LOGICIELS)
+
+    for phrase in grammaire[:-1]:
+        # Vosk ne produit que des mots en minuscules séparés par des espaces
+        assert phrase == ' '.join(phrase.lower().split())
+        assert detecteur.detecter(phrase) is not None, phrase
+
+    for name in LOGICIELS:
+        for verbe in VERBES_LANCEMENT:
+            assert detecteur.detecter(f"{verbe} {forme_parlee(name)}") == f'LAUNCH_SOFTWARE:{name}'
+
+
+def test_nom_sans_lettre_ignore():
+    assert phrases_commandes(['++']) == phrases_commandes([])
+    assert DetecteurMotsCles(['++']).detecter("lance") is None
+
+
+@pytest.mark.parametrize('texte,code', [
+    ("stop", 'PLAY_PAUSE'),
+    ("monte le son", 'VOLUME_UP'),
+    ("lance visual studio code", 'LAUNCH_SOFTWARE:visual_studio_code'),
+    ("lance code insiders", 'LAUNCH_SOFTWARE:code_insiders'),
+    # La playlist attend son nom
+    ("mets la playlist", None),
+    # "lance code" peut encore devenir "lance code insiders"
+    ("lance code", None),
+    # "relance" peut encore devenir "relance spotify" (ouvrir Spotify, plus prioritaire)
+    ("relance", None),
+    ("relance la musique", 'PLAY_PAUSE'),
+    ("bonjour", None),
+])
+def test_detecter_definitif(detecteur, texte, code):
+    assert detecteur.detecter_definitif(texte) == code
+
+
+def test_obtenir_detecteur_par_version():
+    db = {'code': 'code.exe'}
+    premier = obtenir_detecteur(db, 1001)
+
+    assert obtenir_detecteur(db, 1001) is premier
+    db['discord'] = 'discord.exe'
+    second = obtenir_detecteur(db, 1002)
+    assert second is not premier
+    assert second.detecter("ouvre discord") == 'LAUNCH_SOFTWARE:discord'
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Tests de la recherche approximative des noms de logiciels."""
+
+import random
+
+import pytest
+
+from recherche_logiciels import IndexLogiciels, distance_bornee
+
+
+def levenshtein(a, b):
+    """Distance d'édition complète, pour comparaison."""
+    precedente = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        courante = [i]
+        for j, cb in enumerate(b, 1):
+            courante.append(min(precedente[j] + 1, courante[j - 1] + 1, precedente[j - 1] + (ca != cb)))
+        precedente = courante
+    return precedente[-1]
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("discord", "discord", 0),
+    ("discord", "discorde", 1),
+    ("chien", "chine", 2),
+    ("kitten", "sitting", 3),
+    ("", "vlc", 3),
+])
+def test_distance_bornee_exacte_sous_la_borne(a, b, distance):
+    assert distance_bornee(a, b, 3) == distance
+    assert distance_bornee(b, a, 3) == distance
+
+
+def test_distance_bornee_au_dela_de_la_borne():
+    assert distance_bornee("kitten", "sitting", 2) == 3
+    assert distance_bornee("vlc", "visual studio code", 2) == 3
+
+
+def test_distance_bornee_comme_levenshtein():
+    generateur = random.Random(42)
+    for _ in range(500):
+        a = ''.join(generateur.choice('abc') for _ in range(generateur.randint(0, 8)))
+        b = ''.join(generateur.choice('abc') for _ in range(generateur.randint(0, 8)))
+        borne = generateur.randint(0, 4)
+        assert distance_bornee(a, b, borne) == min(levenshtein(a, b), borne + 1)
+
+
+@pytest.fixture
+def index():
+    return IndexLogiciels(['discord', 'visual_studio_code', 'vlc', 'firefox', 'obs_studio'])
+
+
+@pytest.mark.parametrize("texte, nom", [
+    ("lance discorde", 'discord'),
+    ("ouvre le visuel studio code", 'visual_studio_code'),
+    ("lance v l c", 'vlc'),
+    ("lance fire fox", 'firefox'),
+])
+def test_rechercher_lancement_nom_mal_transcrit(index, texte, nom):
+    resultat = index.rechercher_lancement(texte)
+
+    assert resultat is not None
+    assert resultat[0] == nom
+    assert 0.75 <= resultat[1] < 1
+
+
+@pytest.mark.parametrize("texte", ["discorde", "bonjour", "lance photoshop"])
+def test_rechercher_lancement_sans_verbe_ou_sans_nom_proche(index, texte):
+    assert index.rechercher_lancement(texte) is None
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Tests de la planification de la résidence du modèle Ollama (chargement, renouvellement, expiration)."""
+
+import time
+
+import pytest
+
+import residence_ollama
+from client_ollama import ClientOllama
+from ollama_factice import ServeurOllamaFactice
+from residence_ollama import ResidenceOllama, duree_keep_alive
+
+
+class Horloge:
+    """Remplace le module time de residence_ollama : monotonic() avance à la demande."""
+
+    def __init__(self):
+        self.maintenant = 1000.0
+
+    def monotonic(self):
+        return self.maintenant
+
+    perf_counter = staticmethod(time.perf_counter)
+
+
+@pytest.fixture
+def horloge(monkeypatch):
+    horloge = Horloge()
+    monkeypatch.setattr(residence_ollama, 'time', horloge)
+    return horloge
+
+
+def residence(client, **options):
+    options.setdefault('keep_alive', '10m')
+    options.setdefault('inactivite_max_s', 20 * 60)
+    options.setdefault('marge_s', 60.0)
+    return ResidenceOllama(client, lambda: 'mistral:latest', **options)
+
+
+def test_duree_keep_alive():
+    assert duree_keep_alive("10m") == 600
+    assert duree_keep_alive("1h") == 3600
+    assert duree_keep_alive(45) == 45
+    assert duree_keep_alive("-1") is None
+    with pytest.raises(ValueError):
+        duree_keep_alive("bientôt")
+
+
+def test_chargement_puis_attente_du_renouvellement(client, serveur, horloge):
+    r = residence(client)
+
+    assert r._prochaine_action() == 0.0
+    assert r.charge and r.chargements == 1
+    assert serveur.requetes[-1]['prompt'] == ''
+
+    # Renouvellement prévu une marge avant l'expiration du keep_alive
+    horloge.maintenant += 100
+    assert r._prochaine_action() == pytest.approx(600 - 60 - 100)
+    assert len(serveur.requetes) == 1
+
+
+def test_renouvellement_pendant_l_utilisation(client, serveur, horloge):
+    r = residence(client)
+    r._prochaine_action()
+
+    horloge.maintenant += 550
+    r.signaler_activite()
+    assert r._prochaine_action() == 0.0
+    assert r.rafraichissements == 1
+    assert len(serveur.requetes) == 2
+
+
+def test_expiration_apres_inactivite(client, serveur, horloge):
+    r = residence(client, inactivite_max_s=300)
+    r._prochaine_action()
+
+    # Inactif mais pas encore expiré : on attend l'expiration sans renouveler
+    horloge.maintenant += 400
+    assert r._prochaine_action() == pytest.approx(200)
+    assert r.rafraichissements == 0
+
+    horloge.maintenant += 200
+    assert r._prochaine_action() is None
+    assert not r.charge and r.expirations == 1
+
+    # Modèle déchargé et personne ne parle : aucune requête
+    assert r._prochaine_action() is None
+    assert len(serveur.requetes) == 1
+
+    r.signaler_activite()
+    assert r._prochaine_action() == 0.0
+    assert r.chargements == 2
+
+
+def test_keep_alive_infini(client, horloge):
+    r = residence(client, keep_alive=-1)
+
+    assert r._prochaine_action() == 0.0
+    assert r._prochaine_action() is None
+
+
+def test_attente_apres_echec(horloge):
+    with ServeurOllamaFactice(echecs=10) as serveur:
+        client = ClientOllama(serveur.url_base, tentatives=0, facteur_attente=0)
+        try:
+            r = residence(client, attente_echec_s=30.0)
+            assert r._prochaine_action() == 0.0
+            assert r.echecs == 1 and not r.charge
+
+            horloge.maintenant += 10
+            assert r._prochaine_action() == pytest.approx(20)
+            assert len(serveur.requetes) == 1
+        finally:
+            client.fermer()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'engagement anticipé sur les résultats partiels de Vosk."""
+
+import json
+
+import pytest
+
+from detection_mots_cles import DetecteurMotsCles
+from pipeline_audio import PipelineVocal, SuiviPartiels
+
+
+@pytest.fixture
+def suivi():
+    detecteur = DetecteurMotsCles(['spotify', 'code', 'code_insiders'])
+    return SuiviPartiels(detecteur.detecter_definitif, blocs_stables=2)
+
+
+def test_engagement_apres_partiels_stables(suivi):
+    resultats = [suivi.partiel("stop", instant) for instant in (0.0, 0.1, 0.2, 0.3)]
+
+    # Le partiel doit rester identique pendant deux blocs supplémentaires, puis n'est engagé qu'une fois
+    assert resultats == [None, None, 'PLAY_PAUSE', None]
+    assert suivi.statistiques()['engages'] == 1
+
+
+def test_partiel_qui_change_repart_de_zero(suivi):
+    assert suivi.partiel("monte", 0.0) is None
+    assert suivi.partiel("monte", 0.1) is None
+    assert suivi.partiel("monte le son", 0.2) is None
+    assert suivi.partiel("monte le son", 0.3) is None
+    assert suivi.partiel("monte le son", 0.4) == 'VOLUME_UP'
+
+
+def test_final_identique_ecarte(suivi):
+    for instant in (0.0, 0.1, 0.2):
+        suivi.partiel("stop", instant)
+
+    assert suivi.final("stop", 0.5) is True
+    statistiques = suivi.statistiques()
+    assert statistiques['doublons_evites'] == 1
+    assert statistiques['desaccords'] == 0
+    assert statistiques['latence_partiel_ms'] == pytest.approx(200)
+    assert statistiques['latence_final_ms'] == pytest.approx(500)
+    assert statistiques['gain_moyen_ms'] == pytest.approx(300)
+
+
+def test_final_en_desaccord_ecarte(suivi):
+    for instant in (0.0, 0.1, 0.2):
+        suivi.partiel("stop", instant)
+
+    # Une seule action par énoncé, même si le texte final désigne une autre commande
+    assert suivi.final("lance spotify", 0.5) is True
+    assert suivi.statistiques()['desaccords'] == 1
+
+
+def test_final_sans_engagement_transmis(suivi):
+    suivi.partiel("bonjour", 0.0)
+
+    assert suivi.final("bonjour", 0.3) is False
+    assert suivi.statistiques()['engages'] == 0
+
+
+@pytest.mark.parametrize('texte', ["relance", "lance code", "mets la playlist"])
+def test_partiel_prolongeable_non_engage(suivi, texte):
+    assert [suivi.partiel(texte, instant) for instant in (0.0, 0.1, 0.2, 0.3)] == [None] * 4
+    assert suivi.final(texte, 0.5) is False
+
+
+def test_nouvel_enonce_apres_final(suivi):
+    for instant in (0.0, 0.1, 0.2):
+        suivi.partiel("stop", instant)
+    suivi.final("stop", 0.3)
+
+    assert [suivi.partiel("suivant", instant) for instant in (1.0, 1.1, 1.2)] == [None, None, 'NEXT_SONG']
+    assert suivi.statistiques()['engages'] == 2
+
+
+def test_reinitialiser(suivi):
+    suivi.partiel("stop", 0.0)
+    suivi.partiel("stop", 0.1)
+    suivi.reinitialiser()
+
+    assert suivi.partiel("stop", 0.2) is None
+
+
+class RecognizerScripte:
+    """Faux KaldiRecognizer : chaque bloc porte son texte partiel, ou '|texte' pour un résultat final."""
+
+    def __init__(self):
+        self._texte = ""
+
+    def AcceptWaveform(self, bloc):
+        texte = bloc.decode('utf-8')
+        self._texte = texte.lstrip('|')
+        return texte.startswith('|')
+
+    def PartialResult(self):
+        return json.dumps({'partial': self._texte})
+
+    def Result(self):
+        return json.dumps({'text': self._texte})
+
+    def FinalResult(self):
+        return json.dumps({'text': ''})
+
+
+def test_debut_enonce_une_fois_par_enonce():
+    blocs = iter([b"mets", b"mets la", b"|mets la musique", b"stop", b"|stop"])
+    debuts = []
+    pipeline = PipelineVocal(
+        lire_bloc=lambda: next(blocs, b""),
+        recognizer=RecognizerScripte(),
+        analyser=lambda texte: None,
+        executer=lambda intention, texte: None,
+        sans_perte=True,
+        debut_enonce=lambda: debuts.append(True),
+    )
+    pipeline.demarrer()
+    pipeline.attendre(timeout=5)
+    pipeline.arreter()
+
+    # Barge-in : la voix est coupée au premier partiel de chacun des deux énoncés
+    assert len(debuts) == 2
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Transcription et étiquetage d'intention en lot, sur tous les coeurs.
+
+Chaque fichier WAV est transcrit par Vosk puis passé à analyser_intention()
+de l'assistant (analyse_intentions.py : ni micro, ni carte son, ni synthèse vocale). Les fichiers sont répartis sur un ProcessPoolExecutor dont
+chaque processus charge le modèle une seule fois ; les résultats sont écrits
+en JSONL dans l'ordre des fichiers d'entrée, au fil de l'eau. Relancer la
+même commande reprend là où le traitement s'était arrêté.
+
+Utilisation :
+    python transcription_lot.py archives/ --sortie etiquettes.jsonl
+    python transcription_lot.py liste_fichiers.txt --sortie etiquettes.jsonl --processus 8 --mots-cles-seulement
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
+
+# Configurer l'encodage UTF-8 pour la console Windows
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+SAMPLE_RATE = 16000
+TAILLE_BLOC = 8000
+
+# État de chaque processus de travail (initialisé une seule fois par _initialiser_travailleur)
+_MODELE = None
+_ANALYSER = None
+
+
+def lister_fichiers(entree: str) -> List[str]:
+    """
+    Liste les fichiers à traiter.
+
+    Args:
+        entree: Dossier (parcouru récursivement) ou fichier texte contenant un chemin par ligne
+
+    Returns:
+        list: Chemins des fichiers WAV, dans un ordre stable
+    """
+    if os.path.isdir(entree):
+        fichiers = []
+        for dossier, _, noms in os.walk(entree):
+            fichiers.extend(os.path.join(dossier, nom) for nom in noms if nom.lower().endswith('.wav'))
+        return sorted(fichiers)
+    with open(entree, 'r', encoding='utf-8') as f:
+        return [ligne.strip() for ligne in f if ligne.strip() and not ligne.startswith('#')]
+
+
+def fichiers_deja_traites(sortie: str) -> Set[str]:
+    """
+    Relit la sortie d'un traitement interrompu.
+
+    Une dernière ligne tronquée (arrêt pendant l'écriture) est retirée du fichier.
+
+    Args:
+        sortie: Fichier JSONL des résultats
+
+    Returns:
+        set: Chemins des fichiers déjà traités
+    """
+    if not os.path.exists(sortie):
+        return set()
+    traites = set()
+    taille_valide = 0
+    with open(sortie, 'rb') as f:
+        for ligne in f:
+            try:
+                traites.add(json.loads(ligne.decode('utf-8'))['fichier'])
+            except (ValueError, KeyError, UnicodeDecodeError):
+                break
+            taille_valide += len(ligne)
+    if taille_valide < os.path.getsize(sortie):
+        with open(sortie, 'r+b') as f:
+            f.truncate(taille_valide)
+        print(f"⚠️  Dernière ligne incomplète retirée de {sortie}")
+    return traites
+
+
+def _initialiser_travailleur(chemin_modele: str, mots_cles_seulement: bool, modele_ollama: Optional[str]) -> None:
+    """Charge le modèle Vosk et l'analyseur d'intention une fois pour toute la vie du processus."""
+    global _MODELE, _ANALYSER
+
+    import vosk
+    from modeles_vosk import REGISTRE_MODELES
+
+    vosk.SetLogLevel(-1)
+    _MODELE = REGISTRE_MODELES.obtenir(chemin_modele)
+
+    import analyse_intentions as intentions
+    from cache_intentions import CacheIntentions
+
+    intentions.load_software_db()
+    if mots_cles_seulement:
+        _ANALYSER = lambda texte, incidents: intentions.analyser_intention_mots_cles(texte)
+        return
+
+    intentions.OLLAMA_MODEL_ACTUAL = modele_ollama
+    # Le cache des intentions sert en lecture : plusieurs processus ne doivent pas réécrire le même fichier
+    cache = CacheIntentions(intentions.INTENT_CACHE_SIZE, intentions.INTENT_CACHE_TTL, intentions.INTENT_CACHE_PATH)
+    cache.charger()
+    cache.chemin = None
+    intentions.CACHE_INTENTIONS = cache
+    _ANALYSER = intentions.analyser_intention
+
+
+def traiter_fichier(chemin: str) -> Dict:
+    """
+    Transcrit un fichier et étiquette son intention (dans un processus de travail).
+
+    Args:
+        chemin: Fichier WAV
+
+    Returns:
+        dict: fichier, texte, intention, durée audio, durée de traitement, erreur éventuelle (dont une commande
+            ignorée parce que des étages de la cascade étaient en erreur ou hors budget : pas une vraie étiquette)
+    """
+    import vosk
+    from sources_audio import SourceWav
+
+    debut = time.perf_counter()
+    resultat = {'fichier': chemin, 'texte': '', 'intention': None, 'duree_audio_s': 0.0}
+    try:
+        recognizer = vosk.KaldiRecognizer(_MODELE, SAMPLE_RATE)
+        textes = []
+        echantillons = 0
+        with SourceWav(chemin, SAMPLE_RATE, TAILLE_BLOC, temps_reel=False) as source:
+            while True:
+                bloc = source.lire()
+                if not bloc:
+                    break
+                echantillons += len(bloc) // 2
+                if recognizer.AcceptWaveform(bloc):
+                    textes.append(json.loads(recognizer.Result()).get('text', ''))
+        textes.append(json.loads(recognizer.FinalResult()).get('text', ''))
+
+        texte = ' '.join(t for t in textes if t).strip()
+        resultat['texte'] = texte
+        resultat['duree_audio_s'] = echantillons / SAMPLE_RATE
+        if texte:
+            incidents: Dict[str, str] = {}
+            resultat['intention'] = _ANALYSER(texte, incidents)
+            if incidents:
+                resultat['intention'] = None
+                resultat['erreur'] = '; '.join(f"{etage}: {cause}" for etage, cause in incidents.items())
+    except Exception as e:
+        resultat['erreur'] = f"{type(e).__name__}: {e}"
+    resultat['duree_traitement_s'] = time.perf_counter() - debut
+    resultat['processus'] = os.getpid()
+    return resultat
+
+
+def traiter_lot(
+    fichiers: List[str],
+    sortie: str,
+    chemin_modele: str,
+    processus: int,
+    mots_cles_seulement: bool = False,
+    modele_ollama: Optional[str] = None,
+    en_vol_par_processus: int = 4,
+) -> Dict:
+    """
+    Traite les fichiers en parallèle et écrit les résultats dans l'ordre d'entrée.
+
+    Args:
+        fichiers: Fichiers à traiter (déjà privés de ceux traités lors d'un passage précédent)
+        sortie: Fichier JSONL complété au fil de l'eau
+        chemin_modele: Dossier du modèle Vosk
+        processus: Nombre de processus de travail
+        mots_cles_seulement: N'utiliser que la détection par mots-clés (pas d'Ollama)
+        modele_ollama: Nom exact du modèle Ollama
+        en_vol_par_processus: Tâches soumises d'avance par processus (borne la mémoire des résultats en attente)
+
+    Returns:
+        dict: fichiers, erreurs, secondes d'audio, durée totale, débit
+    """
+    debut = time.perf_counter()
+    duree_audio = 0.0
+    erreurs = 0
+    ecrits = 0
+
+    with open(sortie, 'a', encoding='utf-8') as f, ProcessPoolExecutor(
+        max_workers=processus,
+        initializer=_initialiser_travailleur,
+        initargs=(chemin_modele, mots_cles_seulement, modele_ollama),
+    ) as executeur:
+        a_soumettre = iter(fichiers)
+        en_vol = deque()
+        for chemin in a_soumettre:
+            en_vol.append(executeur.submit(traiter_fichier, chemin))
+            if len(en_vol) >= processus * en_vol_par_processus:
+                break
+
+        while en_vol:
+            # Le plus ancien d'abord : l'ordre de sortie est celui d'entrée
+            resultat = en_vol.popleft().result()
+            suivant = next(a_soumettre, None)
+            if suivant is not None:
+                en_vol.append(executeur.submit(traiter_fichier, suivant))
+
+            f.write(json.dumps(resultat, ensure_ascii=False) + '\n')
+            f.flush()
+            ecrits += 1
+            duree_audio += resultat['duree_audio_s']
+            if 'erreur' in resultat:
+                erreurs += 1
+                print(f"❌ {resultat['fichier']} : {resultat['erreur']}")
+            if ecrits % 100 == 0 or not en_vol:
+                ecoule = time.perf_counter() - debut
+                print(f"⏳ {ecrits}/{len(fichiers)} fichiers, {duree_audio / ecoule:.1f} s d'audio par seconde")
+
+    duree = time.perf_counter() - debut
+    return {
+        'fichiers': ecrits,
+        'erreurs': erreurs,
+        'duree_audio_s': duree_audio,
+        'duree_s': duree,
+        'debit': duree_audio / duree if duree else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Transcription et étiquetage d'intention en lot")
+    parser.add_argument('entree', help="Dossier de fichiers WAV, ou fichier texte listant un chemin par ligne")
+    parser.add_argument('--sortie', required=True, help="Fichier JSONL des résultats (complété en cas de reprise)")
+    parser.add_argument('--modele', default="vosk-model-small-fr-0.22", help="Dossier du modèle Vosk")
+    parser.add_argument('--processus', type=int, default=os.cpu_count() or 1, help="Nombre de processus de travail")
+    parser.add_argument('--mots-cles-seulement', action='store_true', help="Étiquetage par mots-clés uniquement (sans Ollama)")
+    parser.add_argument('--recommencer', action='store_true', help="Ignore les résultats existants et recommence")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.modele):
+        print(f"❌ Modèle Vosk introuvable : {args.modele}")
+        sys.exit(1)
+
+    fichiers = lister_fichiers(args.entree)
+    if args.recommencer and os.path.exists(args.sortie):
+        os.remove(args.sortie)
+    traites = fichiers_deja_traites(args.sortie)
+    restants = [chemin for chemin in fichiers if chemin not in traites]
+    print(f"📂 {len(fichiers)} fichiers, {len(fichiers) - len(restants)} déjà traités, {len(restants)} à traiter "
+          f"sur {args.processus} processus")
+    if not restants:
+        return
+
+    modele_ollama = None
+    if not args.mots_cles_seulement:
+        import analyse_intentions as intentions
+        if not intentions.verifier_ollama():
+            print("💡 Lancez Ollama ou utilisez --mots-cles-seulement")
+            sys.exit(1)
+        modele_ollama = intentions.OLLAMA_MODEL_ACTUAL
+
+    try:
+        bilan = traiter_lot(restants, args.sortie, args.modele, args.processus, args.mots_cles_seulement, modele_ollama)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrompu : relancez la même commande pour reprendre")
+        sys.exit(1)
+
+    print(f"✅ {bilan['fichiers']} fichiers ({bilan['erreurs']} erreurs), {bilan['duree_audio_s']:.0f} s d'audio "
+          f"en {bilan['duree_s']:.1f} s, soit {bilan['debit']:.1f} s d'audio par seconde")
+
+
+if __name__ == "__main__":
+    main()